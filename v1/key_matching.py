@@ -0,0 +1,143 @@
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+FUZZY_THRESHOLD = 0.9  # Минимальная похожесть ключей при нечётком сопоставлении
+MAX_BLOCK_PAIRS = 200000  # Максимум пар-кандидатов в одном блоке
+WORKERS = 4
+KEY_SEPARATOR = '\x1f'  # Разделитель колонок составного ключа
+FLOAT_DIGITS = 15  # Значащих цифр десятичного числа, которые float64 всегда хранит точно
+
+
+def normalize_key_series(series, trim=True, casefold=True, numeric=True, dates=False):
+    """
+    Приводит значения ключевой колонки к единому виду, целиком для колонки.
+    Обрезает и схлопывает пробелы, записывает числа в одной форме
+    ('1.50' и 1.5 -> '1.5', '7.0' -> '7'), даты - в ISO, приводит регистр.
+    Целые числа переписываются как текст, чтобы длинные идентификаторы
+    сохраняли все цифры, остальные числа - только если float64 хранит их
+    точно. Пустые значения остаются None.
+    """
+    missing = series.isna().to_numpy()
+    text = series.astype(object).where(~missing, '').astype(str)
+    if trim:
+        text = text.str.strip().str.replace(r'\s+', ' ', regex=True)
+    result = text.copy()
+
+    parsed = np.zeros(len(text), dtype=bool)
+    if numeric:
+        # У целых убираем знак плюс, ведущие нули и нулевую дробную часть
+        parts = text.str.extract(r'^([+-]?)0*(\d+?)(?:\.0*)?$')
+        integers = parts[1].notna().to_numpy() & ~missing
+        if integers.any():
+            signs = parts[0][integers].where(parts[1][integers] != '0', '').str.replace('+', '', regex=False)
+            result[integers] = signs + parts[1][integers]
+        numbers = pd.to_numeric(text.where(~integers), errors='coerce')
+        digits = text.str.replace(r'[eE].*$', '', regex=True).str.replace(r'\D', '', regex=True).str.strip('0')
+        decimals = numbers.notna().to_numpy() & ~missing & ~integers & (digits.str.len() <= FLOAT_DIGITS).to_numpy()
+        if decimals.any():
+            values = numbers[decimals]
+            integral = (values % 1 == 0) & (values.abs() < 2 ** 53)
+            canonical = values.astype(str)
+            canonical[integral] = values[integral].astype('int64').astype(str)
+            result[decimals] = canonical
+        parsed = integers | decimals
+    if dates:
+        candidates = ~parsed & ~missing & (text != '').to_numpy()
+        if candidates.any():
+            stamps = pd.to_datetime(text[candidates], errors='coerce', format='mixed')
+            valid = stamps.notna().to_numpy()
+            if valid.any():
+                stamps = stamps[valid]
+                midnight = stamps == stamps.dt.normalize()
+                # По позиции: в индексе могут быть повторяющиеся метки
+                result.iloc[np.flatnonzero(candidates)[valid]] = np.where(
+                    midnight, stamps.dt.strftime('%Y-%m-%d'), stamps.dt.strftime('%Y-%m-%d %H:%M:%S'))
+    if casefold:
+        result = result.str.casefold()
+    return result.astype(object).where(~missing, None)
+
+
+def build_keys(df, columns, normalize=False, dates=False):
+    """Строковый ключ каждой строки из указанных колонок (без построчного apply)."""
+    parts = []
+    for col in columns:
+        values = normalize_key_series(df[col], dates=dates) if normalize else df[col]
+        parts.append(values.astype(object).where(values.notna(), '').astype(str))
+    keys = parts[0]
+    for part in parts[1:]:
+        keys = keys + KEY_SEPARATOR + part
+    return keys
+
+
+def fuzzy_pairs(keys1, keys2, threshold=FUZZY_THRESHOLD, workers=WORKERS):
+    """
+    Сопоставляет ключи двух списков один к одному по похожести строк.
+    Сравниваются только ключи с общим первым или последним символом
+    (блокировка), блоки оцениваются в пуле потоков. Возвращает список
+    (позиция в keys1, позиция в keys2, похожесть), лучшие пары первыми.
+    """
+    if not keys1 or not keys2:
+        return []
+    blocks = {}
+    for side, keys in enumerate((keys1, keys2)):
+        for i, key in enumerate(keys):
+            for block in (('head', key[:1]), ('tail', key[-1:])):
+                blocks.setdefault(block, ([], []))[side].append(i)
+
+    # Отбрасываем пары, у которых похожесть ограничена разницей длин
+    lengths1 = np.array([len(key) for key in keys1])
+    lengths2 = np.array([len(key) for key in keys2])
+    candidates = []
+    for members1, members2 in blocks.values():
+        if not members1 or not members2:
+            continue
+        members1, members2 = np.array(members1), np.array(members2)
+        l1, l2 = lengths1[members1][:, None], lengths2[members2][None, :]
+        bound = 2 * np.minimum(l1, l2) / np.maximum(l1 + l2, 1)
+        rows, cols = np.nonzero(bound >= threshold)
+        if len(rows) > MAX_BLOCK_PAIRS:
+            best = np.argsort(-bound[rows, cols], kind='stable')[:MAX_BLOCK_PAIRS]
+            rows, cols = rows[best], cols[best]
+        candidates.append((members1[rows], members2[cols]))
+
+    def score_block(block):
+        positions1, positions2 = block
+        scored = []
+        matcher = SequenceMatcher(autojunk=False)
+        for j in np.unique(positions2):
+            matcher.set_seq2(keys2[j])
+            for i in positions1[positions2 == j]:
+                matcher.set_seq1(keys1[i])
+                if matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold:
+                    score = matcher.ratio()
+                    if score >= threshold:
+                        scored.append((score, int(i), int(j)))
+        return scored
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        scored = [pair for block in executor.map(score_block, candidates) for pair in block]
+
+    matches, used1, used2 = [], set(), set()
+    for score, i, j in sorted(set(scored), key=lambda pair: (-pair[0], pair[1], pair[2])):
+        if i not in used1 and j not in used2:
+            used1.add(i)
+            used2.add(j)
+            matches.append((i, j, score))
+    return matches
+
+
+def match_leftover_keys(keys_a, keys_b, threshold=FUZZY_THRESHOLD):
+    """
+    Заменяет ключи B, не найденные в A, на похожие ключи A, не найденные в B.
+    Возвращает новые ключи B и число сопоставленных ключей.
+    """
+    left_a = pd.Index(keys_a.unique()).difference(keys_b.unique())
+    left_b = pd.Index(keys_b.unique()).difference(keys_a.unique())
+    matches = fuzzy_pairs(list(left_a), list(left_b), threshold)
+    if not matches:
+        return keys_b, 0
+    mapping = {left_b[j]: left_a[i] for i, j, _ in matches}
+    return keys_b.replace(mapping), len(matches)
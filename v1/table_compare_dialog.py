@@ -7,6 +7,7 @@ from PyQt5.QtGui import QColor, QBrush, QPen, QFont, QPainter, QIcon
 from PyQt5.QtWidgets import QApplication, QDesktopWidget
 import sqlite3
 import pandas as pd
+from key_matching import build_keys, match_leftover_keys
 
 
 class ComparisonItemDelegate(QStyledItemDelegate):
@@ -193,6 +194,19 @@ class TableCompareDialog(QWidget):
         compare_btn.clicked.connect(self.compare_tables)
         button_layout.addWidget(compare_btn)
         
+        # Параметры сопоставления ключей
+        self.normalize_keys_cb = QCheckBox('Нормализовать ключи')
+        self.normalize_keys_cb.setToolTip('Игнорировать регистр, лишние пробелы и запись чисел (1.0 = 1)')
+        button_layout.addWidget(self.normalize_keys_cb)
+        self.parse_dates_cb = QCheckBox('Распознавать даты')
+        self.parse_dates_cb.setToolTip('Сопоставлять даты, записанные в разных форматах')
+        button_layout.addWidget(self.parse_dates_cb)
+        self.fuzzy_keys_cb = QCheckBox('Нечёткое сопоставление')
+        self.fuzzy_keys_cb.setToolTip('Сопоставлять оставшиеся без пары ключи по похожести')
+        button_layout.addWidget(self.fuzzy_keys_cb)
+        self.fuzzy_info_label = QLabel('')
+        button_layout.addWidget(self.fuzzy_info_label)
+        
         # Добавляем кнопку в разделитель
         self.splitter.addWidget(button_widget)
         
@@ -266,8 +280,16 @@ class TableCompareDialog(QWidget):
             df_b.columns = [f'B_{col}' for col in df_b.columns]
             
             # Создание ключей для объединения
-            df_a['merge_key'] = df_a.apply(lambda row: '_'.join([str(row[f'A_{col}']) for col in self.key_columns_a]), axis=1)
-            df_b['merge_key'] = df_b.apply(lambda row: '_'.join([str(row[f'B_{col}']) for col in self.key_columns_b]), axis=1)
+            normalize = self.normalize_keys_cb.isChecked() or self.parse_dates_cb.isChecked()
+            dates = self.parse_dates_cb.isChecked()
+            df_a['merge_key'] = build_keys(df_a, [f'A_{col}' for col in self.key_columns_a], normalize, dates)
+            df_b['merge_key'] = build_keys(df_b, [f'B_{col}' for col in self.key_columns_b], normalize, dates)
+            
+            # Нечёткое сопоставление ключей, не нашедших пары
+            self.fuzzy_info_label.setText('')
+            if self.fuzzy_keys_cb.isChecked():
+                df_b['merge_key'], matched = match_leftover_keys(df_a['merge_key'], df_b['merge_key'])
+                self.fuzzy_info_label.setText(f'Нечётко сопоставлено ключей: {matched}')
             
             # Полное внешнее объединение
             self.merged_data = pd.merge(df_a, df_b, on='merge_key', how='outer')
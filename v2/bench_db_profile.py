@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark SQLite connection profiles on a copy of the session database
+
+Usage: python bench_db_profile.py [session_db.sqlite] [rows]
+"""
+
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from utils.db_profile import CONNECTION_PRESETS, apply_connection_profile
+
+
+def run_workload(db_path, profile, rows):
+    """Time a typical import followed by a few interactive queries"""
+    conn = sqlite3.connect(db_path)
+    effective = apply_connection_profile(conn, profile)
+    timings = {}
+
+    # Import: create a table and insert rows in one transaction
+    start = time.perf_counter()
+    conn.execute('DROP TABLE IF EXISTS "_bench_import"')
+    conn.execute('CREATE TABLE "_bench_import" ("id" TEXT, "name" TEXT, "category" TEXT, "value" TEXT)')
+    conn.executemany(
+        'INSERT INTO "_bench_import" VALUES (?, ?, ?, ?)',
+        ((str(i), f"name_{i}", f"cat_{i % 50}", str(i * 1.5)) for i in range(rows))
+    )
+    conn.commit()
+    timings['import'] = time.perf_counter() - start
+
+    # Queries: aggregate, self-join and ordered scan
+    queries = [
+        'SELECT category, count(*), sum(CAST(value AS REAL)) FROM "_bench_import" GROUP BY category',
+        'SELECT count(*) FROM "_bench_import" a JOIN "_bench_import" b ON a.id = b.id',
+        'SELECT * FROM "_bench_import" ORDER BY name DESC LIMIT 100'
+    ]
+    start = time.perf_counter()
+    for query in queries:
+        conn.execute(query).fetchall()
+    timings['queries'] = time.perf_counter() - start
+
+    # Edits: many small committed updates, as the editors do
+    start = time.perf_counter()
+    for i in range(0, min(rows, 2000)):
+        conn.execute('UPDATE "_bench_import" SET value = ? WHERE rowid = ?', (str(i), i + 1))
+        conn.commit()
+    timings['edits'] = time.perf_counter() - start
+
+    conn.execute('DROP TABLE "_bench_import"')
+    conn.commit()
+    conn.close()
+    return effective, timings
+
+
+def main():
+    """Run the workload once per preset"""
+    source_db = sys.argv[1] if len(sys.argv) > 1 else '../session_db.sqlite'
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+
+    temp_dir = tempfile.mkdtemp(prefix='db_profile_bench_')
+    try:
+        print(f"Rows: {rows}, source: {source_db if os.path.exists(source_db) else 'empty database'}")
+        print(f"{'Profile':<12} {'Journal':<8} {'Sync':<7} {'Import':>9} {'Queries':>9} {'Edits':>9}")
+        for name, profile in CONNECTION_PRESETS.items():
+            db_path = os.path.join(temp_dir, f"{name.replace(' ', '_')}.sqlite")
+            if os.path.exists(source_db):
+                shutil.copyfile(source_db, db_path)
+            effective, timings = run_workload(db_path, profile, rows)
+            print(f"{name:<12} {effective['journal_mode']:<8} {effective['synchronous']:<7} "
+                  f"{timings['import']:>8.3f}s {timings['queries']:>8.3f}s {timings['edits']:>8.3f}s")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
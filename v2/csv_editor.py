@@ -7,12 +7,14 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QListWidget, QCheckBox, QDialogButtonBox,
                              QToolBar, QAction, QMenu, QApplication, QInputDialog,
                              QComboBox, QListWidgetItem, QRadioButton, QButtonGroup)
-from PyQt5.QtCore import Qt, QEvent, QSize, QPoint, QRect, QUrl
+from PyQt5.QtCore import Qt, QEvent, QSize, QPoint, QRect, QUrl, QThread, QTimer, pyqtSignal
 from PyQt5.QtGui import QIcon, QColor, QKeySequence, QFont, QBrush, QPainter, QPen, QPixmap, QCursor
 from PyQt5.QtMultimedia import QSoundEffect
 import sqlite3
 import colorsys
 from collections import defaultdict
+from pathlib import Path
+from utils.table_window import SQLiteTableWindow, WindowPages, register_functions
 try:
     import openpyxl
     from openpyxl.styles import Font, PatternFill
@@ -503,6 +505,43 @@ class DragDropTableWidget(QTableWidget):
         # Clear undo data
         self.undo_data = None
 
+WINDOW_PAGES = 3  # Pages of a table window kept in the widget while scrolling
+
+
+class RowCountWorker(QThread):
+    """Counts the rows of a table window on a read-only connection of its own"""
+    counted = pyqtSignal(int, int)  # generation, row count
+    
+    def __init__(self, db_path, sql, params, generation, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.sql = sql
+        self.params = params
+        self.generation = generation
+        self.conn = None
+        
+    def run(self):
+        try:
+            self.conn = sqlite3.connect(Path(self.db_path).resolve().as_uri() + '?mode=ro', uri=True,
+                                        check_same_thread=False)
+            try:
+                register_functions(self.conn)
+                count = self.conn.execute(self.sql, self.params).fetchone()[0]
+            finally:
+                self.conn.close()
+            self.counted.emit(self.generation, count)
+        except sqlite3.Error:
+            pass  # Interrupted by a newer count, or the database went away
+            
+    def cancel(self):
+        """Abort the count; safe to call from the GUI thread"""
+        try:
+            if self.conn is not None:
+                self.conn.interrupt()
+        except sqlite3.Error:
+            pass
+
+
 class CSVEditor(QWidget):
     def __init__(self, main_window):
         super().__init__()
@@ -518,9 +557,23 @@ class CSVEditor(QWidget):
         self.column_widths = {}  # Store Excel column width information: {col_idx: width_in_pixels}
         self.current_file = None  # Store current file path
         self.current_table_name = None  # Store current table name when loaded from database
+        self.table_window = None  # Live view of a SQLite table, paged as the table is scrolled
+        self.window_rowids = []  # Rowid of each shown row while a table window is open
+        self.window_pages = WindowPages()  # Loaded pages of the table window and their shown rows
+        self.window_at_end = False
+        self.window_total = None  # Rows in the table window, None while counting
+        self.window_generation = 0  # Bumped on reload so stale counts are ignored
+        self.window_loading = False
+        self.count_worker = None
         
         self.init_ui()
         
+        # Edits of a table window are written back in batches
+        self.window_flush_timer = QTimer(self)
+        self.window_flush_timer.setSingleShot(True)
+        self.window_flush_timer.setInterval(500)
+        self.window_flush_timer.timeout.connect(self.flush_table_window)
+        
     def init_ui(self):
         layout = QVBoxLayout(self)
         
@@ -599,6 +652,7 @@ class CSVEditor(QWidget):
         # Connect signals for formula editing
         self.table.itemChanged.connect(self.on_item_changed)
         self.table.itemDoubleClicked.connect(self.on_item_double_clicked)
+        self.table.verticalScrollBar().valueChanged.connect(self.on_table_scrolled)
         
         layout.addWidget(self.table)
         
@@ -684,6 +738,8 @@ class CSVEditor(QWidget):
             self.column_widths = {}  # Clear column widths for CSV files
             self.current_file = file_path  # Store current file path
             self.current_table_name = None  # Clear table name when loading from file
+            self.close_table_window()
+            self.mark_structure_changed()
             
             self.update_table_display()
             self.update_main_window_title()
@@ -703,6 +759,8 @@ class CSVEditor(QWidget):
             self.column_widths = {}  # Clear column widths for simple Excel loading
             self.current_file = file_path  # Store current file path
             self.current_table_name = None  # Clear table name when loading from file
+            self.close_table_window()
+            self.mark_structure_changed()
             
             self.update_table_display()
             self.update_main_window_title()
@@ -860,6 +918,8 @@ class CSVEditor(QWidget):
             self.csv_data = data
             self.current_file = file_path  # Store current file path
             self.current_table_name = None  # Clear table name when loading from file
+            self.close_table_window()
+            self.mark_structure_changed()
             
             self.update_table_display()
             self.update_main_window_title()
@@ -880,6 +940,9 @@ class CSVEditor(QWidget):
             
     def save_csv_file(self, file_path):
         """Save CSV file to path"""
+        if self.table_window is not None:
+            self.save_table_window_csv(file_path)
+            return
         try:
             df = pd.DataFrame(self.csv_data, columns=self.csv_headers)
             df.to_csv(file_path, index=False, encoding='utf-8')
@@ -889,6 +952,19 @@ class CSVEditor(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save CSV: {e}")
             
+    def save_table_window_csv(self, file_path):
+        """Save all rows of a table window (filtered and sorted) without loading them at once"""
+        try:
+            self.flush_table_window()
+            with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(self.csv_headers)
+                for rows in self.table_window.iter_rows():
+                    writer.writerows(rows)
+            self.main_window.log_message(f"Table '{self.table_window.table}' saved to {file_path}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to save CSV: {e}")
+            
     def save_xlsx(self):
         """Save XLSX file"""
         if not OPENPYXL_AVAILABLE:
@@ -985,13 +1061,23 @@ class CSVEditor(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save Excel file: {e}")
             
+    def mark_structure_changed(self):
+        """Tell session autosave that rows or columns changed"""
+        if hasattr(self.main_window, 'session_changes'):
+            self.main_window.session_changes.mark_structure()
+            
     def update_table_display(self):
         """Update table widget display"""
+        if self.table_window is not None and len(self.csv_data) != len(self.window_rowids):
+            self.close_table_window()  # Rows were replaced, e.g. by a Python script
         if not self.csv_headers:
             self.table.clear()
             self.status_label.setText("No data loaded")
             return
             
+        # Rows of a table window come from SQLite, filling them in is not an edit
+        self.table.blockSignals(self.table_window is not None)
+        
         # Set up table
         self.table.setRowCount(len(self.csv_data))
         self.table.setColumnCount(len(self.csv_headers))
@@ -1037,11 +1123,221 @@ class CSVEditor(QWidget):
         
         # Apply intelligent column width sizing
         self.apply_intelligent_column_sizing()
+        
+        if self.table_window is not None:
+            self.table.blockSignals(False)
+            first_row = self.window_pages.first_row
+            self.table.setVerticalHeaderLabels([str(first_row + i + 1) for i in range(len(self.csv_data))])
+            self.update_window_status()
+            return
                 
         # Update status
         self.status_label.setText(f"{len(self.csv_data)} rows, {len(self.csv_headers)} columns")
         self.main_window.row_count_label.setText(f"{len(self.csv_data)} rows")
         
+    def open_table_window(self, table_name):
+        """Open a SQLite table as a live window; returns False if it cannot be paged by rowid"""
+        conn = self.main_window.sqlite_conn
+        if not SQLiteTableWindow.has_rowid(conn, table_name):
+            return False
+        self.close_table_window()
+        self.table_window = SQLiteTableWindow(conn, table_name)
+        self.csv_headers = list(self.table_window.columns)
+        self.current_file = None
+        self.current_table_name = table_name
+        self.cell_formatting = {}
+        self.cell_formulas = {}
+        self.column_widths = {}
+        self.active_filters = {}
+        self.update_filters_display()
+        self.search_input.blockSignals(True)
+        self.search_input.clear()
+        self.search_input.blockSignals(False)
+        self.table.setSortingEnabled(False)  # Sorting happens in SQLite
+        self.table.horizontalHeader().setSortIndicatorShown(False)
+        self.reload_table_window()
+        self.update_main_window_title()
+        return True
+        
+    def close_table_window(self):
+        """Write pending edits and return to a plain in-memory table"""
+        if self.table_window is None:
+            return
+        self.window_flush_timer.stop()
+        self.flush_table_window()
+        if self.count_worker is not None:
+            self.count_worker.cancel()
+            self.count_worker = None
+        self.table_window = None
+        self.window_rowids = []
+        self.window_total = None
+        self.table.setRowCount(0)  # Drops the absolute row numbers
+        self.table.setSortingEnabled(True)
+        
+    def reload_table_window(self):
+        """Show the table window from its first row, e.g. after a sort or filter change"""
+        self.flush_table_window()
+        try:
+            self.window_rowids, self.csv_data = self.table_window.fetch_page(0)
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Error", f"Failed to read table: {e}")
+            self.window_rowids, self.csv_data = [], []
+        self.window_pages.reset(len(self.csv_data))
+        self.window_at_end = len(self.csv_data) < self.table_window.page_size
+        self.window_generation += 1
+        self.start_window_count()
+        self.window_loading = True
+        self.update_table_display()
+        self.table.scrollToTop()
+        self.window_loading = False
+        
+    def start_window_count(self):
+        """Count the rows of the table window without blocking the editor"""
+        if self.count_worker is not None:
+            self.count_worker.cancel()
+            self.count_worker = None
+        self.window_total = None
+        if self.window_at_end:
+            self.window_total = len(self.csv_data)
+            return
+        if not self.table_window.conditions and hasattr(self.main_window, 'table_manager'):
+            stats = self.main_window.table_manager.cached_table_stats(self.table_window.table)
+            if stats:
+                self.window_total = stats['row_count']
+                return
+                
+        sql, params = self.table_window.count_query()
+        conn = self.main_window.sqlite_conn
+        db_path = self.main_window.current_db_path()
+        if not db_path or conn.in_transaction:
+            # Another connection would not see this data; count on the session connection
+            self.window_total = conn.execute(sql, params).fetchone()[0]
+            return
+        self.count_worker = RowCountWorker(db_path, sql, params, self.window_generation, self)
+        self.count_worker.counted.connect(self.on_window_counted)
+        self.count_worker.finished.connect(self.count_worker.deleteLater)
+        self.count_worker.start()
+        
+    def on_window_counted(self, generation, count):
+        """Show the row count of the table window once it is known"""
+        if self.table_window is not None and generation == self.window_generation:
+            self.window_total = count
+            self.count_worker = None
+            self.update_window_status()
+            
+    def update_window_status(self):
+        """Show which rows of the table window are loaded"""
+        first_row = self.window_pages.first_row
+        total = f"{self.window_total:,}" if self.window_total is not None else "counting..."
+        shown = f"rows {first_row + 1:,}-{first_row + len(self.csv_data):,}" if self.csv_data else "no rows"
+        self.status_label.setText(
+            f"Table {self.table_window.table}: {shown} of {total}, {len(self.csv_headers)} columns")
+        self.main_window.row_count_label.setText(f"{total} rows")
+        
+    def on_table_scrolled(self, value):
+        """Load the next or previous page when a table window is scrolled to its edge"""
+        if self.table_window is None or self.window_loading:
+            return
+        scroll_bar = self.table.verticalScrollBar()
+        if value >= scroll_bar.maximum() and not self.window_at_end:
+            self.load_window_page(forward=True)
+        elif value <= scroll_bar.minimum() and self.window_pages.first_page > 0:
+            self.load_window_page(forward=False)
+            
+    def load_window_page(self, forward):
+        """Slide the table window by one page, keeping at most WINDOW_PAGES pages in the widget"""
+        pages = self.window_pages
+        page = pages.next_page() if forward else pages.first_page - 1
+        self.flush_table_window()
+        try:
+            rowids, rows = self.table_window.fetch_page(page)
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Error", f"Failed to read table: {e}")
+            return
+            
+        scroll_bar = self.table.verticalScrollBar()
+        position = scroll_bar.value()
+        if forward:
+            self.window_at_end = len(rows) < self.table_window.page_size
+            if rows:
+                self.window_rowids += rowids
+                self.csv_data += rows
+                pages.append(len(rows))
+            if len(pages) > WINDOW_PAGES:
+                count = pages.drop_first()
+                del self.window_rowids[:count]
+                del self.csv_data[:count]
+                position -= count
+        else:
+            self.window_rowids = rowids + self.window_rowids
+            self.csv_data = rows + self.csv_data
+            pages.prepend(len(rows))
+            position += len(rows)
+            if len(pages) > WINDOW_PAGES:
+                count = pages.drop_last()
+                if count:
+                    del self.window_rowids[-count:]
+                    del self.csv_data[-count:]
+                self.window_at_end = False
+                
+        self.window_loading = True
+        self.update_table_display()
+        self.table.doItemsLayout()  # Update the scroll range before restoring the position
+        scroll_bar.setValue(position)
+        self.window_loading = False
+        
+    def apply_window_filters(self):
+        """Push the column filters and the search box down to SQLite"""
+        search = None
+        search_text = self.search_input.text().strip()
+        if search_text:
+            settings = self.advanced_search_settings or {}
+            search = {'text': search_text, 'columns': settings.get('columns'),
+                      'mode': settings.get('mode', 'any'), 'case': settings.get('case', False)}
+        self.table_window.set_filters(self.active_filters, search)
+        self.reload_table_window()
+        
+    def queue_window_edit(self, row, col, value):
+        """Queue a cell edit of the table window for the next batched write"""
+        if row < len(self.window_rowids) and col < len(self.csv_headers):
+            self.table_window.queue_update(self.window_rowids[row], self.csv_headers[col], value)
+            self.window_flush_timer.start()
+            
+    def flush_table_window(self):
+        """Write queued edits of the table window to SQLite in one transaction"""
+        if self.table_window is None or not self.table_window.edits:
+            return
+        row_change = len(self.table_window.edits.inserts) - len(self.table_window.edits.deletes)
+        try:
+            count = self.table_window.flush()
+        except sqlite3.Error as e:
+            self.table_window.edits.clear()
+            QMessageBox.warning(self, "Error", f"Failed to save changes to table, they were discarded: {e}")
+            self.table_window.reload_columns()
+            self.csv_headers = list(self.table_window.columns)
+            self.reload_table_window()
+            return
+            
+        # New rows now have real rowids
+        inserted = self.table_window.inserted
+        self.window_rowids = [inserted.get(rowid, rowid) for rowid in self.window_rowids]
+        if self.window_total is not None:
+            self.window_total = max(0, self.window_total + row_change)
+            self.update_window_status()
+        self.main_window.log_message(f"Saved {count} change(s) to table '{self.table_window.table}'")
+        
+    def delete_window_rows(self, rows):
+        """Remove rows of the table window and queue their deletion"""
+        for row in sorted(set(rows), reverse=True):
+            if 0 <= row < len(self.window_rowids):
+                self.table_window.queue_delete(self.window_rowids.pop(row))
+                del self.csv_data[row]
+                self.window_pages.remove_row(row)
+        self.window_flush_timer.start()
+        self.window_loading = True
+        self.update_table_display()
+        self.window_loading = False
+        
     def add_row(self):
         """Add new row to table"""
         if not self.csv_headers:
@@ -1050,13 +1346,23 @@ class CSVEditor(QWidget):
             
         new_row = [""] * len(self.csv_headers)
         self.csv_data.append(new_row)
+        if self.table_window is not None:
+            self.window_rowids.append(self.table_window.queue_insert({}))
+            self.window_pages.add_row()
+            self.window_flush_timer.start()
+        else:
+            self.mark_structure_changed()
         self.update_table_display()
         
     def delete_row(self):
         """Delete selected row"""
         current_row = self.table.currentRow()
         if current_row >= 0 and current_row < len(self.csv_data):
+            if self.table_window is not None:
+                self.delete_window_rows([current_row])
+                return
             del self.csv_data[current_row]
+            self.mark_structure_changed()
             self.update_table_display()
         else:
             QMessageBox.warning(self, "Warning", "No row selected")
@@ -1067,6 +1373,9 @@ class CSVEditor(QWidget):
         if not search_text:
             self.clear_search()
             return
+        if self.table_window is not None:
+            self.apply_window_filters()
+            return
             
         # Use advanced search settings if available
         settings = self.advanced_search_settings or {}
@@ -1155,6 +1464,9 @@ class CSVEditor(QWidget):
     def clear_search(self):
         """Clear search and show all rows"""
         self.search_input.clear()
+        if self.table_window is not None:
+            self.apply_window_filters()
+            return
         for row in range(self.table.rowCount()):
             self.table.setRowHidden(row, False)
             
@@ -1180,18 +1492,18 @@ class CSVEditor(QWidget):
             columns_def = ", ".join([f'"{header}" TEXT' for header in clean_headers])
             create_sql = f'CREATE TABLE IF NOT EXISTS "{table_name}" ({columns_def})'
             
-            cursor = self.main_window.sqlite_conn.cursor()
-            cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
-            cursor.execute(create_sql)
-            
-            # Insert data
-            placeholders = ", ".join(["?" for _ in clean_headers])
-            insert_sql = f'INSERT INTO "{table_name}" VALUES ({placeholders})'
-            
-            for row in self.csv_data:
-                cursor.execute(insert_sql, row)
+            with self.main_window.bulk_load_profile():
+                cursor = self.main_window.sqlite_conn.cursor()
+                cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+                cursor.execute(create_sql)
                 
-            self.main_window.sqlite_conn.commit()
+                # Insert data
+                placeholders = ", ".join(["?" for _ in clean_headers])
+                insert_sql = f'INSERT INTO "{table_name}" VALUES ({placeholders})'
+                
+                cursor.executemany(insert_sql, self.csv_data)
+                    
+                self.main_window.sqlite_conn.commit()
             
             # Update table manager
             if hasattr(self.main_window, 'table_manager'):
@@ -1212,6 +1524,8 @@ class CSVEditor(QWidget):
         self.column_widths = {}  # Clear column widths for direct data loading
         self.current_file = None  # Clear current file since this is direct data loading
         self.current_table_name = None  # Clear current table name since this is direct data loading
+        self.close_table_window()
+        self.mark_structure_changed()
         self.update_table_display()
         self.update_main_window_title()
         self.main_window.log_message(f"Data loaded: {len(self.csv_data)} rows, {len(self.csv_headers)} columns")
@@ -1238,6 +1552,8 @@ class CSVEditor(QWidget):
         self.column_widths = {}  # Clear column width data
         self.current_file = None  # Clear current file
         self.current_table_name = None  # Clear current table name
+        self.close_table_window()
+        self.mark_structure_changed()
         self.table.clear()
         self.table.setRowCount(0)
         self.table.setColumnCount(0)
@@ -1339,18 +1655,18 @@ class CSVEditor(QWidget):
             columns_def = ", ".join([f'"{header}" TEXT' for header in clean_headers])
             create_sql = f'CREATE TABLE IF NOT EXISTS "{table_name}" ({columns_def})'
             
-            cursor = self.main_window.sqlite_conn.cursor()
-            cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
-            cursor.execute(create_sql)
-            
-            # Insert data
-            placeholders = ", ".join(["?" for _ in clean_headers])
-            insert_sql = f'INSERT INTO "{table_name}" VALUES ({placeholders})'
-            
-            for row in self.csv_data:
-                cursor.execute(insert_sql, row)
+            with self.main_window.bulk_load_profile():
+                cursor = self.main_window.sqlite_conn.cursor()
+                cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+                cursor.execute(create_sql)
                 
-            self.main_window.sqlite_conn.commit()
+                # Insert data
+                placeholders = ", ".join(["?" for _ in clean_headers])
+                insert_sql = f'INSERT INTO "{table_name}" VALUES ({placeholders})'
+                
+                cursor.executemany(insert_sql, self.csv_data)
+                    
+                self.main_window.sqlite_conn.commit()
             
             # Update table manager
             if hasattr(self.main_window, 'table_manager'):
@@ -1640,7 +1956,14 @@ class CSVEditor(QWidget):
             
         # Add column to headers
         new_col_name = f"Column_{len(self.csv_headers) + 1}"
+        while new_col_name in self.csv_headers:
+            new_col_name += "_"
         self.csv_headers.append(new_col_name)
+        if self.table_window is not None:
+            self.table_window.queue_add_column(new_col_name)
+            self.window_flush_timer.start()
+        else:
+            self.mark_structure_changed()
         
         # Add column to data
         for row in self.csv_data:
@@ -1683,6 +2006,10 @@ class CSVEditor(QWidget):
             
         # Remove columns (from right to left to maintain indices)
         for col in selected_cols:
+            if self.table_window is not None:
+                self.table_window.queue_drop_column(self.csv_headers[col])
+                self.window_flush_timer.start()
+                
             # Remove from headers
             del self.csv_headers[col]
             
@@ -1691,6 +2018,8 @@ class CSVEditor(QWidget):
                 if col < len(row):
                     del row[col]
                     
+        if self.table_window is None:
+            self.mark_structure_changed()
         self.update_table_display()
         
     def sort_by_column(self, logical_index):
@@ -1698,6 +2027,17 @@ class CSVEditor(QWidget):
         if logical_index < 0 or logical_index >= len(self.csv_headers):
             return
             
+        if self.table_window is not None:
+            # Sort in SQLite; the widget only holds the rows around the scroll position
+            column = self.csv_headers[logical_index]
+            descending = self.table_window.sort_column == column and not self.table_window.descending
+            self.table_window.set_sort(column, descending)
+            self.table.horizontalHeader().setSortIndicatorShown(True)
+            self.table.horizontalHeader().setSortIndicator(
+                logical_index, Qt.DescendingOrder if descending else Qt.AscendingOrder)
+            self.reload_table_window()
+            return
+            
         # Toggle sort order
         current_order = self.table.horizontalHeader().sortIndicatorOrder()
         new_order = Qt.DescendingOrder if current_order == Qt.AscendingOrder else Qt.AscendingOrder
@@ -1708,6 +2048,13 @@ class CSVEditor(QWidget):
     def add_selected_area(self):
         """Add area based on selection (from old project)"""
         sel = self.table.selectedRanges()
+        if self.table_window is not None:
+            # Table rows are appended by SQLite, so the new row goes to the end
+            if not sel or sel[0].columnCount() >= sel[0].rowCount():
+                self.add_row()
+            else:
+                self.add_column()
+            return
         if not sel:
             # If nothing selected but has columns, add row
             if self.table.columnCount() > 0:
@@ -1727,6 +2074,7 @@ class CSVEditor(QWidget):
             else:
                 self.csv_headers.insert(insert_col, f"col{insert_col+1}")
             self.table.setHorizontalHeaderLabels(self.csv_headers)
+        self.mark_structure_changed()
     
     def delete_selected_area(self):
         """Delete selected area (from old project)"""
@@ -1735,6 +2083,14 @@ class CSVEditor(QWidget):
             return
         rng = sel[0]
         
+        if self.table_window is not None and rng.columnCount() == self.table.columnCount():
+            self.delete_window_rows(range(rng.topRow(), rng.bottomRow() + 1))
+            return
+        if self.table_window is not None and rng.rowCount() == self.table.rowCount():
+            self.table.setCurrentCell(rng.topRow(), rng.leftColumn())
+            self.delete_column()
+            return
+        
         # If selected area height is entire column height, delete columns
         if rng.rowCount() == self.table.rowCount():
             # Delete columns from right to left
@@ -1743,11 +2099,13 @@ class CSVEditor(QWidget):
                 if col < len(self.csv_headers):
                     del self.csv_headers[col]
             self.table.setHorizontalHeaderLabels(self.csv_headers)
+            self.mark_structure_changed()
         # If selected area width is entire row width, delete rows
         elif rng.columnCount() == self.table.columnCount():
             # Delete rows from bottom to top
             for row in range(rng.bottomRow(), rng.topRow() - 1, -1):
                 self.table.removeRow(row)
+            self.mark_structure_changed()
         else:
             # Clear selected cells
             for row in range(rng.topRow(), rng.bottomRow() + 1):
@@ -1982,6 +2340,9 @@ class CSVEditor(QWidget):
     
     def apply_all_filters(self):
         """Apply all active filters to the table"""
+        if self.table_window is not None:
+            self.apply_window_filters()
+            return
         if not self.active_filters:
             # Show all rows if no filters
             for row in range(self.table.rowCount()):
@@ -2046,6 +2407,10 @@ class CSVEditor(QWidget):
         # Update CSV data
         if row < len(self.csv_data) and col < len(self.csv_data[row]):
             self.csv_data[row][col] = new_value
+            if self.table_window is not None:
+                self.queue_window_edit(row, col, new_value)
+            elif hasattr(self.main_window, 'session_changes'):
+                self.main_window.session_changes.mark_cell(row, col, new_value)
             
         # Check if the value is a formula (starts with =)
         if new_value.startswith('='):
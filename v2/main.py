@@ -1,10 +1,13 @@
 import sys
 import os
+import multiprocessing
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QIcon
 from vscode_main_window import VSCodeMainWindow
 
 if __name__ == "__main__":
+    # Batch comparisons run in spawned worker processes, also in the frozen build
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     app.setWindowIcon(QIcon('/icons/main.png'))
     
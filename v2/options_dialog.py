@@ -9,6 +9,9 @@ from PyQt5.QtGui import QFont, QColor, QPalette
 import json
 import os
 
+from utils.db_profile import (CONNECTION_PRESETS, DEFAULT_PROFILE, JOURNAL_MODES, SYNCHRONOUS_MODES,
+                              PROFILE_SETTINGS_KEYS, get_preset)
+
 class OptionsDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -399,6 +402,14 @@ class OptionsDialog(QDialog):
         self.option_widgets['sql_max_results'] = max_result_spin
         exec_layout.addWidget(max_result_spin, 1, 1)
         
+        # Prepared statement cache
+        exec_layout.addWidget(QLabel("Cached statements (applies on reconnect):"), 2, 0)
+        cached_statements_spin = QSpinBox()
+        cached_statements_spin.setRange(0, 4096)
+        cached_statements_spin.setValue(256)
+        self.option_widgets['sql_cached_statements'] = cached_statements_spin
+        exec_layout.addWidget(cached_statements_spin, 2, 1)
+        
         layout.addWidget(exec_group)
         layout.addStretch()
         page.setWidget(widget)
@@ -507,11 +518,86 @@ class OptionsDialog(QDialog):
         self.option_widgets['chunk_size'] = chunk_spin
         processing_layout.addWidget(chunk_spin, 1, 1)
         
+        # Session database compression (uses the worker threads)
+        processing_layout.addWidget(QLabel("Session database compression level:"), 2, 0)
+        session_level_spin = QSpinBox()
+        session_level_spin.setRange(0, 9)
+        session_level_spin.setSpecialValueText("Stored (fastest to open)")
+        self.option_widgets['session_db_compression_level'] = session_level_spin
+        processing_layout.addWidget(session_level_spin, 2, 1)
+        
         layout.addWidget(processing_group)
+        
+        # SQLite connection group
+        sqlite_group = QGroupBox("SQLite Connection")
+        sqlite_layout = QGridLayout(sqlite_group)
+        
+        # Profile preset
+        sqlite_layout.addWidget(QLabel("Profile preset:"), 0, 0)
+        profile_combo = QComboBox()
+        profile_combo.addItems(list(CONNECTION_PRESETS.keys()))
+        profile_combo.currentTextChanged.connect(self.on_sqlite_profile_changed)
+        self.option_widgets['sqlite_profile'] = profile_combo
+        sqlite_layout.addWidget(profile_combo, 0, 1)
+        
+        # Page size
+        sqlite_layout.addWidget(QLabel("Page size (bytes, new databases only):"), 1, 0)
+        page_size_combo = QComboBox()
+        page_size_combo.addItems([str(2 ** power) for power in range(9, 17)])
+        self.option_widgets['sqlite_page_size'] = page_size_combo
+        sqlite_layout.addWidget(page_size_combo, 1, 1)
+        
+        # Page cache
+        sqlite_layout.addWidget(QLabel("Page cache (MB):"), 2, 0)
+        sqlite_cache_spin = QSpinBox()
+        sqlite_cache_spin.setRange(1, 8192)
+        self.option_widgets['sqlite_cache_size_mb'] = sqlite_cache_spin
+        sqlite_layout.addWidget(sqlite_cache_spin, 2, 1)
+        
+        # Memory-mapped I/O
+        sqlite_layout.addWidget(QLabel("Memory-mapped I/O (MB, 0 = off):"), 3, 0)
+        mmap_spin = QSpinBox()
+        mmap_spin.setRange(0, 65536)
+        self.option_widgets['sqlite_mmap_size_mb'] = mmap_spin
+        sqlite_layout.addWidget(mmap_spin, 3, 1)
+        
+        # Journal mode
+        sqlite_layout.addWidget(QLabel("Journal mode:"), 4, 0)
+        journal_combo = QComboBox()
+        journal_combo.addItems(JOURNAL_MODES)
+        self.option_widgets['sqlite_journal_mode'] = journal_combo
+        sqlite_layout.addWidget(journal_combo, 4, 1)
+        
+        # Synchronous
+        sqlite_layout.addWidget(QLabel("Synchronous:"), 5, 0)
+        synchronous_combo = QComboBox()
+        synchronous_combo.addItems(SYNCHRONOUS_MODES)
+        self.option_widgets['sqlite_synchronous'] = synchronous_combo
+        sqlite_layout.addWidget(synchronous_combo, 5, 1)
+        
+        temp_store_cb = QCheckBox("Keep temporary tables and indexes in memory")
+        self.option_widgets['sqlite_temp_store_memory'] = temp_store_cb
+        sqlite_layout.addWidget(temp_store_cb, 6, 0, 1, 2)
+        
+        bulk_load_cb = QCheckBox("Switch to 'bulk load' profile while importing data")
+        self.option_widgets['sqlite_auto_bulk_load'] = bulk_load_cb
+        sqlite_layout.addWidget(bulk_load_cb, 7, 0, 1, 2)
+        
+        layout.addWidget(sqlite_group)
         layout.addStretch()
         page.setWidget(widget)
         return page
         
+    def on_sqlite_profile_changed(self, profile_name):
+        """Fill SQLite connection fields from the selected preset"""
+        preset = get_preset(profile_name)
+        self.option_widgets['sqlite_page_size'].setCurrentText(str(preset['page_size']))
+        self.option_widgets['sqlite_cache_size_mb'].setValue(preset['cache_size_mb'])
+        self.option_widgets['sqlite_mmap_size_mb'].setValue(preset['mmap_size_mb'])
+        self.option_widgets['sqlite_journal_mode'].setCurrentText(preset['journal_mode'])
+        self.option_widgets['sqlite_synchronous'].setCurrentText(preset['synchronous'])
+        self.option_widgets['sqlite_temp_store_memory'].setChecked(preset['temp_store_memory'])
+        
     def create_debug_page(self):
         """Create debugging options page"""
         page = QScrollArea()
@@ -758,6 +844,13 @@ class OptionsDialog(QDialog):
             # Define default values for new settings
             defaults = {
                 'open_last_file_on_startup': True,
+                'autosave_interval': 5,
+                'session_db_compression_level': 0,
+                'sql_cached_statements': 256,
+                'sqlite_profile': DEFAULT_PROFILE,
+                'sqlite_auto_bulk_load': True,
+                **{PROFILE_SETTINGS_KEYS[field]: value
+                   for field, value in get_preset(settings.get('sqlite_profile', DEFAULT_PROFILE)).items()},
                 'excel_prompt_for_options': True,
                 'excel_import_with_formatting': False,
                 'excel_default_apply_background_colors': True,
@@ -1,13 +1,18 @@
 import sys
 import os
+import shutil
+import sqlite3
+import tempfile
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
     QLabel, QTextEdit, QSplitter, QPushButton, QComboBox, QGroupBox,
     QProgressBar, QMessageBox, QTabWidget, QWidget, QHeaderView,
-    QAbstractItemView, QMenu, QAction, QFileDialog, QCheckBox, QLineEdit
+    QAbstractItemView, QMenu, QAction, QFileDialog, QCheckBox, QLineEdit, QListWidget, QListWidgetItem,
+    QApplication, QTableView
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QColor, QFont, QIcon
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, List, Optional
 
@@ -15,6 +20,11 @@ from typing import Dict, Any, List, Optional
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.plugin_loader import PluginLoader
+from utils.fingerprints import cached_fingerprints, file_source, update_fingerprints
+from utils.chunked_compare import (
+    CHANGED_FIELDS_TABLE, DIFFERENCES_TABLE, CompareCancelled, compare_files, export_result_table, read_columns
+)
+from utils.batch_compare import run_batch
 
 def get_plugin_loader():
     """Get plugin loader instance."""
@@ -43,21 +53,187 @@ class ComparisonWorker(QThread):
             
             # Run the comparison
             result = self.plugin.compare(self.df1, self.df2, **self.parameters)
+            self.save_fingerprints()
+            
+            self.progress_updated.emit(100)
+            self.status_updated.emit("Comparison completed")
+            self.comparison_finished.emit(result)
+            
+        except Exception as e:
+            self.comparison_failed.emit(str(e))
+    
+    def save_fingerprints(self):
+        """Store fingerprints of compared files that have none yet, so later runs can skip loading them."""
+        store_path = self.parameters.get('store_path')
+        if not store_path:
+            return
+        try:
+            self.status_updated.emit("Storing fingerprints...")
+            update_fingerprints(store_path, [(self.parameters.get('df1_source'), self.df1),
+                                             (self.parameters.get('df2_source'), self.df2)])
+        except sqlite3.Error as e:
+            print(f"Failed to store fingerprints: {e}")
+
+class ChunkedComparisonWorker(ComparisonWorker):
+    """Worker thread for the out-of-core comparison of two files by key."""
+    
+    def __init__(self, file1, file2, parameters, result_path):
+        super().__init__(None, None, None, parameters)
+        self.file1 = file1
+        self.file2 = file2
+        self.result_path = result_path
+        self.cancelled = False
+    
+    def cancel(self):
+        """Stop the comparison at the next chunk or bucket."""
+        self.cancelled = True
+    
+    def report_progress(self, fraction, message):
+        """Forward engine progress to the signals; returns False once cancelled."""
+        self.progress_updated.emit(int(fraction * 100))
+        self.status_updated.emit(message)
+        return not self.cancelled
+    
+    def run(self):
+        """Run the comparison in a separate thread."""
+        try:
+            result = compare_files(self.file1, self.file2, result_path=self.result_path,
+                                   progress=self.report_progress, **self.parameters)
             
             self.progress_updated.emit(100)
             self.status_updated.emit("Comparison completed")
             self.comparison_finished.emit(result)
             
+        except CompareCancelled:
+            self.comparison_failed.emit("Comparison was cancelled")
+        except Exception as e:
+            self.comparison_failed.emit(str(e))
+
+class BatchComparisonWorker(ChunkedComparisonWorker):
+    """Worker thread for comparing many files with several plugins."""
+    
+    def __init__(self, paths, plugins, parameters):
+        super().__init__(None, None, parameters, None)
+        self.paths = paths
+        self.plugins = plugins
+    
+    def run(self):
+        """Run the batch in a separate thread."""
+        try:
+            result = run_batch(self.paths, self.plugins, progress=self.report_progress, **self.parameters)
+            
+            self.progress_updated.emit(100)
+            self.status_updated.emit(f"Batch completed in {result['seconds']:.1f} s")
+            self.comparison_finished.emit(result)
+            
+        except CompareCancelled:
+            self.comparison_failed.emit("Comparison was cancelled")
         except Exception as e:
             self.comparison_failed.emit(str(e))
 
-class HighlightedTableWidget(QTableWidget):
-    """Table widget with support for highlighting differences."""
+class DiffTableModel(QAbstractTableModel):
+    """Read-only model over a DataFrame of comparison results.
+    
+    Cells are read from the column arrays of the frame when the view asks
+    for them, and rows and changed cells are colored from the diff type
+    column and the cell mask, so no item is created per cell. Rows can be
+    filtered by diff type without copying the frame.
+    """
+    
+    def __init__(self, colors: Dict[str, QColor], parent=None):
+        super().__init__(parent)
+        self.colors = colors
+        self.set_dataframe(pd.DataFrame())
+    
+    def set_dataframe(self, df: pd.DataFrame, highlight_column: str = '_diff_type',
+                      cell_mask: Optional[Dict[str, Any]] = None):
+        """Show a frame; internal columns (starting with '_') are not displayed."""
+        self.beginResetModel()
+        self.df = df
+        self.positions = [i for i, col in enumerate(df.columns) if not str(col).startswith('_')]
+        self.display_columns = [df.columns[i] for i in self.positions]
+        self.values = [df.iloc[:, i].to_numpy() for i in self.positions]
+        
+        # Diff type of each row as a code into diff_types
+        if highlight_column in df.columns:
+            codes, diff_types = pd.factorize(df[highlight_column].fillna(''))
+            self.diff_types = [str(diff_type) for diff_type in diff_types]
+        else:
+            codes, self.diff_types = np.zeros(len(df), dtype=np.int64), ['same']
+        self.type_codes = codes
+        self.type_colors = [self.colors.get(diff_type) for diff_type in self.diff_types]
+        
+        # Display column -> column of the cell mask, rows with any changed cell
+        self.mask = None
+        if cell_mask is not None and len(cell_mask['mask']) == len(df):
+            self.mask = np.asarray(cell_mask['mask'], dtype=bool)
+            mask_columns = {name: i for i, name in enumerate(cell_mask['columns'])}
+            self.mask_index = [mask_columns.get(col) for col in self.display_columns]
+            self.masked_rows = self.mask.any(axis=1)
+        
+        self.rows = np.arange(len(df))
+        self.shown_types = None
+        self.endResetModel()
+    
+    def set_diff_type_filter(self, diff_types: Optional[List[str]]):
+        """Show only rows of the given diff types (all rows for None)."""
+        self.beginResetModel()
+        self.shown_types = None if diff_types is None else list(diff_types)
+        if diff_types is None:
+            self.rows = np.arange(len(self.df))
+        else:
+            shown = [code for code, diff_type in enumerate(self.diff_types) if diff_type in diff_types]
+            self.rows = np.flatnonzero(np.isin(self.type_codes, shown))
+        self.endResetModel()
+    
+    def visible_dataframe(self) -> pd.DataFrame:
+        """Displayed columns of the rows passing the filter."""
+        return self.df.iloc[self.rows, self.positions].reset_index(drop=True)
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.display_columns)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            value = self.values[index.column()][row]
+            return '' if pd.isna(value) else str(value)
+        if role == Qt.BackgroundRole:
+            if self.mask is not None and self.masked_rows[row]:
+                mask_column = self.mask_index[index.column()]
+                if mask_column is not None and self.mask[row, mask_column]:
+                    return self.colors['changed_cell']
+                return None
+            return self.type_colors[self.type_codes[row]]
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return str(self.display_columns[section])
+        return str(self.rows[section] + 1)
+    
+    def flags(self, index):
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled
+
+class HighlightedTableWidget(QTableView):
+    """Table view with support for highlighting differences.
+    
+    Backed by a DiffTableModel, so large results display without creating
+    an item per cell.
+    """
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setAlternatingRowColors(True)
         self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.horizontalHeader().setStretchLastSection(True)
         
         # Colors for different types of differences
@@ -66,55 +242,43 @@ class HighlightedTableWidget(QTableWidget):
             'different': QColor(255, 240, 240), # Light red
             'only_in_a': QColor(255, 255, 200), # Light yellow
             'only_in_b': QColor(200, 255, 255), # Light cyan
-            'header': QColor(220, 220, 220)     # Light gray
+            'header': QColor(220, 220, 220),    # Light gray
+            'removed': QColor(255, 225, 225),   # Light red
+            'added': QColor(225, 255, 225),     # Light green
+            'changed_cell': QColor(255, 210, 120)  # Orange, changed cells of modified rows
         }
-    
-    def populate_from_dataframe(self, df: pd.DataFrame, highlight_column: str = '_diff_type'):
-        """Populate table from DataFrame with optional highlighting."""
-        if df.empty:
-            self.setRowCount(0)
-            self.setColumnCount(0)
-            return
-        
-        # Set up table dimensions
-        self.setRowCount(len(df))
+        self.changed_fields = None  # One row per changed cell, for export
         
-        # Determine columns to display (exclude internal columns)
-        display_columns = [col for col in df.columns if not col.startswith('_')]
-        self.setColumnCount(len(display_columns))
-        self.setHorizontalHeaderLabels(display_columns)
-        
-        # Populate data
-        for row_idx, (_, row) in enumerate(df.iterrows()):
-            # Determine highlight type
-            highlight_type = 'same'
-            if highlight_column in df.columns:
-                highlight_type = row.get(highlight_column, 'same')
-            
-            for col_idx, col_name in enumerate(display_columns):
-                value = row[col_name]
-                
-                # Convert value to string
-                if pd.isna(value):
-                    display_value = ''
-                else:
-                    display_value = str(value)
-                
-                # Create table item
-                item = QTableWidgetItem(display_value)
-                
-                # Apply highlighting
-                if highlight_type in self.colors:
-                    item.setBackground(self.colors[highlight_type])
-                
-                # Make item read-only
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                
-                self.setItem(row_idx, col_idx, item)
-        
-        # Resize columns to content
+        self.diff_model = DiffTableModel(self.colors, self)
+        self.setModel(self.diff_model)
+    
+    def populate_from_dataframe(self, df: pd.DataFrame, highlight_column: str = '_diff_type',
+                                cell_mask: Optional[Dict[str, Any]] = None):
+        """Show a DataFrame with optional highlighting.
+        
+        With a cell mask (see BaseComparePlugin.compare) only the changed
+        cells of a row are highlighted. Column widths are fitted to the
+        rows in view only.
+        """
+        self.diff_model.set_dataframe(df, highlight_column, cell_mask)
         self.resizeColumnsToContents()
     
+    def set_diff_type_filter(self, diff_types: Optional[List[str]]):
+        """Show only rows of the given diff types (all rows for None)."""
+        self.diff_model.set_diff_type_filter(diff_types)
+    
+    def toggle_diff_type(self, diff_type: str, shown: bool):
+        """Show or hide the rows of one diff type."""
+        shown_types = self.diff_model.shown_types
+        shown_types = set(self.diff_model.diff_types if shown_types is None else shown_types)
+        if shown:
+            shown_types.add(diff_type)
+        else:
+            shown_types.discard(diff_type)
+        all_shown = shown_types >= set(self.diff_model.diff_types)
+        self.set_diff_type_filter(None if all_shown else
+                                  [name for name in self.diff_model.diff_types if name in shown_types])
+    
     def setup_context_menu(self):
         """Set up context menu for the table."""
         self.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -133,14 +297,31 @@ class HighlightedTableWidget(QTableWidget):
         export_excel_action.triggered.connect(self.export_to_excel)
         menu.addAction(export_excel_action)
         
+        export_changes_action = QAction("Export Changed Fields to CSV", self)
+        export_changes_action.triggered.connect(self.export_changed_fields)
+        export_changes_action.setEnabled(self.changed_fields is not None and not self.changed_fields.empty)
+        menu.addAction(export_changes_action)
+        
         menu.addSeparator()
         
+        # Filter actions: one per diff type of the shown result
+        if len(self.diff_model.diff_types) > 1:
+            filter_menu = menu.addMenu("Show Diff Types")
+            shown_types = self.diff_model.shown_types
+            for diff_type in self.diff_model.diff_types:
+                action = filter_menu.addAction(diff_type)
+                action.setCheckable(True)
+                action.setChecked(shown_types is None or diff_type in shown_types)
+                action.toggled.connect(lambda shown, t=diff_type: self.toggle_diff_type(t, shown))
+            show_all_action = filter_menu.addAction("Show All")
+            show_all_action.triggered.connect(lambda: self.set_diff_type_filter(None))
+        
         # View actions
         fit_columns_action = QAction("Fit Columns to Content", self)
         fit_columns_action.triggered.connect(self.resizeColumnsToContents)
         menu.addAction(fit_columns_action)
         
-        menu.exec_(self.mapToGlobal(position))
+        menu.exec_(self.viewport().mapToGlobal(position))
     
     def export_to_csv(self):
         """Export table data to CSV."""
@@ -156,6 +337,20 @@ class HighlightedTableWidget(QTableWidget):
             except Exception as e:
                 QMessageBox.critical(self, "Export Error", f"Failed to export data: {str(e)}")
     
+    def export_changed_fields(self):
+        """Export only the changed cells (key, column, old and new value) to CSV."""
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Export Changed Fields", "", "CSV Files (*.csv)"
+        )
+        
+        if filename:
+            try:
+                self.changed_fields.to_csv(filename, index=False)
+                QMessageBox.information(self, "Export Successful",
+                                        f"{len(self.changed_fields)} changed fields exported to {filename}")
+            except Exception as e:
+                QMessageBox.critical(self, "Export Error", f"Failed to export data: {str(e)}")
+    
     def export_to_excel(self):
         """Export table data to Excel."""
         filename, _ = QFileDialog.getSaveFileName(
@@ -171,34 +366,172 @@ class HighlightedTableWidget(QTableWidget):
                 QMessageBox.critical(self, "Export Error", f"Failed to export data: {str(e)}")
     
     def to_dataframe(self) -> pd.DataFrame:
-        """Convert table data back to DataFrame."""
-        data = []
-        headers = []
-        
-        # Get headers
-        for col in range(self.columnCount()):
-            headers.append(self.horizontalHeaderItem(col).text())
-        
-        # Get data
-        for row in range(self.rowCount()):
-            row_data = []
-            for col in range(self.columnCount()):
-                item = self.item(row, col)
-                row_data.append(item.text() if item else '')
-            data.append(row_data)
-        
-        return pd.DataFrame(data, columns=headers)
+        """Displayed columns of the rows passing the diff type filter."""
+        return self.diff_model.visible_dataframe()
+
+class PluginParametersMixin:
+    """Controls for the parameters of a plugin, in a dialog's parameters_layout."""
+    
+    def update_parameters_ui(self, plugin):
+        """Update the parameters UI based on the selected plugin."""
+        # Clear existing parameters
+        for i in reversed(range(self.parameters_layout.count())):
+            child = self.parameters_layout.itemAt(i).widget()
+            if child:
+                child.setParent(None)
+        
+        self.parameter_specs = {}
+        try:
+            parameters = plugin.get_parameters()
+            self.parameter_specs = parameters
+            
+            if not parameters:
+                label = QLabel("This plugin has no configurable parameters.")
+                self.parameters_layout.addWidget(label)
+                return
+            
+            # Create parameter controls
+            for param_name, param_info in parameters.items():
+                param_layout = QHBoxLayout()
+                
+                # Parameter label
+                label = QLabel(f"{param_name}:")
+                label.setToolTip(param_info.get('description', ''))
+                param_layout.addWidget(label)
+                
+                # Parameter control based on type
+                param_type = param_info.get('type', 'str')
+                default_value = self.parameter_default(param_info)
+                
+                if param_type == 'bool':
+                    control = QCheckBox()
+                    control.setChecked(default_value)
+                elif param_type == 'list' and not param_info.get('options'):
+                    # Free list, e.g. key columns: comma-separated values
+                    control = QLineEdit()
+                    control.setText(', '.join(str(value) for value in default_value or []))
+                elif param_type == 'list':
+                    control = QComboBox()
+                    options = param_info.get('options', [])
+                    control.addItems([str(opt) for opt in options])
+                    if default_value in options:
+                        control.setCurrentText(str(default_value))
+                else:
+                    control = QLineEdit()
+                    control.setText(str(default_value))
+                
+                control.setObjectName(param_name)
+                param_layout.addWidget(control)
+                
+                param_layout.addStretch()
+                
+                widget = QWidget()
+                widget.setLayout(param_layout)
+                self.parameters_layout.addWidget(widget)
+        
+        except Exception as e:
+            error_label = QLabel(f"Error loading parameters: {e}")
+            self.parameters_layout.addWidget(error_label)
+    
+    def get_current_parameters(self) -> Dict[str, Any]:
+        """Get current parameter values from the UI."""
+        parameters = {}
+        
+        for i in range(self.parameters_layout.count()):
+            widget = self.parameters_layout.itemAt(i).widget()
+            if not widget:
+                continue
+            
+            # Find parameter controls
+            for control in widget.findChildren((QCheckBox, QComboBox, QLineEdit)):
+                param_name = control.objectName()
+                if not param_name:
+                    continue
+                
+                if isinstance(control, QCheckBox):
+                    parameters[param_name] = control.isChecked()
+                elif isinstance(control, QComboBox):
+                    text = control.currentText()
+                    # Try to convert to appropriate type
+                    try:
+                        if text.lower() in ['true', 'false']:
+                            parameters[param_name] = text.lower() == 'true'
+                        elif text.isdigit():
+                            parameters[param_name] = int(text)
+                        elif '.' in text and text.replace('.', '').isdigit():
+                            parameters[param_name] = float(text)
+                        else:
+                            parameters[param_name] = text
+                    except ValueError:
+                        parameters[param_name] = text
+                elif isinstance(control, QLineEdit):
+                    text = control.text()
+                    if getattr(self, 'parameter_specs', {}).get(param_name, {}).get('type') == 'list':
+                        parameters[param_name] = [value.strip() for value in text.split(',') if value.strip()]
+                        continue
+                    # Try to convert to appropriate type
+                    try:
+                        if text.lower() in ['true', 'false']:
+                            parameters[param_name] = text.lower() == 'true'
+                        elif text.isdigit():
+                            parameters[param_name] = int(text)
+                        elif '.' in text and text.replace('.', '').isdigit():
+                            parameters[param_name] = float(text)
+                        else:
+                            parameters[param_name] = text
+                    except ValueError:
+                        parameters[param_name] = text
+        
+        return parameters
+    
+    def parameter_default(self, param_info: Dict[str, Any]) -> Any:
+        """Default of a parameter, or the application setting it is tied to (e.g. worker_threads)."""
+        settings = getattr(self.parent(), 'settings', None) or {}
+        if param_info.get('setting') in settings:
+            return settings[param_info['setting']]
+        return param_info.get('default', '')
+    
+    def set_parameter_values(self, values: Dict[str, Any]):
+        """Show earlier parameter values in the controls of update_parameters_ui."""
+        for i in range(self.parameters_layout.count()):
+            widget = self.parameters_layout.itemAt(i).widget()
+            if not widget:
+                continue
+            for control in widget.findChildren((QCheckBox, QComboBox, QLineEdit)):
+                if control.objectName() not in values:
+                    continue
+                value = values[control.objectName()]
+                if isinstance(control, QCheckBox):
+                    control.setChecked(bool(value))
+                elif isinstance(control, QComboBox):
+                    control.setCurrentText(str(value))
+                elif isinstance(value, list):
+                    control.setText(', '.join(str(item) for item in value))
+                else:
+                    control.setText(str(value))
 
-class PluginCompareDialog(QDialog):
-    """Dialog for comparing DataFrames using plugins."""
+class PluginCompareDialog(PluginParametersMixin, QDialog):
+    """Dialog for comparing DataFrames using plugins.
+    
+    DataFrames given as None are loaded from their paths (through the
+    parent's load_dataframe_from_file) only when a comparison cannot be
+    decided from the cached fingerprints of the files.
+    """
     
-    def __init__(self, df1: pd.DataFrame, df2: pd.DataFrame, 
-                 df1_name: str = "DataFrame 1", df2_name: str = "DataFrame 2", parent=None):
+    def __init__(self, df1: Optional[pd.DataFrame], df2: Optional[pd.DataFrame], 
+                 df1_name: str = "DataFrame 1", df2_name: str = "DataFrame 2", parent=None,
+                 df1_path: Optional[str] = None, df2_path: Optional[str] = None):
         super().__init__(parent)
         self.df1 = df1
         self.df2 = df2
         self.df1_name = df1_name
         self.df2_name = df2_name
+        self.df1_path = df1_path
+        self.df2_path = df2_path
+        
+        # (path, signature) of each file, taken when its DataFrame was loaded
+        self.df1_source = self.file_source(df1_path) if df1 is not None else None
+        self.df2_source = self.file_source(df2_path) if df2 is not None else None
         
         self.plugin_loader = get_plugin_loader()
         self.plugins = self.plugin_loader.load_plugins()
@@ -322,8 +655,10 @@ class PluginCompareDialog(QDialog):
         self.results_tabs.addTab(side_by_side_widget, "Side-by-Side")
         
         # Populate initial data
-        self.left_table.populate_from_dataframe(self.df1)
-        self.right_table.populate_from_dataframe(self.df2)
+        if self.df1 is not None:
+            self.left_table.populate_from_dataframe(self.df1)
+        if self.df2 is not None:
+            self.right_table.populate_from_dataframe(self.df2)
         
         return self.results_tabs
     
@@ -392,108 +727,54 @@ class PluginCompareDialog(QDialog):
         # Update parameters
         self.update_parameters_ui(selected_plugin)
     
-    def update_parameters_ui(self, plugin):
-        """Update the parameters UI based on the selected plugin."""
-        # Clear existing parameters
-        for i in reversed(range(self.parameters_layout.count())):
-            child = self.parameters_layout.itemAt(i).widget()
-            if child:
-                child.setParent(None)
-        
+    @staticmethod
+    def file_source(path: Optional[str]):
+        """(absolute path, signature) of a file, None without a readable file."""
         try:
-            parameters = plugin.get_parameters()
-            
-            if not parameters:
-                label = QLabel("This plugin has no configurable parameters.")
-                self.parameters_layout.addWidget(label)
-                return
-            
-            # Create parameter controls
-            for param_name, param_info in parameters.items():
-                param_layout = QHBoxLayout()
-                
-                # Parameter label
-                label = QLabel(f"{param_name}:")
-                label.setToolTip(param_info.get('description', ''))
-                param_layout.addWidget(label)
-                
-                # Parameter control based on type
-                param_type = param_info.get('type', 'str')
-                default_value = param_info.get('default', '')
-                
-                if param_type == 'bool':
-                    control = QCheckBox()
-                    control.setChecked(default_value)
-                elif param_type == 'list':
-                    control = QComboBox()
-                    options = param_info.get('options', [])
-                    control.addItems([str(opt) for opt in options])
-                    if default_value in options:
-                        control.setCurrentText(str(default_value))
-                else:
-                    control = QLineEdit()
-                    control.setText(str(default_value))
-                
-                control.setObjectName(param_name)
-                param_layout.addWidget(control)
-                
-                param_layout.addStretch()
-                
-                widget = QWidget()
-                widget.setLayout(param_layout)
-                self.parameters_layout.addWidget(widget)
-        
-        except Exception as e:
-            error_label = QLabel(f"Error loading parameters: {e}")
-            self.parameters_layout.addWidget(error_label)
+            return file_source(path) if path else None
+        except OSError:
+            return None
     
-    def get_current_parameters(self) -> Dict[str, Any]:
-        """Get current parameter values from the UI."""
-        parameters = {}
-        
-        for i in range(self.parameters_layout.count()):
-            widget = self.parameters_layout.itemAt(i).widget()
-            if not widget:
+    def get_comparison_context(self) -> Dict[str, Any]:
+        """Where the DataFrames came from, for plugins that keep state between runs.
+        
+        'store_path' is the session database path (None when in memory);
+        'df1_source'/'df2_source' are (path, signature) of the files, as
+        loaded or, for files not loaded yet, as they are now.
+        """
+        get_db_path = getattr(self.parent(), 'current_db_path', None)
+        return {
+            'store_path': get_db_path() if get_db_path else None,
+            'df1_source': self.df1_source if self.df1 is not None else self.file_source(self.df1_path),
+            'df2_source': self.df2_source if self.df2 is not None else self.file_source(self.df2_path)
+        }
+    
+    def load_dataframes(self):
+        """Load the DataFrames not given to the dialog from their files."""
+        loader = getattr(self.parent(), 'load_dataframe_from_file', None)
+        for index, path in ((1, self.df1_path), (2, self.df2_path)):
+            if getattr(self, f'df{index}') is not None:
                 continue
-            
-            # Find parameter controls
-            for control in widget.findChildren((QCheckBox, QComboBox, QLineEdit)):
-                param_name = control.objectName()
-                if not param_name:
-                    continue
-                
-                if isinstance(control, QCheckBox):
-                    parameters[param_name] = control.isChecked()
-                elif isinstance(control, QComboBox):
-                    text = control.currentText()
-                    # Try to convert to appropriate type
-                    try:
-                        if text.lower() in ['true', 'false']:
-                            parameters[param_name] = text.lower() == 'true'
-                        elif text.isdigit():
-                            parameters[param_name] = int(text)
-                        elif '.' in text and text.replace('.', '').isdigit():
-                            parameters[param_name] = float(text)
-                        else:
-                            parameters[param_name] = text
-                    except ValueError:
-                        parameters[param_name] = text
-                elif isinstance(control, QLineEdit):
-                    text = control.text()
-                    # Try to convert to appropriate type
-                    try:
-                        if text.lower() in ['true', 'false']:
-                            parameters[param_name] = text.lower() == 'true'
-                        elif text.isdigit():
-                            parameters[param_name] = int(text)
-                        elif '.' in text and text.replace('.', '').isdigit():
-                            parameters[param_name] = float(text)
-                        else:
-                            parameters[param_name] = text
-                    except ValueError:
-                        parameters[param_name] = text
-        
-        return parameters
+            if loader is None or not path:
+                raise ValueError(f"No data to load for {getattr(self, f'df{index}_name')}")
+            self.status_label.setText(f"Loading {os.path.basename(path)}...")
+            QApplication.processEvents()
+            setattr(self, f'df{index}_source', self.file_source(path))
+            setattr(self, f'df{index}', loader(path))
+            table = self.left_table if index == 1 else self.right_table
+            table.populate_from_dataframe(getattr(self, f'df{index}'))
+    
+    def cached_comparison(self, plugin, parameters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Result decided by the plugin from the cached fingerprints of both files, if it can."""
+        try:
+            fingerprint1, fingerprint2 = cached_fingerprints(
+                parameters['store_path'], [parameters['df1_source'], parameters['df2_source']])
+        except sqlite3.Error as e:
+            print(f"Failed to read fingerprints: {e}")
+            return None
+        if fingerprint1 is None or fingerprint2 is None:
+            return None
+        return plugin.compare_fingerprints(fingerprint1, fingerprint2, **parameters)
     
     def run_comparison(self):
         """Run the selected plugin comparison."""
@@ -519,6 +800,22 @@ class PluginCompareDialog(QDialog):
         
         # Get parameters
         parameters = self.get_current_parameters()
+        parameters.update(self.get_comparison_context())
+        
+        # Unchanged files with cached fingerprints may not need loading at all
+        result = self.cached_comparison(selected_plugin, parameters)
+        if result is not None:
+            self.on_comparison_finished(result)
+            self.status_label.setText("Comparison decided from cached fingerprints")
+            return
+        
+        try:
+            self.load_dataframes()
+        except Exception as e:
+            QMessageBox.critical(self, "Load Error", f"Failed to load data: {str(e)}")
+            self.status_label.setText("Ready")
+            return
+        parameters.update(self.get_comparison_context())
         
         # Disable UI during comparison
         self.compare_button.setEnabled(False)
@@ -560,7 +857,8 @@ class PluginCompareDialog(QDialog):
         
         # Update highlights table
         highlights = result.get('highlights', pd.DataFrame())
-        self.highlights_table.populate_from_dataframe(highlights)
+        self.highlights_table.changed_fields = result.get('changed_fields')
+        self.highlights_table.populate_from_dataframe(highlights, cell_mask=result.get('cell_mask'))
         
         # Reset UI
         self.compare_button.setEnabled(True)
@@ -588,6 +886,456 @@ class PluginCompareDialog(QDialog):
         
         event.accept()
 
+class ChunkedCompareDialog(QDialog):
+    """Dialog for comparing two large files by key without loading them into memory."""
+    
+    def __init__(self, file1: str, file2: str, parent=None):
+        super().__init__(parent)
+        self.file1 = file1
+        self.file2 = file2
+        
+        self.work_dir = tempfile.mkdtemp(prefix='csvquery_compare_')
+        self.result_path = os.path.join(self.work_dir, 'compare_result.sqlite')
+        self.comparison_worker = None
+        self.current_result = None
+        
+        self.init_ui()
+    
+    def init_ui(self):
+        """Initialize the user interface."""
+        self.setWindowTitle("Out-of-Core Table Comparison")
+        self.setGeometry(100, 100, 1100, 750)
+        
+        main_layout = QVBoxLayout()
+        
+        # Settings: key columns common to both files and text options
+        group_box = QGroupBox("Comparison Settings")
+        settings_layout = QVBoxLayout()
+        settings_layout.addWidget(QLabel(f"File 1: {self.file1}\nFile 2: {self.file2}"))
+        settings_layout.addWidget(QLabel("Key columns:"))
+        
+        self.key_list = QListWidget()
+        self.key_list.setMaximumHeight(120)
+        try:
+            columns2 = set(read_columns(self.file2))
+            for column in read_columns(self.file1):
+                if column in columns2:
+                    item = QListWidgetItem(str(column))
+                    item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                    item.setCheckState(Qt.Unchecked)
+                    self.key_list.addItem(item)
+        except Exception as e:
+            QMessageBox.critical(self, "Read Error", f"Failed to read file columns: {str(e)}")
+        settings_layout.addWidget(self.key_list)
+        
+        options_layout = QHBoxLayout()
+        self.ignore_case_check = QCheckBox("Ignore case")
+        options_layout.addWidget(self.ignore_case_check)
+        self.ignore_whitespace_check = QCheckBox("Ignore whitespace")
+        options_layout.addWidget(self.ignore_whitespace_check)
+        options_layout.addStretch()
+        settings_layout.addLayout(options_layout)
+        
+        group_box.setLayout(settings_layout)
+        main_layout.addWidget(group_box)
+        
+        # Progress bar
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        main_layout.addWidget(self.progress_bar)
+        
+        # Status label
+        self.status_label = QLabel("Ready")
+        main_layout.addWidget(self.status_label)
+        
+        # Results: summary and previews of the result tables
+        self.results_tabs = QTabWidget()
+        self.summary_tab = QTextEdit()
+        self.summary_tab.setReadOnly(True)
+        self.results_tabs.addTab(self.summary_tab, "Summary")
+        self.highlights_table = HighlightedTableWidget()
+        self.results_tabs.addTab(self.highlights_table, "Differences")
+        self.changed_fields_table = HighlightedTableWidget()
+        self.results_tabs.addTab(self.changed_fields_table, "Changed Fields")
+        main_layout.addWidget(self.results_tabs)
+        
+        # Bottom buttons
+        button_layout = QHBoxLayout()
+        
+        self.compare_button = QPushButton("Run Comparison")
+        self.compare_button.clicked.connect(self.run_comparison)
+        button_layout.addWidget(self.compare_button)
+        
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_comparison)
+        button_layout.addWidget(self.cancel_button)
+        
+        self.export_differences_button = QPushButton("Export Differences...")
+        self.export_differences_button.setEnabled(False)
+        self.export_differences_button.clicked.connect(lambda: self.export_table(DIFFERENCES_TABLE))
+        button_layout.addWidget(self.export_differences_button)
+        
+        self.export_fields_button = QPushButton("Export Changed Fields...")
+        self.export_fields_button.setEnabled(False)
+        self.export_fields_button.clicked.connect(lambda: self.export_table(CHANGED_FIELDS_TABLE))
+        button_layout.addWidget(self.export_fields_button)
+        
+        button_layout.addStretch()
+        
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        
+        main_layout.addLayout(button_layout)
+        
+        self.setLayout(main_layout)
+    
+    def get_key_columns(self) -> List[str]:
+        """Checked key columns, in file order."""
+        return [self.key_list.item(i).text() for i in range(self.key_list.count())
+                if self.key_list.item(i).checkState() == Qt.Checked]
+    
+    def run_comparison(self):
+        """Start the out-of-core comparison."""
+        key_columns = self.get_key_columns()
+        if not key_columns:
+            QMessageBox.warning(self, "No Key", "Select at least one key column.")
+            return
+        
+        parameters = {
+            'key_columns': key_columns,
+            'ignore_case': self.ignore_case_check.isChecked(),
+            'ignore_whitespace': self.ignore_whitespace_check.isChecked()
+        }
+        
+        # Disable UI during comparison
+        self.compare_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.export_differences_button.setEnabled(False)
+        self.export_fields_button.setEnabled(False)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        
+        self.comparison_worker = ChunkedComparisonWorker(self.file1, self.file2, parameters, self.result_path)
+        self.comparison_worker.progress_updated.connect(self.progress_bar.setValue)
+        self.comparison_worker.status_updated.connect(self.status_label.setText)
+        self.comparison_worker.comparison_finished.connect(self.on_comparison_finished)
+        self.comparison_worker.comparison_failed.connect(self.on_comparison_failed)
+        
+        self.comparison_worker.start()
+    
+    def cancel_comparison(self):
+        """Ask the running comparison to stop."""
+        if self.comparison_worker and self.comparison_worker.isRunning():
+            self.comparison_worker.cancel()
+            self.status_label.setText("Cancelling...")
+    
+    def on_comparison_finished(self, result: Dict[str, Any]):
+        """Show the summary and the preview of the result tables."""
+        self.current_result = result
+        
+        summary_text = f"Comparison Result: {'EQUAL' if result['is_equal'] else 'DIFFERENT'}\n\n"
+        summary_text += result['details']
+        summary_text += "\n\nMetadata:\n"
+        for key, value in result['metadata'].items():
+            summary_text += f"- {key}: {value}\n"
+        self.summary_tab.setText(summary_text)
+        
+        self.highlights_table.populate_from_dataframe(result['highlights'])
+        self.changed_fields_table.populate_from_dataframe(result['changed_fields'])
+        
+        # Reset UI
+        self.compare_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.export_differences_button.setEnabled(True)
+        self.export_fields_button.setEnabled(True)
+        self.progress_bar.setVisible(False)
+        self.results_tabs.setCurrentIndex(0)
+    
+    def on_comparison_failed(self, error_message: str):
+        """Handle comparison failure or cancellation."""
+        if not self.comparison_worker.cancelled:
+            QMessageBox.critical(self, "Comparison Error", f"Comparison failed: {error_message}")
+        
+        # Reset UI
+        self.compare_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.progress_bar.setVisible(False)
+        self.status_label.setText(error_message if self.comparison_worker.cancelled else "Comparison failed")
+    
+    def export_table(self, table: str):
+        """Export a full result table to CSV."""
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Export Comparison Result", f"{table}.csv", "CSV Files (*.csv)"
+        )
+        
+        if filename:
+            try:
+                rows = export_result_table(self.result_path, table, filename)
+                QMessageBox.information(self, "Export Successful", f"{rows} rows exported to {filename}")
+            except Exception as e:
+                QMessageBox.critical(self, "Export Error", f"Failed to export data: {str(e)}")
+    
+    def done(self, result):
+        """Stop a running comparison and remove its working files, however the dialog is closed."""
+        if self.comparison_worker and self.comparison_worker.isRunning():
+            self.comparison_worker.blockSignals(True)  # No "cancelled" message after closing
+            self.comparison_worker.cancel()
+            self.comparison_worker.wait()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        
+        super().done(result)
+
+class BatchCompareDialog(PluginParametersMixin, QDialog):
+    """Dialog for comparing many files pairwise or against a baseline with several plugins."""
+    
+    def __init__(self, files: List[str], parent=None, plugin_names: Optional[List[str]] = None):
+        super().__init__(parent)
+        self.files = files
+        
+        self.plugin_loader = get_plugin_loader()
+        self.plugins = self.plugin_loader.load_plugins()
+        self.plugin_names = plugin_names
+        self.plugin_parameters = {}  # Plugin name -> parameters edited in the dialog
+        self.shown_plugin = None
+        
+        self.comparison_worker = None
+        self.current_result = None
+        
+        self.init_ui()
+    
+    def init_ui(self):
+        """Initialize the user interface."""
+        self.setWindowTitle(f"Batch Comparison - {len(self.files)} files")
+        self.setGeometry(100, 100, 1100, 750)
+        
+        main_layout = QVBoxLayout()
+        
+        # Settings: pairing mode and the plugins to run
+        group_box = QGroupBox("Batch Settings")
+        settings_layout = QVBoxLayout()
+        
+        mode_layout = QHBoxLayout()
+        mode_layout.addWidget(QLabel("Compare:"))
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(["All pairs", "Each file against baseline"])
+        self.mode_combo.currentIndexChanged.connect(self.on_mode_changed)
+        mode_layout.addWidget(self.mode_combo)
+        mode_layout.addWidget(QLabel("Baseline:"))
+        self.baseline_combo = QComboBox()
+        self.baseline_combo.addItems([os.path.basename(path) for path in self.files])
+        self.baseline_combo.setEnabled(False)
+        mode_layout.addWidget(self.baseline_combo)
+        mode_layout.addStretch()
+        settings_layout.addLayout(mode_layout)
+        
+        settings_layout.addWidget(QLabel("Plugins (select one to edit its parameters):"))
+        self.plugin_list = QListWidget()
+        self.plugin_list.setMaximumHeight(120)
+        for plugin in self.plugins:
+            try:
+                name = plugin.get_name()
+            except Exception:
+                continue
+            item = QListWidgetItem(name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            checked = self.plugin_names is None or name in self.plugin_names
+            item.setCheckState(Qt.Checked if checked else Qt.Unchecked)
+            self.plugin_list.addItem(item)
+        self.plugin_list.currentItemChanged.connect(self.on_plugin_selected)
+        settings_layout.addWidget(self.plugin_list)
+        
+        # Parameters of the selected plugin (will be populated dynamically)
+        self.parameters_widget = QWidget()
+        self.parameters_layout = QVBoxLayout(self.parameters_widget)
+        settings_layout.addWidget(self.parameters_widget)
+        
+        group_box.setLayout(settings_layout)
+        main_layout.addWidget(group_box)
+        
+        # Progress bar
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        main_layout.addWidget(self.progress_bar)
+        
+        # Status label
+        self.status_label = QLabel("Ready")
+        main_layout.addWidget(self.status_label)
+        
+        # Results: one row per pair and plugin, details of the selected row below
+        splitter = QSplitter(Qt.Vertical)
+        self.summary_table = HighlightedTableWidget()
+        self.summary_table.setup_context_menu()
+        self.summary_table.selectionModel().selectionChanged.connect(self.show_selected_details)
+        splitter.addWidget(self.summary_table)
+        self.details_text = QTextEdit()
+        self.details_text.setReadOnly(True)
+        splitter.addWidget(self.details_text)
+        splitter.setSizes([500, 200])
+        main_layout.addWidget(splitter)
+        
+        # Bottom buttons
+        button_layout = QHBoxLayout()
+        
+        self.compare_button = QPushButton("Run Batch")
+        self.compare_button.clicked.connect(self.run_comparison)
+        button_layout.addWidget(self.compare_button)
+        
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_comparison)
+        button_layout.addWidget(self.cancel_button)
+        
+        button_layout.addStretch()
+        
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        
+        main_layout.addLayout(button_layout)
+        
+        self.setLayout(main_layout)
+    
+    def on_mode_changed(self):
+        """Enable the baseline choice in baseline mode."""
+        self.baseline_combo.setEnabled(self.mode_combo.currentIndex() == 1)
+    
+    def plugin_by_name(self, name: str) -> Optional[Any]:
+        for plugin in self.plugins:
+            try:
+                if plugin.get_name() == name:
+                    return plugin
+            except Exception:
+                continue
+        return None
+    
+    def on_plugin_selected(self, current, previous):
+        """Keep the parameters of the previous plugin and show those of the selected one."""
+        self.store_shown_parameters()
+        plugin = self.plugin_by_name(current.text()) if current else None
+        self.shown_plugin = plugin
+        if plugin is None:
+            return
+        self.update_parameters_ui(plugin)
+        self.set_parameter_values(self.plugin_parameters.get(current.text(), {}))
+    
+    def store_shown_parameters(self):
+        """Remember the parameters edited for the plugin shown."""
+        if self.shown_plugin is not None:
+            self.plugin_parameters[self.shown_plugin.get_name()] = self.get_current_parameters()
+    
+    def batch_parameters(self, plugins: List[Any]) -> Dict[str, Dict[str, Any]]:
+        """Parameters of each plugin: as edited, else their defaults."""
+        self.store_shown_parameters()
+        parameters = {}
+        for plugin in plugins:
+            name = plugin.get_name()
+            parameters[name] = self.plugin_parameters.get(name) or {
+                key: self.parameter_default(spec) for key, spec in plugin.get_parameters().items()}
+        return parameters
+    
+    def get_selected_plugins(self) -> List[Any]:
+        """Checked plugins, in list order."""
+        checked = {self.plugin_list.item(i).text() for i in range(self.plugin_list.count())
+                   if self.plugin_list.item(i).checkState() == Qt.Checked}
+        return [plugin for plugin in self.plugins if plugin.get_name() in checked]
+    
+    def run_comparison(self):
+        """Start the batch."""
+        plugins = self.get_selected_plugins()
+        if not plugins:
+            QMessageBox.warning(self, "No Plugin", "Select at least one plugin.")
+            return
+        
+        plugin_parameters = self.batch_parameters(plugins)
+        # Rows of different files are only matched by position without keys
+        unkeyed = [plugin.get_name() for plugin in plugins
+                   if plugin.get_parameters().get('key_columns', {}).get('type') == 'list'
+                   and not plugin_parameters[plugin.get_name()].get('key_columns')]
+        if unkeyed:
+            QMessageBox.warning(self, "No Key Columns",
+                                f"Enter key_columns for: {', '.join(unkeyed)}.\n"
+                                "Select the plugin in the list to edit its parameters.")
+            return
+        
+        get_db_path = getattr(self.parent(), 'current_db_path', None)
+        parameters = {
+            'baseline': self.baseline_combo.currentIndex() if self.mode_combo.currentIndex() == 1 else None,
+            'parameters': plugin_parameters,
+            'store_path': get_db_path() if get_db_path else None
+        }
+        
+        # Disable UI during comparison
+        self.compare_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        
+        self.comparison_worker = BatchComparisonWorker(self.files, plugins, parameters)
+        self.comparison_worker.progress_updated.connect(self.progress_bar.setValue)
+        self.comparison_worker.status_updated.connect(self.status_label.setText)
+        self.comparison_worker.comparison_finished.connect(self.on_comparison_finished)
+        self.comparison_worker.comparison_failed.connect(self.on_comparison_failed)
+        
+        self.comparison_worker.start()
+    
+    def cancel_comparison(self):
+        """Ask the running batch to stop."""
+        if self.comparison_worker and self.comparison_worker.isRunning():
+            self.comparison_worker.cancel()
+            self.status_label.setText("Cancelling...")
+    
+    def on_comparison_finished(self, result: Dict[str, Any]):
+        """Show the summary table."""
+        self.current_result = result
+        
+        summary = result['summary'].copy()
+        summary['seconds'] = summary['seconds'].round(3)
+        summary['_diff_type'] = summary['is_equal'].map({True: 'same', False: 'different'})
+        self.summary_table.populate_from_dataframe(summary)
+        
+        loads = "\n".join(f"- {os.path.basename(path)}: {seconds:.3f} s"
+                           for path, seconds in result['load_seconds'].items())
+        self.details_text.setText(f"{len(summary)} comparisons, {int((~summary['is_equal']).sum())} with "
+                                  f"differences, in {result['seconds']:.1f} s\n\n"
+                                  f"Files loaded ({len(result['load_seconds'])}):\n{loads or '- none'}")
+        
+        # Reset UI
+        self.compare_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.progress_bar.setVisible(False)
+    
+    def on_comparison_failed(self, error_message: str):
+        """Handle batch failure or cancellation."""
+        if not self.comparison_worker.cancelled:
+            QMessageBox.critical(self, "Comparison Error", f"Batch comparison failed: {error_message}")
+        
+        # Reset UI
+        self.compare_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.progress_bar.setVisible(False)
+        self.status_label.setText(error_message if self.comparison_worker.cancelled else "Comparison failed")
+    
+    def show_selected_details(self):
+        """Show the details text of the selected comparison."""
+        rows = self.summary_table.selectionModel().selectedRows()
+        if self.current_result is None or not rows:
+            return
+        position = int(self.summary_table.diff_model.rows[rows[0].row()])  # The view may be filtered
+        row = self.current_result['summary'].iloc[position]
+        self.details_text.setText(f"{row['file1']} vs {row['file2']} - {row['plugin']}\n\n"
+                                  f"{self.current_result['details'][position]}")
+    
+    def done(self, result):
+        """Stop a running batch, however the dialog is closed."""
+        if self.comparison_worker and self.comparison_worker.isRunning():
+            self.comparison_worker.blockSignals(True)  # No "cancelled" message after closing
+            self.comparison_worker.cancel()
+            self.comparison_worker.wait()
+        
+        super().done(result)
+
 if __name__ == "__main__":
     from PyQt5.QtWidgets import QApplication
     import sys
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import pandas as pd
 from pandas import DataFrame
 from typing import Dict, Any, Optional
 
@@ -27,7 +28,11 @@ class BaseComparePlugin(ABC):
         Args:
             df1: First DataFrame to compare
             df2: Second DataFrame to compare
-            **kwargs: Additional parameters specific to the plugin
+            **kwargs: Additional parameters specific to the plugin. The
+                compare dialog also passes 'store_path' (session
+                database path or None) and 'df1_source'/'df2_source'
+                ((file path, signature) or None) for plugins that keep
+                state between runs.
             
         Returns:
             Dict with keys:
@@ -35,9 +40,35 @@ class BaseComparePlugin(ABC):
             - 'details': str with human-readable summary
             - 'highlights': DataFrame or dict with difference highlights
             - 'metadata': dict with additional comparison metadata
+            Optionally:
+            - 'cell_mask': dict with 'columns' (column names) and 'mask'
+              (boolean array, one row per highlights row, one column per
+              name) marking the changed cells, so that only those are
+              highlighted
+            - 'changed_fields': DataFrame with one row per changed cell
+              (key columns, 'column', 'old_value', 'new_value')
         """
         pass
     
+    def compare_fingerprints(self, fingerprint1: Dict[str, Any], fingerprint2: Dict[str, Any],
+                             **kwargs) -> Optional[Dict[str, Any]]:
+        """Decide a comparison from cached fingerprints, without the data.
+        
+        Fingerprints are made by utils.fingerprints.dataframe_fingerprint.
+        Returns a result like compare() does, or None when the DataFrames
+        have to be loaded and compared. By default only identical content
+        is decided, as every comparison finds no differences then.
+        """
+        if fingerprint1['content_hash'] != fingerprint2['content_hash']:
+            return None
+        return {
+            'is_equal': True,
+            'details': (f"Identical content: {fingerprint1['row_count']} rows, "
+                        f"{len(fingerprint1['columns'])} columns (decided from cached fingerprints)"),
+            'highlights': pd.DataFrame(),
+            'metadata': {'from_fingerprints': True, 'content_hash': fingerprint1['content_hash']}
+        }
+    
     def get_parameters(self) -> Dict[str, Dict[str, Any]]:
         """Return plugin-specific parameters for UI configuration.
         
@@ -47,6 +78,7 @@ class BaseComparePlugin(ABC):
             - 'default': default value
             - 'description': parameter description
             - 'options': list of options (for 'list' type)
+            - 'setting': optional application setting whose value is the default
         """
         return {}
     
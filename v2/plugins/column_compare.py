@@ -2,7 +2,77 @@ from plugins.base_compare import BaseComparePlugin
 import pandas as pd
 import numpy as np
 from pandas import DataFrame
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+NUMERIC_DTYPES = ('int64', 'float64')
+NUMERIC_STATS = ['mean', 'std', 'min', 'max', 'median']
+NUMERIC_MEASURES = ['mean', 'std', 'min', 'max']  # Compared between the frames
+
+
+def _numeric_stats(values: np.ndarray, measures: bool = True) -> Dict[str, np.ndarray]:
+    """Null and unique counts, and NUMERIC_STATS when measures is True, of
+    every row of a 2D int64, float64 or bool array holding one column per row.
+    
+    One sort of each column gives the unique counts, minimum, maximum and
+    median of all columns; missing values (NaN) sort last and are skipped
+    like pandas does.
+    """
+    columns, rows = values.shape
+    ordered = np.sort(values, axis=1)
+    if values.dtype.kind == 'f':
+        missing = np.isnan(ordered)
+        counts = rows - missing.sum(axis=1)
+    else:
+        missing = np.zeros(ordered.shape, dtype=bool)
+        counts = np.full(columns, rows)
+    changes = (ordered[:, 1:] != ordered[:, :-1]) & ~missing[:, 1:]
+    stats = {'null_count': rows - counts, 'unique_count': changes.sum(axis=1) + (counts > 0)}
+    if not measures or not rows:
+        return stats
+    
+    def at(positions):
+        return ordered[np.arange(columns), np.clip(positions, 0, None)].astype(float)
+    
+    with np.errstate(all='ignore'):
+        floats = ordered.astype(float, copy=False)
+        mean = np.where(missing, 0, floats).sum(axis=1) / counts
+        squares = np.where(missing, 0, (floats - mean[:, None]) ** 2).sum(axis=1)
+        stats.update({
+            'mean': mean,
+            'std': np.where(counts > 1, np.sqrt(squares / (counts - 1)), np.nan),
+            'min': np.where(counts > 0, at(0), np.nan),
+            'max': np.where(counts > 0, at(counts - 1), np.nan),
+            'median': np.where(counts > 0, (at((counts - 1) // 2) + at(counts // 2)) / 2, np.nan)
+        })
+    return stats
+
+
+def _factorized_stats(col: pd.Series, text_stats: bool) -> Dict[str, Any]:
+    """Null and unique counts of a column from one factorization, and for
+    text_stats also the most common value and the average text length.
+    
+    The mode and lengths are worked out on the distinct values, weighted
+    by their counts, instead of on every row.
+    """
+    codes, uniques = pd.factorize(col)
+    present = codes[codes >= 0]
+    stats = {'null_count': len(codes) - len(present), 'unique_count': len(uniques)}
+    if text_stats:
+        counts = np.bincount(present, minlength=len(uniques))
+        most_common = None
+        if len(uniques):
+            # Ties go to the smallest value, as Series.mode sorts them
+            tied = [uniques[i] for i in np.flatnonzero(counts == counts.max())]
+            try:
+                most_common = min(tied)
+            except TypeError:
+                most_common = tied[0]
+        lengths = pd.Series(uniques, dtype=object).astype(str).str.len().to_numpy(dtype=float)
+        stats.update({
+            'most_common': most_common,
+            'avg_length': float(counts @ lengths / len(present)) if len(present) else (np.nan if len(codes) else None)
+        })
+    return stats
 
 class ColumnComparePlugin(BaseComparePlugin):
     """Plugin for statistical column-wise comparison of DataFrames."""
@@ -14,7 +84,7 @@ class ColumnComparePlugin(BaseComparePlugin):
         return "Compares DataFrames by analyzing statistical properties of each column"
     
     def get_version(self) -> str:
-        return "1.0.0"
+        return "1.1.0"
     
     def get_parameters(self) -> Dict[str, Dict[str, Any]]:
         return {
@@ -52,48 +122,49 @@ class ColumnComparePlugin(BaseComparePlugin):
         include_stats = kwargs.get('include_stats', True)
         tolerance = kwargs.get('tolerance', 0.001)
         
-        # Get all columns from both DataFrames
-        all_columns = set(df1.columns) | set(df2.columns)
-        common_columns = set(df1.columns) & set(df2.columns)
-        only_in_df1 = set(df1.columns) - set(df2.columns)
-        only_in_df2 = set(df2.columns) - set(df1.columns)
+        # Columns in a fixed order: common and first-only columns as in df1, then second-only as in df2
+        columns1 = set(df1.columns)
+        columns2 = set(df2.columns)
+        common_columns = [col for col in df1.columns if col in columns2]
+        only_in_df1 = [col for col in df1.columns if col not in columns2]
+        only_in_df2 = [col for col in df2.columns if col not in columns1]
+        all_columns = common_columns + only_in_df1 + only_in_df2
+        
+        # Statistics of every column of each frame, computed once per frame
+        stats1 = self._get_frame_stats(df1, include_nulls, include_stats)
+        stats2 = self._get_frame_stats(df2, include_nulls, include_stats)
+        close = self._stats_close(stats1, stats2, common_columns, tolerance) if include_stats else {}
         
         # Prepare results
         comparison_results = []
-        differences_found = False
         
         # Compare common columns
         for col in common_columns:
-            col_result = self._compare_column(df1[col], df2[col], col, include_nulls, include_stats, tolerance)
-            comparison_results.append(col_result)
-            if not col_result['is_equal']:
-                differences_found = True
+            comparison_results.append(self._compare_column(stats1[col], stats2[col], col, include_nulls,
+                                                           include_stats, close.get(col)))
         
         # Handle columns only in df1
         for col in only_in_df1:
-            col_result = {
+            comparison_results.append({
                 'column': col,
                 'status': 'only_in_df1',
                 'is_equal': False,
-                'df1_stats': self._get_column_stats(df1[col], include_nulls, include_stats),
+                'df1_stats': stats1[col],
                 'df2_stats': None,
                 'differences': ['Column exists only in first DataFrame']
-            }
-            comparison_results.append(col_result)
-            differences_found = True
+            })
         
         # Handle columns only in df2
         for col in only_in_df2:
-            col_result = {
+            comparison_results.append({
                 'column': col,
                 'status': 'only_in_df2',
                 'is_equal': False,
                 'df1_stats': None,
-                'df2_stats': self._get_column_stats(df2[col], include_nulls, include_stats),
+                'df2_stats': stats2[col],
                 'differences': ['Column exists only in second DataFrame']
-            }
-            comparison_results.append(col_result)
-            differences_found = True
+            })
+        differences_found = any(not result['is_equal'] for result in comparison_results)
         
         # Create highlights DataFrame
         highlights = self._create_highlights_dataframe(comparison_results)
@@ -115,14 +186,15 @@ class ColumnComparePlugin(BaseComparePlugin):
             }
         }
     
-    def _compare_column(self, col1: pd.Series, col2: pd.Series, col_name: str, 
-                       include_nulls: bool, include_stats: bool, tolerance: float) -> Dict[str, Any]:
-        """Compare two columns and return detailed results."""
-        differences = []
+    def _compare_column(self, stats1: Dict[str, Any], stats2: Dict[str, Any], col_name: Any,
+                        include_nulls: bool, include_stats: bool,
+                        close: Optional[Dict[str, bool]] = None) -> Dict[str, Any]:
+        """Compare the statistics of a column in both frames and return detailed results.
         
-        # Get statistics for both columns
-        stats1 = self._get_column_stats(col1, include_nulls, include_stats)
-        stats2 = self._get_column_stats(col2, include_nulls, include_stats)
+        close holds, per numeric measure, whether the two values are equal
+        within the tolerance (see _stats_close).
+        """
+        differences = []
         
         # Compare data types
         if stats1['dtype'] != stats2['dtype']:
@@ -137,14 +209,11 @@ class ColumnComparePlugin(BaseComparePlugin):
             differences.append(f"Null count differs: {stats1['null_count']} vs {stats2['null_count']}")
         
         # Compare statistical measures if requested and applicable
-        if include_stats and stats1['dtype'] in ['int64', 'float64'] and stats2['dtype'] in ['int64', 'float64']:
-            for stat_name in ['mean', 'std', 'min', 'max']:
-                val1 = stats1.get(stat_name)
-                val2 = stats2.get(stat_name)
-                
-                if val1 is not None and val2 is not None:
-                    if not np.isclose(val1, val2, atol=tolerance, rtol=tolerance, equal_nan=True):
-                        differences.append(f"{stat_name.capitalize()} differs: {val1:.6f} vs {val2:.6f}")
+        if include_stats and close:
+            for stat_name in NUMERIC_MEASURES:
+                if not close[stat_name]:
+                    differences.append(f"{stat_name.capitalize()} differs: "
+                                       f"{stats1[stat_name]:.6f} vs {stats2[stat_name]:.6f}")
         
         # Compare unique value counts for categorical data
         if stats1['dtype'] == 'object' or stats2['dtype'] == 'object':
@@ -160,43 +229,67 @@ class ColumnComparePlugin(BaseComparePlugin):
             'differences': differences
         }
     
-    def _get_column_stats(self, col: pd.Series, include_nulls: bool, include_stats: bool) -> Dict[str, Any]:
-        """Get statistical information for a column."""
-        stats = {
-            'dtype': str(col.dtype),
-            'count': len(col),
-            'unique_count': col.nunique()
-        }
+    def _stats_close(self, stats1: Dict[Any, Dict[str, Any]], stats2: Dict[Any, Dict[str, Any]],
+                     columns: List[Any], tolerance: float) -> Dict[Any, Dict[str, bool]]:
+        """Whether each numeric measure of the numeric common columns agrees within the tolerance.
+        
+        All columns are compared in one np.isclose call.
+        """
+        numeric = [col for col in columns
+                   if stats1[col]['dtype'] in NUMERIC_DTYPES and stats2[col]['dtype'] in NUMERIC_DTYPES
+                   and stats1[col].get('mean') is not None and stats2[col].get('mean') is not None]
+        if not numeric:
+            return {}
+        values1 = np.array([[stats1[col][name] for name in NUMERIC_MEASURES] for col in numeric], dtype=float)
+        values2 = np.array([[stats2[col][name] for name in NUMERIC_MEASURES] for col in numeric], dtype=float)
+        close = np.isclose(values1, values2, atol=tolerance, rtol=tolerance, equal_nan=True)
+        return {col: dict(zip(NUMERIC_MEASURES, row.tolist())) for col, row in zip(numeric, close)}
+    
+    def _get_frame_stats(self, df: DataFrame, include_nulls: bool, include_stats: bool) -> Dict[Any, Dict[str, Any]]:
+        """Get statistical information for every column of a frame.
         
-        if include_nulls:
-            stats['null_count'] = col.isnull().sum()
-            stats['null_percentage'] = (stats['null_count'] / len(col)) * 100 if len(col) > 0 else 0
+        Every column is read once: int64, float64 and bool columns together
+        as one array per type (see _numeric_stats), the other columns with
+        one factorization each (see _factorized_stats).
+        """
+        dtypes = [str(dtype) for dtype in df.dtypes]
+        positions = range(df.shape[1])
+        null_counts = [0] * df.shape[1]
+        unique_counts = [0] * df.shape[1]
+        measures = {}
         
-        if include_stats:
-            if col.dtype in ['int64', 'float64']:
+        for dtype in NUMERIC_DTYPES + ('bool',):
+            block = [i for i in positions if dtypes[i] == dtype]
+            if block:
+                numeric = include_stats and dtype in NUMERIC_DTYPES
+                block_stats = _numeric_stats(df.iloc[:, block].to_numpy(dtype=dtype).T, numeric)
+                for j, i in enumerate(block):
+                    null_counts[i] = int(block_stats['null_count'][j])
+                    unique_counts[i] = int(block_stats['unique_count'][j])
+                    if numeric:
+                        measures[i] = [None if df.empty else float(block_stats[name][j]) for name in NUMERIC_STATS]
+        others = {}
+        for i in positions:
+            if dtypes[i] not in NUMERIC_DTYPES + ('bool',):
+                others[i] = _factorized_stats(df.iloc[:, i], include_stats and dtypes[i] == 'object')
+                null_counts[i] = others[i]['null_count']
+                unique_counts[i] = others[i]['unique_count']
+        
+        stats = []
+        for i in positions:
+            col_stats = {'dtype': dtypes[i], 'count': len(df), 'unique_count': unique_counts[i]}
+            if include_nulls:
+                col_stats['null_count'] = null_counts[i]
+                col_stats['null_percentage'] = (null_counts[i] / len(df)) * 100 if len(df) > 0 else 0
+            if include_stats and i in measures:
                 # Numerical statistics
-                try:
-                    stats.update({
-                        'mean': float(col.mean()) if not col.empty else None,
-                        'std': float(col.std()) if not col.empty else None,
-                        'min': float(col.min()) if not col.empty else None,
-                        'max': float(col.max()) if not col.empty else None,
-                        'median': float(col.median()) if not col.empty else None
-                    })
-                except Exception:
-                    # Handle cases where statistics can't be computed
-                    pass
-            elif col.dtype == 'object':
+                col_stats.update(zip(NUMERIC_STATS, measures[i]))
+            elif include_stats and dtypes[i] == 'object':
                 # String/categorical statistics
-                try:
-                    stats.update({
-                        'most_common': col.mode().iloc[0] if not col.mode().empty else None,
-                        'avg_length': col.astype(str).str.len().mean() if not col.empty else None
-                    })
-                except Exception:
-                    pass
+                col_stats.update({name: others[i][name] for name in ('most_common', 'avg_length')})
+            stats.append(col_stats)
         
-        return stats
+        return dict(zip(df.columns, stats))
     
     def _create_highlights_dataframe(self, comparison_results: list) -> DataFrame:
         """Create a DataFrame highlighting the comparison results."""
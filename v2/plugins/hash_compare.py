@@ -1,9 +1,18 @@
 from plugins.base_compare import BaseComparePlugin
+import numpy as np
 import pandas as pd
-import hashlib
 import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pandas import DataFrame
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+from utils.merkle_tree import (MerkleTree, MerkleTreeStore, combine_row_hashes, diff_trees, hash_digest,
+                               key_hashes, value_hashes)
+
+DEFAULT_WORKERS = 4
+HASH_BLOCK_ROWS = 1 << 20  # Rows of a column hashed by one task
+
 
 class HashComparePlugin(BaseComparePlugin):
     """Plugin for hash-based comparison of DataFrames."""
@@ -12,10 +21,10 @@ class HashComparePlugin(BaseComparePlugin):
         return "Hash-based Comparison"
     
     def get_description(self) -> str:
-        return "Fast comparison using MD5 hashes of DataFrame content and structure"
+        return "Fast comparison using vectorized row hashes of DataFrame content and structure"
     
     def get_version(self) -> str:
-        return "1.0.0"
+        return "1.2.0"
     
     def get_parameters(self) -> Dict[str, Dict[str, Any]]:
         return {
@@ -39,6 +48,28 @@ class HashComparePlugin(BaseComparePlugin):
                 'type': 'bool',
                 'default': True,
                 'description': 'Perform detailed analysis when hashes differ'
+            },
+            'mode': {
+                'type': 'list',
+                'default': 'chunks',
+                'description': 'Locate differences by fixed row chunks, or by key in a Merkle tree',
+                'options': ['chunks', 'merkle']
+            },
+            'key_columns': {
+                'type': 'str',
+                'default': '',
+                'description': 'Comma-separated key columns of the Merkle tree (all columns if empty)'
+            },
+            'verdict_only': {
+                'type': 'bool',
+                'default': False,
+                'description': 'Only decide equal or not, stopping at the first differing column'
+            },
+            'worker_threads': {
+                'type': 'int',
+                'default': DEFAULT_WORKERS,
+                'setting': 'worker_threads',
+                'description': 'Threads hashing columns and row blocks in parallel'
             }
         }
     
@@ -59,10 +90,21 @@ class HashComparePlugin(BaseComparePlugin):
         include_index = kwargs.get('include_index', False)
         chunk_size = kwargs.get('chunk_size', 1000)
         detailed_analysis = kwargs.get('detailed_analysis', True)
+        workers = max(1, int(kwargs.get('worker_threads', DEFAULT_WORKERS)))
+        
+        if kwargs.get('verdict_only', False):
+            return self._compare_verdict(df1, df2, include_index, workers)
+        
+        if kwargs.get('mode', 'chunks') == 'merkle':
+            return self._compare_merkle(df1, df2, hash_algorithm, workers, **kwargs)
+        
+        # Row hashes and digests of every column, computed once for the overall, column and chunk hashes
+        hashed1 = self._hash_columns(df1, hash_algorithm, workers)
+        hashed2 = self._hash_columns(df2, hash_algorithm, workers)
         
         # Calculate overall hashes
-        hash1 = self._calculate_dataframe_hash(df1, hash_algorithm, include_index)
-        hash2 = self._calculate_dataframe_hash(df2, hash_algorithm, include_index)
+        hash1 = self._calculate_dataframe_hash(df1, hash_algorithm, include_index, hashed1[1])
+        hash2 = self._calculate_dataframe_hash(df2, hash_algorithm, include_index, hashed2[1])
         
         is_equal = hash1 == hash2
         
@@ -86,7 +128,7 @@ class HashComparePlugin(BaseComparePlugin):
         
         if detailed_analysis:
             analysis_results = self._perform_detailed_analysis(
-                df1, df2, hash_algorithm, include_index, chunk_size
+                df1, df2, hash_algorithm, include_index, chunk_size, hashed1, hashed2
             )
             highlights = self._create_highlights_from_analysis(analysis_results)
         
@@ -106,49 +148,222 @@ class HashComparePlugin(BaseComparePlugin):
             }
         }
     
-    def _calculate_dataframe_hash(self, df: DataFrame, algorithm: str, include_index: bool) -> str:
-        """Calculate hash for entire DataFrame."""
-        hasher = hashlib.new(algorithm)
+    def _hash_columns(self, df: DataFrame, algorithm: str, workers: int,
+                      digests: bool = True) -> Tuple[List[np.ndarray], List[str]]:
+        """Row hashes and hash of every column, by position.
+        
+        Columns and blocks of HASH_BLOCK_ROWS rows are hashed as separate
+        tasks on a thread pool, so wide and long frames both use all workers;
+        a column's hash is the digest of its blocks' digests (skipped
+        when digests is False).
+        """
+        tasks = [(i, start) for i in range(df.shape[1]) for start in range(0, max(len(df), 1), HASH_BLOCK_ROWS)]
         
-        # Add shape information
-        hasher.update(str(df.shape).encode('utf-8'))
+        def hash_block(task):
+            i, start = task
+            row_hashes = value_hashes(df.iloc[start:start + HASH_BLOCK_ROWS, i])
+            return row_hashes, hash_digest(algorithm, row_hashes) if digests else None
+        
+        if workers == 1 or len(tasks) <= 1:
+            blocks = [hash_block(task) for task in tasks]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                blocks = list(executor.map(hash_block, tasks))
+        
+        blocks_per_column = len(tasks) // max(df.shape[1], 1)
+        row_hashes, column_hashes = [], []
+        for i in range(df.shape[1]):
+            column_blocks = blocks[i * blocks_per_column:(i + 1) * blocks_per_column]
+            row_hashes.append(np.concatenate([hashes for hashes, _ in column_blocks]))
+            if digests:
+                column_hashes.append(hash_digest(algorithm, *[digest for _, digest in column_blocks]))
+        return row_hashes, column_hashes
+    
+    def _columns_info(self, df: DataFrame) -> str:
+        """Column names and types, as hashed with the data."""
+        return json.dumps([(str(col), str(dtype)) for col, dtype in df.dtypes.items()], sort_keys=True)
+    
+    def _calculate_dataframe_hash(self, df: DataFrame, algorithm: str, include_index: bool,
+                                  column_hashes: Optional[List[str]] = None) -> str:
+        """Calculate hash for entire DataFrame."""
+        if column_hashes is None:
+            column_hashes = self._hash_columns(df, algorithm, 1)[1]
         
-        # Add column names and types
-        columns_info = [(col, str(df[col].dtype)) for col in df.columns]
-        hasher.update(json.dumps(columns_info, sort_keys=True).encode('utf-8'))
+        # Shape, column names and types
+        parts = [str(df.shape), self._columns_info(df)]
         
         # Add index if requested
         if include_index:
-            hasher.update(str(df.index.tolist()).encode('utf-8'))
+            parts.append(pd.util.hash_pandas_object(df.index).to_numpy())
         
         # Add data content
-        for col in df.columns:
-            col_hash = self._calculate_column_hash(df[col], algorithm)
-            hasher.update(col_hash.encode('utf-8'))
+        parts.extend(column_hashes)
         
-        return hasher.hexdigest()
+        return hash_digest(algorithm, *parts)
+    
+    def _calculate_chunk_hash(self, df: DataFrame, start_idx: int, end_idx: int, 
+                             algorithm: str, include_index: bool, combined_hashes: np.ndarray) -> str:
+        """Calculate hash for a chunk of DataFrame from its rows' combined hashes."""
+        parts = [str((end_idx - start_idx, df.shape[1])), self._columns_info(df)]
+        if include_index:
+            parts.append(pd.util.hash_pandas_object(df.index[start_idx:end_idx]).to_numpy())
+        parts.append(combined_hashes[start_idx:end_idx])
+        return hash_digest(algorithm, *parts)
+    
+    def _merkle_tree(self, df: DataFrame, columns: List[str], key_columns: List[str], algorithm: str,
+                     workers: int, store: Optional[MerkleTreeStore], source: Optional[Tuple[str, str]],
+                     signature: str) -> Tuple[MerkleTree, bool]:
+        """Tree of a DataFrame, loaded from the store when its source is unchanged; returns (tree, reused)."""
+        if store is not None and source:
+            tree = store.load(source[0], f"{source[1]}|{signature}")
+            if tree is not None:
+                return tree, True
+        row_hashes = self._hash_columns(df[columns], algorithm, workers, digests=False)[0]
+        tree = MerkleTree.build(key_hashes(df, key_columns), combine_row_hashes(row_hashes, len(df)))
+        if store is not None and source:
+            store.save(source[0], f"{source[1]}|{signature}", tree)
+        return tree, False
     
-    def _calculate_column_hash(self, series: pd.Series, algorithm: str) -> str:
-        """Calculate hash for a single column."""
-        hasher = hashlib.new(algorithm)
+    def _compare_merkle(self, df1: DataFrame, df2: DataFrame, algorithm: str, workers: int,
+                        **kwargs) -> Dict[str, Any]:
+        """Compare DataFrames by key through Merkle trees of their rows.
         
-        # Convert series to string representation, handling NaN values
-        series_str = series.fillna('__NaN__').astype(str)
+        Rows of the common columns are hashed and summed into trees by key
+        hash; only mismatching subtrees are descended into. With a tree
+        store (the session database path in 'store_path') and a source
+        (path, signature) per DataFrame in 'df1_source'/'df2_source', trees
+        are kept between runs, so an unchanged file is not rehashed.
+        """
+        key_columns = [col.strip() for col in str(kwargs.get('key_columns') or '').split(',') if col.strip()]
+        columns = [col for col in df1.columns if col in df2.columns]
+        key_columns = key_columns or columns
+        missing = [col for col in key_columns if col not in columns]
+        if missing or not columns:
+            error_msg = f"Key columns missing from one of the DataFrames: {missing}" if missing else "No common columns"
+            return {
+                'is_equal': False,
+                'details': error_msg,
+                'highlights': pd.DataFrame(),
+                'metadata': {'error': error_msg}
+            }
+        
+        structure_differences = []
+        if list(df1.columns) != list(df2.columns):
+            structure_differences.append(f"Columns differ: {list(df1.columns)} vs {list(df2.columns)}")
+        if [str(df1[col].dtype) for col in columns] != [str(df2[col].dtype) for col in columns]:
+            structure_differences.append("Data types differ")
         
-        # Add each value to hash
-        for value in series_str:
-            hasher.update(value.encode('utf-8'))
+        # Trees depend on the key and on the hashed columns and their types
+        signature = json.dumps([key_columns, [(str(col), str(df1[col].dtype)) for col in columns]])
+        store, conn, store_error = None, None, None
+        if kwargs.get('store_path'):
+            try:
+                conn = sqlite3.connect(kwargs['store_path'], timeout=5)
+                store = MerkleTreeStore(conn)
+            except sqlite3.Error as e:
+                store_error = str(e)
         
-        return hasher.hexdigest()
+        try:
+            try:
+                tree1, reused1 = self._merkle_tree(df1, columns, key_columns, algorithm, workers, store,
+                                                   kwargs.get('df1_source'), signature)
+                tree2, reused2 = self._merkle_tree(df2, columns, key_columns, algorithm, workers, store,
+                                                   kwargs.get('df2_source'), signature)
+            except sqlite3.Error as e:
+                # Compare without the store rather than fail
+                store_error = str(e)
+                tree1, reused1 = self._merkle_tree(df1, columns, key_columns, algorithm, workers, None, None, signature)
+                tree2, reused2 = self._merkle_tree(df2, columns, key_columns, algorithm, workers, None, None, signature)
+            
+            started = time.perf_counter()
+            diff = diff_trees(tree1, tree2)
+            locate_seconds = time.perf_counter() - started
+        finally:
+            if conn is not None:
+                conn.close()
+        
+        parts = []
+        for df, positions, source, diff_type in ((df1, diff['removed'], 'df1', 'removed'),
+                                                 (df2, diff['added'], 'df2', 'added'),
+                                                 (df1, diff['modified1'], 'df1', 'modified_old'),
+                                                 (df2, diff['modified2'], 'df2', 'modified_new')):
+            if len(positions):
+                rows = df.iloc[positions].copy()
+                rows['_source'] = source
+                rows['_diff_type'] = diff_type
+                parts.append(rows)
+        highlights = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+        
+        modified_keys = len(np.unique(key_hashes(df1.iloc[diff['modified1']], key_columns)))
+        is_equal = not len(highlights) and not structure_differences
+        details = f"Merkle tree comparison results (key: {', '.join(map(str, key_columns))}):\n"
+        details += f"- Rows only in first table: {len(diff['removed'])}\n"
+        details += f"- Rows only in second table: {len(diff['added'])}\n"
+        details += f"- Modified keys: {modified_keys}\n"
+        details += f"- Tree nodes compared: {diff['nodes_compared']}, located in {locate_seconds * 1000:.1f} ms\n"
+        details += f"- Stored trees reused: {int(reused1) + int(reused2)} of 2"
+        for difference in structure_differences:
+            details += f"\n- {difference}"
+        if store_error:
+            details += f"\n- Trees could not be stored: {store_error}"
+        
+        return {
+            'is_equal': is_equal,
+            'details': details,
+            'highlights': highlights,
+            'metadata': {
+                'mode': 'merkle',
+                'key_columns': key_columns,
+                'removed_count': len(diff['removed']),
+                'added_count': len(diff['added']),
+                'modified_count': modified_keys,
+                'nodes_compared': diff['nodes_compared'],
+                'locate_seconds': locate_seconds,
+                'trees_reused': [reused1, reused2],
+                'root_hashes': [f"{tree1.levels[0][0]:016x}", f"{tree2.levels[0][0]:016x}"],
+                'structure_differences': structure_differences,
+                'tree_store_error': store_error
+            }
+        }
     
-    def _calculate_chunk_hash(self, df: DataFrame, start_idx: int, end_idx: int, 
-                             algorithm: str, include_index: bool) -> str:
-        """Calculate hash for a chunk of DataFrame."""
-        chunk = df.iloc[start_idx:end_idx]
-        return self._calculate_dataframe_hash(chunk, algorithm, include_index)
+    def _compare_verdict(self, df1: DataFrame, df2: DataFrame, include_index: bool, workers: int) -> Dict[str, Any]:
+        """Decide only whether the DataFrames are equal, stopping at the first difference.
+        
+        Structure is checked first; then the row hashes of each column pair
+        are compared as the workers finish them, and columns not yet started
+        are skipped once one differs.
+        """
+        differs = None
+        if df1.shape != df2.shape:
+            differs = f"Shape differs: {df1.shape} vs {df2.shape}"
+        elif list(df1.columns) != list(df2.columns) or list(df1.dtypes) != list(df2.dtypes):
+            differs = "Columns or data types differ"
+        elif include_index and not df1.index.equals(df2.index):
+            differs = "Index differs"
+        else:
+            def column_differs(i):
+                return not np.array_equal(value_hashes(df1.iloc[:, i]), value_hashes(df2.iloc[:, i]))
+            
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(column_differs, i): i for i in range(df1.shape[1])}
+                for future in as_completed(futures):
+                    if future.result():
+                        differs = f"Column '{df1.columns[futures[future]]}' differs"
+                        for pending in futures:
+                            pending.cancel()
+                        break
+        
+        return {
+            'is_equal': differs is None,
+            'details': "DataFrames are identical" if differs is None else f"DataFrames are different: {differs}",
+            'highlights': pd.DataFrame(),
+            'metadata': {'verdict_only': True, 'include_index': include_index, 'first_difference': differs}
+        }
     
     def _perform_detailed_analysis(self, df1: DataFrame, df2: DataFrame, 
-                                  algorithm: str, include_index: bool, chunk_size: int) -> Dict[str, Any]:
+                                  algorithm: str, include_index: bool, chunk_size: int,
+                                  hashed1: Tuple[List[np.ndarray], List[str]],
+                                  hashed2: Tuple[List[np.ndarray], List[str]]) -> Dict[str, Any]:
         """Perform detailed analysis to identify where differences occur."""
         analysis = {
             'structure_differences': [],
@@ -166,11 +381,15 @@ class HashComparePlugin(BaseComparePlugin):
         if list(df1.dtypes) != list(df2.dtypes):
             analysis['structure_differences'].append("Data types differ")
         
-        # Check column-level differences for common columns
-        common_columns = set(df1.columns) & set(df2.columns)
-        for col in common_columns:
-            hash1 = self._calculate_column_hash(df1[col], algorithm)
-            hash2 = self._calculate_column_hash(df2[col], algorithm)
+        # Check column-level differences for common columns, in df1's order
+        positions2 = {}
+        for position, col in enumerate(df2.columns):
+            positions2.setdefault(col, position)
+        for position, col in enumerate(df1.columns):
+            if col not in positions2 or col in analysis['column_differences']:
+                continue
+            hash1 = hashed1[1][position]
+            hash2 = hashed2[1][positions2[col]]
             
             if hash1 != hash2:
                 analysis['column_differences'][col] = {
@@ -187,11 +406,15 @@ class HashComparePlugin(BaseComparePlugin):
         
         # Check chunk-level differences (only if DataFrames have same shape)
         if df1.shape == df2.shape and len(df1) > chunk_size:
+            combined1 = combine_row_hashes(hashed1[0], len(df1))
+            combined2 = combine_row_hashes(hashed2[0], len(df2))
             for start_idx in range(0, len(df1), chunk_size):
                 end_idx = min(start_idx + chunk_size, len(df1))
                 
-                chunk_hash1 = self._calculate_chunk_hash(df1, start_idx, end_idx, algorithm, include_index)
-                chunk_hash2 = self._calculate_chunk_hash(df2, start_idx, end_idx, algorithm, include_index)
+                chunk_hash1 = self._calculate_chunk_hash(df1, start_idx, end_idx, algorithm, include_index,
+                                                         combined1)
+                chunk_hash2 = self._calculate_chunk_hash(df2, start_idx, end_idx, algorithm, include_index,
+                                                         combined2)
                 
                 if chunk_hash1 != chunk_hash2:
                     analysis['chunk_differences'].append({
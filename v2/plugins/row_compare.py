@@ -1,7 +1,95 @@
 from plugins.base_compare import BaseComparePlugin
+from utils.key_matching import DEFAULT_WORKERS, fuzzy_pairs, key_text, normalized_keys
+import numpy as np
 import pandas as pd
-from pandas import DataFrame
-from typing import Dict, Any
+from pandas import DataFrame, Series
+from typing import Dict, Any, Tuple
+
+
+def _comparable(s1: Series, s2: Series) -> Tuple[Series, Series]:
+    """Values of two columns in a form that compares like their string forms.
+    
+    Columns of the same numeric, boolean or datetime dtype compare as they
+    are; anything else (object columns, mixed dtypes) compares as str().
+    """
+    if s1.dtype == s2.dtype and s1.dtype != object:
+        return s1, s2
+    return s1.astype(str), s2.astype(str)
+
+
+def _key_codes(df1: DataFrame, df2: DataFrame, key_columns: list) -> Tuple[np.ndarray, np.ndarray]:
+    """Integer code of each row's key, equal codes meaning equal keys on either side."""
+    keys1, keys2 = {}, {}
+    for col in key_columns:
+        keys1[col], keys2[col] = _comparable(df1[col].reset_index(drop=True), df2[col].reset_index(drop=True))
+    keys = pd.concat([pd.DataFrame(keys1), pd.DataFrame(keys2)], ignore_index=True)
+    codes = keys.groupby(list(key_columns), sort=False, dropna=False).ngroup().to_numpy()
+    return codes[:len(df1)], codes[len(df1):]
+
+
+def _match_fuzzy_keys(keys1: DataFrame, keys2: DataFrame, codes1: np.ndarray, codes2: np.ndarray,
+                      threshold: float, workers: int) -> Tuple[np.ndarray, int]:
+    """Key codes of the second frame with unmatched keys mapped onto similar unmatched keys of the first.
+    
+    Also returns the number of keys matched this way.
+    """
+    unique1, first1 = np.unique(codes1, return_index=True)
+    unique2, first2 = np.unique(codes2, return_index=True)
+    left1 = ~np.isin(unique1, unique2)
+    left2 = ~np.isin(unique2, unique1)
+    matches = fuzzy_pairs(key_text(keys1.iloc[first1[left1]]), key_text(keys2.iloc[first2[left2]]),
+                          threshold, workers=workers)
+    if not matches:
+        return codes2, 0
+    positions1, positions2, _ = (np.array(values) for values in zip(*matches))
+    remap = np.arange(max(codes1.max(initial=0), codes2.max(initial=0)) + 1)
+    remap[unique2[left2][positions2]] = unique1[left1][positions1]
+    return remap[codes2], len(matches)
+
+
+def _values_differ(s1: Series, s2: Series) -> np.ndarray:
+    """Element-wise inequality of two aligned columns; two missing values are equal."""
+    v1, v2 = (s.to_numpy() for s in _comparable(s1, s2))
+    differ = v1 != v2
+    if differ.any():
+        differ &= ~(pd.isna(v1) & pd.isna(v2))
+    return differ
+
+
+def _rows_with_keys(df: DataFrame, codes: np.ndarray, selected: np.ndarray, source: str,
+                    diff_type: str) -> Tuple[DataFrame, np.ndarray]:
+    """Rows of a frame whose key is among the selected codes, tagged for highlighting.
+    
+    Also returns the key codes of the returned rows.
+    """
+    if not len(selected):
+        return pd.DataFrame(), codes[:0]
+    in_selection = np.isin(codes, selected)
+    rows = df[in_selection].copy()
+    rows['_source'] = source
+    rows['_diff_type'] = diff_type
+    return rows, codes[in_selection]
+
+
+def _changed_fields(df1: DataFrame, df2: DataFrame, key_columns: list, value_columns: list,
+                    rows1: np.ndarray, rows2: np.ndarray, change_mask: np.ndarray) -> DataFrame:
+    """One row per changed cell: key values, column name, old and new value."""
+    parts = []
+    key_values = df1[key_columns].iloc[rows1].reset_index(drop=True)
+    for i, col in enumerate(value_columns):
+        changed = np.flatnonzero(change_mask[:, i])
+        if not len(changed):
+            continue
+        part = key_values.iloc[changed].copy()
+        part['column'] = col
+        part['old_value'] = df1[col].iloc[rows1[changed]].to_numpy()
+        part['new_value'] = df2[col].iloc[rows2[changed]].to_numpy()
+        parts.append(part)
+    if not parts:
+        return pd.DataFrame(columns=list(key_columns) + ['column', 'old_value', 'new_value'])
+    # Group the changes of a row together, in row order
+    return pd.concat(parts).sort_index(kind='stable').reset_index(drop=True)
+
 
 class RowComparePlugin(BaseComparePlugin):
     """Plugin for row-by-row comparison of DataFrames."""
@@ -13,7 +101,7 @@ class RowComparePlugin(BaseComparePlugin):
         return "Compares DataFrames row by row, identifying added, removed, and modified rows"
     
     def get_version(self) -> str:
-        return "1.0.0"
+        return "1.2.0"
     
     def get_parameters(self) -> Dict[str, Dict[str, Any]]:
         return {
@@ -32,6 +120,27 @@ class RowComparePlugin(BaseComparePlugin):
                 'type': 'bool',
                 'default': False,
                 'description': 'Ignore leading/trailing whitespace in string values'
+            },
+            'normalize_keys': {
+                'type': 'bool',
+                'default': False,
+                'description': 'Match keys ignoring case, surrounding whitespace and number formatting'
+            },
+            'parse_dates': {
+                'type': 'bool',
+                'default': False,
+                'description': 'Match keys written as dates in different formats (with normalize_keys)'
+            },
+            'fuzzy_threshold': {
+                'type': 'float',
+                'default': 0.0,
+                'description': 'Match leftover keys with at least this similarity (0 to 1, 0 disables)'
+            },
+            'worker_threads': {
+                'type': 'int',
+                'default': DEFAULT_WORKERS,
+                'setting': 'worker_threads',
+                'description': 'Threads scoring fuzzy key candidates in parallel'
             }
         }
     
@@ -51,18 +160,20 @@ class RowComparePlugin(BaseComparePlugin):
         key_columns = kwargs.get('key_columns', [])
         ignore_case = kwargs.get('ignore_case', False)
         ignore_whitespace = kwargs.get('ignore_whitespace', False)
+        key_matching = {
+            'normalize': kwargs.get('normalize_keys', False),
+            'dates': kwargs.get('parse_dates', False),
+            'fuzzy_threshold': float(kwargs.get('fuzzy_threshold', 0.0) or 0.0),
+            'workers': max(1, int(kwargs.get('worker_threads', DEFAULT_WORKERS)))
+        }
         
-        # Prepare DataFrames for comparison
-        df1_prep = self._prepare_dataframe(df1.copy(), ignore_case, ignore_whitespace)
-        df2_prep = self._prepare_dataframe(df2.copy(), ignore_case, ignore_whitespace)
-        
-        # Add source indicators
-        df1_prep['_source'] = 'df1'
-        df2_prep['_source'] = 'df2'
+        # Prepare DataFrames for comparison (copies only when values are transformed)
+        df1_prep = self._prepare_dataframe(df1, ignore_case, ignore_whitespace)
+        df2_prep = self._prepare_dataframe(df2, ignore_case, ignore_whitespace)
         
         if key_columns:
             # Use specified key columns for matching
-            result = self._compare_with_keys(df1_prep, df2_prep, key_columns)
+            result = self._compare_with_keys(df1_prep, df2_prep, key_columns, **key_matching)
         else:
             # Compare all rows without specific keys
             result = self._compare_without_keys(df1_prep, df2_prep)
@@ -70,8 +181,9 @@ class RowComparePlugin(BaseComparePlugin):
         return result
     
     def _prepare_dataframe(self, df: DataFrame, ignore_case: bool, ignore_whitespace: bool) -> DataFrame:
-        """Prepare DataFrame for comparison by applying transformations."""
+        """Prepare DataFrame for comparison by applying transformations; the input is not modified."""
         if ignore_case or ignore_whitespace:
+            df = df.copy()
             for col in df.select_dtypes(include=['object']).columns:
                 if ignore_case:
                     df[col] = df[col].astype(str).str.lower()
@@ -79,8 +191,18 @@ class RowComparePlugin(BaseComparePlugin):
                     df[col] = df[col].astype(str).str.strip()
         return df
     
-    def _compare_with_keys(self, df1: DataFrame, df2: DataFrame, key_columns: list) -> Dict[str, Any]:
-        """Compare DataFrames using specified key columns."""
+    def _compare_with_keys(self, df1: DataFrame, df2: DataFrame, key_columns: list, normalize: bool = False,
+                           dates: bool = False, fuzzy_threshold: float = 0.0,
+                           workers: int = DEFAULT_WORKERS) -> Dict[str, Any]:
+        """Compare DataFrames using specified key columns.
+        
+        Keys of both sides are encoded to integer codes in one pass; the
+        first row of every key common to both sides is aligned by code and
+        all value columns are compared as whole arrays. Keys can be
+        normalized before encoding, and keys left unmatched can be paired
+        by similarity when fuzzy_threshold is above 0. Neither input is
+        modified.
+        """
         # Validate key columns exist
         missing_keys_df1 = [col for col in key_columns if col not in df1.columns]
         missing_keys_df2 = [col for col in key_columns if col not in df2.columns]
@@ -94,65 +216,49 @@ class RowComparePlugin(BaseComparePlugin):
                 'metadata': {'error': error_msg}
             }
         
-        # Create composite keys
-        df1['_key'] = df1[key_columns].apply(lambda x: '|'.join(x.astype(str)), axis=1)
-        df2['_key'] = df2[key_columns].apply(lambda x: '|'.join(x.astype(str)), axis=1)
-        
-        # Find differences
-        keys_df1 = set(df1['_key'])
-        keys_df2 = set(df2['_key'])
-        
-        only_in_df1 = keys_df1 - keys_df2
-        only_in_df2 = keys_df2 - keys_df1
-        common_keys = keys_df1 & keys_df2
-        
-        differences = []
-        modified_rows = []
-        
-        # Check for modified rows in common keys
-        for key in common_keys:
-            row1 = df1[df1['_key'] == key].iloc[0]
-            row2 = df2[df2['_key'] == key].iloc[0]
-            
-            # Compare non-key columns
-            non_key_cols = [col for col in df1.columns if col not in key_columns + ['_source', '_key']]
-            row_diff = False
-            
-            for col in non_key_cols:
-                if col in df2.columns:
-                    if str(row1[col]) != str(row2[col]):
-                        row_diff = True
-                        break
-            
-            if row_diff:
-                modified_rows.append(key)
+        if normalize:
+            match1 = normalized_keys(df1, key_columns, dates=dates)
+            match2 = normalized_keys(df2, key_columns, dates=dates)
+        else:
+            match1, match2 = df1[key_columns], df2[key_columns]
+        codes1, codes2 = _key_codes(match1, match2, key_columns)
+        fuzzy_matches = 0
+        if fuzzy_threshold > 0:
+            codes2, fuzzy_matches = _match_fuzzy_keys(match1, match2, codes1, codes2, fuzzy_threshold, workers)
+        keys1, first1 = np.unique(codes1, return_index=True)
+        keys2, first2 = np.unique(codes2, return_index=True)
+        
+        only_in_df1 = np.setdiff1d(keys1, keys2, assume_unique=True)
+        only_in_df2 = np.setdiff1d(keys2, keys1, assume_unique=True)
+        common_keys, common1, common2 = np.intersect1d(keys1, keys2, assume_unique=True, return_indices=True)
+        
+        # Compare non-key columns of the first row of each common key
+        value_columns = [col for col in df1.columns if col not in key_columns and col in df2.columns]
+        rows1 = first1[common1]
+        rows2 = first2[common2]
+        change_mask = np.zeros((len(common_keys), len(value_columns)), dtype=bool)
+        for i, col in enumerate(value_columns):
+            change_mask[:, i] = _values_differ(df1[col].iloc[rows1], df2[col].iloc[rows2])
+        is_modified = change_mask.any(axis=1)
+        modified_rows = common_keys[is_modified]
         
         # Create highlights DataFrame
-        highlights = pd.DataFrame()
-        
-        # Add rows only in df1 (removed)
-        if only_in_df1:
-            removed_rows = df1[df1['_key'].isin(only_in_df1)].copy()
-            removed_rows['_diff_type'] = 'removed'
-            highlights = pd.concat([highlights, removed_rows], ignore_index=True)
-        
-        # Add rows only in df2 (added)
-        if only_in_df2:
-            added_rows = df2[df2['_key'].isin(only_in_df2)].copy()
-            added_rows['_diff_type'] = 'added'
-            highlights = pd.concat([highlights, added_rows], ignore_index=True)
-        
-        # Add modified rows
-        if modified_rows:
-            modified_df1 = df1[df1['_key'].isin(modified_rows)].copy()
-            modified_df1['_diff_type'] = 'modified_old'
-            modified_df2 = df2[df2['_key'].isin(modified_rows)].copy()
-            modified_df2['_diff_type'] = 'modified_new'
-            highlights = pd.concat([highlights, modified_df1, modified_df2], ignore_index=True)
-        
-        # Clean up temporary columns
-        if '_key' in highlights.columns:
-            highlights = highlights.drop('_key', axis=1)
+        parts = [
+            _rows_with_keys(df1, codes1, only_in_df1, 'df1', 'removed'),
+            _rows_with_keys(df2, codes2, only_in_df2, 'df2', 'added'),
+            _rows_with_keys(df1, codes1, modified_rows, 'df1', 'modified_old'),
+            _rows_with_keys(df2, codes2, modified_rows, 'df2', 'modified_new')
+        ]
+        frames = [rows for rows, _ in parts if not rows.empty]
+        highlights = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        
+        # Cell mask of the highlight rows: changed cells of modified rows, nothing for added/removed rows
+        mask_parts = [np.zeros((len(parts[0][1]) + len(parts[1][1]), len(value_columns)), dtype=bool)]
+        for _, row_codes in parts[2:]:
+            mask_parts.append(change_mask[np.searchsorted(common_keys, row_codes)])
+        cell_mask = {'columns': value_columns, 'mask': np.concatenate(mask_parts)}
+        changed_fields = _changed_fields(df1, df2, key_columns, value_columns, rows1[is_modified],
+                                         rows2[is_modified], change_mask[is_modified])
         
         # Generate summary
         total_changes = len(only_in_df1) + len(only_in_df2) + len(modified_rows)
@@ -163,16 +269,22 @@ class RowComparePlugin(BaseComparePlugin):
         details += f"- Rows only in second table: {len(only_in_df2)}\n"
         details += f"- Modified rows: {len(modified_rows)}\n"
         details += f"- Total differences: {total_changes}"
+        if fuzzy_threshold > 0:
+            details += f"\n- Keys matched by similarity: {fuzzy_matches}"
         
         return {
             'is_equal': is_equal,
             'details': details,
             'highlights': highlights,
+            'cell_mask': cell_mask,
+            'changed_fields': changed_fields,
             'metadata': {
                 'removed_count': len(only_in_df1),
                 'added_count': len(only_in_df2),
                 'modified_count': len(modified_rows),
+                'changed_cells': len(changed_fields),
                 'total_changes': total_changes,
+                'fuzzy_matches': fuzzy_matches,
                 'key_columns': key_columns
             }
         }
@@ -180,11 +292,7 @@ class RowComparePlugin(BaseComparePlugin):
     def _compare_without_keys(self, df1: DataFrame, df2: DataFrame) -> Dict[str, Any]:
         """Compare DataFrames without specific key columns."""
         # Simple approach: find rows that exist in one but not the other
-        df1_clean = df1.drop('_source', axis=1)
-        df2_clean = df2.drop('_source', axis=1)
-        
-        # Find differences using pandas merge
-        merged = pd.concat([df1_clean, df2_clean]).drop_duplicates(keep=False)
+        merged = pd.concat([df1, df2]).drop_duplicates(keep=False)
         
         is_equal = merged.empty and len(df1) == len(df2)
         
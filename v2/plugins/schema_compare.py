@@ -1,7 +1,7 @@
 from .base_compare import BaseComparePlugin
 import pandas as pd
 from pandas import DataFrame
-from typing import Dict, Any, List, Set
+from typing import Dict, Any, List, Optional, Set
 
 class SchemaComparePlugin(BaseComparePlugin):
     """Plugin for schema comparison of DataFrames."""
@@ -57,6 +57,43 @@ class SchemaComparePlugin(BaseComparePlugin):
                 'metadata': {'error': validation_error}
             }
         
+        return self._compare_schemas(self._schema(df1), self._schema(df2), **kwargs)
+    
+    def compare_fingerprints(self, fingerprint1: Dict[str, Any], fingerprint2: Dict[str, Any],
+                             **kwargs) -> Optional[Dict[str, Any]]:
+        """Compare schemas from cached fingerprints, which hold everything compared."""
+        result = self._compare_schemas(self._schema_from_fingerprint(fingerprint1),
+                                       self._schema_from_fingerprint(fingerprint2), **kwargs)
+        result['metadata']['from_fingerprints'] = True
+        return result
+    
+    def _schema(self, df: DataFrame) -> Dict[str, Any]:
+        """What the comparison looks at of a DataFrame."""
+        return {
+            'columns': list(df.columns),
+            'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+            'null_counts': {col: int(count) for col, count in df.isnull().sum().items()},
+            'shape': df.shape,
+            'index_name': df.index.name,
+            'index_dtype': str(df.index.dtype),
+            'index_length': len(df.index)
+        }
+    
+    def _schema_from_fingerprint(self, fingerprint: Dict[str, Any]) -> Dict[str, Any]:
+        """The schema of a DataFrame, from its fingerprint."""
+        columns = [name for name, _ in fingerprint['columns']]
+        return {
+            'columns': columns,
+            'dtypes': {name: dtype for name, dtype in fingerprint['columns']},
+            'null_counts': dict(zip(columns, fingerprint['null_counts'])),
+            'shape': (fingerprint['row_count'], len(columns)),
+            'index_name': fingerprint['index'][0],
+            'index_dtype': fingerprint['index'][1],
+            'index_length': fingerprint['row_count']
+        }
+    
+    def _compare_schemas(self, schema1: Dict[str, Any], schema2: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        """Compare two schemas as made by _schema."""
         # Get parameters
         check_column_order = kwargs.get('check_column_order', True)
         check_data_types = kwargs.get('check_data_types', True)
@@ -66,11 +103,11 @@ class SchemaComparePlugin(BaseComparePlugin):
         
         # Perform schema comparison
         comparison_results = {
-            'column_names': self._compare_column_names(df1, df2, check_column_order),
-            'data_types': self._compare_data_types(df1, df2, type_compatibility) if check_data_types else None,
-            'nullable_info': self._compare_nullable(df1, df2) if check_nullable else None,
-            'index_schema': self._compare_index_schema(df1, df2) if check_index else None,
-            'shape': self._compare_shape(df1, df2)
+            'column_names': self._compare_column_names(schema1, schema2, check_column_order),
+            'data_types': self._compare_data_types(schema1, schema2, type_compatibility) if check_data_types else None,
+            'nullable_info': self._compare_nullable(schema1, schema2) if check_nullable else None,
+            'index_schema': self._compare_index_schema(schema1, schema2) if check_index else None,
+            'shape': self._compare_shape(schema1, schema2)
         }
         
         # Determine if schemas are equal
@@ -96,10 +133,11 @@ class SchemaComparePlugin(BaseComparePlugin):
             }
         }
     
-    def _compare_column_names(self, df1: DataFrame, df2: DataFrame, check_order: bool) -> Dict[str, Any]:
+    def _compare_column_names(self, schema1: Dict[str, Any], schema2: Dict[str, Any],
+                              check_order: bool) -> Dict[str, Any]:
         """Compare column names and optionally their order."""
-        cols1 = list(df1.columns)
-        cols2 = list(df2.columns)
+        cols1 = list(schema1['columns'])
+        cols2 = list(schema2['columns'])
         
         # Find differences
         only_in_df1 = set(cols1) - set(cols2)
@@ -122,15 +160,16 @@ class SchemaComparePlugin(BaseComparePlugin):
             'names_equal': len(only_in_df1) == 0 and len(only_in_df2) == 0 and (not check_order or order_matches)
         }
     
-    def _compare_data_types(self, df1: DataFrame, df2: DataFrame, compatibility_mode: str) -> Dict[str, Any]:
+    def _compare_data_types(self, schema1: Dict[str, Any], schema2: Dict[str, Any],
+                            compatibility_mode: str) -> Dict[str, Any]:
         """Compare data types of columns."""
-        common_columns = set(df1.columns) & set(df2.columns)
+        common_columns = set(schema1['columns']) & set(schema2['columns'])
         type_differences = {}
         compatible_types = {}
         
         for col in common_columns:
-            dtype1 = df1[col].dtype
-            dtype2 = df2[col].dtype
+            dtype1 = schema1['dtypes'][col]
+            dtype2 = schema2['dtypes'][col]
             
             # Check strict equality
             strict_equal = dtype1 == dtype2
@@ -205,16 +244,16 @@ class SchemaComparePlugin(BaseComparePlugin):
         
         return False
     
-    def _compare_nullable(self, df1: DataFrame, df2: DataFrame) -> Dict[str, Any]:
+    def _compare_nullable(self, schema1: Dict[str, Any], schema2: Dict[str, Any]) -> Dict[str, Any]:
         """Compare nullable information (presence of null values)."""
-        common_columns = set(df1.columns) & set(df2.columns)
+        common_columns = set(schema1['columns']) & set(schema2['columns'])
         nullable_info = {}
         
         for col in common_columns:
-            has_nulls_df1 = df1[col].isnull().any()
-            has_nulls_df2 = df2[col].isnull().any()
-            null_count_df1 = df1[col].isnull().sum()
-            null_count_df2 = df2[col].isnull().sum()
+            null_count_df1 = schema1['null_counts'][col]
+            null_count_df2 = schema2['null_counts'][col]
+            has_nulls_df1 = null_count_df1 > 0
+            has_nulls_df2 = null_count_df2 > 0
             
             nullable_info[col] = {
                 'df1_has_nulls': has_nulls_df1,
@@ -229,28 +268,29 @@ class SchemaComparePlugin(BaseComparePlugin):
             'all_nullable_matches': all(info['nullable_matches'] for info in nullable_info.values())
         }
     
-    def _compare_index_schema(self, df1: DataFrame, df2: DataFrame) -> Dict[str, Any]:
+    def _compare_index_schema(self, schema1: Dict[str, Any], schema2: Dict[str, Any]) -> Dict[str, Any]:
         """Compare index schemas."""
         return {
-            'df1_index_name': df1.index.name,
-            'df2_index_name': df2.index.name,
-            'df1_index_dtype': str(df1.index.dtype),
-            'df2_index_dtype': str(df2.index.dtype),
-            'df1_index_length': len(df1.index),
-            'df2_index_length': len(df2.index),
-            'index_names_match': df1.index.name == df2.index.name,
-            'index_dtypes_match': df1.index.dtype == df2.index.dtype,
-            'index_lengths_match': len(df1.index) == len(df2.index)
+            'df1_index_name': schema1['index_name'],
+            'df2_index_name': schema2['index_name'],
+            'df1_index_dtype': schema1['index_dtype'],
+            'df2_index_dtype': schema2['index_dtype'],
+            'df1_index_length': schema1['index_length'],
+            'df2_index_length': schema2['index_length'],
+            'index_names_match': schema1['index_name'] == schema2['index_name'],
+            'index_dtypes_match': schema1['index_dtype'] == schema2['index_dtype'],
+            'index_lengths_match': schema1['index_length'] == schema2['index_length']
         }
     
-    def _compare_shape(self, df1: DataFrame, df2: DataFrame) -> Dict[str, Any]:
+    def _compare_shape(self, schema1: Dict[str, Any], schema2: Dict[str, Any]) -> Dict[str, Any]:
         """Compare DataFrame shapes."""
+        shape1, shape2 = tuple(schema1['shape']), tuple(schema2['shape'])
         return {
-            'df1_shape': df1.shape,
-            'df2_shape': df2.shape,
-            'shapes_match': df1.shape == df2.shape,
-            'rows_match': df1.shape[0] == df2.shape[0],
-            'columns_match': df1.shape[1] == df2.shape[1]
+            'df1_shape': shape1,
+            'df2_shape': shape2,
+            'shapes_match': shape1 == shape2,
+            'rows_match': shape1[0] == shape2[0],
+            'columns_match': shape1[1] == shape2[1]
         }
     
     def _determine_equality(self, results: Dict[str, Any]) -> bool:
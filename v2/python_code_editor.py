@@ -182,6 +182,9 @@ class PythonCodeEditor(QWidget):
                 self.output_label.setText('Code executed successfully (no output).')
             self.output_label.setStyleSheet('color: #005500; background: #f0fff0; padding: 4px;')
             
+            # Scripts may replace the CSV data, which autosave must then snapshot
+            self.main_window.csv_editor.mark_structure_changed()
+            
             # Log to main window
             self.main_window.log_message("Python code executed successfully")
             
@@ -336,6 +339,7 @@ class PythonCodeEditor(QWidget):
                 # Update existing snippet
                 snippet['code'] = code
                 self.save_snippets()
+                self.index_snippet(group_name, snippet_name, code)
                 return
                 
         # Add new snippet
@@ -344,6 +348,7 @@ class PythonCodeEditor(QWidget):
             'code': code
         })
         self.save_snippets()
+        self.index_snippet(group_name, snippet_name, code)
         
     def update_snippet(self, old_name, new_name, new_code):
         """Update an existing snippet"""
@@ -353,6 +358,8 @@ class PythonCodeEditor(QWidget):
                     snippet['name'] = new_name
                     snippet['code'] = new_code
                     self.save_snippets()
+                    self.unindex_snippet(group['name'], old_name)
+                    self.index_snippet(group['name'], new_name, new_code)
                     return True
         return False
         
@@ -366,5 +373,18 @@ class PythonCodeEditor(QWidget):
                     if not group['snippets']:
                         self.snippets.remove(group)
                     self.save_snippets()
+                    self.unindex_snippet(group['name'], snippet_name)
                     return True
-        return False
\ No newline at end of file
+        return False
+        
+    def index_snippet(self, group_name, snippet_name, code):
+        """Update the snippet in the history search index"""
+        history_store = getattr(self.main_window, 'history_store', None)
+        if history_store is not None:
+            history_store.index_snippet(group_name, snippet_name, code)
+            
+    def unindex_snippet(self, group_name, snippet_name):
+        """Remove the snippet from the history search index"""
+        history_store = getattr(self.main_window, 'history_store', None)
+        if history_store is not None:
+            history_store.remove_snippet(group_name, snippet_name)
\ No newline at end of file
@@ -7,14 +7,21 @@ from PyQt5.QtWidgets import (
     QTableWidget, QTableWidgetItem, QTextEdit, QComboBox,
     QDialog, QDialogButtonBox, QLineEdit, QSpinBox, QFontComboBox,
     QInputDialog, QMessageBox, QToolBar, QAction, QSizePolicy, QFileDialog,
-    QTreeWidgetItem
+    QTreeWidget, QTreeWidgetItem, QCheckBox, QTabWidget
 )
 from PyQt5.QtCore import Qt, QSize, QProcess
-from PyQt5.QtGui import QIcon, QFont
+from PyQt5.QtGui import QIcon, QFont, QColor
 from PyQt5.Qsci import QsciScintilla, QsciLexerSQL
 import pandas as pd
 
-HISTORY_FILE = '../query_history.json'
+from utils.sql_params import (
+    substitute_parameters, to_bind_parameters, parse_parameter_sets, execute_batch
+)
+from utils.script_runner import ScriptRunner, split_statements
+from utils.query_profiler import profile_query, format_profile_run, MAX_PROFILE_RUNS
+
+HISTORY_FILE = '../query_history.json'  # History written before the log below; only read
+HISTORY_LOG_FILE = '../query_history.jsonl'  # Executed queries, appended one JSON line each
 EDITOR_SETTINGS_FILE = '../editor_settings.json'
 
 class EditorOptionsDialog(QDialog):
@@ -46,6 +53,10 @@ class EditorOptionsDialog(QDialog):
         self.editor_path_edit = QLineEdit()
         layout.addWidget(self.editor_path_edit)
         
+        # Parameter mode
+        self.bind_params_cb = QCheckBox('Bind parameters instead of substituting text')
+        layout.addWidget(self.bind_params_cb)
+        
         # Hotkeys info
         layout.addWidget(QLabel('Search/Replace hotkeys:'))
         self.hotkeys_label = QLabel('Search: Ctrl+F   Replace: Ctrl+H   Go to line: Ctrl+G')
@@ -63,13 +74,15 @@ class EditorOptionsDialog(QDialog):
             self.font_size_spin.setValue(current_settings.get('font_size', 12))
             self.scheme_combo.setCurrentIndex(1 if current_settings.get('color_scheme', 'light') == 'dark' else 0)
             self.editor_path_edit.setText(current_settings.get('editor_path', 'code'))
+            self.bind_params_cb.setChecked(current_settings.get('bind_parameters', False))
             
     def get_settings(self):
         return {
             'font_family': self.font_combo.currentFont().family(),
             'font_size': self.font_size_spin.value(),
             'color_scheme': 'dark' if self.scheme_combo.currentIndex() == 1 else 'light',
-            'editor_path': self.editor_path_edit.text() or 'code'
+            'editor_path': self.editor_path_edit.text() or 'code',
+            'bind_parameters': self.bind_params_cb.isChecked()
         }
 
 class ParamsDialog(QDialog):
@@ -122,6 +135,27 @@ class ParamsDialog(QDialog):
                 result[k] = v
         return result
 
+class BatchParamsDialog(QDialog):
+    def __init__(self, params, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Batch Parameter Sets')
+        self.resize(600, 400)
+        layout = QVBoxLayout(self)
+        
+        layout.addWidget(QLabel('One parameter set per line, tab-separated. First line holds the parameter names:'))
+        self.sets_edit = QTextEdit()
+        self.sets_edit.setAcceptRichText(False)
+        self.sets_edit.setPlainText('\t'.join(sorted(params.keys())) + '\n' if params else '')
+        layout.addWidget(self.sets_edit)
+        
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
+        
+    def get_param_sets(self):
+        return parse_parameter_sets(self.sets_edit.toPlainText())
+
 class QueryPreviewDialog(QDialog):
     def __init__(self, query_text, parent=None):
         super().__init__(parent)
@@ -143,11 +177,14 @@ class SQLQueryEditor(QWidget):
         super().__init__()
         self.main_window = main_window
         self.history = []
+        self.history_loader = None  # Set while an opened session's history is not loaded yet
+        self.unloaded_history_queries = []  # Executed meanwhile; added when it loads
         self.current_group_idx = -1
         self.current_query_idx = -1
         self.editor_settings = self.load_editor_settings()
         self.query_params = {'task_numbers': ''}
         self.loaded_query_item = None  # Track which query item was loaded from history
+        self.script_runner = ScriptRunner()  # Keeps intermediate results of the last script
         
         self.load_history()
         self.init_ui()
@@ -165,11 +202,32 @@ class SQLQueryEditor(QWidget):
         self.execute_btn.setStyleSheet("font-size: 12px; font-weight: bold;")
         main_toolbar.addWidget(self.execute_btn)
         
+        self.profile_btn = QPushButton("⏱️ Profile (Shift+F7)")
+        self.profile_btn.setShortcut('Shift+F7')
+        self.profile_btn.setToolTip("Show EXPLAIN QUERY PLAN and measure time and VM steps")
+        self.profile_btn.clicked.connect(self.profile_current_query)
+        self.profile_btn.setStyleSheet("font-size: 12px; font-weight: bold;")
+        main_toolbar.addWidget(self.profile_btn)
+        
         self.params_btn = QPushButton("⚙️ Parameters")
         self.params_btn.clicked.connect(self.edit_query_params)
         self.params_btn.setStyleSheet("font-size: 12px; font-weight: bold;")
         main_toolbar.addWidget(self.params_btn)
         
+        self.bind_params_btn = QPushButton("🔗 Bind")
+        self.bind_params_btn.setCheckable(True)
+        self.bind_params_btn.setChecked(self.editor_settings.get('bind_parameters', False))
+        self.bind_params_btn.setToolTip("Execute {param} placeholders as bound :param values")
+        self.bind_params_btn.toggled.connect(self.on_bind_params_toggled)
+        self.bind_params_btn.setStyleSheet("font-size: 12px; font-weight: bold;")
+        main_toolbar.addWidget(self.bind_params_btn)
+        
+        self.batch_btn = QPushButton("📑 Batch")
+        self.batch_btn.setToolTip("Execute the query once per parameter set as one prepared statement")
+        self.batch_btn.clicked.connect(self.execute_query_batch)
+        self.batch_btn.setStyleSheet("font-size: 12px; font-weight: bold;")
+        main_toolbar.addWidget(self.batch_btn)
+        
         main_toolbar.addSeparator()
         
         self.save_query_btn = QPushButton("💾 Save")
@@ -251,9 +309,26 @@ class SQLQueryEditor(QWidget):
         self.results_label = QLabel("Query Results:")
         layout.addWidget(self.results_label)
         
+        self.results_tabs = QTabWidget()
+        
         self.results_table = QTableWidget()
         self.results_table.setAlternatingRowColors(True)
-        layout.addWidget(self.results_table)
+        self.results_tabs.addTab(self.results_table, "📊 Results")
+        
+        # Per-statement timings of multi-statement scripts
+        self.statements_table = QTableWidget()
+        self.statements_table.setAlternatingRowColors(True)
+        self.statements_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.statements_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.statements_table.itemDoubleClicked.connect(self.on_statement_double_clicked)
+        self.results_tabs.addTab(self.statements_table, "⏱️ Statements")
+        
+        # Query plan of the last profile run
+        self.plan_tree = QTreeWidget()
+        self.plan_tree.setHeaderLabels(["Query Plan", "Note"])
+        self.results_tabs.addTab(self.plan_tree, "🌳 Plan")
+        
+        layout.addWidget(self.results_tabs)
         
         # Status
         self.status_label = QLabel("Ready to execute queries")
@@ -298,23 +373,41 @@ class SQLQueryEditor(QWidget):
             )
             
     def load_history(self):
-        """Load query history from file"""
+        """Load query history from file, then the queries logged since"""
+        self.history = []
         if os.path.exists(HISTORY_FILE):
             try:
                 with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
                     self.history = json.load(f)
             except Exception:
                 self.history = []
-        else:
-            self.history = []
+        if os.path.exists(HISTORY_LOG_FILE):
+            query_entries = []
+            try:
+                with open(HISTORY_LOG_FILE, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        query_entries.append(json.loads(line))
+            except (OSError, json.JSONDecodeError):
+                pass  # Keep the queries before a torn last line
+            self.add_history_queries(query_entries)
             
-    def save_history(self):
-        """Save query history to file"""
+    def add_history_queries(self, query_entries):
+        """Append executed queries to the first history group"""
+        if not query_entries:
+            return
+        if not self.history:
+            self.history.append({'name': 'Default Group', 'queries': []})
+        self.history[0]['queries'].extend(query_entries)
+        
+    def save_history(self, query_entry):
+        """Append an executed query to the history log and the session journal"""
         try:
-            with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, ensure_ascii=False, indent=2)
+            with open(HISTORY_LOG_FILE, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(query_entry, ensure_ascii=False) + '\n')
         except Exception:
             pass
+        if hasattr(self.main_window, 'session_changes'):
+            self.main_window.session_changes.mark_history(query_entry)
             
     def execute_query(self):
         """Execute SQL query"""
@@ -327,12 +420,22 @@ class SQLQueryEditor(QWidget):
             QMessageBox.warning(self, "Warning", "No query to execute")
             return
             
-        try:
-            # Replace parameters if any
-            final_query = self.replace_parameters(query_text)
+        # Scripts run statement by statement in one transaction
+        if len(split_statements(query_text)) > 1:
+            self.execute_script(query_text)
+            return
             
+        try:
+            self.prepare_external_sources(query_text)
             cursor = self.main_window.sqlite_conn.cursor()
-            cursor.execute(final_query)
+            if self.editor_settings.get('bind_parameters', False):
+                # Bound values keep the statement text stable, so the prepared statement is reused
+                final_query, bindings = to_bind_parameters(query_text, self.query_params)
+                cursor.execute(final_query, bindings)
+            else:
+                # Replace parameters if any
+                final_query = self.replace_parameters(query_text)
+                cursor.execute(final_query)
             
             if final_query.strip().upper().startswith('SELECT'):
                 # Fetch results for SELECT queries
@@ -370,13 +473,240 @@ class SQLQueryEditor(QWidget):
             QMessageBox.critical(self, "Query Error", f"Failed to execute query:\n{e}")
             self.status_label.setText(f"Query failed: {e}")
             
+    def prepare_external_sources(self, query_text):
+        """Load external tables (CSV/Parquet registered in the table manager) that the query uses"""
+        if hasattr(self.main_window, 'table_manager'):
+            self.main_window.table_manager.prepare_external_sources(
+                substitute_parameters(query_text, self.query_params))
+            
+    def execute_script(self, script_text):
+        """Execute multi-statement script with per-statement timing"""
+        settings = getattr(self.main_window, 'settings', {})
+        max_rows = settings.get('sql_max_results', 5000)
+        
+        try:
+            self.prepare_external_sources(script_text)
+            results = self.script_runner.run(
+                self.main_window.sqlite_conn, script_text, self.query_params,
+                bind=self.editor_settings.get('bind_parameters', False), max_rows=max_rows
+            )
+            self.display_statement_timings(results)
+            
+            total_time = sum(result['elapsed'] for result in results)
+            last_result = results[-1]
+            if last_result['data'] is not None:
+                self.display_results(last_result['data'], last_result['columns'])
+                self.update_main_results_table(last_result['data'], last_result['columns'])
+                rows_text = f"{last_result['rows']}{'+' if last_result['truncated'] else ''} rows returned"
+                self.results_tabs.setCurrentWidget(self.results_table)
+            else:
+                self.results_table.clear()
+                self.results_table.setRowCount(0)
+                self.results_table.setColumnCount(0)
+                rows_text = f"{sum(result['changes'] for result in results)} rows affected"
+                self.results_tabs.setCurrentWidget(self.statements_table)
+            self.status_label.setText(
+                f"Script executed successfully. {len(results)} statements in {total_time * 1000:.1f} ms, {rows_text}."
+            )
+            
+            self.save_query_to_history(script_text)
+            
+            if hasattr(self.main_window, 'table_manager'):
+                self.main_window.table_manager.refresh_tables()
+                
+            self.main_window.log_message(f"Script executed ({len(results)} statements): {script_text[:50]}...")
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Query Error", f"Failed to execute script:\n{e}")
+            self.status_label.setText(f"Script failed: {e}")
+            
+    def display_statement_timings(self, results):
+        """Show wall time, rows and changes for each statement of a script"""
+        headers = ["#", "Time (ms)", "Share", "Rows", "Changes", "Statement"]
+        self.statements_table.clear()
+        self.statements_table.setRowCount(len(results))
+        self.statements_table.setColumnCount(len(headers))
+        self.statements_table.setHorizontalHeaderLabels(headers)
+        
+        total_time = sum(result['elapsed'] for result in results) or 1e-9
+        slowest = max(results, key=lambda result: result['elapsed'])['index'] if results else -1
+        
+        for row_idx, result in enumerate(results):
+            statement = ' '.join(result['sql'].split())
+            values = [
+                str(result['index'] + 1),
+                f"{result['elapsed'] * 1000:.2f}",
+                f"{result['elapsed'] / total_time:.0%}",
+                '' if result['rows'] is None else str(result['rows']),
+                str(result['changes']),
+                statement[:200]
+            ]
+            for col_idx, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                item.setToolTip(result['sql'])
+                if result['index'] == slowest:
+                    item.setBackground(QColor(255, 220, 220))
+                self.statements_table.setItem(row_idx, col_idx, item)
+            # Intermediate results can be opened from their temp table
+            self.statements_table.item(row_idx, 0).setData(Qt.UserRole, result['temp_table'])
+            
+        self.statements_table.resizeColumnsToContents()
+        
+    def on_statement_double_clicked(self, item):
+        """Show intermediate result of a script statement"""
+        temp_table = self.statements_table.item(item.row(), 0).data(Qt.UserRole)
+        if not temp_table:
+            return
+            
+        try:
+            settings = getattr(self.main_window, 'settings', {})
+            results, columns = self.script_runner.fetch_temp_table(temp_table, settings.get('sql_max_results', 5000))
+            self.display_results(results, columns)
+            self.results_tabs.setCurrentWidget(self.results_table)
+            self.status_label.setText(f"Showing result of statement {item.row() + 1} ({len(results)} rows)")
+        except Exception as e:
+            QMessageBox.warning(self, "Warning", f"Intermediate result is no longer available: {e}")
+            
+    def profile_current_query(self):
+        """Profile query: show query plan, elapsed time and VM steps"""
+        if not self.main_window.sqlite_conn:
+            QMessageBox.warning(self, "Warning", "No database connection")
+            return
+            
+        query_text = self.sql_edit.text().strip()
+        statements = split_statements(query_text)
+        if len(statements) != 1:
+            QMessageBox.warning(self, "Warning", "Profiling works on a single statement")
+            return
+            
+        try:
+            statement = statements[0].rstrip().rstrip(';')
+            if self.editor_settings.get('bind_parameters', False):
+                statement, bindings = to_bind_parameters(statement, self.query_params)
+            else:
+                statement, bindings = self.replace_parameters(statement), {}
+                
+            self.prepare_external_sources(query_text)
+            run = profile_query(self.main_window.sqlite_conn, statement, bindings)
+            previous_run = self.store_profile_run(query_text, run)
+            self.display_query_plan(run, previous_run)
+            
+            status = f"Profiled: {format_profile_run(run)}"
+            if previous_run:
+                status += f" (previous: {previous_run['elapsed_ms']:.1f} ms)"
+            self.status_label.setText(status)
+            self.results_tabs.setCurrentWidget(self.plan_tree)
+            self.main_window.log_message(f"Query profiled: {format_profile_run(run)}")
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Query Error", f"Failed to profile query:\n{e}")
+            self.status_label.setText(f"Profile failed: {e}")
+            
+    def display_query_plan(self, run, previous_run=None):
+        """Show query plan tree with scans, temp B-trees and automatic indexes highlighted"""
+        colors = {
+            'scan': QColor(255, 240, 200),
+            'temp_btree': QColor(255, 220, 220),
+            'auto_index': QColor(255, 200, 255)
+        }
+        notes = {
+            'scan': 'Full scan',
+            'temp_btree': 'Temporary B-tree',
+            'auto_index': 'Automatic index'
+        }
+        
+        def add_nodes(parent, nodes):
+            for node in nodes:
+                item = QTreeWidgetItem(parent, [node['detail'], notes.get(node['kind'], '')])
+                if node['kind'] in colors:
+                    item.setBackground(0, colors[node['kind']])
+                    item.setBackground(1, colors[node['kind']])
+                add_nodes(item, node['children'])
+        
+        self.plan_tree.clear()
+        summary = QTreeWidgetItem(self.plan_tree, [format_profile_run(run), run['timestamp']])
+        if previous_run:
+            QTreeWidgetItem(summary, [f"Previous: {format_profile_run(previous_run)}", previous_run['timestamp']])
+        add_nodes(self.plan_tree, run['plan'])
+        self.plan_tree.expandAll()
+        self.plan_tree.resizeColumnToContents(0)
+        
+    def store_profile_run(self, query_text, run):
+        """Store profile run with the query in the history tree.
+        
+        Returns the previous run of the same query, if any.
+        """
+        if not hasattr(self.main_window, 'query_history_tree'):
+            return None
+            
+        # Make sure the query has a history entry
+        self.auto_save_query_to_history(query_text)
+        query_item = self.loaded_query_item or self.find_existing_query_item(query_text)
+        if not query_item:
+            return None
+            
+        item_data = query_item.data(0, Qt.UserRole)
+        stored_data = item_data.get('data', {})
+        runs = stored_data.get('profile_runs', [])
+        previous_run = runs[-1] if runs else None
+        runs.append(run)
+        stored_data['profile_runs'] = runs[-MAX_PROFILE_RUNS:]
+        self.main_window.update_query_history_item(query_item, stored_data)
+        
+        # Timeline of recent runs makes regressions visible
+        timeline = '\n'.join(
+            f"{past_run['timestamp'][:19]}: {past_run['elapsed_ms']:.1f} ms, ~{past_run['vm_steps']:,} steps"
+            for past_run in stored_data['profile_runs'][-5:]
+        )
+        query_item.setToolTip(0, f"Profile runs:\n{timeline}")
+        return previous_run
+        
     def replace_parameters(self, query_text):
         """Replace parameters in query text"""
-        final_query = query_text
-        for key, value in self.query_params.items():
-            placeholder = f"{{{key}}}"
-            final_query = final_query.replace(placeholder, str(value))
-        return final_query
+        return substitute_parameters(query_text, self.query_params)
+        
+    def on_bind_params_toggled(self, checked):
+        """Switch between bound and text-substituted parameters"""
+        self.editor_settings['bind_parameters'] = checked
+        self.save_editor_settings()
+        
+    def execute_query_batch(self):
+        """Execute query once per parameter set with a single prepared statement"""
+        if not self.main_window.sqlite_conn:
+            QMessageBox.warning(self, "Warning", "No database connection")
+            return
+            
+        query_text = self.sql_edit.text().strip()
+        if not query_text:
+            QMessageBox.warning(self, "Warning", "No query to execute")
+            return
+            
+        dialog = BatchParamsDialog(self.query_params, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        param_sets = dialog.get_param_sets()
+        if not param_sets:
+            QMessageBox.warning(self, "Warning", "No parameter sets entered")
+            return
+            
+        try:
+            affected_rows = execute_batch(self.main_window.sqlite_conn, query_text, self.query_params, param_sets)
+            self.main_window.sqlite_conn.commit()
+            self.status_label.setText(
+                f"Batch executed successfully. {len(param_sets)} parameter sets, {affected_rows} rows affected."
+            )
+            
+            self.save_query_to_history(query_text)
+            
+            if hasattr(self.main_window, 'table_manager'):
+                self.main_window.table_manager.refresh_tables()
+                
+            self.main_window.log_message(f"Batch executed ({len(param_sets)} sets): {query_text[:50]}...")
+            
+        except Exception as e:
+            self.main_window.sqlite_conn.rollback()
+            QMessageBox.critical(self, "Query Error", f"Failed to execute batch:\n{e}")
+            self.status_label.setText(f"Batch failed: {e}")
         
     def display_results(self, results, columns):
         """Display query results in table"""
@@ -421,16 +751,12 @@ class SQLQueryEditor(QWidget):
             'task_numbers': self.task_numbers_edit.toPlainText()
         }
         
-        # Add to current group or create new group
-        if not self.history:
-            self.history.append({
-                'name': 'Default Group',
-                'queries': [query_entry]
-            })
+        # Add to current group or create new group; a session's history is not loaded for it
+        if self.history_loader:
+            self.unloaded_history_queries.append(query_entry)
         else:
-            self.history[0]['queries'].append(query_entry)
-            
-        self.save_history()
+            self.add_history_queries([query_entry])
+        self.save_history(query_entry)
         
     def edit_query_params(self):
         """Edit query parameters"""
@@ -523,6 +849,7 @@ class SQLQueryEditor(QWidget):
             self.editor_settings = dialog.get_settings()
             self.save_editor_settings()
             self.apply_editor_settings()
+            self.bind_params_btn.setChecked(self.editor_settings.get('bind_parameters', False))
             
     def get_query_text(self):
         """Get current query text"""
@@ -571,21 +898,19 @@ class SQLQueryEditor(QWidget):
                     stored_data['params'] = self.query_params.copy()
                     stored_data['timestamp'] = pd.Timestamp.now().isoformat()
                     
-                    # Update the tree item data
-                    self.loaded_query_item.setData(0, Qt.UserRole, {'type': 'query', 'data': stored_data})
-                    
-                    # Save to persistent storage
-                    self.main_window.save_query_history_tree()
+                    # Update the tree item and its stored row
+                    self.main_window.update_query_history_item(self.loaded_query_item, stored_data)
                     return
             
-            # Check if this exact query already exists to avoid duplicates
-            existing_query = self.find_existing_query(query_text)
-            if existing_query:
+            # Check if this exact query already exists to avoid duplicates (indexed lookup)
+            existing_item = self.find_existing_query_item(query_text)
+            if existing_item:
                 # Update existing query with current parameters
+                existing_query = existing_item.data(0, Qt.UserRole).get('data', {})
                 existing_query['task_numbers'] = self.task_numbers_edit.toPlainText()
                 existing_query['params'] = self.query_params.copy()
                 existing_query['timestamp'] = pd.Timestamp.now().isoformat()
-                self.main_window.save_query_history_tree()
+                self.main_window.update_query_history_item(existing_item, existing_query)
                 return
             
             # Create new query entry
@@ -597,41 +922,19 @@ class SQLQueryEditor(QWidget):
                 'timestamp': pd.Timestamp.now().isoformat()
             }
             
-            # Find or create "Auto-saved" group
-            auto_group = None
-            for i in range(self.main_window.query_history_tree.topLevelItemCount()):
-                group_item = self.main_window.query_history_tree.topLevelItem(i)
-                group_data = group_item.data(0, Qt.UserRole)
-                if group_data and group_data.get('name') == 'Auto-saved':
-                    auto_group = group_item
-                    break
-            
-            if not auto_group:
-                auto_group = QTreeWidgetItem(['Auto-saved'])
-                auto_group.setData(0, Qt.UserRole, {'type': 'group', 'name': 'Auto-saved'})
-                self.main_window.query_history_tree.addTopLevelItem(auto_group)
-            
-            # Add query to auto-saved group
-            query_item = QTreeWidgetItem([query_data['name']])
-            query_item.setData(0, Qt.UserRole, {'type': 'query', 'data': query_data})
-            auto_group.addChild(query_item)
-            auto_group.setExpanded(True)
-            
-            # Save to persistent storage
-            self.main_window.save_query_history_tree()
+            # Add query to the "Auto-saved" group
+            auto_group = self.main_window.find_query_history_group('Auto-saved')
+            self.main_window.add_query_history_item(auto_group, query_data)
     
-    def find_existing_query(self, query_text):
-        """Find if the exact query already exists in history"""
+    def find_existing_query_item(self, query_text):
+        """Find the history tree item holding the same query"""
         if not hasattr(self.main_window, 'query_history_tree'):
             return None
-            
-        for i in range(self.main_window.query_history_tree.topLevelItemCount()):
-            group_item = self.main_window.query_history_tree.topLevelItem(i)
-            for j in range(group_item.childCount()):
-                query_item = group_item.child(j)
-                query_data = query_item.data(0, Qt.UserRole)
-                if query_data and query_data.get('type') == 'query':
-                    stored_query = query_data.get('data', {}).get('query', '')
-                    if stored_query.strip() == query_text.strip():
-                        return query_data.get('data', {})
+        return self.main_window.find_query_history_item(query_text)
+    
+    def find_existing_query(self, query_text):
+        """Find if the exact query already exists in history"""
+        query_item = self.find_existing_query_item(query_text)
+        if query_item:
+            return query_item.data(0, Qt.UserRole).get('data', {})
         return None
\ No newline at end of file
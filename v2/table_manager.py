@@ -3,13 +3,20 @@ from PyQt5.QtWidgets import (
     QListWidgetItem, QMenu, QAction, QMessageBox, QInputDialog,
     QDialog, QFormLayout, QLineEdit, QDialogButtonBox, QLabel,
     QApplication, QTableWidgetItem, QComboBox, QTreeWidget, QTreeWidgetItem,
-    QFileDialog
+    QFileDialog, QSplitter
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QEvent
+from PyQt5.QtCore import Qt, pyqtSignal, QEvent, QThread
 from PyQt5.QtGui import QIcon, QDrag, QPixmap, QPainter, QKeySequence
 import sqlite3
 import re
 import os
+from pathlib import Path
+
+from utils.external_sources import ExternalSourceManager, DEFAULT_CHUNK_SIZE
+from utils.table_catalog import TableCatalog, group_table_names, tree_spec
+from utils.table_stats import TableStatsCache, compute_table_stats, format_size, SAMPLE_ROWS
+
+TREE_KEY_ROLE = Qt.UserRole + 1  # Identity of a tree item, used to update the tree in place
 
 def clean_header(header):
     """Clean header for SQLite compatibility"""
@@ -60,6 +67,40 @@ class TableEditDialog(QDialog):
     def get_table_name(self):
         return self.name_edit.text().strip()
 
+class TableStatsWorker(QThread):
+    """Computes table statistics on a read-only connection of its own"""
+    stats_ready = pyqtSignal(str, object, object)  # table, signature, stats
+    failed = pyqtSignal(str, str)
+    
+    def __init__(self, db_path, table_name, signature, sample_rows=SAMPLE_ROWS):
+        super().__init__()
+        self.db_path = db_path
+        self.table_name = table_name
+        self.signature = signature
+        self.sample_rows = sample_rows
+        self.conn = None
+        
+    def run(self):
+        try:
+            self.conn = sqlite3.connect(Path(self.db_path).resolve().as_uri() + '?mode=ro', uri=True,
+                                        check_same_thread=False)
+            try:
+                stats = compute_table_stats(self.conn, self.table_name, self.sample_rows)
+            finally:
+                self.conn.close()
+            self.stats_ready.emit(self.table_name, self.signature, stats)
+        except Exception as e:
+            self.failed.emit(self.table_name, str(e))
+            
+    def cancel(self):
+        """Abort the running statement; safe to call from the GUI thread"""
+        try:
+            if self.conn is not None:
+                self.conn.interrupt()
+        except sqlite3.Error:
+            pass
+
+
 class TableManager(QWidget):
     """Table manager widget for managing database tables"""
     table_selected = pyqtSignal(str)  # Emitted when a table is selected
@@ -71,6 +112,13 @@ class TableManager(QWidget):
         self.main_window = main_window
         self.convert_first_row_to_headers = True  # Option to treat first row as headers
         self.double_click_mode = "CSV editor"  # Default mode for double-click
+        self.external_sources = ExternalSourceManager()  # Lazy CSV/Parquet tables and attached databases
+        self.table_catalog = TableCatalog()  # Table names, reloaded when the schema changes
+        self.tree_state = None  # Catalog key and external sources the table tree shows
+        self.stats_cache = TableStatsCache()  # Table statistics, kept until the table's data changes
+        self.stats_worker = None
+        self.stats_table = None  # Table shown in the statistics panel
+        self.pending_stats = None  # (table, signature) to compute after the running worker
         self.init_ui()
         
         # Install event filter for clipboard paste
@@ -120,7 +168,26 @@ class TableManager(QWidget):
         self.table_tree.setAcceptDrops(True)
         self.table_tree.setDropIndicatorShown(True)
         
-        layout.addWidget(self.table_tree)
+        # Statistics of the selected table, computed in the background
+        stats_widget = QWidget()
+        stats_layout = QVBoxLayout(stats_widget)
+        stats_layout.setContentsMargins(0, 0, 0, 0)
+        self.stats_label = QLabel("Select a table to see its statistics")
+        self.stats_label.setWordWrap(True)
+        self.stats_label.setStyleSheet("font-size: 11px;")
+        stats_layout.addWidget(self.stats_label)
+        self.stats_tree = QTreeWidget()
+        self.stats_tree.setHeaderLabels(["Column", "Type", "Nulls", "Distinct", "Min", "Max"])
+        self.stats_tree.setRootIsDecorated(False)
+        self.stats_tree.setAlternatingRowColors(True)
+        stats_layout.addWidget(self.stats_tree)
+        
+        splitter = QSplitter(Qt.Vertical)
+        splitter.addWidget(self.table_tree)
+        splitter.addWidget(stats_widget)
+        splitter.setStretchFactor(0, 3)
+        splitter.setStretchFactor(1, 1)
+        layout.addWidget(splitter)
         
         # Buttons with font-based icons
         button_layout = QHBoxLayout()
@@ -146,6 +213,12 @@ class TableManager(QWidget):
         self.delete_btn.setStyleSheet("text-align: left; padding: 4px;")
         button_layout.addWidget(self.delete_btn)
         
+        self.attach_btn = QPushButton("🔗 Attach")
+        self.attach_btn.clicked.connect(self.attach_external_source)
+        self.attach_btn.setToolTip("Query a CSV/Parquet file without importing it, or attach another SQLite database")
+        self.attach_btn.setStyleSheet("text-align: left; padding: 4px;")
+        button_layout.addWidget(self.attach_btn)
+        
         layout.addLayout(button_layout)
         
     def eventFilter(self, source, event):
@@ -201,8 +274,10 @@ class TableManager(QWidget):
             
             # Load data into CSV editor if available
             if hasattr(self.main_window, 'csv_editor'):
+                self.main_window.csv_editor.close_table_window()
                 self.main_window.csv_editor.csv_headers = valid_headers
                 self.main_window.csv_editor.csv_data = data
+                self.main_window.csv_editor.mark_structure_changed()
                 self.main_window.csv_editor.update_table_display()
                 
             self.main_window.log_message(f"Created table '{table_name}' from clipboard with {len(data)} rows, {len(valid_headers)} columns")
@@ -320,104 +395,121 @@ class TableManager(QWidget):
             self.main_window.sqlite_conn = sqlite3.connect(":memory:")
             
         try:
-            cursor = self.main_window.sqlite_conn.cursor()
-            
-            # Drop table if exists
-            cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
-            
-            # Create table
-            col_defs = ', '.join([f'"{h}" TEXT' for h in headers])
-            cursor.execute(f'CREATE TABLE "{table_name}" ({col_defs})')
-            
-            # Insert data
-            if data:
-                placeholders = ','.join(['?'] * len(headers))
-                # Ensure all rows have the same number of columns
-                safe_rows = []
-                for row in data:
-                    safe_row = row[:len(headers)] + [''] * (len(headers) - len(row))
-                    safe_rows.append(safe_row)
-                cursor.executemany(f'INSERT INTO "{table_name}" VALUES ({placeholders})', safe_rows)
+            with self.main_window.bulk_load_profile():
+                cursor = self.main_window.sqlite_conn.cursor()
                 
-            self.main_window.sqlite_conn.commit()
+                # Drop table if exists
+                cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+                
+                # Create table
+                col_defs = ', '.join([f'"{h}" TEXT' for h in headers])
+                cursor.execute(f'CREATE TABLE "{table_name}" ({col_defs})')
+                
+                # Insert data
+                if data:
+                    placeholders = ','.join(['?'] * len(headers))
+                    # Ensure all rows have the same number of columns
+                    safe_rows = []
+                    for row in data:
+                        safe_row = row[:len(headers)] + [''] * (len(headers) - len(row))
+                        safe_rows.append(safe_row)
+                    cursor.executemany(f'INSERT INTO "{table_name}" VALUES ({placeholders})', safe_rows)
+                    
+                self.main_window.sqlite_conn.commit()
             
         except Exception as e:
             raise Exception(f"Database error: {e}")
         
     def refresh_tables(self):
-        """Refresh the table tree from database with grouping"""
-        self.table_tree.clear()
+        """Refresh the table tree from database with grouping.
         
+        The catalog is read again only when the schema changed, and the tree
+        is updated in place so selection and expanded groups are kept.
+        """
         if not hasattr(self.main_window, 'sqlite_conn') or not self.main_window.sqlite_conn:
+            self.table_tree.clear()
+            self.table_catalog.invalidate()
+            self.tree_state = None
             return
             
         try:
-            cursor = self.main_window.sqlite_conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-            tables = cursor.fetchall()
+            self.table_catalog.refresh(self.main_window.sqlite_conn)
+            external_spec = self.external_item_spec()
             
+            # Nothing to do when neither the catalog nor the external sources changed
+            tree_state = (self.table_catalog.key, external_spec)
+            if tree_state == self.tree_state:
+                return
+                
             # Group tables by Excel file origin
-            excel_groups = {}
-            standalone_tables = []
-            
-            for table in tables:
-                table_name = table[0]
-                if not table_name.startswith('sqlite_'):  # Skip system tables
-                    # Check if table name follows Excel pattern: filename_sheetname
-                    if '_' in table_name:
-                        # Try to identify Excel file groups
-                        parts = table_name.split('_')
-                        if len(parts) >= 2:
-                            # Assume last part is sheet name, rest is file name
-                            potential_file = '_'.join(parts[:-1])
-                            sheet_name = parts[-1]
-                            
-                            # Check if there are other tables with same file prefix
-                            similar_tables = [t[0] for t in tables if t[0].startswith(potential_file + '_') and not t[0].startswith('sqlite_')]
-                            
-                            if len(similar_tables) > 1:
-                                # This is part of an Excel group
-                                if potential_file not in excel_groups:
-                                    excel_groups[potential_file] = []
-                                excel_groups[potential_file].append(table_name)
-                            else:
-                                standalone_tables.append(table_name)
-                        else:
-                            standalone_tables.append(table_name)
-                    else:
-                        standalone_tables.append(table_name)
-            
-            # Add Excel groups to tree
-            for file_name, table_names in excel_groups.items():
-                if len(table_names) > 1:  # Only create group if multiple tables
-                    group_item = QTreeWidgetItem([f"📊 {file_name} ({len(table_names)} sheets)"])
-                    group_item.setData(0, Qt.UserRole, {'type': 'excel_group', 'file_name': file_name, 'tables': table_names})
-                    group_item.setToolTip(0, f"Excel file group: {file_name}\nRight-click to delete entire group")
+            excel_groups, standalone_tables = group_table_names(self.table_catalog.table_names)
+            
+            specs = []
+            for file_name, table_names in excel_groups:
+                children = []
+                for table_name in table_names:
+                    # Extract sheet name for display
+                    sheet_name = table_name.replace(file_name + '_', '', 1)
+                    children.append(tree_spec(
+                        ('table', table_name), f"📋 {sheet_name}",
+                        {'type': 'table', 'table_name': table_name, 'sheet_name': sheet_name},
+                        f"Table: {table_name}"))
+                specs.append(tree_spec(
+                    ('excel_group', file_name), f"📊 {file_name} ({len(table_names)} sheets)",
+                    {'type': 'excel_group', 'file_name': file_name, 'tables': table_names},
+                    f"Excel file group: {file_name}\nRight-click to delete entire group",
+                    children, expanded=True))
                     
-                    for table_name in sorted(table_names):
-                        # Extract sheet name for display
-                        sheet_name = table_name.replace(file_name + '_', '', 1)
-                        table_item = QTreeWidgetItem([f"📋 {sheet_name}"])
-                        table_item.setData(0, Qt.UserRole, {'type': 'table', 'table_name': table_name, 'sheet_name': sheet_name})
-                        table_item.setToolTip(0, f"Table: {table_name}")
-                        group_item.addChild(table_item)
+            # Standalone tables
+            for table_name in standalone_tables:
+                specs.append(tree_spec(
+                    ('table', table_name), f"📋 {table_name}",
+                    {'type': 'table', 'table_name': table_name}, f"Table: {table_name}"))
                     
-                    self.table_tree.addTopLevelItem(group_item)
-                    group_item.setExpanded(True)
-                else:
-                    # Single table, add to standalone
-                    standalone_tables.extend(table_names)
-            
-            # Add standalone tables
-            for table_name in sorted(standalone_tables):
-                item = QTreeWidgetItem([f"📋 {table_name}"])
-                item.setData(0, Qt.UserRole, {'type': 'table', 'table_name': table_name})
-                item.setToolTip(0, f"Table: {table_name}")
-                self.table_tree.addTopLevelItem(item)
+            if external_spec:
+                specs.append(external_spec)
+                
+            self.sync_tree_items(self.table_tree.invisibleRootItem(), specs)
+            self.tree_state = tree_state
                     
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to refresh tables: {e}")
             
+    def sync_tree_items(self, parent, specs):
+        """Make the children of parent match specs, reusing existing items by key"""
+        wanted = {spec['key'] for spec in specs}
+        existing = {}
+        for index in reversed(range(parent.childCount())):
+            child = parent.child(index)
+            key = child.data(0, TREE_KEY_ROLE)
+            if key in wanted and key not in existing:
+                existing[key] = child
+            else:
+                parent.takeChild(index)
+                
+        for index, spec in enumerate(specs):
+            item = existing.get(spec['key'])
+            if item is None:
+                item = QTreeWidgetItem([spec['text']])
+                item.setData(0, TREE_KEY_ROLE, spec['key'])
+                parent.insertChild(index, item)
+                item.setExpanded(spec['expanded'])
+            elif parent.indexOfChild(item) != index:
+                # Moved items keep their own expanded state
+                expanded = item.isExpanded()
+                parent.takeChild(parent.indexOfChild(item))
+                parent.insertChild(index, item)
+                item.setExpanded(expanded)
+                
+            if item.text(0) != spec['text']:
+                item.setText(0, spec['text'])
+            if item.data(0, Qt.UserRole) != spec['data']:
+                item.setData(0, Qt.UserRole, spec['data'])
+            if item.toolTip(0) != spec['tooltip']:
+                item.setToolTip(0, spec['tooltip'])
+            if spec['children'] or item.childCount():
+                self.sync_tree_items(item, spec['children'])
+                
     def show_context_menu(self, position):
         """Show context menu for table operations"""
         item = self.table_tree.itemAt(position)
@@ -427,7 +519,19 @@ class TableManager(QWidget):
         menu = QMenu(self)
         item_data = item.data(0, Qt.UserRole)
         
-        if item_data and item_data.get('type') == 'excel_group':
+        if item_data and item_data.get('type') in ('external', 'attached_db', 'attached_table'):
+            # External source context menu
+            if item_data.get('type') != 'attached_db':
+                view_action = QAction("View Data", self)
+                view_action.triggered.connect(lambda: self.view_external_data(item_data))
+                menu.addAction(view_action)
+            if item_data.get('type') != 'attached_table':
+                remove_text = "Detach Database" if item_data.get('type') == 'attached_db' else "Remove External Source"
+                remove_action = QAction(f"🔗 {remove_text}", self)
+                remove_action.triggered.connect(lambda: self.remove_external_source(item_data['name']))
+                menu.addAction(remove_action)
+                
+        elif item_data and item_data.get('type') == 'excel_group':
             # Excel group context menu
             save_xlsx_action = QAction("💾 Save to XLSX", self)
             save_xlsx_action.triggered.connect(lambda: self.save_group_to_xlsx(item))
@@ -501,6 +605,7 @@ class TableManager(QWidget):
                 table_name = item_data.get('table_name')
                 if table_name:
                     self.table_selected.emit(table_name)
+                    self.request_table_stats(table_name)
             elif item_data and item_data.get('type') == 'excel_group':
                 # Group selected, don't emit table_selected
                 pass
@@ -530,6 +635,11 @@ class TableManager(QWidget):
             elif item_data and item_data.get('type') == 'excel_group':
                 # Toggle group expansion on double-click
                 item.setExpanded(not item.isExpanded())
+            elif item_data and item_data.get('type') in ('external', 'attached_table'):
+                # External data is only queried, never loaded as a whole
+                self.view_external_data(item_data)
+            elif item_data and item_data.get('type') == 'attached_db':
+                item.setExpanded(not item.isExpanded())
             else:
                 # Fallback for items without data
                 table_name = item.text(0).replace('📋 ', '').replace('📊 ', '')
@@ -538,6 +648,125 @@ class TableManager(QWidget):
                 else:  # SQL Query mode
                     self.view_table_data()
                 
+    def external_item_spec(self):
+        """Tree item description of registered external files and attached databases"""
+        conn = self.main_window.sqlite_conn
+        sources = self.external_sources
+        if not sources.sources and not sources.attached:
+            return None
+            
+        sources.reattach(conn)
+        children = []
+        for name, source in sorted(sources.sources.items()):
+            state = "not loaded" if source['materialized'] is None else f"{source['rows']} rows cached"
+            children.append(tree_spec(
+                ('external', name), f"📄 {name} ({source['kind']}, {state})",
+                {'type': 'external', 'name': name},
+                f"{source['path']}\nColumns: {', '.join(source['columns'])}\n"
+                f"Loaded in chunks when a query uses it; simple WHERE conditions filter rows while reading"))
+            
+        for alias, path in sorted(sources.attached.items()):
+            table_specs = []
+            try:
+                for table_name in sources.attached_tables(conn, alias):
+                    table_specs.append(tree_spec(
+                        ('attached_table', alias, table_name), f"📋 {table_name}",
+                        {'type': 'attached_table', 'name': alias, 'table_name': table_name}))
+            except sqlite3.Error as e:
+                self.main_window.log_message(f"Failed to list tables of attached database '{alias}': {e}")
+            children.append(tree_spec(
+                ('attached_db', alias), f"🗄️ {alias}", {'type': 'attached_db', 'name': alias},
+                f"Attached database: {path}\nQuery tables as \"{alias}\".table_name", table_specs))
+            
+        return tree_spec(
+            ('external_group',), f"🔗 External ({len(sources.sources) + len(sources.attached)})",
+            {'type': 'external_group'}, children=children, expanded=True)
+        
+    def attach_external_source(self):
+        """Register a CSV/Parquet file as a lazy table or attach a SQLite database"""
+        if not hasattr(self.main_window, 'sqlite_conn') or not self.main_window.sqlite_conn:
+            QMessageBox.warning(self, "Error", "No database connection")
+            return
+            
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Attach External Source", "",
+            "Data sources (*.csv *.tsv *.txt *.parquet *.pq *.sqlite *.sqlite3 *.db *.db3);;"
+            "CSV files (*.csv *.tsv *.txt);;Parquet files (*.parquet *.pq);;"
+            "SQLite databases (*.sqlite *.sqlite3 *.db *.db3);;All files (*.*)"
+        )
+        if not file_path:
+            return
+            
+        try:
+            conn = self.main_window.sqlite_conn
+            if self.external_sources.source_kind(file_path) == 'sqlite':
+                name = self.external_sources.attach_database(conn, file_path)
+                self.main_window.log_message(f"Attached database '{file_path}' as \"{name}\"")
+            else:
+                settings = getattr(self.main_window, 'settings', {})
+                name = self.external_sources.register_file(
+                    conn, file_path, encoding=settings.get('default_encoding', 'utf-8') or 'utf-8',
+                    clean_headers=make_unique_headers
+                )
+                self.main_window.log_message(f"Registered external table '{name}' for '{file_path}'")
+            self.refresh_tables()
+            
+            # Start with a query on the new source
+            self.view_external_data(self.external_item_data(name))
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to attach external source: {e}")
+            
+    def external_item_data(self, name):
+        """Build tree item data for an external source name"""
+        if name in self.external_sources.attached:
+            return {'type': 'attached_db', 'name': name}
+        return {'type': 'external', 'name': name}
+        
+    def view_external_data(self, item_data):
+        """Put a SELECT on an external source into the SQL editor"""
+        if not hasattr(self.main_window, 'sql_editor'):
+            return
+            
+        if item_data.get('type') == 'attached_table':
+            query = f'SELECT * FROM "{item_data["name"]}"."{item_data["table_name"]}" LIMIT 100;'
+        elif item_data.get('type') == 'attached_db':
+            query = f'SELECT name FROM "{item_data["name"]}".sqlite_master WHERE type = \'table\';'
+        else:
+            query = f'SELECT * FROM "{item_data["name"]}" LIMIT 100;'
+        self.main_window.sql_editor.sql_edit.setText(query)
+        self.main_window.editor_tabs.setCurrentWidget(self.main_window.sql_editor)
+        
+    def remove_external_source(self, name):
+        """Unregister an external file or detach a database"""
+        try:
+            self.external_sources.remove(self.main_window.sqlite_conn, name)
+            self.refresh_tables()
+            self.main_window.log_message(f"Removed external source '{name}'")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to remove external source: {e}")
+            
+    def prepare_external_sources(self, query_text):
+        """Materialize external file tables used by a query, pushing simple filters into the read"""
+        conn = getattr(self.main_window, 'sqlite_conn', None)
+        if conn is None or not self.external_sources.referenced_sources(query_text):
+            return
+            
+        settings = getattr(self.main_window, 'settings', {})
+        self.external_sources.chunk_size = int(settings.get('chunk_size', DEFAULT_CHUNK_SIZE))
+        self.external_sources.reattach(conn)
+        
+        def show_progress(name, rows_read):
+            if hasattr(self.main_window, 'statusBar'):
+                self.main_window.statusBar().showMessage(f"Reading external table '{name}': {rows_read:,} rows")
+            QApplication.processEvents()
+            
+        for stats in self.external_sources.prepare(conn, query_text, show_progress):
+            pushed = ', '.join(f"{column} {op} {value!r}" for column, op, value in stats['predicates']) or 'none'
+            self.main_window.log_message(
+                f"Loaded external table '{stats['name']}': kept {stats['rows_kept']:,} of {stats['rows_read']:,} rows "
+                f"in {stats['elapsed']:.2f}s (pushed-down filters: {pushed})")
+        
     def load_table_to_csv_editor(self, table_name):
         """Load table data into CSV editor"""
         if not hasattr(self.main_window, 'sqlite_conn') or not self.main_window.sqlite_conn:
@@ -545,6 +774,13 @@ class TableManager(QWidget):
             return
             
         try:
+            # Rowid tables open as a live window that pages rows as the editor scrolls
+            csv_editor = getattr(self.main_window, 'csv_editor', None)
+            if csv_editor is not None and csv_editor.open_table_window(table_name):
+                self.main_window.editor_tabs.setCurrentWidget(csv_editor)
+                self.main_window.log_message(f"Opened table '{table_name}' in CSV editor")
+                return
+                
             cursor = self.main_window.sqlite_conn.cursor()
             cursor.execute(f"SELECT * FROM [{table_name}]")
             rows = cursor.fetchall()
@@ -559,12 +795,14 @@ class TableManager(QWidget):
             
             # Load into CSV editor
             if hasattr(self.main_window, 'csv_editor'):
+                self.main_window.csv_editor.close_table_window()
                 self.main_window.csv_editor.csv_headers = headers
                 self.main_window.csv_editor.csv_data = data
                 self.main_window.csv_editor.current_file = None  # Clear file path since loading from database
                 self.main_window.csv_editor.current_table_name = table_name  # Set current table name
                 self.main_window.csv_editor.cell_formatting = {}  # Clear any existing formatting
                 self.main_window.csv_editor.column_widths = {}  # Clear column widths
+                self.main_window.csv_editor.mark_structure_changed()
                 self.main_window.csv_editor.update_table_display()
                 self.main_window.csv_editor.update_main_window_title()  # Update title to show table name
                 
@@ -739,16 +977,137 @@ class TableManager(QWidget):
                     structure_text += f" DEFAULT {default}"
                 structure_text += "\n"
                 
-            # Get row count
-            cursor.execute(f"SELECT COUNT(*) FROM [{table_name}]")
-            count = cursor.fetchone()[0]
-            structure_text += f"\nRow count: {count}"
+            stats = self.cached_table_stats(table_name)
+            if stats:
+                structure_text += "\n" + self.format_stats_summary(stats)
+                for profile in stats['columns']:
+                    structure_text += (f"\n  {profile['name']}: {profile['nulls']} nulls, "
+                                       f"{profile['distinct']} distinct")
+            else:
+                # Get row count
+                cursor.execute(f"SELECT COUNT(*) FROM [{table_name}]")
+                count = cursor.fetchone()[0]
+                structure_text += f"\nRow count: {count}"
             
             QMessageBox.information(self, f"Table Structure - {table_name}", structure_text)
             
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to get table structure: {e}")
             
+    def table_stats_signature(self, table_name):
+        """State of a table that its cached statistics are valid for"""
+        conn = self.main_window.sqlite_conn
+        tracker = getattr(self.main_window, 'session_changes', None)
+        row = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table_name,)).fetchone()
+        version = tracker.table_versions.get(table_name, 0) if tracker else None
+        # Cached statements write without being authorized, so any change drops every table's entry
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        return (id(conn), row[0] if row else None, version, conn.total_changes, data_version)
+        
+    def cached_table_stats(self, table_name):
+        """Statistics of a table if they are cached and still current"""
+        if not getattr(self.main_window, 'sqlite_conn', None):
+            return None
+        return self.stats_cache.get(table_name, self.table_stats_signature(table_name))
+        
+    def request_table_stats(self, table_name):
+        """Show statistics of a table, computing them in the background if needed"""
+        if not getattr(self.main_window, 'sqlite_conn', None):
+            return
+        self.stats_table = table_name
+        try:
+            signature = self.table_stats_signature(table_name)
+        except sqlite3.Error as e:
+            self.stats_label.setText(f"{table_name}: statistics unavailable ({e})")
+            return
+        stats = self.stats_cache.get(table_name, signature)
+        if stats:
+            self.show_table_stats(stats)
+            return
+            
+        self.stats_tree.clear()
+        self.stats_label.setText(f"{table_name}: computing statistics...")
+        conn = self.main_window.sqlite_conn
+        db_path = self.main_window.current_db_path() if hasattr(self.main_window, 'current_db_path') else None
+        if not db_path or conn.in_transaction:
+            # The worker's connection would not see this data, and the GUI thread must not scan it
+            reason = "uncommitted changes" if db_path else "in-memory database"
+            self.stats_label.setText(f"{table_name}: statistics unavailable ({reason})")
+            return
+            
+        if self.stats_worker is not None and self.stats_worker.isRunning():
+            # Newest selection wins; the running computation is abandoned
+            self.pending_stats = (table_name, signature)
+            if self.stats_worker.table_name != table_name:
+                self.stats_worker.cancel()
+            return
+        self.start_stats_worker(db_path, table_name, signature)
+        
+    def start_stats_worker(self, db_path, table_name, signature):
+        """Start computing statistics of a table in a background thread"""
+        self.pending_stats = None
+        self.stats_worker = TableStatsWorker(db_path, table_name, signature)
+        self.stats_worker.stats_ready.connect(self.on_table_stats_ready)
+        self.stats_worker.failed.connect(self.on_table_stats_failed)
+        self.stats_worker.finished.connect(self.on_stats_worker_finished)
+        self.stats_worker.start()
+        
+    def on_stats_worker_finished(self):
+        """Start the statistics request that arrived while the worker was busy"""
+        if self.pending_stats and self.main_window.sqlite_conn:
+            table_name, signature = self.pending_stats
+            if self.stats_cache.get(table_name, signature):
+                self.pending_stats = None
+            else:
+                self.start_stats_worker(self.main_window.current_db_path(), table_name, signature)
+                
+    def on_table_stats_ready(self, table_name, signature, stats):
+        """Cache computed statistics and show them if the table is still selected"""
+        self.stats_cache.put(table_name, signature, stats)
+        if table_name == self.stats_table:
+            self.show_table_stats(stats)
+            
+    def on_table_stats_failed(self, table_name, error):
+        """Report a failed statistics computation"""
+        if self.pending_stats:
+            return  # Interrupted in favour of another table
+        if table_name == self.stats_table:
+            self.stats_label.setText(f"{table_name}: statistics unavailable ({error})")
+        if hasattr(self.main_window, 'log_message'):
+            self.main_window.log_message(f"Failed to compute statistics of {table_name}: {error}")
+            
+    def format_stats_summary(self, stats):
+        """One-line row count and size summary of table statistics"""
+        text = f"Rows: {stats['row_count']:,}"
+        size = stats['size']
+        if size is not None:
+            text += f" | Size: {format_size(size['table'])}"
+            if size['indexes']:
+                text += f" (+ {format_size(size['indexes'])} indexes)"
+        if stats['sampled']:
+            text += f" | Columns profiled on a sample of {stats['profiled_rows']:,} rows"
+        return text
+        
+    def show_table_stats(self, stats):
+        """Fill the statistics panel"""
+        self.stats_label.setText(f"{stats['table']}\n{self.format_stats_summary(stats)}")
+        self.stats_tree.clear()
+        for profile in stats['columns']:
+            values = [profile['name'], profile['type'], f"{profile['nulls']:,}", f"{profile['distinct']:,}",
+                      '' if profile['min'] is None else str(profile['min'])[:50],
+                      '' if profile['max'] is None else str(profile['max'])[:50]]
+            item = QTreeWidgetItem(values)
+            for column in (2, 3):
+                item.setTextAlignment(column, Qt.AlignRight | Qt.AlignVCenter)
+            self.stats_tree.addTopLevelItem(item)
+            
+    def stop_table_stats(self):
+        """Cancel a running statistics computation and wait for its thread"""
+        self.pending_stats = None
+        if self.stats_worker is not None:
+            self.stats_worker.cancel()
+            self.stats_worker.wait()
+            
     def get_selected_table(self):
         """Get currently selected table name"""
         current_item = self.table_tree.currentItem()
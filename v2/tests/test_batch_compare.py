@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the batch comparison of many files.
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.batch_compare import comparison_pairs, run_batch
+from plugins.row_compare import RowComparePlugin
+from plugins.schema_compare import SchemaComparePlugin
+
+
+class TestBatchCompare(unittest.TestCase):
+    """Test cases for pairing files and running plugins over them."""
+
+    def setUp(self):
+        """Write three files; the third has one changed value."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for k in range(3):
+            df = pd.DataFrame({'id': np.arange(100), 'value': np.arange(100)})
+            if k == 2:
+                df.loc[5, 'value'] = -1
+            path = os.path.join(self.temp_dir, f'extract{k}.csv')
+            df.to_csv(path, index=False)
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_comparison_pairs(self):
+        """Test all pairs and baseline pairs."""
+        self.assertEqual(comparison_pairs(3), [(0, 1), (0, 2), (1, 2)])
+        self.assertEqual(comparison_pairs(3, baseline=1), [(1, 0), (1, 2)])
+
+    def test_run_batch_reuses_fingerprints(self):
+        """Test the summary of a batch, and a rerun deciding unchanged equal files without loading them."""
+        plugins = [RowComparePlugin(), SchemaComparePlugin()]
+        parameters = {'Row-by-Row Comparison': {'key_columns': ['id']}}
+        store_path = os.path.join(self.temp_dir, 'session.sqlite')
+        first = run_batch(self.paths, plugins, parameters=parameters, store_path=store_path, workers=2)
+
+        summary = first['summary']
+        self.assertEqual(list(summary['plugin']), ['Row-by-Row Comparison', 'Schema Comparison'] * 3)
+        self.assertEqual(list(summary['file2']), ['extract1.csv'] * 2 + ['extract2.csv'] * 4)
+        self.assertEqual(list(summary['is_equal']), [True, True, False, True, False, True])
+        self.assertEqual(summary['differences'][2], 1)
+        self.assertTrue(summary['error'].isna().all())
+        self.assertEqual(len(first['load_seconds']), 3)
+
+        second = run_batch(self.paths, plugins, parameters=parameters, store_path=store_path, workers=2)
+        self.assertEqual(list(second['summary']['decided_by']),
+                         ['fingerprints', 'fingerprints', 'compared', 'fingerprints', 'compared', 'fingerprints'])
+        self.assertEqual(list(second['summary']['is_equal']), list(summary['is_equal']))
+
+        baseline = run_batch(self.paths[:2] + [os.path.join(self.temp_dir, 'missing.csv')],
+                             plugins[:1], baseline=0, workers=1)
+        self.assertEqual(list(baseline['summary']['is_equal']), [True, False])
+        self.assertIn('missing.csv', baseline['summary']['error'][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the out-of-core comparison of two files by key.
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.chunked_compare import CompareCancelled, compare_files, export_result_table
+from plugins.row_compare import RowComparePlugin
+
+
+class TestChunkedCompare(unittest.TestCase):
+    """Test cases for bucketed comparison against the in-memory row comparison."""
+
+    def setUp(self):
+        """Write two shuffled files with removed, added and modified rows."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.file1 = os.path.join(self.temp_dir, 'a.csv')
+        self.file2 = os.path.join(self.temp_dir, 'b.csv')
+        self.result_path = os.path.join(self.temp_dir, 'result.sqlite')
+
+        rng = np.random.default_rng(4)
+        n = 3000
+        df1 = pd.DataFrame({'id': np.arange(n), 'grp': rng.choice(['a', 'B', None], n),
+                            'value': rng.integers(0, 100, n)})
+        df2 = df1.sample(frac=1, random_state=1)
+        df2 = df2[df2['id'] % 37 != 0].copy()
+        df2.loc[df2['id'] % 41 == 0, 'value'] += 1
+        df2 = pd.concat([df2, pd.DataFrame({'id': [n, n + 1], 'grp': ['z', 'z'], 'value': [1, 2]})])
+        df2['extra'] = 'x'
+        df1.to_csv(self.file1, index=False)
+        df2.to_csv(self.file2, index=False)
+
+    def tearDown(self):
+        """Remove the files."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_matches_in_memory_compare(self):
+        """Test bucket by bucket comparison finds the same differences as one in-memory compare."""
+        fractions = []
+        result = compare_files(self.file1, self.file2, ['id'], self.result_path, buckets=7, chunk_rows=500,
+                               progress=lambda fraction, message: fractions.append(fraction))
+        expected = RowComparePlugin().compare(pd.read_csv(self.file1, dtype=str), pd.read_csv(self.file2, dtype=str),
+                                              key_columns=['id'])
+        for name in ('removed_count', 'added_count', 'modified_count', 'changed_cells'):
+            self.assertEqual(result['metadata'][name], expected['metadata'][name], name)
+        self.assertFalse(result['is_equal'])
+        self.assertEqual(fractions, sorted(fractions))
+        self.assertEqual(fractions[-1], 1.0)
+
+        def key_set(df, diff_type):
+            return set(df.loc[df['_diff_type'] == diff_type, 'id'].astype(str))
+
+        highlights = result['highlights']
+        for diff_type in ('removed', 'added', 'modified_old', 'modified_new'):
+            self.assertEqual(key_set(highlights, diff_type), key_set(expected['highlights'], diff_type))
+        self.assertEqual(list(highlights.columns), ['id', 'grp', 'value', 'extra', '_source', '_diff_type'])
+
+        csv_path = os.path.join(self.temp_dir, 'fields.csv')
+        self.assertEqual(export_result_table(self.result_path, 'changed_fields', csv_path, chunk_rows=7),
+                         expected['metadata']['changed_cells'])
+        exported = pd.read_csv(csv_path)
+        self.assertEqual(set(exported['column']), {'value'})
+        self.assertTrue((exported['new_value'] == exported['old_value'] + 1).all())
+        self.assertFalse(os.path.exists(self.result_path + '.parts'))
+
+    def test_keys_match_across_buckets_when_ignoring_case(self):
+        """Test keys differing only in case land in the same bucket."""
+        pd.DataFrame({'k': ['A', 'b', 'c'], 'v': [1, 2, 3]}).to_csv(self.file1, index=False)
+        pd.DataFrame({'k': ['a', 'B', 'C'], 'v': [1, 2, 3]}).to_csv(self.file2, index=False)
+        result = compare_files(self.file1, self.file2, ['k'], self.result_path, ignore_case=True, buckets=50)
+        self.assertTrue(result['is_equal'])
+        self.assertTrue(result['highlights'].empty)
+
+    def test_cancel_and_missing_keys(self):
+        """Test a cancelled comparison stops and cleans up, and unknown keys are rejected."""
+        with self.assertRaises(CompareCancelled):
+            compare_files(self.file1, self.file2, ['id'], self.result_path, progress=lambda fraction, message: False)
+        self.assertFalse(os.path.exists(self.result_path + '.parts'))
+        with self.assertRaises(ValueError):
+            compare_files(self.file1, self.file2, ['extra'], self.result_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
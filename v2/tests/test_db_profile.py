@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Unit tests for SQLite connection profiles.
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import shutil
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.db_profile import (
+    get_preset, profile_from_settings, apply_connection_profile, read_connection_profile, BulkLoadProfile
+)
+
+
+class TestDbProfile(unittest.TestCase):
+    """Test cases for connection profile presets and switching."""
+
+    def setUp(self):
+        """Set up a file database, since journal modes need one."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.conn = sqlite3.connect(os.path.join(self.temp_dir, 'session.sqlite'))
+
+    def tearDown(self):
+        """Close and remove test database."""
+        self.conn.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_profile_from_settings(self):
+        """Test preset defaults and per-setting overrides."""
+        profile = profile_from_settings({'sqlite_profile': 'safe', 'sqlite_cache_size_mb': 10})
+        self.assertEqual(profile['journal_mode'], 'DELETE')
+        self.assertEqual(profile['cache_size_mb'], 10)
+        self.assertEqual(profile_from_settings({'sqlite_profile': 'unknown'}), get_preset('interactive'))
+
+    def test_apply_profile(self):
+        """Test PRAGMAs are applied and read back."""
+        effective = apply_connection_profile(self.conn, get_preset('interactive'))
+        self.assertEqual(effective['journal_mode'], 'WAL')
+        self.assertEqual(effective['synchronous'], 'NORMAL')
+        self.assertEqual(effective['cache_size_mb'], 256)
+        self.assertEqual(effective['page_size'], 16384)
+        self.assertTrue(effective['temp_store_memory'])
+
+    def test_apply_commits_open_transaction(self):
+        """Test pending changes are committed before switching."""
+        self.conn.execute('CREATE TABLE t (a)')
+        self.conn.execute('INSERT INTO t VALUES (1)')
+        apply_connection_profile(self.conn, get_preset('bulk load'))
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual(read_connection_profile(self.conn)['journal_mode'], 'MEMORY')
+
+    def test_bulk_load_restores_profile(self):
+        """Test nested bulk load switches once and restores the previous profile."""
+        apply_connection_profile(self.conn, get_preset('safe'))
+        bulk_load = BulkLoadProfile(lambda: self.conn, lambda: get_preset('safe'))
+        with bulk_load:
+            with bulk_load:
+                self.assertEqual(read_connection_profile(self.conn)['synchronous'], 'OFF')
+            self.assertEqual(read_connection_profile(self.conn)['synchronous'], 'OFF')
+        effective = read_connection_profile(self.conn)
+        self.assertEqual(effective['synchronous'], 'FULL')
+        self.assertEqual(effective['journal_mode'], 'DELETE')
+
+    def test_bulk_load_with_other_readers(self):
+        """Test a WAL database stays in WAL while another connection has it open."""
+        apply_connection_profile(self.conn, get_preset('interactive'))
+        self.conn.execute('CREATE TABLE t (a)')
+        self.conn.commit()
+        reader = sqlite3.connect(f"file:{os.path.join(self.temp_dir, 'session.sqlite')}?mode=ro", uri=True)
+        try:
+            reader.execute('SELECT * FROM t').fetchall()
+            with BulkLoadProfile(lambda: self.conn, lambda: get_preset('interactive')):
+                self.assertEqual(read_connection_profile(self.conn)['journal_mode'], 'WAL')
+                self.assertEqual(read_connection_profile(self.conn)['synchronous'], 'OFF')
+                self.conn.execute('INSERT INTO t VALUES (1)')
+        finally:
+            reader.close()
+        self.assertEqual(self.conn.execute('SELECT COUNT(*) FROM t').fetchone()[0], 1)
+
+    def test_bulk_load_rolls_back_failed_import(self):
+        """Test the rows of a failed import are not committed."""
+        self.conn.execute('CREATE TABLE t (a)')
+        bulk_load = BulkLoadProfile(lambda: self.conn, lambda: get_preset('safe'))
+        with self.assertRaises(ValueError):
+            with bulk_load:
+                self.conn.execute('INSERT INTO t VALUES (1)')
+                raise ValueError("bad row")
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual(self.conn.execute('SELECT COUNT(*) FROM t').fetchone()[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Unit tests for lazily materialized external sources.
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import shutil
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.external_sources import ExternalSourceManager, extract_pushdown_predicates, split_conjuncts
+
+COLUMNS = ['id', 'city', 'amount']
+
+
+class TestPushdown(unittest.TestCase):
+    """Test cases for WHERE clause pushdown parsing."""
+
+    def test_simple_conjuncts(self):
+        """Test column-vs-literal conditions joined by AND are pushed."""
+        predicates = extract_pushdown_predicates(
+            "SELECT * FROM sales s WHERE s.city = 'Oslo' AND \"amount\" >= 10 AND id IN (1, '2') ORDER BY id",
+            'sales', COLUMNS)
+        self.assertEqual(predicates, [('city', '=', 'Oslo'), ('amount', '>=', '10'), ('id', 'in', ('1', '2'))])
+
+    def test_unsafe_queries_not_pushed(self):
+        """Test OR, BETWEEN, joins and repeated references disable pushdown."""
+        unsafe = [
+            "SELECT * FROM sales WHERE city = 'Oslo' OR id = 1",
+            "SELECT * FROM sales WHERE amount BETWEEN 1 AND id = 2",
+            "SELECT * FROM sales JOIN other ON sales.id = other.id WHERE city = 'Oslo'",
+            "SELECT * FROM sales WHERE id = 1 AND city IN (SELECT city FROM sales WHERE id = 2)",
+        ]
+        for query in unsafe:
+            self.assertEqual(extract_pushdown_predicates(query, 'sales', COLUMNS), [], query)
+
+    def test_unparsed_conditions_skipped(self):
+        """Test conditions that are not plain comparisons are left to SQLite."""
+        predicates = extract_pushdown_predicates(
+            "SELECT * FROM sales WHERE lower(city) = 'oslo' AND city = 'a AND b' AND other.id = 1",
+            'sales', COLUMNS)
+        self.assertEqual(predicates, [('city', '=', 'a AND b')])
+
+    def test_split_conjuncts(self):
+        """Test AND inside parentheses and literals does not split."""
+        self.assertEqual(split_conjuncts("a = 'x AND y' AND (b = 1 AND c = 2)"),
+                         ["a = 'x AND y'", "(b = 1 AND c = 2)"])
+
+
+class TestExternalSourceManager(unittest.TestCase):
+    """Test cases for registering and materializing sources."""
+
+    def setUp(self):
+        """Set up a CSV source and a session database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.temp_dir, 'sales.csv')
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write('id,city,amount\n')
+            for i in range(1, 101):
+                f.write(f"{i},{'Oslo' if i % 4 == 0 else 'Bergen'},{i * 10}\n")
+        self.conn = sqlite3.connect(':memory:')
+        self.manager = ExternalSourceManager(chunk_size=7, cache_dir=os.path.join(self.temp_dir, 'cache'))
+        os.makedirs(self.manager.cache_dir)
+
+    def tearDown(self):
+        """Close database and remove files."""
+        self.manager.close(self.conn)
+        self.conn.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_register_reads_header_only(self):
+        """Test registering does not create any table."""
+        name = self.manager.register_file(self.conn, self.csv_path)
+        self.assertEqual(name, 'sales')
+        self.assertEqual(self.manager.sources[name]['columns'], COLUMNS)
+        self.assertIsNone(self.manager.sources[name]['materialized'])
+
+    def test_filtered_materialization(self):
+        """Test pushed-down filter keeps only matching rows and results are correct."""
+        name = self.manager.register_file(self.conn, self.csv_path)
+        query = "SELECT count(*) FROM sales WHERE city = 'Oslo'"
+        stats = self.manager.prepare(self.conn, query)
+        self.assertEqual(stats[0]['rows_read'], 100)
+        self.assertEqual(stats[0]['rows_kept'], 25)
+        self.assertEqual(self.conn.execute(query).fetchone()[0], 25)
+
+        # Same filter is served from the cache; a different one reloads
+        self.assertEqual(self.manager.prepare(self.conn, query), [])
+        self.assertEqual(len(self.manager.prepare(self.conn, f"SELECT count(*) FROM {name}")), 1)
+        self.assertEqual(self.conn.execute("SELECT count(*) FROM sales").fetchone()[0], 100)
+
+        # Full materialization serves any later filter
+        self.assertEqual(self.manager.prepare(self.conn, "SELECT * FROM sales WHERE id = 5"), [])
+
+    def test_connection_swap_keeps_sources_queryable(self):
+        """Test materialized sources stay queryable after the session connection is replaced."""
+        self.manager.register_file(self.conn, self.csv_path)
+        query = "SELECT count(*) FROM sales"
+        self.manager.prepare(self.conn, query)
+        self.conn.close()
+
+        # Reattached connection: the cache is attached again, nothing is reloaded
+        self.conn = sqlite3.connect(':memory:')
+        self.manager.reattach(self.conn)
+        self.assertEqual(self.manager.prepare(self.conn, query), [])
+        self.assertEqual(self.conn.execute(query).fetchone()[0], 100)
+
+        # Connection that was never reattached: the source is loaded again
+        self.conn.close()
+        self.conn = sqlite3.connect(':memory:')
+        self.assertEqual(len(self.manager.prepare(self.conn, query)), 1)
+        self.assertEqual(self.conn.execute(query).fetchone()[0], 100)
+
+    def test_main_table_name_not_shadowed(self):
+        """Test registered names do not collide with session tables."""
+        self.conn.execute('CREATE TABLE sales (x)')
+        self.assertEqual(self.manager.register_file(self.conn, self.csv_path), 'sales_1')
+
+    def test_attach_database(self):
+        """Test SQLite files are attached and their tables listed."""
+        db_path = os.path.join(self.temp_dir, 'other.db')
+        other = sqlite3.connect(db_path)
+        other.execute('CREATE TABLE items (a)')
+        other.execute('INSERT INTO items VALUES (1)')
+        other.commit()
+        other.close()
+
+        alias = self.manager.attach_database(self.conn, db_path)
+        self.assertEqual(self.manager.attached_tables(self.conn, alias), ['items'])
+        self.assertEqual(self.conn.execute(f'SELECT a FROM "{alias}".items').fetchall(), [(1,)])
+        self.manager.remove(self.conn, alias)
+        self.assertNotIn(alias, self.manager.attached_schemas(self.conn))
+
+
+if __name__ == '__main__':
+    unittest.main()
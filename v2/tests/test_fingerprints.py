@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the fingerprint cache that decides comparisons without loading data.
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.fingerprints import (
+    cached_fingerprints, dataframe_fingerprint, file_source, update_fingerprints
+)
+from plugins.hash_compare import HashComparePlugin
+from plugins.row_compare import RowComparePlugin
+from plugins.schema_compare import SchemaComparePlugin
+
+
+class TestFingerprints(unittest.TestCase):
+    """Test cases for fingerprints, their store and plugin verdicts from them."""
+
+    def setUp(self):
+        """Create a frame, a copy and a frame with another schema."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store_path = os.path.join(self.temp_dir, 'session.sqlite')
+        self.df1 = pd.DataFrame({'id': [1, 2, 3], 'name': ['a', None, 'c'], 'value': [1.5, 2.5, np.nan]})
+        self.df2 = self.df1.copy()
+        self.df3 = self.df1.drop(columns='value').assign(value=[1, 2, 3], extra='x')
+
+    def tearDown(self):
+        """Remove the temporary files."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_fingerprint_tracks_content(self):
+        """Test equal frames share a content hash and a changed cell or order does not."""
+        fingerprint = dataframe_fingerprint(self.df1)
+        self.assertEqual(fingerprint, dataframe_fingerprint(self.df2))
+        self.assertEqual(fingerprint['null_counts'], [0, 1, 1])
+        changed = self.df2.copy()
+        changed.loc[1, 'value'] = 0.0
+        self.assertNotEqual(dataframe_fingerprint(changed)['content_hash'], fingerprint['content_hash'])
+        reordered = dataframe_fingerprint(self.df1.iloc[::-1].reset_index(drop=True))
+        self.assertNotEqual(reordered['content_hash'], fingerprint['content_hash'])
+        self.assertEqual(reordered['merkle_root'], fingerprint['merkle_root'])
+        root = HashComparePlugin().compare(self.df1, self.df2, mode='merkle')['metadata']['root_hashes'][0]
+        self.assertEqual(fingerprint['merkle_root'], root)
+
+    def test_plugin_verdicts_from_fingerprints(self):
+        """Test identical content is decided by any plugin and schemas match a full comparison."""
+        fingerprints = [dataframe_fingerprint(df) for df in (self.df1, self.df2, self.df3)]
+        result = RowComparePlugin().compare_fingerprints(fingerprints[0], fingerprints[1])
+        self.assertTrue(result['is_equal'])
+        self.assertIsNone(RowComparePlugin().compare_fingerprints(fingerprints[0], fingerprints[2]))
+
+        plugin = SchemaComparePlugin()
+        for other, fingerprint in ((self.df2, fingerprints[1]), (self.df3, fingerprints[2])):
+            for mode in ('strict', 'compatible'):
+                expected = plugin.compare(self.df1, other, type_compatibility=mode, check_index=True)
+                cached = plugin.compare_fingerprints(fingerprints[0], fingerprint, type_compatibility=mode,
+                                                     check_index=True)
+                self.assertEqual(cached['is_equal'], expected['is_equal'])
+                self.assertEqual(cached['details'], expected['details'])
+                pd.testing.assert_frame_equal(cached['highlights'], expected['highlights'])
+
+    def test_store_by_source_signature(self):
+        """Test fingerprints are stored per file and missed once the file changes."""
+        path = os.path.join(self.temp_dir, 'a.csv')
+        self.df1.to_csv(path, index=False)
+        source = file_source(path)
+        self.assertEqual(cached_fingerprints(self.store_path, [source, None]), [None, None])
+        self.assertEqual(update_fingerprints(self.store_path, [(source, self.df1), (None, self.df2)]), 1)
+        self.assertEqual(update_fingerprints(self.store_path, [(source, self.df1)]), 0)
+        self.assertEqual(cached_fingerprints(self.store_path, [source])[0], dataframe_fingerprint(self.df1))
+        self.assertEqual(cached_fingerprints(None, [source]), [None])
+
+        self.df3.to_csv(path, index=False)
+        self.assertIsNone(cached_fingerprints(self.store_path, [file_source(path)])[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SQLite query history store.
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import shutil
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.history_store import QueryHistoryStore, normalize_query, query_hash
+
+
+class TestQueryHistoryStore(unittest.TestCase):
+    """Test cases for storing and finding history queries."""
+
+    def setUp(self):
+        """Create a store in a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = QueryHistoryStore(os.path.join(self.temp_dir, 'history.sqlite'))
+
+    def tearDown(self):
+        """Close the store and remove files."""
+        self.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_normalized_hash(self):
+        """Test whitespace differences hash alike."""
+        self.assertEqual(normalize_query('  SELECT *\n\tFROM  t '), 'SELECT * FROM t')
+        self.assertEqual(query_hash('SELECT * FROM t'), query_hash('SELECT *\nFROM t'))
+        self.assertNotEqual(query_hash('SELECT * FROM t'), query_hash('SELECT * FROM u'))
+
+    def test_incremental_changes(self):
+        """Test groups and queries are added, updated, found, reordered and deleted."""
+        group_id = self.store.add_group('Auto-saved')
+        first = self.store.add_query(group_id, {'name': 'q1', 'query': 'SELECT 1'})
+        second = self.store.add_query(group_id, {'name': 'q2', 'query': 'SELECT 2'})
+
+        found_id, data = self.store.find_query('  SELECT\n1 ')
+        self.assertEqual((found_id, data['name']), (first, 'q1'))
+        self.assertIsNone(self.store.find_query('SELECT 3'))
+
+        self.store.update_query(second, {'name': 'q2', 'query': 'SELECT 3', 'params': {'a': 1}})
+        self.assertEqual(self.store.find_query('SELECT 3')[1]['params'], {'a': 1})
+        self.assertIsNone(self.store.find_query('SELECT 2'))
+
+        self.store.save_order([(group_id, [second, first])])
+        self.assertEqual([data['name'] for _, data in self.store.load()[0]['queries']], ['q2', 'q1'])
+
+        self.store.delete_query(first)
+        other_group = self.store.add_group('Other')
+        self.store.rename_group(other_group, 'Renamed')
+        self.assertEqual(self.store.export(), [
+            {'name': 'Auto-saved', 'queries': [{'name': 'q2', 'query': 'SELECT 3', 'params': {'a': 1}}]},
+            {'name': 'Renamed', 'queries': []}
+        ])
+        self.store.delete_group(group_id)
+        self.assertIsNone(self.store.find_query('SELECT 3'))
+
+    def test_search_follows_query_changes(self):
+        """Test the search index is kept in sync with history changes by triggers."""
+        if not self.store.has_fts:
+            self.skipTest('SQLite built without FTS5')
+        group_id = self.store.add_group('g')
+        query_id = self.store.add_query(group_id, {
+            'name': 'Reconciliation totals', 'query': 'SELECT * FROM customers',
+            'task_numbers': 'TASK-42', 'timestamp': '2024-03-14T10:00:00'})
+        self.store.add_query(group_id, {'name': 'other', 'query': 'SELECT 1', 'timestamp': '2024-05-01T10:00:00'})
+
+        self.assertEqual([r['id'] for r in self.store.search('custom')], [query_id])
+        self.assertEqual([r['id'] for r in self.store.search('recon march')], [query_id])
+        self.assertEqual(self.store.search('recon may'), [])
+        self.assertEqual(self.store.search('task-42')[0]['id'], query_id)
+        self.assertEqual(self.store.search('recon')[0]['name'], '«Reconciliation» totals')
+
+        self.store.update_query(query_id, {'name': 'Reconciliation totals', 'query': 'SELECT * FROM invoices'})
+        self.assertEqual(self.store.search('customers'), [])
+        self.assertEqual(self.store.search('invoices')[0]['fragment'], 'SELECT * FROM «invoices»')
+        self.store.delete_query(query_id)
+        self.assertEqual(self.store.search('invoices'), [])
+
+    def test_other_connections_write_history(self):
+        """Test the index triggers need no application function, so other connections can add queries."""
+        if not self.store.has_fts:
+            self.skipTest('SQLite built without FTS5')
+        group_id = self.store.add_group('g')
+        conn = sqlite3.connect(self.store.path)
+        conn.execute("INSERT INTO queries (group_id, position, name, query, query_hash, data, period) "
+                     "VALUES (?, 0, 'Imported', 'SELECT 1', 0, ?, '2023-07-01 July 2023')",
+                     (group_id, json.dumps({'task_numbers': 'T-7'})))
+        conn.commit()
+        conn.close()
+        self.assertEqual([r['name'] for r in self.store.search('imported july 2023')], ['«Imported»'])
+        self.assertEqual(len(self.store.search('t-7')), 1)
+        self.assertEqual(self.store.conn.execute(
+            "SELECT rowid FROM search_index WHERE search_index MATCH 'name:imported'").fetchall(), [(1,)])
+
+    def test_search_snippets_ranked(self):
+        """Test snippets are indexed, name matches rank first and removed snippets drop out."""
+        if not self.store.has_fts:
+            self.skipTest('SQLite built without FTS5')
+        group_id = self.store.add_group('g')
+        self.store.add_query(group_id, {'name': 'q', 'query': 'SELECT * FROM ledger'})
+        self.store.sync_snippets([{'name': 'Tools', 'snippets': [
+            {'name': 'Ledger export', 'code': 'print(1)'},
+            {'name': 'Stats', 'code': 'df.describe()'}
+        ]}])
+        results = self.store.search('ledger')
+        self.assertEqual([(r['kind'], r.get('snippet')) for r in results],
+                         [('snippet', 'Ledger export'), ('query', None)])
+
+        self.store.index_snippet('Tools', 'Stats', 'df.describe()  # ledger')
+        self.assertEqual(len(self.store.search('ledger')), 3)
+        self.store.sync_snippets([{'name': 'Tools', 'snippets': [{'name': 'Stats', 'code': 'x'}]}])
+        self.assertEqual([r['kind'] for r in self.store.search('ledger')], ['query'])
+        self.assertEqual(self.store.search('"'), [])
+
+    def test_legacy_json_import(self):
+        """Test the JSON history is imported once into an empty store."""
+        json_path = os.path.join(self.temp_dir, 'query_history.json')
+        history = [{'name': 'g', 'queries': [{'name': 'q', 'query': 'SELECT 1'}]}]
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(history, f)
+        db_path = os.path.join(self.temp_dir, 'imported.sqlite')
+        store = QueryHistoryStore(db_path, json_path)
+        self.assertEqual(store.export(), history)
+        store.add_group('new')
+        store.close()
+
+        store = QueryHistoryStore(db_path, json_path)
+        self.assertEqual(len(store.export()), 2)
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Unit tests for key normalization and fuzzy key matching.
+"""
+
+import unittest
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.key_matching import fuzzy_pairs, normalize_key_series
+from plugins.row_compare import RowComparePlugin
+
+
+class TestKeyMatching(unittest.TestCase):
+    """Test cases for normalizing and pairing keys."""
+
+    def test_normalize_key_series(self):
+        """Test numbers, whitespace, case and dates are written in one form."""
+        series = pd.Series([' 1.50', 1.5, 7, '7.0', None, ' Foo  Bar', '2024-01-05', 'Jan 5, 2024',
+                            '2024-01-05 10:30'])
+        self.assertEqual(normalize_key_series(series).tolist(),
+                         ['1.5', '1.5', '7', '7', None, 'foo bar', '2024-01-05', 'jan 5, 2024', '2024-01-05 10:30'])
+        self.assertEqual(normalize_key_series(series, dates=True).tolist()[6:],
+                         ['2024-01-05', '2024-01-05', '2024-01-05 10:30:00'])
+        self.assertEqual(normalize_key_series(series, casefold=False, numeric=False).tolist()[:2], ['1.50', '1.5'])
+        # Duplicate index labels, as after concatenating frames
+        series = pd.Series(['2024-01-05', 'x', 'Jan 5, 2024 10:30', '7.0'], index=[0, 0, 1, 1])
+        self.assertEqual(normalize_key_series(series, dates=True).tolist(),
+                         ['2024-01-05', 'x', '2024-01-05 10:30:00', '7'])
+        # Long IDs next to text keep every digit; only exact decimals are rewritten
+        series = pd.Series(['12345678901234567', '12345678901234568', 'n/a', ' +007', '-0012.00',
+                            '1.00000000000000000001', '1.00000000000000000002'])
+        self.assertEqual(normalize_key_series(series).tolist(),
+                         ['12345678901234567', '12345678901234568', 'n/a', '7', '-12',
+                          '1.00000000000000000001', '1.00000000000000000002'])
+
+    def test_fuzzy_pairs(self):
+        """Test similar keys pair one to one, best first, across blocks and threads."""
+        keys1 = ['smith john', 'acme corp', 'zeta', 'xbcdefgh']
+        keys2 = ['acme corp.', 'smith jon', 'omega', 'abcdefgh']
+        expected = [(0, 1), (1, 0), (3, 3)]
+        for workers in (1, 4):
+            pairs = fuzzy_pairs(keys1, keys2, threshold=0.85, workers=workers)
+            self.assertEqual(sorted((i, j) for i, j, _ in pairs), expected)
+            self.assertTrue(all(score >= 0.85 for _, _, score in pairs))
+        # Two candidates for one key: the closer one wins
+        self.assertEqual([(i, j) for i, j, _ in fuzzy_pairs(['order 1001'], ['order 1001x', 'order 1001'], 0.9)],
+                         [(0, 1)])
+        self.assertEqual(fuzzy_pairs(['abc'], ['xyz'], 0.5), [])
+
+    def test_row_compare_normalized_and_fuzzy_keys(self):
+        """Test the row comparison matches dirty keys when asked to."""
+        df1 = pd.DataFrame({'id': ['1.0', ' A', '2024-01-05', 'acme corp'], 'value': [1, 2, 3, 4]})
+        df2 = pd.DataFrame({'id': ['1', 'a', 'Jan 5, 2024', 'acme corp.'], 'value': [1, 2, 3, 5]})
+        plugin = RowComparePlugin()
+
+        exact = plugin.compare(df1, df2, key_columns=['id'])
+        self.assertEqual(exact['metadata']['removed_count'], 4)
+
+        normalized = plugin.compare(df1, df2, key_columns=['id'], normalize_keys=True, parse_dates=True)
+        self.assertEqual(normalized['metadata']['removed_count'], 1)
+        self.assertEqual(normalized['metadata']['added_count'], 1)
+
+        fuzzy = plugin.compare(df1, df2, key_columns=['id'], normalize_keys=True, parse_dates=True,
+                               fuzzy_threshold=0.9)
+        self.assertEqual(fuzzy['metadata']['fuzzy_matches'], 1)
+        self.assertEqual(fuzzy['metadata']['total_changes'], 1)
+        self.assertEqual(fuzzy['changed_fields'].to_dict('records'),
+                         [{'id': 'acme corp', 'column': 'value', 'old_value': 4, 'new_value': 5}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Merkle trees used to locate differences by key.
+"""
+
+import unittest
+import tempfile
+import shutil
+import sqlite3
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.merkle_tree import MerkleTree, MerkleTreeStore, diff_trees, file_signature, key_hashes
+from plugins.hash_compare import HashComparePlugin
+
+
+class TestMerkleTree(unittest.TestCase):
+    """Test cases for building, diffing and storing trees."""
+
+    def setUp(self):
+        """Create a table and a shuffled copy with removed, added and modified rows."""
+        self.temp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(3)
+        n = 20000
+        self.df1 = pd.DataFrame({'id': np.arange(n), 'value': rng.integers(0, 100, n)})
+        df2 = self.df1.sample(frac=1, random_state=2)
+        df2 = df2[~df2['id'].isin([5, 7000])].copy()
+        df2.loc[df2['id'].isin([1, 19999]), 'value'] = -1
+        self.df2 = pd.concat([df2, pd.DataFrame({'id': [n], 'value': [0]})], ignore_index=True)
+
+    def tearDown(self):
+        """Remove the temporary files."""
+        shutil.rmtree(self.temp_dir)
+
+    def build(self, df):
+        """Tree of a frame keyed by id."""
+        rows = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        return MerkleTree.build(key_hashes(df, ['id']), rows)
+
+    def test_diff_locates_changed_rows(self):
+        """Test only the changed rows are returned, by position, visiting few nodes."""
+        tree1, tree2 = self.build(self.df1), self.build(self.df2)
+        diff = diff_trees(tree1, tree2)
+        self.assertEqual(sorted(self.df1['id'].iloc[diff['removed']]), [5, 7000])
+        self.assertEqual(list(self.df2['id'].iloc[diff['added']]), [20000])
+        self.assertEqual(sorted(self.df1['id'].iloc[diff['modified1']]), [1, 19999])
+        self.assertEqual(sorted(self.df2['id'].iloc[diff['modified2']]), [1, 19999])
+        self.assertLess(diff['nodes_compared'], 5 * 16 * (tree1.depth + 1))
+
+        same = diff_trees(tree1, self.build(self.df1.iloc[::-1]))
+        self.assertEqual(same['nodes_compared'], 1)
+        self.assertFalse(any(len(same[name]) for name in ('removed', 'added', 'modified1', 'modified2')))
+
+    def test_store_round_trip(self):
+        """Test a stored tree gives the same diff and is only loaded for its signature."""
+        conn = sqlite3.connect(os.path.join(self.temp_dir, 'session.sqlite'))
+        store = MerkleTreeStore(conn)
+        tree1 = self.build(self.df1)
+        store.save('a.csv', '1', tree1)
+        self.assertIsNone(store.load('a.csv', '2'))
+        loaded = store.load('a.csv', '1')
+        self.assertEqual(loaded.depth, tree1.depth)
+        self.assertEqual(loaded.row_count, len(self.df1))
+        tree2 = self.build(self.df2)
+        for name, positions in diff_trees(tree1, tree2).items():
+            np.testing.assert_array_equal(diff_trees(loaded, tree2)[name], positions, name)
+        conn.close()
+
+    def test_plugin_reuses_trees_of_unchanged_files(self):
+        """Test the hash plugin reuses stored trees until a file's signature changes."""
+        path = os.path.join(self.temp_dir, 'a.csv')
+        self.df1.to_csv(path, index=False)
+        kwargs = {'mode': 'merkle', 'key_columns': 'id', 'store_path': os.path.join(self.temp_dir, 's.sqlite'),
+                  'df1_source': (path, file_signature(path)), 'df2_source': ('b.csv', '1')}
+        plugin = HashComparePlugin()
+        first = plugin.compare(self.df1, self.df2, **kwargs)
+        second = plugin.compare(self.df1, self.df2, **kwargs)
+        self.assertEqual(first['metadata']['trees_reused'], [False, False])
+        self.assertEqual(second['metadata']['trees_reused'], [True, True])
+        pd.testing.assert_frame_equal(first['highlights'], second['highlights'])
+        self.assertEqual(second['metadata']['modified_count'], 2)
+
+        kwargs['df2_source'] = ('b.csv', '2')
+        self.assertEqual(plugin.compare(self.df1, self.df2, **kwargs)['metadata']['trees_reused'], [True, False])
+        kwargs['key_columns'] = 'id, value'
+        self.assertEqual(plugin.compare(self.df1, self.df2, **kwargs)['metadata']['trees_reused'], [False, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,12 +14,14 @@ import unittest
 import tempfile
 import os
 import shutil
+import numpy as np
 import pandas as pd
 import sys
 from unittest.mock import Mock, patch, MagicMock
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtTest import QTest
 from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
 
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -224,6 +226,56 @@ class TestComparisonPlugins(unittest.TestCase):
         self.assertIsInstance(result['details'], str)
         self.assertIn('comparison results', result['details'])
     
+    def test_row_compare_with_keys(self):
+        """Test keyed row comparison finds removed, added and modified rows without changing inputs."""
+        df1 = self.df1.copy()
+        df1.loc[2, 'category'] = None
+        df2 = self.df2.copy()
+        df2.loc[2, 'category'] = None
+        df2['id'] = df2['id'].astype(str)  # Keys match by their text, as before
+        df1_before, df2_before = df1.copy(), df2.copy()
+        
+        result = self.row_plugin.compare(df1, df2, key_columns=['id'])
+        
+        pd.testing.assert_frame_equal(df1, df1_before)
+        pd.testing.assert_frame_equal(df2, df2_before)
+        metadata = result['metadata']
+        self.assertEqual((metadata['removed_count'], metadata['added_count'], metadata['modified_count']), (1, 1, 1))
+        highlights = result['highlights']
+        self.assertEqual(list(highlights['_diff_type']), ['removed', 'added', 'modified_old', 'modified_new'])
+        self.assertEqual(list(highlights['name']), ['Eve', 'Frank', 'Bob', 'Bob'])
+        self.assertEqual(list(highlights['_source']), ['df1', 'df2', 'df1', 'df2'])
+    
+    def test_row_compare_duplicate_keys(self):
+        """Test the first row of a duplicated key is compared and all its rows are reported."""
+        df1 = pd.DataFrame({'k': [1, 1, 2], 'v': ['a', 'x', 'b']})
+        df2 = pd.DataFrame({'k': [1, 2, 2], 'v': ['a', 'c', 'b']})
+        result = self.row_plugin.compare(df1, df2, key_columns=['k'])
+        self.assertEqual(result['metadata']['modified_count'], 1)
+        modified = result['highlights']
+        self.assertEqual(list(modified['v']), ['b', 'c', 'b'])
+
+    def test_row_compare_cell_mask(self):
+        """Test the cell mask marks only changed cells of modified rows and matches the changed fields."""
+        df1 = pd.DataFrame({'k': [1, 2, 3, 4], 'a': ['x', 'y', 'z', 'w'], 'b': [1.0, None, 3.0, 4.0]})
+        df2 = pd.DataFrame({'k': [4, 3, 2, 5], 'a': ['W', 'z', 'y', 'v'], 'b': [5.0, 3.0, None, 6.0]})
+        result = self.row_plugin.compare(df1, df2, key_columns=['k'])
+
+        cell_mask = result['cell_mask']
+        self.assertEqual(cell_mask['columns'], ['a', 'b'])
+        self.assertEqual(cell_mask['mask'].shape, (len(result['highlights']), 2))
+        self.assertEqual(list(result['highlights']['_diff_type']), ['removed', 'added', 'modified_old', 'modified_new'])
+        self.assertEqual(cell_mask['mask'].tolist(), [[False, False], [False, False], [True, True], [True, True]])
+
+        changed = result['changed_fields']
+        self.assertEqual(list(changed.columns), ['k', 'column', 'old_value', 'new_value'])
+        self.assertEqual(changed.values.tolist(), [[4, 'a', 'w', 'W'], [4, 'b', 4.0, 5.0]])
+        self.assertEqual(result['metadata']['changed_cells'], 2)
+
+        same = self.row_plugin.compare(df1, df1, key_columns=['k'])
+        self.assertTrue(same['changed_fields'].empty)
+        self.assertEqual(same['cell_mask']['mask'].shape, (0, 2))
+
     def test_column_compare_plugin_basic_info(self):
         """Test ColumnComparePlugin basic information methods."""
         self.assertEqual(self.column_plugin.get_name(), "Column Statistical Comparison")
@@ -245,6 +297,28 @@ class TestComparisonPlugins(unittest.TestCase):
         self.assertIsInstance(result, dict)
         self.assertFalse(result['is_equal'])
     
+    def test_column_compare_stats_match_pandas(self):
+        """Test the one-pass statistics match per-column pandas results, in column order."""
+        df1 = pd.DataFrame({'z': [3, 1, 2, 2], 'f': [1.5, None, 0.5, 0.5], 'flag': [True, False, True, True],
+                            'o': pd.Series(['bb', None, 'a', 'a'], dtype=object), 'x': [1, 2, 3, 4]})
+        df2 = df1.drop(columns='x').assign(f=[1.5, None, 0.5, 0.6], y=1)
+        result = self.column_plugin.compare(df1, df2, tolerance=0.01)
+        self.assertEqual([r['column'] for r in result['metadata']['column_results']], ['z', 'f', 'flag', 'o', 'x', 'y'])
+        self.assertEqual(list(result['highlights']['Column']), ['z', 'f', 'flag', 'o', 'x', 'y'])
+        
+        stats = {r['column']: r for r in result['metadata']['column_results']}
+        for col in ('z', 'f'):
+            for name in ('mean', 'std', 'min', 'max', 'median'):
+                self.assertAlmostEqual(stats[col]['df1_stats'][name], getattr(df1[col], name)(), msg=(col, name))
+        for col in ('z', 'f', 'flag', 'o'):
+            self.assertEqual(stats[col]['df1_stats']['unique_count'], df1[col].nunique(), col)
+            self.assertEqual(stats[col]['df1_stats']['null_count'], df1[col].isnull().sum(), col)
+        self.assertEqual(stats['o']['df1_stats']['most_common'], 'a')
+        self.assertAlmostEqual(stats['o']['df1_stats']['avg_length'], 4 / 3)
+        self.assertTrue(stats['z']['is_equal'])
+        self.assertEqual(stats['f']['differences'], ['Mean differs: 0.833333 vs 0.866667',
+                                                     'Std differs: 0.577350 vs 0.550757'])
+    
     def test_hash_compare_plugin_basic_info(self):
         """Test HashComparePlugin basic information methods."""
         self.assertEqual(self.hash_plugin.get_name(), "Hash-based Comparison")
@@ -266,6 +340,51 @@ class TestComparisonPlugins(unittest.TestCase):
         self.assertIsInstance(result, dict)
         self.assertFalse(result['is_equal'])
     
+    def test_hash_compare_locates_differences_in_parallel(self):
+        """Test differing columns and chunks are found the same way with any number of workers."""
+        df1 = pd.DataFrame({f'c{i}': range(i, i + 50) for i in range(12)})
+        df1['text'] = [f'row {i}' if i % 7 else None for i in range(50)]
+        df2 = df1.copy()
+        df2.loc[23, 'c5'] = -1
+        df2.loc[41, 'text'] = 'changed'
+        
+        results = [self.hash_plugin.compare(df1, df2, chunk_size=10, worker_threads=workers) for workers in (1, 4)]
+        self.assertEqual(results[0]['metadata']['hash1'], results[1]['metadata']['hash1'])
+        analysis = results[1]['metadata']['analysis']
+        self.assertEqual(sorted(col for col, info in analysis['column_differences'].items() if info['differs']),
+                         ['c5', 'text'])
+        self.assertEqual([chunk['start_row'] for chunk in analysis['chunk_differences']], [20, 40])
+        self.assertEqual(list(analysis['column_differences']), list(df1.columns))
+        self.assertEqual(analysis['column_differences']['c0']['hash1'],
+                         self.hash_plugin._hash_columns(df1[['c0']], 'md5', 1)[1][0])
+        
+        swapped = df1.iloc[[1, 0] + list(range(2, 50))].reset_index(drop=True)
+        self.assertFalse(self.hash_plugin.compare(df1, swapped)['is_equal'])
+    
+    def test_hash_compare_verdict_only(self):
+        """Test the verdict-only mode stops at the first difference without detailed analysis."""
+        result = self.hash_plugin.compare(self.df1, self.df_identical, verdict_only=True, worker_threads=2)
+        self.assertTrue(result['is_equal'])
+        result = self.hash_plugin.compare(self.df1, self.df2, verdict_only=True, worker_threads=2)
+        self.assertFalse(result['is_equal'])
+        self.assertIn('differs', result['metadata']['first_difference'])
+        self.assertTrue(result['highlights'].empty)
+    
+    def test_hash_compare_merkle_by_key(self):
+        """Test the Merkle mode matches rows by key regardless of their order."""
+        df2 = self.df2.iloc[::-1].reset_index(drop=True)
+        result = self.hash_plugin.compare(self.df1, df2, mode='merkle', key_columns='id')
+        self.assertFalse(result['is_equal'])
+        self.assertEqual((result['metadata']['removed_count'], result['metadata']['added_count'],
+                          result['metadata']['modified_count']), (1, 1, 1))
+        self.assertEqual(list(result['highlights']['_diff_type']),
+                         ['removed', 'added', 'modified_old', 'modified_new'])
+        self.assertEqual(list(result['highlights']['id']), [5, 6, 2, 2])
+        result = self.hash_plugin.compare(self.df1, self.df_identical.iloc[::-1], mode='merkle', key_columns='id')
+        self.assertTrue(result['is_equal'])
+        result = self.hash_plugin.compare(self.df1, df2, mode='merkle', key_columns='missing')
+        self.assertIn('error', result['metadata'])
+    
     def test_schema_compare_plugin_basic_info(self):
         """Test SchemaComparePlugin basic information methods."""
         self.assertEqual(self.schema_plugin.get_name(), "Schema Comparison")
@@ -382,6 +501,41 @@ class TestPluginDownloader(unittest.TestCase):
 # that may not be available in the test environment
 
 
+class TestDiffTableModel(unittest.TestCase):
+    """Test cases for the model behind the result tables (no widgets needed)."""
+    
+    def test_model_reads_colors_and_filters(self):
+        """Test cells, row and cell colors, and filtering by diff type."""
+        from plugin_compare_dialog import DiffTableModel
+        colors = {'removed': QColor(255, 225, 225), 'changed_cell': QColor(255, 210, 120)}
+        df = pd.DataFrame({
+            'id': [1, 2, 2, 3],
+            'value': [10.5, None, 7.0, 4.0],
+            '_diff_type': ['removed', 'modified_old', 'modified_new', 'added']
+        })
+        mask = {'columns': ['value'], 'mask': np.array([[False], [True], [True], [False]])}
+        model = DiffTableModel(colors)
+        model.set_dataframe(df, cell_mask=mask)
+        
+        self.assertEqual((model.rowCount(), model.columnCount()), (4, 2))
+        self.assertEqual(model.headerData(1, Qt.Horizontal), 'value')
+        self.assertEqual(model.data(model.index(0, 1)), '10.5')
+        self.assertEqual(model.data(model.index(1, 1)), '')
+        self.assertEqual(model.data(model.index(0, 0), Qt.BackgroundRole), colors['removed'])
+        self.assertEqual(model.data(model.index(1, 1), Qt.BackgroundRole), colors['changed_cell'])
+        self.assertIsNone(model.data(model.index(1, 0), Qt.BackgroundRole))
+        self.assertIsNone(model.data(model.index(3, 0), Qt.BackgroundRole))
+        
+        model.set_diff_type_filter(['modified_new', 'added'])
+        self.assertEqual(model.rowCount(), 2)
+        self.assertEqual(model.data(model.index(0, 1)), '7.0')
+        self.assertEqual(model.headerData(0, Qt.Vertical), '3')
+        self.assertEqual(model.visible_dataframe()['id'].tolist(), [2, 3])
+        
+        model.set_diff_type_filter(None)
+        self.assertEqual(model.rowCount(), 4)
+
+
 class TestIntegration(unittest.TestCase):
     """Integration tests for the complete plugin system."""
     
@@ -482,6 +636,7 @@ if __name__ == '__main__':
         TestBaseComparePlugin,
         TestComparisonPlugins,
         TestPluginDownloader,
+        TestDiffTableModel,
         TestIntegration
     ]
     
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the query profiler.
+"""
+
+import unittest
+import sqlite3
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.query_profiler import (
+    classify_plan_detail, explain_query_plan, iter_plan_nodes, profile_query, format_profile_run
+)
+
+
+class TestQueryProfiler(unittest.TestCase):
+    """Test cases for plan classification and profiling."""
+
+    def setUp(self):
+        """Set up test database."""
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute('CREATE TABLE a (id INTEGER, name TEXT)')
+        self.conn.execute('CREATE TABLE b (id INTEGER, value TEXT)')
+        self.conn.executemany('INSERT INTO a VALUES (?, ?)', [(i, f'n{i}') for i in range(200)])
+        self.conn.executemany('INSERT INTO b VALUES (?, ?)', [(i, f'v{i}') for i in range(200)])
+        self.conn.commit()
+
+    def tearDown(self):
+        """Close test database."""
+        self.conn.close()
+
+    def test_classify_plan_detail(self):
+        """Test highlighted plan step kinds."""
+        self.assertEqual(classify_plan_detail('SCAN a'), 'scan')
+        self.assertEqual(classify_plan_detail('USE TEMP B-TREE FOR ORDER BY'), 'temp_btree')
+        self.assertEqual(classify_plan_detail('SEARCH b USING AUTOMATIC COVERING INDEX (id=?)'), 'auto_index')
+        self.assertIsNone(classify_plan_detail('SEARCH a USING INTEGER PRIMARY KEY (rowid=?)'))
+
+    def test_explain_query_plan(self):
+        """Test plan tree contains scans and temp B-trees."""
+        plan = explain_query_plan(self.conn, 'SELECT * FROM a JOIN b ON a.id = b.id ORDER BY a.name')
+        kinds = {node['kind'] for node in iter_plan_nodes(plan)}
+        self.assertIn('scan', kinds)
+        self.assertIn('temp_btree', kinds)
+
+    def test_profile_query(self):
+        """Test profiling counts rows and VM steps."""
+        run = profile_query(self.conn, 'SELECT * FROM a JOIN b ON a.id = b.id', step_interval=10)
+        self.assertEqual(run['rows'], 200)
+        self.assertGreater(run['vm_steps'], 0)
+        self.assertGreaterEqual(run['elapsed_ms'], 0)
+        self.assertIn('VM steps', format_profile_run(run))
+
+    def test_profile_does_not_modify_data(self):
+        """Test profiling a data-changing statement is rolled back."""
+        profile_query(self.conn, 'DELETE FROM a')
+        self.assertEqual(self.conn.execute('SELECT count(*) FROM a').fetchone()[0], 200)
+        self.assertFalse(self.conn.in_transaction)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the multi-statement script runner.
+"""
+
+import unittest
+import sqlite3
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.script_runner import split_statements, ScriptRunner
+
+
+class TestSplitStatements(unittest.TestCase):
+    """Test cases for statement splitting."""
+
+    def test_semicolon_in_literal(self):
+        """Test semicolons inside string literals do not split."""
+        statements = split_statements("SELECT 'a;b'; SELECT 2")
+        self.assertEqual(statements, ["SELECT 'a;b';", "SELECT 2"])
+
+    def test_trigger_body(self):
+        """Test trigger bodies stay in one statement."""
+        script = ("CREATE TRIGGER tr AFTER INSERT ON t BEGIN "
+                  "UPDATE t SET a = 1; DELETE FROM t WHERE a = 2; END;\nSELECT 1;")
+        statements = split_statements(script)
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[0].endswith('END;'))
+
+    def test_comment_only_tail(self):
+        """Test trailing comments are not treated as statements."""
+        self.assertEqual(split_statements("SELECT 1;\t--"), ["SELECT 1;"])
+        self.assertEqual(split_statements("-- nothing here"), [])
+
+
+class TestScriptRunner(unittest.TestCase):
+    """Test cases for ScriptRunner."""
+
+    def setUp(self):
+        """Set up test database."""
+        self.conn = sqlite3.connect(':memory:')
+        self.runner = ScriptRunner()
+
+    def tearDown(self):
+        """Close test database."""
+        self.conn.close()
+
+    def test_run_script(self):
+        """Test timing, rows, changes and lazy intermediate results."""
+        script = """
+            CREATE TABLE t (a INTEGER, b TEXT);
+            INSERT INTO t VALUES (1, 'x;y'), (2, 'z'), (3, 'w');
+            SELECT * FROM t WHERE a > 1;
+            UPDATE t SET b = 'u' WHERE a = 3;
+            SELECT count(*) AS n FROM t;
+        """
+        results = self.runner.run(self.conn, script)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[1]['changes'], 3)
+        self.assertEqual(results[3]['changes'], 1)
+
+        intermediate = results[2]
+        self.assertIsNone(intermediate['data'])
+        self.assertEqual(intermediate['rows'], 2)
+        self.assertEqual(intermediate['columns'], ['a', 'b'])
+        rows, columns = self.runner.fetch_temp_table(intermediate['temp_table'])
+        self.assertEqual(rows, [(2, 'z'), (3, 'w')])
+
+        self.assertEqual(results[4]['columns'], ['n'])
+        self.assertEqual(results[4]['data'], [(3,)])
+        self.assertTrue(all(result['elapsed'] >= 0 for result in results))
+        self.assertFalse(self.conn.in_transaction)
+
+    def test_bound_parameters(self):
+        """Test parameters are bound per statement."""
+        script = "CREATE TABLE t (a TEXT); INSERT INTO t VALUES ('{v}'); SELECT a FROM t WHERE a = '{v}';"
+        results = self.runner.run(self.conn, script, {'v': "it's"}, bind=True)
+        self.assertEqual(results[-1]['data'], [("it's",)])
+
+    def test_max_rows(self):
+        """Test last result is truncated to max_rows."""
+        results = self.runner.run(self.conn, "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 10) SELECT x FROM c", max_rows=4)
+        self.assertEqual(results[0]['rows'], 4)
+        self.assertTrue(results[0]['truncated'])
+
+    def test_rollback_on_error(self):
+        """Test failing script is rolled back as a whole."""
+        self.conn.execute('CREATE TABLE t (a INTEGER)')
+        with self.assertRaises(sqlite3.Error):
+            self.runner.run(self.conn, "INSERT INTO t VALUES (1); SELECT * FROM missing; INSERT INTO t VALUES (2);")
+        self.assertEqual(self.conn.execute('SELECT count(*) FROM t').fetchone()[0], 0)
+
+    def test_own_transactions(self):
+        """Test a script with its own BEGIN/COMMIT is not wrapped in another transaction."""
+        self.conn.execute('CREATE TABLE t (a INTEGER)')
+        results = self.runner.run(self.conn, "BEGIN; INSERT INTO t VALUES (1); COMMIT; "
+                                             "BEGIN; INSERT INTO t VALUES (2); ROLLBACK; SELECT a FROM t;")
+        self.assertEqual(results[-1]['data'], [(1,)])
+        self.assertFalse(self.conn.in_transaction)
+        with self.assertRaises(sqlite3.Error):
+            self.runner.run(self.conn, "BEGIN; INSERT INTO t VALUES (3); SELECT * FROM missing; COMMIT;")
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual(self.conn.execute('SELECT count(*) FROM t').fetchone()[0], 1)
+
+    def test_temp_tables_dropped_on_next_run(self):
+        """Test intermediate results of the previous run are dropped."""
+        self.runner.run(self.conn, "SELECT 1 AS a; SELECT 2;")
+        self.runner.run(self.conn, "SELECT 3;")
+        temp_tables = self.conn.execute("SELECT name FROM sqlite_temp_master WHERE type = 'table'").fetchall()
+        self.assertEqual(temp_tables, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the columnar session format.
+"""
+
+import unittest
+import zipfile
+import tempfile
+import shutil
+import json
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.session_format import (
+    encode_table, decode_table, split_session_data, read_session_csv_data, session_manifest,
+    SessionArchive, CSV_DATA_MEMBER
+)
+
+
+class TestSessionFormat(unittest.TestCase):
+    """Test cases for csv_data encoding and session compatibility."""
+
+    def test_round_trip_types(self):
+        """Test values and types survive encoding."""
+        data = [
+            ['a', 1, 1.5, None, 'ünïcødé;\n"x"', True],
+            ['', 2, float('inf'), 'x', '', 3],
+            [None, 3, -0.25, None, 'z', 'mixed'],
+        ]
+        self.assertEqual(decode_table(encode_table(data)), data)
+
+    def test_ragged_and_empty(self):
+        """Test rows of different lengths and empty tables."""
+        data = [['a', 'b', 'c'], ['d'], []]
+        self.assertEqual(decode_table(encode_table(data)), data)
+        self.assertEqual(decode_table(encode_table([])), [])
+        self.assertEqual(decode_table(encode_table([[], []])), [[], []])
+
+    def test_large_integers(self):
+        """Test integers beyond int64 fall back to exact storage."""
+        data = [[2 ** 70], [None], [5]]
+        self.assertEqual(decode_table(encode_table(data)), data)
+
+    def test_smaller_than_json(self):
+        """Test columnar blob is much smaller than indented JSON."""
+        data = [[str(i), f'name {i % 100}', 'constant'] for i in range(20000)]
+        blob = encode_table(data)
+        self.assertLess(len(blob) * 5, len(json.dumps(data, indent=2)))
+
+    def test_session_zip_round_trip(self):
+        """Test new sessions use the member and legacy JSON sessions still load."""
+        data = [['1', 'x'], ['2', 'y']]
+        session_data, blob = split_session_data({'csv_data': data, 'csv_headers': ['a', 'b']})
+        self.assertNotIn('csv_data', session_data)
+        self.assertEqual(session_data['format_version'], 2)
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zf:
+            zf.writestr(CSV_DATA_MEMBER, blob)
+        with zipfile.ZipFile(buffer) as zf:
+            self.assertEqual(read_session_csv_data(session_data, zf), data)
+            self.assertEqual(read_session_csv_data({'csv_data': data}, zf), data)
+
+    def test_session_archive_parts(self):
+        """Test parts are read individually and legacy sessions are supported."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, 'session.zip')
+            session_data, blob = split_session_data(session_manifest({'csv_data': [['1']], 'csv_headers': ['a']}))
+            with zipfile.ZipFile(path, 'w') as zf:
+                zf.writestr('session.json', json.dumps(session_data))
+                zf.writestr('history.json', json.dumps([{'name': 'g', 'queries': []}]))
+                zf.writestr(CSV_DATA_MEMBER, blob)
+                zf.writestr('session_db.sqlite', b'db bytes')
+            archive = SessionArchive(path)
+            self.assertEqual(archive.read_csv_data(), [['1']])
+            self.assertEqual(archive.read_json_part('history')[0]['name'], 'g')
+            target = archive.extract_part('database', os.path.join(temp_dir, 'db.sqlite'))
+            with open(target, 'rb') as f:
+                self.assertEqual(f.read(), b'db bytes')
+
+            legacy_path = os.path.join(temp_dir, 'legacy.zip')
+            with zipfile.ZipFile(legacy_path, 'w') as zf:
+                zf.writestr('session.json', json.dumps({'csv_data': [['x']], 'csv_headers': ['a']}))
+            legacy = SessionArchive(legacy_path)
+            self.assertTrue(legacy.has_part('csv_data'))
+            self.assertFalse(legacy.has_part('database'))
+            self.assertEqual(legacy.read_csv_data(), [['x']])
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Unit tests for session autosave journaling.
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import shutil
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.session_journal import SessionChangeTracker, SessionJournal, JOURNAL_FILE
+
+
+class TestSessionChangeTracker(unittest.TestCase):
+    """Test cases for collecting changes between autosaves."""
+
+    def test_cells_then_snapshot(self):
+        """Test cell edits become a cells entry and structure changes a snapshot."""
+        tracker = SessionChangeTracker()
+        data = [['a', 'b'], ['c', 'd']]
+        tracker.mark_cell(1, 0, 'x')
+        tracker.mark_cell(1, 0, 'y')
+        self.assertEqual(tracker.take_entries(['h1', 'h2'], data),
+                         [{'type': 'cells', 'cells': [[1, 0, 'y']]}])
+        self.assertEqual(tracker.take_entries(['h1', 'h2'], data), [])
+
+        tracker.mark_cell(0, 0, 'z')
+        tracker.mark_structure()
+        tracker.mark_cell(0, 1, 'w')
+        entries = tracker.take_entries(['h1', 'h2'], data)
+        self.assertEqual([entry['type'] for entry in entries], ['csv_snapshot'])
+        data[0][0] = 'changed later'
+        self.assertEqual(entries[0]['data'][0][0], 'a')
+
+    def test_history_queries(self):
+        """Test only the queries added since the last call are journaled."""
+        tracker = SessionChangeTracker()
+        tracker.mark_history({'query': 'SELECT 1', 'timestamp': 't1'})
+        self.assertEqual(tracker.take_entries([], []),
+                         [{'type': 'history_queries', 'queries': [{'query': 'SELECT 1', 'timestamp': 't1'}]}])
+        tracker.mark_history({'query': 'SELECT 2', 'timestamp': 't2'})
+        self.assertEqual(tracker.take_entries([], [])[0]['queries'], [{'query': 'SELECT 2', 'timestamp': 't2'}])
+
+    def test_authorizer_marks_main_tables(self):
+        """Test written tables are recorded, reads and temp tables are not."""
+        tracker = SessionChangeTracker()
+        conn = sqlite3.connect(':memory:')
+        conn.set_authorizer(tracker.authorizer)
+        conn.execute('CREATE TABLE t (a)')
+        conn.execute('CREATE TEMP TABLE scratch (a)')
+        conn.execute('SELECT * FROM t').fetchall()
+        conn.execute('ALTER TABLE t ADD COLUMN b')
+        entries = tracker.take_entries([], [], conn.total_changes)
+        self.assertEqual(entries, [{'type': 'tables', 'tables': ['t']}])
+
+        # A cached statement is not authorized again; the change count still shows it
+        conn.execute('INSERT INTO t VALUES (1, 2)')
+        tracker.take_entries([], [], conn.total_changes)
+        conn.execute('INSERT INTO t VALUES (1, 2)')
+        self.assertEqual(tracker.take_entries([], [], conn.total_changes),
+                         [{'type': 'tables', 'tables': None}])
+        conn.close()
+
+
+class TestSessionJournal(unittest.TestCase):
+    """Test cases for writing and replaying the journal."""
+
+    def setUp(self):
+        """Create a journal directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.journal = SessionJournal(os.path.join(self.temp_dir, 'autosave'))
+
+    def tearDown(self):
+        """Remove the journal directory."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_replay(self):
+        """Test the last snapshot, later cells, history and tables are recovered."""
+        self.journal.start('session.zip', 'db.sqlite')
+        self.assertFalse(self.journal.has_changes())
+        self.journal.append([{'type': 'cells', 'cells': [[0, 0, 'lost']]}])
+        self.journal.append([
+            {'type': 'csv_snapshot', 'headers': ['a', 'b'], 'data': [['1', '2'], ['3', '4']]},
+            {'type': 'tables', 'tables': ['t1']}
+        ])
+        self.journal.append([
+            {'type': 'cells', 'cells': [[1, 1, 'x'], [5, 0, 'out of range']]},
+            {'type': 'history_queries', 'queries': [{'query': 'SELECT 1'}]},
+            {'type': 'history_queries', 'queries': [{'query': 'SELECT 2'}]},
+            {'type': 'tables', 'tables': ['t2']}
+        ])
+        self.assertTrue(self.journal.has_changes())
+
+        state = self.journal.replay()
+        self.assertEqual(state['session_path'], 'session.zip')
+        self.assertEqual(state['db_path'], 'db.sqlite')
+        self.assertEqual(state['csv_headers'], ['a', 'b'])
+        self.assertEqual(state['csv_data'], [['1', '2'], ['3', 'x']])
+        self.assertEqual(state['cells'], [])
+        self.assertEqual(state['history_queries'], [{'query': 'SELECT 1'}, {'query': 'SELECT 2'}])
+        self.assertEqual(state['tables'], ['t1', 't2'])
+
+    def test_torn_line_and_discard(self):
+        """Test a partially written last line is ignored and discard removes all files."""
+        self.journal.start(None, None)
+        self.journal.append([{'type': 'cells', 'cells': [[0, 0, 'kept']]}])
+        self.journal.append([{'type': 'csv_snapshot', 'headers': ['a'], 'data': [['1']]}])
+        with open(self.journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"type": "cells", "cel')
+
+        state = self.journal.replay()
+        self.assertEqual(state['csv_data'], [['1']])
+        self.assertEqual(state['tables'], [])
+
+        # Starting a new journal drops the previous one
+        self.journal.start(None, None)
+        self.assertFalse(self.journal.has_changes())
+        self.journal.discard()
+        self.assertEqual(os.listdir(self.journal.directory), [])
+        self.assertFalse(os.path.exists(os.path.join(self.journal.directory, JOURNAL_FILE)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Unit tests for query parameter binding.
+"""
+
+import unittest
+import sqlite3
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.sql_params import (
+    substitute_parameters, to_bind_parameters, parse_parameter_sets,
+    execute_bound, execute_batch
+)
+
+
+class TestSqlParams(unittest.TestCase):
+    """Test cases for parameter substitution and binding."""
+
+    def setUp(self):
+        """Set up test database."""
+        self.conn = sqlite3.connect(':memory:', cached_statements=16)
+        self.conn.execute('CREATE TABLE tasks (num TEXT, status TEXT)')
+        self.conn.executemany('INSERT INTO tasks VALUES (?, ?)',
+                              [('1', 'open'), ('2', 'closed'), ('3', 'open')])
+
+    def tearDown(self):
+        """Close test database."""
+        self.conn.close()
+
+    def test_substitute_parameters(self):
+        """Test plain text substitution is unchanged."""
+        query = substitute_parameters("SELECT * FROM t WHERE a = {a}", {'a': 5})
+        self.assertEqual(query, "SELECT * FROM t WHERE a = 5")
+
+    def test_bare_and_quoted_placeholders(self):
+        """Test both bare and quoted placeholders become named parameters."""
+        query, bindings = to_bind_parameters(
+            "SELECT * FROM t WHERE a = {a} AND b = '{b}'", {'a': 5, 'b': 'x'})
+        self.assertEqual(query, "SELECT * FROM t WHERE a = :a AND b = :b")
+        self.assertEqual(bindings, {'a': 5, 'b': 'x'})
+
+    def test_unknown_and_invalid_keys(self):
+        """Test unknown keys are kept and invalid names fall back to text."""
+        query, bindings = to_bind_parameters(
+            "SELECT {missing}, '{bad key}'", {'bad key': 'v'})
+        self.assertEqual(query, "SELECT {missing}, 'v'")
+        self.assertEqual(bindings, {})
+
+    def test_placeholders_inside_literals(self):
+        """Test a placeholder inside a longer literal is bound into a concatenation."""
+        query, bindings = to_bind_parameters(
+            "SELECT * FROM tasks WHERE status LIKE '%{s}%' AND \"{col}\" = 'a{x}'", {'s': 'pe', 'col': 'num', 'x': 'b'})
+        self.assertEqual(query, "SELECT * FROM tasks WHERE status LIKE '%' || :s || '%' AND \"num\" = 'a' || :x")
+        self.assertEqual(bindings, {'s': 'pe', 'x': 'b'})
+        cursor = execute_bound(self.conn, "SELECT count(*) FROM tasks WHERE status LIKE '%{s}%'", {'s': 'pe'})
+        self.assertEqual(cursor.fetchone()[0], 2)
+
+    def test_statement_text_stable_across_values(self):
+        """Test different values produce the same statement text."""
+        first, _ = to_bind_parameters("SELECT * FROM tasks WHERE num = '{n}'", {'n': '1'})
+        second, _ = to_bind_parameters("SELECT * FROM tasks WHERE num = '{n}'", {'n': '2'})
+        self.assertEqual(first, second)
+
+    def test_execute_bound(self):
+        """Test executing with bound values."""
+        cursor = execute_bound(self.conn, "SELECT count(*) FROM tasks WHERE status = '{s}'", {'s': 'open'})
+        self.assertEqual(cursor.fetchone()[0], 2)
+
+    def test_parse_parameter_sets(self):
+        """Test parsing tab-separated parameter sets."""
+        sets = parse_parameter_sets("num\tstatus\n1\tdone\n3\n")
+        self.assertEqual(sets, [{'num': '1', 'status': 'done'}, {'num': '3', 'status': ''}])
+        self.assertEqual(parse_parameter_sets("num\n"), [])
+
+    def test_execute_batch(self):
+        """Test one prepared statement runs over all parameter sets."""
+        changed = execute_batch(
+            self.conn,
+            "UPDATE tasks SET status = '{status}' WHERE num = '{num}'",
+            {'status': 'done'},
+            [{'num': '1'}, {'num': '3'}]
+        )
+        self.assertEqual(changed, 2)
+        rows = self.conn.execute("SELECT num FROM tasks WHERE status = 'done' ORDER BY num").fetchall()
+        self.assertEqual(rows, [('1',), ('3',)])
+
+    def test_execute_batch_empty(self):
+        """Test empty batch does nothing."""
+        self.assertEqual(execute_batch(self.conn, "DELETE FROM tasks", {}, []), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the cached table catalog and Excel group detection.
+"""
+
+import unittest
+import sqlite3
+import random
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.table_catalog import TableCatalog, group_table_names
+
+
+def quadratic_grouping(table_names):
+    """Grouping as TableManager.refresh_tables did it before the catalog."""
+    excel_groups = {}
+    standalone = []
+    for table_name in table_names:
+        if table_name.startswith('sqlite_'):
+            continue
+        if '_' in table_name:
+            potential_file = '_'.join(table_name.split('_')[:-1])
+            similar = [t for t in table_names if t.startswith(potential_file + '_') and not t.startswith('sqlite_')]
+            if len(similar) > 1:
+                excel_groups.setdefault(potential_file, []).append(table_name)
+            else:
+                standalone.append(table_name)
+        else:
+            standalone.append(table_name)
+    groups = []
+    for file_name, members in excel_groups.items():
+        if len(members) > 1:
+            groups.append((file_name, sorted(members)))
+        else:
+            standalone.extend(members)
+    return groups, sorted(standalone)
+
+
+class TestTableCatalog(unittest.TestCase):
+    """Test cases for table grouping and schema change detection."""
+
+    def test_grouping(self):
+        """Test sheets of one file are grouped and single prefixes stay standalone."""
+        names = sorted(['sales_2023', 'sales_2024', 'report_q1_north', 'report_q1_south',
+                        'report_summary', 'customers', 'single_sheet', 'sqlite_sequence',
+                        'csvq_merkle_rows', 'csvq_merkle_trees'])
+        groups, standalone = group_table_names(names)
+        self.assertEqual(groups, [('report_q1', ['report_q1_north', 'report_q1_south']),
+                                  ('sales', ['sales_2023', 'sales_2024'])])
+        self.assertEqual(standalone, ['customers', 'report_summary', 'single_sheet'])
+
+    def test_same_result_as_previous_grouping(self):
+        """Test the one-pass grouping matches the previous pairwise scan."""
+        rng = random.Random(7)
+        parts = ['a', 'b', 'ab', '', 'x1', 'sheet']
+        for _ in range(50):
+            names = sorted({'_'.join(rng.choice(parts) for _ in range(rng.randint(1, 4)))
+                            for _ in range(rng.randint(1, 30))})
+            self.assertEqual(group_table_names(names), quadratic_grouping(names), names)
+
+    def test_refresh_only_on_schema_change(self):
+        """Test the catalog is reloaded only after DDL."""
+        conn = sqlite3.connect(':memory:')
+        catalog = TableCatalog()
+        conn.execute('CREATE TABLE b (x)')
+        self.assertTrue(catalog.refresh(conn))
+        conn.execute('INSERT INTO b VALUES (1)')
+        self.assertFalse(catalog.refresh(conn))
+        conn.execute('CREATE TABLE a (x)')
+        self.assertTrue(catalog.refresh(conn))
+        self.assertEqual(catalog.table_names, ['a', 'b'])
+        conn.execute('DROP TABLE a')
+        self.assertTrue(catalog.refresh(conn))
+        self.assertEqual(catalog.table_names, ['b'])
+        catalog.invalidate()
+        self.assertTrue(catalog.refresh(conn))
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
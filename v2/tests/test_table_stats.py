@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Unit tests for table statistics and their cache.
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import random
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.table_stats import TableStatsCache, compute_table_stats, format_size, sample_rowids
+from utils.session_journal import SessionChangeTracker
+
+
+class TestTableStats(unittest.TestCase):
+    """Test cases for computing and caching table statistics."""
+
+    def setUp(self):
+        """Create a database with a small and a larger table."""
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute('CREATE TABLE people ("full name" TEXT, age INTEGER)')
+        self.conn.executemany('INSERT INTO people VALUES (?, ?)',
+                              [('Ann', 31), ('Bob', None), ('Ann', 45), (None, 31)])
+        self.conn.execute('CREATE TABLE big (id INTEGER, grp TEXT)')
+        self.conn.executemany('INSERT INTO big VALUES (?, ?)', [(i, f'g{i % 5}') for i in range(5000)])
+
+    def tearDown(self):
+        """Close the database."""
+        self.conn.close()
+
+    def test_full_profile(self):
+        """Test row count, size and exact column profiles of a small table."""
+        stats = compute_table_stats(self.conn, 'people')
+        self.assertEqual(stats['row_count'], 4)
+        self.assertFalse(stats['sampled'])
+        self.assertEqual(stats['columns'][0], {'name': 'full name', 'type': 'TEXT', 'nulls': 1,
+                                               'distinct': 2, 'min': 'Ann', 'max': 'Bob'})
+        self.assertEqual(stats['columns'][1]['nulls'], 1)
+        self.assertEqual(stats['columns'][1]['distinct'], 2)
+        if stats['size'] is not None:
+            self.assertGreater(stats['size']['table'], 0)
+
+    def test_sampled_profile(self):
+        """Test big tables are profiled on a rowid sample but counted exactly."""
+        stats = compute_table_stats(self.conn, 'big', sample_rows=1000, rng=random.Random(3))
+        self.assertEqual(stats['row_count'], 5000)
+        self.assertTrue(stats['sampled'])
+        self.assertLessEqual(stats['profiled_rows'], 1000)
+        self.assertGreater(stats['profiled_rows'], 0)
+        self.assertEqual(stats['columns'][1]['distinct'], 5)
+
+        rowids = sample_rowids(self.conn, 'big', 1000, random.Random(3))
+        self.assertEqual(rowids, sorted(set(rowids)))
+        self.conn.execute('CREATE TABLE keyed (k PRIMARY KEY, v) WITHOUT ROWID')
+        self.conn.executemany('INSERT INTO keyed VALUES (?, ?)', [(i, i) for i in range(50)])
+        self.assertIsNone(sample_rowids(self.conn, 'keyed', 10))
+        self.assertEqual(compute_table_stats(self.conn, 'keyed', sample_rows=10)['profiled_rows'], 10)
+
+    def test_cache_follows_database_writes(self):
+        """Test cached statistics stay valid until the database is written to, however it is written."""
+        tracker = SessionChangeTracker()
+        self.conn.set_authorizer(tracker.authorizer)
+        cache = TableStatsCache()
+
+        def signature(conn, table):
+            data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+            return tracker.table_versions.get(table, 0), conn.total_changes, data_version
+
+        for table in ('people', 'big'):
+            cache.put(table, signature(self.conn, table), compute_table_stats(self.conn, table))
+        self.assertIsNotNone(cache.get('big', signature(self.conn, 'big')))
+        self.conn.execute("INSERT INTO people VALUES ('Cy', 20)")
+        self.assertIsNone(cache.get('people', signature(self.conn, 'people')))
+
+        # A cached statement is not re-authorized, so a write to another table must not hide it
+        cache.put('people', signature(self.conn, 'people'), compute_table_stats(self.conn, 'people'))
+        self.conn.execute("INSERT INTO big VALUES (-1, 'x')")
+        self.conn.execute("INSERT INTO people VALUES ('Cy', 20)")
+        self.assertIsNone(cache.get('people', signature(self.conn, 'people')))
+
+        # Commits of another connection
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'stats.sqlite')
+            conn = sqlite3.connect(path)
+            conn.execute('CREATE TABLE t (x)')
+            conn.commit()
+            cache.put('t', signature(conn, 't'), compute_table_stats(conn, 't'))
+            other = sqlite3.connect(path)
+            other.execute('INSERT INTO t VALUES (1)')
+            other.commit()
+            other.close()
+            self.assertIsNone(cache.get('t', signature(conn, 't')))
+            conn.close()
+
+    def test_format_size(self):
+        """Test byte sizes are shown with a unit."""
+        self.assertEqual(format_size(None), 'n/a')
+        self.assertEqual(format_size(512), '512 B')
+        self.assertEqual(format_size(3 * 1024 * 1024), '3.0 MB')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the paged SQLite table window used by the CSV editor.
+"""
+
+import unittest
+import sqlite3
+import random
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.table_window import SQLiteTableWindow, TableEditQueue, WindowPages
+
+
+class TestSQLiteTableWindow(unittest.TestCase):
+    """Test cases for paging, filtering and writing back table rows."""
+
+    def setUp(self):
+        """Create a table with mixed values and NULLs."""
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute('CREATE TABLE items (name TEXT, "unit price" REAL, qty)')
+        rng = random.Random(5)
+        names = ['Apple', 'apple pie', 'Яблоко', 'Pear', '100%_pure', None]
+        self.rows = [(rng.choice(names), rng.choice([None, 1.5, 2.0, 10.0]), rng.choice([None, 1, 'x', 3]))
+                     for _ in range(1234)]
+        self.conn.executemany('INSERT INTO items VALUES (?, ?, ?)', self.rows)
+
+    def tearDown(self):
+        """Close the database."""
+        self.conn.close()
+
+    def read_all(self, window, reset_keys=False):
+        """Read pages until a short one, optionally without keyset positions."""
+        rowids, page = [], 0
+        while True:
+            if reset_keys:
+                window.page_keys = {}
+            page_rowids, rows = window.fetch_page(page)
+            self.assertEqual(len(page_rowids), len(rows))
+            rowids += page_rowids
+            if len(rows) < window.page_size:
+                return rowids
+            page += 1
+
+    def test_keyset_paging_matches_offset(self):
+        """Test paging from the last row key gives the same rows as OFFSET in every sort."""
+        for column in (None, 'name', 'unit price', 'qty'):
+            for descending in (False, True):
+                window = SQLiteTableWindow(self.conn, 'items', page_size=100)
+                window.set_sort(column, descending)
+                keyset = self.read_all(window)
+                self.assertEqual(keyset, self.read_all(window, reset_keys=True), (column, descending))
+                self.assertEqual(sorted(keyset), list(range(1, len(self.rows) + 1)))
+                direction = ' DESC' if descending else ''
+                order = f'"{column}"{direction}, rowid{direction}' if column else f'rowid{direction}'
+                expected = [r[0] for r in self.conn.execute(f'SELECT rowid FROM items ORDER BY {order}')]
+                self.assertEqual(keyset, expected)
+
+    def test_filters_match_editor(self):
+        """Test pushed-down filters and search select what the editor would show."""
+        window = SQLiteTableWindow(self.conn, 'items', page_size=50)
+
+        def shown(filters, search=None):
+            window.set_filters(filters, search)
+            return len(self.read_all(window)), self.conn.execute(*window.count_query()).fetchone()[0]
+
+        def text(value):
+            return '' if value is None else str(value)
+
+        count = sum(1 for r in self.rows if 'apple' in text(r[0]).lower())
+        self.assertEqual(shown({'name': [{'value': 'APPLE', 'type': 'contains'}]}), (count, count))
+        count = sum(1 for r in self.rows if text(r[0]).lower().startswith('я'))
+        self.assertEqual(shown({'name': [{'value': 'Я', 'type': 'starts_with'}]}), (count, count))
+        count = sum(1 for r in self.rows if '%_' in text(r[0]))
+        self.assertEqual(shown({'name': [{'value': '%_', 'type': 'contains'}]}), (count, count))
+        count = sum(1 for r in self.rows if text(r[1]) in ('1.5', '') and text(r[2]) != 'x')
+        self.assertEqual(shown({'unit price': [{'value': '1.5', 'type': 'equals'}, {'value': '', 'type': 'equals'}],
+                                'qty': [{'value': 'x', 'type': 'not_equals'}]}), (count, count))
+
+        count = sum(1 for r in self.rows if 'pie' in text(r[0]).lower() or text(r[2]) == 'x')
+        self.assertEqual(shown({}, {'text': 'PIE x', 'mode': 'any'}), (count, count))
+        count = sum(1 for r in self.rows if text(r[0]) == 'Pear')
+        self.assertEqual(shown({}, {'text': 'Pear', 'mode': 'exact', 'case': True, 'columns': ['name']}), (count, count))
+        count = sum(1 for r in self.rows if text(r[0]).lower().startswith('apple'))
+        self.assertEqual(shown({}, {'text': '^apple', 'mode': 'regex', 'columns': ['name']}), (count, count))
+
+    def test_batched_write_back(self):
+        """Test queued edits are written by rowid on flush and repeated edits collapse."""
+        window = SQLiteTableWindow(self.conn, 'items', page_size=10)
+        rowids, _ = window.fetch_page(0)
+        window.queue_update(rowids[0], 'name', 'first')
+        window.queue_update(rowids[0], 'name', 'changed')
+        window.queue_update(rowids[3], 'unit price', '7')
+        self.assertEqual(self.conn.total_changes, len(self.rows))
+        self.assertEqual(window.flush(), 2)
+        self.assertEqual(self.conn.execute('SELECT name FROM items WHERE rowid = ?', (rowids[0],)).fetchone()[0],
+                         'changed')
+        self.assertEqual(self.conn.execute('SELECT "unit price" FROM items WHERE rowid = ?', (rowids[3],)).fetchone()[0],
+                         7.0)
+        self.assertEqual(window.flush(), 0)
+
+        window.set_filters({'name': [{'value': 'changed', 'type': 'equals'}]})
+        self.assertEqual(sum(len(rows) for rows in window.iter_rows(batch_size=1)), 1)
+
+    def test_queue_collapses_to_net_changes(self):
+        """Test edits of new, deleted and dropped rows and columns fold into the right statements."""
+        window = SQLiteTableWindow(self.conn, 'items', page_size=10)
+        rowids, _ = window.fetch_page(0)
+        new_row = window.queue_insert({})
+        window.queue_update(new_row, 'name', 'Plum')
+        dropped_row = window.queue_insert({'name': 'gone'})
+        window.queue_delete(dropped_row)
+        window.queue_update(rowids[1], 'name', 'deleted anyway')
+        window.queue_delete(rowids[1])
+        window.queue_add_column('note')
+        window.queue_update(rowids[2], 'note', 'checked')
+        window.queue_add_column('scratch')
+        window.queue_update(rowids[2], 'scratch', 'x')
+        window.queue_drop_column('scratch')
+        window.queue_drop_column('qty')
+        self.assertEqual(len(window.edits), 5)
+
+        window.flush()
+        rowid = window.inserted[new_row]
+        self.assertEqual(list(window.inserted), [new_row])
+        self.assertEqual(self.conn.execute('SELECT name, note FROM items WHERE rowid = ?', (rowid,)).fetchone(),
+                         ('Plum', None))
+        self.assertIsNone(self.conn.execute('SELECT 1 FROM items WHERE rowid = ?', (rowids[1],)).fetchone())
+        self.assertEqual(self.conn.execute('SELECT note FROM items WHERE rowid = ?', (rowids[2],)).fetchone()[0],
+                         'checked')
+        self.assertEqual([row[1] for row in self.conn.execute('PRAGMA table_info(items)')],
+                         ['name', 'unit price', 'note'])
+        self.assertEqual(window.columns, ['name', 'unit price', 'note'])
+        self.assertEqual(self.conn.execute('SELECT count(*) FROM items').fetchone()[0], len(self.rows))
+
+    def test_failed_flush_rolls_back(self):
+        """Test a failing statement undoes the whole batch, including ALTER TABLE."""
+        self.conn.execute('CREATE TABLE strict_items (id INTEGER PRIMARY KEY, name TEXT NOT NULL)')
+        self.conn.execute("INSERT INTO strict_items VALUES (1, 'a')")
+        self.conn.commit()
+        queue = TableEditQueue()
+        queue.add_column('extra')
+        queue.update(1, 'name', 'b')
+        queue.insert({'id': 5})
+        with self.assertRaises(sqlite3.IntegrityError):
+            queue.flush(self.conn, 'strict_items')
+        self.assertEqual(self.conn.execute('SELECT * FROM strict_items').fetchall(), [(1, 'a')])
+        self.assertEqual(len(queue), 3)
+
+    def test_window_pages_after_adding_rows(self):
+        """Test an added row does not skip the next page, and sliding keeps absolute row numbers."""
+        window = SQLiteTableWindow(self.conn, 'items', page_size=100)
+        pages = WindowPages()
+        rowids, _ = window.fetch_page(0)
+        pages.reset(len(rowids))
+        window.queue_insert({})
+        pages.add_row()
+        self.assertEqual(pages.next_page(), 1)
+
+        rowids, _ = window.fetch_page(pages.next_page())
+        self.assertEqual(rowids, list(range(101, 201)))
+        pages.append(len(rowids))
+        pages.remove_row(5)
+        self.assertEqual(pages.counts, [100, 100])
+        self.assertEqual(pages.drop_first(), 100)
+        self.assertEqual((pages.first_page, pages.first_row), (1, 100))
+        self.assertEqual(pages.next_page(), 2)
+        pages.prepend(100)
+        self.assertEqual((pages.first_page, pages.first_row), (0, 0))
+        self.assertEqual(pages.drop_last(), 100)
+
+    def test_without_rowid(self):
+        """Test tables without rowid are reported as not pageable."""
+        self.conn.execute('CREATE TABLE keyed (k PRIMARY KEY) WITHOUT ROWID')
+        self.assertTrue(SQLiteTableWindow.has_rowid(self.conn, 'items'))
+        self.assertFalse(SQLiteTableWindow.has_rowid(self.conn, 'keyed'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the streaming session zip writer.
+"""
+
+import unittest
+import sqlite3
+import zipfile
+import tempfile
+import shutil
+import zlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.zip_stream import StreamingZipWriter, ZipWriteCancelled, deflate_blocks
+from utils.session_format import database_snapshot
+
+
+class TestStreamingZipWriter(unittest.TestCase):
+    """Test cases for writing zip members from streams."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'session.zip')
+        self.data = b''.join(f'{i},name {i % 97},{i * 3.5}\n'.encode() for i in range(200000))
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_parallel_deflate_is_one_stream(self):
+        """Test blocks compressed in parallel decompress to the original data."""
+        blocks = [self.data[i:i + 65536] for i in range(0, len(self.data), 65536)]
+        compressed = b''.join(deflate_blocks(blocks, 6, workers=3))
+        self.assertEqual(zlib.decompress(compressed, -15), self.data)
+        self.assertLess(len(compressed), len(self.data) // 3)
+
+    def test_members_readable_by_zipfile(self):
+        """Test stored, deflated, unsized and non-ASCII members round trip."""
+        with StreamingZipWriter(self.path, workers=2) as zf:
+            zf.write_stream('session_db.sqlite', io.BytesIO(self.data), len(self.data), level=0)
+            zf.write_stream('unsized.bin', io.BytesIO(self.data))
+            zf.write_bytes('history.json', '{"name": "ünï"}'.encode('utf-8'))
+            zf.write_bytes('empty', b'')
+        with zipfile.ZipFile(self.path) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.getinfo('session_db.sqlite').compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(zf.getinfo('unsized.bin').compress_type, zipfile.ZIP_DEFLATED)
+            self.assertEqual(zf.read('unsized.bin'), self.data)
+            self.assertEqual(zf.read('history.json').decode('utf-8'), '{"name": "ünï"}')
+            self.assertEqual(zf.read('empty'), b'')
+        self.assertFalse(os.path.exists(self.path + '.part'))
+
+    def test_cancel_keeps_previous_file(self):
+        """Test a cancelled write leaves the existing archive untouched."""
+        with open(self.path, 'wb') as f:
+            f.write(b'previous')
+        progress = []
+
+        def report(done, total):
+            progress.append(done)
+            return done < total // 2
+
+        with self.assertRaises(ZipWriteCancelled):
+            with StreamingZipWriter(self.path, progress=report, total_size=len(self.data)) as zf:
+                zf.write_bytes('data', self.data)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), b'previous')
+        self.assertFalse(os.path.exists(self.path + '.part'))
+        self.assertTrue(progress)
+
+    def test_database_snapshot(self):
+        """Test the database is streamed from its file, including WAL content."""
+        db_path = os.path.join(self.temp_dir, 'db.sqlite')
+        conn = sqlite3.connect(db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE t (a)')
+        conn.executemany('INSERT INTO t VALUES (?)', [(i,) for i in range(1000)])
+        conn.commit()
+        memory_conn = sqlite3.connect(':memory:')
+        memory_conn.execute('CREATE TABLE m (a)')
+        try:
+            for source, table in ((conn, 't'), (memory_conn, 'm')):
+                with database_snapshot(source) as (db_file, size), \
+                        StreamingZipWriter(self.path) as zf:
+                    zf.write_stream('session_db.sqlite', db_file, size)
+                self.assertFalse(source.in_transaction)
+                with zipfile.ZipFile(self.path) as zf:
+                    zf.extract('session_db.sqlite', self.temp_dir + '/out_' + table)
+                copy = sqlite3.connect(os.path.join(self.temp_dir, 'out_' + table, 'session_db.sqlite'))
+                self.assertEqual(copy.execute(f'SELECT count(*) FROM {table}').fetchone()[0], 1000 if table == 't' else 0)
+                copy.close()
+        finally:
+            conn.close()
+            memory_conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
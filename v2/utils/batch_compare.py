@@ -0,0 +1,206 @@
+import multiprocessing
+import os
+import pickle
+import sqlite3
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from pandas import DataFrame
+
+from utils.chunked_compare import CompareCancelled
+from utils.fingerprints import FingerprintStore, cached_fingerprints, dataframe_fingerprint, file_source
+
+FRAME_CACHE_SIZE = 4  # Loaded files kept in memory by each worker process
+LOAD_SHARE = 0.3  # Part of the progress spent on loading the files
+SUMMARY_COLUMNS = ['file1', 'file2', 'plugin', 'is_equal', 'differences', 'seconds', 'decided_by', 'error']
+
+_frame_cache: 'OrderedDict[str, DataFrame]' = OrderedDict()  # Per worker process
+
+
+def comparison_pairs(count: int, baseline: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Pairs of file positions to compare: every pair, or each file against the baseline."""
+    if baseline is None:
+        return [(i, j) for i in range(count) for j in range(i + 1, count)]
+    return [(baseline, j) for j in range(count) if j != baseline]
+
+
+def load_file(path: str) -> DataFrame:
+    """Load a CSV or Excel file as the main window does."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return pd.read_csv(path)
+    elif ext in ['.xlsx', '.xls']:
+        return pd.read_excel(path)
+    raise ValueError(f"Unsupported file format: {ext}")
+
+
+def difference_count(result: Dict[str, Any]) -> int:
+    """Number of differences a plugin result reports, or its highlight rows."""
+    metadata = result.get('metadata', {})
+    for name in ('total_changes', 'total_differences', 'different_rows'):
+        if isinstance(metadata.get(name), (int, float)):
+            return int(metadata[name])
+    highlights = result.get('highlights')
+    return len(highlights) if isinstance(highlights, DataFrame) else 0
+
+
+def _load_task(path: str, frame_path: str, fingerprint: bool) -> Tuple[float, Optional[Dict[str, Any]]]:
+    """Load a file once and store it for the compare tasks; returns seconds and its fingerprint."""
+    start = time.perf_counter()
+    df = load_file(path)
+    with open(frame_path, 'wb') as handle:
+        pickle.dump(df, handle, pickle.HIGHEST_PROTOCOL)
+    return time.perf_counter() - start, dataframe_fingerprint(df) if fingerprint else None
+
+
+def _cached_frame(frame_path: str) -> DataFrame:
+    """A stored file, kept for the next tasks of this process that compare it."""
+    if frame_path in _frame_cache:
+        _frame_cache.move_to_end(frame_path)
+        return _frame_cache[frame_path]
+    with open(frame_path, 'rb') as handle:
+        df = pickle.load(handle)
+    _frame_cache[frame_path] = df
+    if len(_frame_cache) > FRAME_CACHE_SIZE:
+        _frame_cache.popitem(last=False)
+    return df
+
+
+def _compare_task(plugin, frame_path1: str, frame_path2: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one plugin on one pair of stored files; returns the result without its highlights."""
+    df1, df2 = _cached_frame(frame_path1), _cached_frame(frame_path2)
+    start = time.perf_counter()
+    result = plugin.compare(df1, df2, **parameters)
+    return {
+        'is_equal': bool(result.get('is_equal', False)),
+        'differences': difference_count(result),
+        'details': result.get('details', ''),
+        'error': result.get('metadata', {}).get('error'),
+        'seconds': time.perf_counter() - start
+    }
+
+
+def run_batch(paths: List[str], plugins: List[Any], baseline: Optional[int] = None,
+              parameters: Optional[Dict[str, Dict[str, Any]]] = None, store_path: Optional[str] = None,
+              workers: Optional[int] = None,
+              progress: Optional[Callable[[float, str], Optional[bool]]] = None) -> Dict[str, Any]:
+    """Compare many files pairwise, or each against a baseline, with every given plugin.
+
+    Pairs whose cached fingerprints (in the session database at
+    store_path) let a plugin decide are not loaded at all. Every other
+    file is loaded once, in a process pool, and stored for the compare
+    tasks, which run one per pair and plugin in the same pool; each worker
+    keeps the last FRAME_CACHE_SIZE files it used. parameters maps plugin
+    names to their parameters (defaults otherwise). A progress callback
+    returning False cancels the batch with CompareCancelled.
+
+    Returns 'summary' (one row per pair and plugin, in pair order, with
+    the compare time in seconds), 'details' (each row's details text),
+    'load_seconds' (per loaded file) and the total 'seconds'.
+    """
+    def report(fraction: float, message: str):
+        if progress is not None and progress(fraction, message) is False:
+            raise CompareCancelled("Batch comparison was cancelled")
+
+    started = time.perf_counter()
+    parameters = parameters or {}
+    names = [os.path.basename(path) for path in paths]
+    sources = []
+    for path in paths:
+        try:
+            sources.append(file_source(path))
+        except OSError:
+            sources.append(None)
+    try:
+        fingerprints = cached_fingerprints(store_path, sources)
+    except sqlite3.Error as e:
+        print(f"Failed to read fingerprints: {e}")
+        fingerprints = [None] * len(paths)
+
+    # Decide what the cached fingerprints can, queue the rest
+    rows, tasks = {}, []
+    for pair, (i, j) in enumerate(comparison_pairs(len(paths), baseline)):
+        for order, plugin in enumerate(plugins):
+            name = plugin.get_name()
+            plugin_parameters = parameters.get(name)
+            if plugin_parameters is None:
+                plugin_parameters = {key: spec.get('default') for key, spec in plugin.get_parameters().items()}
+            task_parameters = dict(plugin_parameters, store_path=store_path,
+                                   df1_source=sources[i], df2_source=sources[j])
+            row = {'file1': names[i], 'file2': names[j], 'plugin': name, 'seconds': 0.0, 'error': None}
+            decided = None
+            if fingerprints[i] is not None and fingerprints[j] is not None:
+                decided = plugin.compare_fingerprints(fingerprints[i], fingerprints[j], **task_parameters)
+            if decided is not None:
+                rows[pair, order] = dict(row, is_equal=bool(decided['is_equal']), differences=difference_count(decided),
+                                         details=decided.get('details', ''), decided_by='fingerprints')
+            else:
+                tasks.append(((pair, order), i, j, plugin, task_parameters, row))
+
+    load_seconds = {}
+    needed = sorted({i for _, i, _, _, _, _ in tasks} | {j for _, _, j, _, _, _ in tasks})
+    if tasks:
+        # Spawned workers: forking a process that runs Qt threads is unsafe
+        with tempfile.TemporaryDirectory(prefix='csvquery_batch_') as work_dir, \
+                ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                    mp_context=multiprocessing.get_context('spawn')) as executor:
+            try:
+                frame_paths = {k: os.path.join(work_dir, f'{k}.pickle') for k in needed}
+                futures = {executor.submit(_load_task, paths[k], frame_paths[k],
+                                           bool(store_path) and fingerprints[k] is None): k for k in needed}
+                load_errors, computed = {}, []
+                for done, future in enumerate(as_completed(futures), 1):
+                    k = futures[future]
+                    try:
+                        load_seconds[paths[k]], fingerprint = future.result()
+                        if fingerprint is not None and sources[k] is not None:
+                            computed.append((sources[k], fingerprint))
+                    except Exception as e:
+                        load_errors[k] = f"Failed to load {names[k]}: {e}"
+                    report(LOAD_SHARE * done / len(futures), f"Loaded {done} of {len(futures)} files")
+                if computed:
+                    try:
+                        conn = sqlite3.connect(store_path, timeout=5)
+                        try:
+                            store = FingerprintStore(conn)
+                            for source, fingerprint in computed:
+                                store.save(*source, fingerprint)
+                        finally:
+                            conn.close()
+                    except sqlite3.Error as e:
+                        print(f"Failed to store fingerprints: {e}")
+
+                futures = {}
+                for key, i, j, plugin, task_parameters, row in tasks:
+                    error = load_errors.get(i) or load_errors.get(j)
+                    if error:
+                        rows[key] = dict(row, is_equal=False, differences=None, details=error,
+                                         decided_by='compared', error=error)
+                    else:
+                        futures[executor.submit(_compare_task, plugin, frame_paths[i], frame_paths[j],
+                                                task_parameters)] = (key, row)
+                for done, future in enumerate(as_completed(futures), 1):
+                    key, row = futures[future]
+                    try:
+                        rows[key] = dict(row, decided_by='compared', **future.result())
+                    except Exception as e:
+                        rows[key] = dict(row, is_equal=False, differences=None, details=str(e),
+                                         decided_by='compared', error=str(e))
+                    report(LOAD_SHARE + (1 - LOAD_SHARE) * done / len(futures),
+                           f"Compared {done} of {len(futures)}")
+            except CompareCancelled:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+
+    ordered = [rows[key] for key in sorted(rows)]
+    summary = pd.DataFrame(ordered, columns=SUMMARY_COLUMNS)
+    return {
+        'summary': summary,
+        'details': [row['details'] for row in ordered],
+        'load_seconds': load_seconds,
+        'seconds': time.perf_counter() - started
+    }
@@ -0,0 +1,220 @@
+import os
+import pickle
+import sqlite3
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from plugins.row_compare import RowComparePlugin
+from utils.table_stats import quote_identifier
+
+CHUNK_ROWS = 100000  # Rows read from an input file at a time
+BUCKET_BYTES = 64 * 1024 * 1024  # Input bytes per bucket, bounds the memory of one bucket compare
+PREVIEW_ROWS = 10000  # Rows of each result table returned for display
+PARTITION_SHARE = 0.5  # Part of the progress spent on partitioning the inputs
+
+DIFFERENCES_TABLE = 'differences'
+CHANGED_FIELDS_TABLE = 'changed_fields'
+
+
+class CompareCancelled(Exception):
+    """Raised when the progress callback cancels the comparison."""
+
+
+def read_columns(path: str) -> List[str]:
+    """Column names of a CSV or Excel file, without reading its rows."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return list(pd.read_csv(path, nrows=0).columns)
+    elif ext in ['.xlsx', '.xls']:
+        return list(pd.read_excel(path, nrows=0).columns)
+    raise ValueError(f"Unsupported file format: {ext}")
+
+
+def read_chunks(path: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[Tuple[DataFrame, float]]:
+    """Chunks of a CSV or Excel file with every value as text, and the fraction read so far.
+
+    Excel files cannot be read in parts, so a sheet is loaded once and
+    then handed out in chunks.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        size = max(1, os.path.getsize(path))
+        with open(path, 'rb') as handle:
+            for chunk in pd.read_csv(handle, dtype=str, chunksize=chunk_rows):
+                yield chunk, min(1.0, handle.tell() / size)
+    elif ext in ['.xlsx', '.xls']:
+        df = pd.read_excel(path, dtype=str)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows], min(1.0, (start + chunk_rows) / len(df))
+    else:
+        raise ValueError(f"Unsupported file format: {ext}")
+
+
+def bucket_count(paths: List[str], bucket_bytes: int = BUCKET_BYTES) -> int:
+    """Number of buckets that keeps each bucket near bucket_bytes of input."""
+    size = sum(os.path.getsize(path) for path in paths)
+    return max(1, -(-size // bucket_bytes))
+
+
+def key_buckets(chunk: DataFrame, key_columns: List[str], buckets: int, plugin: RowComparePlugin,
+                ignore_case: bool = False, ignore_whitespace: bool = False) -> np.ndarray:
+    """Bucket of each row, from a hash of its key as the row comparison would match it."""
+    # Object columns, as the buckets are read back for the comparison
+    keys = plugin._prepare_dataframe(chunk[key_columns].astype(object), ignore_case, ignore_whitespace)
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    return (hashes % np.uint64(buckets)).astype(np.int64)
+
+
+def _records(df: DataFrame) -> Iterator[tuple]:
+    """Rows of a frame as tuples of Python values, missing values as None."""
+    return df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+
+def _create_table(conn: sqlite3.Connection, table: str, columns: List[str]):
+    """Create a result table with untyped columns."""
+    conn.execute(f"CREATE TABLE {quote_identifier(table)} "
+                 f"({', '.join(quote_identifier(col) for col in columns)})")
+
+
+def _append(conn: sqlite3.Connection, table: str, columns: List[str], df: DataFrame):
+    """Append the given columns of a frame to a table (missing columns as NULL)."""
+    if df.empty:
+        return
+    placeholders = ', '.join('?' * len(columns))
+    conn.executemany(f"INSERT INTO {quote_identifier(table)} VALUES ({placeholders})",
+                     _records(df.reindex(columns=columns)))
+
+
+def compare_files(path1: str, path2: str, key_columns: List[str], result_path: str,
+                  ignore_case: bool = False, ignore_whitespace: bool = False,
+                  buckets: Optional[int] = None, chunk_rows: int = CHUNK_ROWS,
+                  progress: Optional[Callable[[float, str], Optional[bool]]] = None) -> Dict[str, Any]:
+    """Compare two files by key without loading either of them into memory.
+
+    Both files are read in chunks and hash-partitioned by key into bucket
+    shards in a temporary SQLite database next to result_path. Matching
+    buckets are then compared one at a time with the keyed row comparison,
+    so memory is bounded by the largest bucket, and the differences are
+    appended to the 'differences' and 'changed_fields' tables of the
+    SQLite database at result_path. Values are compared as the text in
+    the files. A progress callback returning False cancels the comparison
+    with CompareCancelled.
+
+    Returns a result in the shape of a comparison plugin's, with the
+    first PREVIEW_ROWS rows of each result table.
+    """
+    def report(fraction: float, message: str):
+        if progress is not None and progress(fraction, message) is False:
+            raise CompareCancelled("Comparison was cancelled")
+
+    columns = [read_columns(path1), read_columns(path2)]
+    missing = [[col for col in key_columns if col not in side] for side in columns]
+    if not key_columns or missing[0] or missing[1]:
+        raise ValueError(f"Key columns missing - File 1: {missing[0]}, File 2: {missing[1]}"
+                         if key_columns else "Out-of-core comparison needs key columns")
+    buckets = buckets or bucket_count([path1, path2])
+    plugin = RowComparePlugin()
+
+    if os.path.exists(result_path):
+        os.remove(result_path)
+    parts_path = result_path + '.parts'
+    conn = sqlite3.connect(result_path)
+    try:
+        # Partitions are scratch data: no journal, no syncing
+        conn.execute("ATTACH DATABASE ? AS parts", (parts_path,))
+        conn.execute("PRAGMA parts.journal_mode = OFF")
+        conn.execute("PRAGMA parts.synchronous = OFF")
+        conn.execute("PRAGMA journal_mode = OFF")
+
+        # Pass 1: hash-partition both inputs by key. Each chunk's rows of a bucket are
+        # stored as one pickled shard, in file order, which avoids binding every value
+        conn.execute("CREATE TABLE parts.shards (side INTEGER, bucket INTEGER, data BLOB)")
+        for side, path in enumerate((path1, path2)):
+            row = 0
+            for chunk, fraction in read_chunks(path, chunk_rows):
+                chunk_buckets = key_buckets(chunk, key_columns, buckets, plugin, ignore_case, ignore_whitespace)
+                order = np.argsort(chunk_buckets, kind='stable')
+                starts = np.searchsorted(chunk_buckets[order], np.arange(buckets + 1))
+                conn.executemany("INSERT INTO parts.shards VALUES (?, ?, ?)", (
+                    (side, bucket, pickle.dumps(chunk.iloc[order[starts[bucket]:starts[bucket + 1]]],
+                                                pickle.HIGHEST_PROTOCOL))
+                    for bucket in range(buckets) if starts[bucket] < starts[bucket + 1]))
+                row += len(chunk)
+                report(PARTITION_SHARE * (side + fraction) / 2,
+                       f"Partitioning {os.path.basename(path)}: {row} rows")
+        conn.execute("CREATE INDEX parts.shards_bucket ON shards (bucket, side)")
+        conn.commit()
+
+        # Pass 2: compare bucket by bucket, streaming the differences out
+        result_columns = columns[0] + [col for col in columns[1] if col not in columns[0]] + ['_source', '_diff_type']
+        field_columns = list(key_columns) + ['column', 'old_value', 'new_value']
+        _create_table(conn, DIFFERENCES_TABLE, result_columns)
+        _create_table(conn, CHANGED_FIELDS_TABLE, field_columns)
+        counts = {'removed_count': 0, 'added_count': 0, 'modified_count': 0, 'changed_cells': 0}
+        for bucket in range(buckets):
+            frames = []
+            for side in range(2):
+                shards = [pickle.loads(data) for data, in conn.execute(
+                    "SELECT data FROM parts.shards WHERE bucket = ? AND side = ? ORDER BY rowid", (bucket, side))]
+                df = pd.concat(shards) if shards else pd.DataFrame(columns=columns[side])
+                df = df.reset_index(drop=True).astype(object)
+                frames.append(df)
+            if not (frames[0].empty and frames[1].empty):
+                result = plugin.compare(frames[0], frames[1], key_columns=key_columns,
+                                        ignore_case=ignore_case, ignore_whitespace=ignore_whitespace)
+                if 'error' in result['metadata']:
+                    raise ValueError(result['metadata']['error'])
+                for name in counts:
+                    counts[name] += result['metadata'][name]
+                _append(conn, DIFFERENCES_TABLE, result_columns, result['highlights'])
+                _append(conn, CHANGED_FIELDS_TABLE, field_columns, result['changed_fields'])
+                conn.commit()
+            report(PARTITION_SHARE + (1 - PARTITION_SHARE) * (bucket + 1) / buckets,
+                   f"Compared bucket {bucket + 1} of {buckets}")
+
+        highlights = pd.read_sql_query(f"SELECT * FROM {DIFFERENCES_TABLE} LIMIT ?", conn, params=(PREVIEW_ROWS,))
+        changed_fields = pd.read_sql_query(f"SELECT * FROM {CHANGED_FIELDS_TABLE} LIMIT ?", conn,
+                                           params=(PREVIEW_ROWS,))
+    finally:
+        conn.close()
+        if os.path.exists(parts_path):
+            os.remove(parts_path)
+
+    total_changes = counts['removed_count'] + counts['added_count'] + counts['modified_count']
+    details = f"Out-of-core row comparison results:\n"
+    details += f"- Rows only in first file: {counts['removed_count']}\n"
+    details += f"- Rows only in second file: {counts['added_count']}\n"
+    details += f"- Modified rows: {counts['modified_count']}\n"
+    details += f"- Total differences: {total_changes}"
+    if total_changes and len(highlights) < total_changes:
+        details += (f"\n\nShowing the first {len(highlights)} difference rows; "
+                    f"the '{DIFFERENCES_TABLE}' result table holds all of them")
+
+    return {
+        'is_equal': total_changes == 0,
+        'details': details,
+        'highlights': highlights,
+        'changed_fields': changed_fields,
+        'metadata': dict(counts, total_changes=total_changes, key_columns=key_columns,
+                         buckets=buckets, result_path=result_path)
+    }
+
+
+def export_result_table(result_path: str, table: str, csv_path: str, chunk_rows: int = CHUNK_ROWS) -> int:
+    """Write a result table of compare_files to CSV in chunks; returns the row count."""
+    conn = sqlite3.connect(result_path)
+    try:
+        rows = 0
+        query = f"SELECT * FROM {quote_identifier(table)}"
+        for chunk in pd.read_sql_query(query, conn, chunksize=chunk_rows):
+            chunk.to_csv(csv_path, mode='w' if rows == 0 else 'a', header=rows == 0, index=False)
+            rows += len(chunk)
+        if rows == 0:
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({quote_identifier(table)})")]
+            pd.DataFrame(columns=columns).to_csv(csv_path, index=False)
+        return rows
+    finally:
+        conn.close()
@@ -0,0 +1,148 @@
+import sqlite3
+from typing import Dict, Any
+
+DEFAULT_PROFILE = 'interactive'
+BULK_LOAD_PROFILE = 'bulk load'
+
+JOURNAL_MODES = ['DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF']
+SYNCHRONOUS_MODES = ['OFF', 'NORMAL', 'FULL', 'EXTRA']
+
+# Connection presets; sizes are in bytes (page_size) and MB (cache, mmap)
+CONNECTION_PRESETS = {
+    'bulk load': {
+        'page_size': 65536,
+        'cache_size_mb': 512,
+        'mmap_size_mb': 0,
+        'temp_store_memory': True,
+        'journal_mode': 'MEMORY',
+        'synchronous': 'OFF'
+    },
+    'interactive': {
+        'page_size': 16384,
+        'cache_size_mb': 256,
+        'mmap_size_mb': 1024,
+        'temp_store_memory': True,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL'
+    },
+    'safe': {
+        'page_size': 4096,
+        'cache_size_mb': 64,
+        'mmap_size_mb': 0,
+        'temp_store_memory': False,
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL'
+    }
+}
+
+# Settings keys for each profile field
+PROFILE_SETTINGS_KEYS = {
+    'page_size': 'sqlite_page_size',
+    'cache_size_mb': 'sqlite_cache_size_mb',
+    'mmap_size_mb': 'sqlite_mmap_size_mb',
+    'temp_store_memory': 'sqlite_temp_store_memory',
+    'journal_mode': 'sqlite_journal_mode',
+    'synchronous': 'sqlite_synchronous'
+}
+
+
+def get_preset(name: str) -> Dict[str, Any]:
+    """Return a copy of a named preset, falling back to the default one."""
+    return dict(CONNECTION_PRESETS.get(name, CONNECTION_PRESETS[DEFAULT_PROFILE]))
+
+
+def profile_from_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a connection profile from application settings.
+
+    The selected preset provides defaults; individual sqlite_* settings
+    override them.
+    """
+    profile = get_preset(settings.get('sqlite_profile', DEFAULT_PROFILE))
+    for field, key in PROFILE_SETTINGS_KEYS.items():
+        if key in settings and settings[key] not in (None, ''):
+            profile[field] = settings[key]
+    return profile
+
+
+def apply_connection_profile(conn: sqlite3.Connection, profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply profile PRAGMAs to a connection and return the effective values.
+
+    page_size only takes effect on an empty database or after VACUUM (and
+    not in WAL mode); the other settings apply immediately. A profile
+    without a journal_mode keeps the current one.
+    """
+    if conn.in_transaction:
+        conn.commit()
+
+    conn.execute(f"PRAGMA page_size = {int(profile['page_size'])}")
+    # Negative cache_size is in KiB
+    conn.execute(f"PRAGMA cache_size = {-int(profile['cache_size_mb']) * 1024}")
+    conn.execute(f"PRAGMA mmap_size = {int(profile['mmap_size_mb']) * 1024 * 1024}")
+    conn.execute(f"PRAGMA temp_store = {'MEMORY' if profile['temp_store_memory'] else 'DEFAULT'}")
+
+    journal_mode = str(profile.get('journal_mode', '')).upper()
+    if journal_mode in JOURNAL_MODES:
+        conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    synchronous = str(profile['synchronous']).upper()
+    if synchronous in SYNCHRONOUS_MODES:
+        conn.execute(f"PRAGMA synchronous = {synchronous}")
+
+    return read_connection_profile(conn)
+
+
+def read_connection_profile(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Read the current profile values of a connection."""
+    def pragma(name):
+        return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+    cache_size = pragma('cache_size')
+    page_size = pragma('page_size')
+    cache_bytes = -cache_size * 1024 if cache_size < 0 else cache_size * page_size
+    mmap_size = conn.execute("PRAGMA mmap_size").fetchone()
+    return {
+        'page_size': page_size,
+        'cache_size_mb': cache_bytes // (1024 * 1024),
+        'mmap_size_mb': (mmap_size[0] if mmap_size else 0) // (1024 * 1024),
+        'temp_store_memory': pragma('temp_store') == 2,
+        'journal_mode': str(pragma('journal_mode')).upper(),
+        'synchronous': SYNCHRONOUS_MODES[pragma('synchronous')]
+    }
+
+
+class BulkLoadProfile:
+    """Context manager switching a connection to the bulk load preset.
+
+    Nested use is a no-op, so an import that calls other importing helpers
+    only switches the profile once. The journal mode is kept: leaving WAL
+    fails while other connections (stats and row count workers, stores)
+    have the database open. On exit a failed import's pending rows are
+    rolled back, then the previous profile is restored.
+    """
+
+    def __init__(self, conn_getter, restore_profile_getter):
+        self.conn_getter = conn_getter
+        self.restore_profile_getter = restore_profile_getter
+        self.depth = 0
+
+    def __enter__(self):
+        self.depth += 1
+        conn = self.conn_getter()
+        if self.depth == 1 and conn is not None:
+            profile = get_preset(BULK_LOAD_PROFILE)
+            del profile['journal_mode']
+            apply_connection_profile(conn, profile)
+        return conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.depth -= 1
+        conn = self.conn_getter()
+        if self.depth == 0 and conn is not None:
+            try:
+                if exc_type is not None and conn.in_transaction:
+                    conn.rollback()
+                apply_connection_profile(conn, self.restore_profile_getter())
+            except sqlite3.Error:
+                # Leave the failing import's error as the one reported
+                if exc_type is None:
+                    raise
+        return False
@@ -0,0 +1,463 @@
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+import pandas as pd
+
+# Attached cache database holding materialized external tables
+CACHE_SCHEMA = 'external'
+DEFAULT_CHUNK_SIZE = 50000
+
+CSV_EXTENSIONS = {'.csv': ',', '.tsv': '\t', '.tab': '\t', '.txt': ','}
+PARQUET_EXTENSIONS = {'.parquet', '.pq'}
+SQLITE_EXTENSIONS = {'.sqlite', '.sqlite3', '.db', '.db3'}
+
+RESERVED_SCHEMAS = {'main', 'temp', CACHE_SCHEMA}
+
+IDENTIFIER = r'(?:"(?:[^"]|"")+"|\[[^\]]+\]|`[^`]+`|[A-Za-z_][\w$]*)'
+LITERAL = r"(?:'(?:[^']|'')*'|[-+]?\d+)"
+COLUMN_REF_RE = re.compile(rf'^(?:(?P<qualifier>{IDENTIFIER})\s*\.\s*)?(?P<column>{IDENTIFIER})$')
+COMPARISON_RE = re.compile(rf'^(?P<column>.+?)\s*(?P<op>==|=|!=|<>|<=|>=|<|>)\s*(?P<value>{LITERAL})$', re.DOTALL)
+IN_LIST_RE = re.compile(rf'^(?P<column>.+?)\s+(?P<negate>NOT\s+)?IN\s*\(\s*(?P<values>{LITERAL}(?:\s*,\s*{LITERAL})*)\s*\)$',
+                        re.IGNORECASE | re.DOTALL)
+SINGLE_TABLE_RE = re.compile(
+    rf'^\s*SELECT\s+.+?\s+FROM\s+(?P<table>{IDENTIFIER})'
+    rf'(?:\s+(?:AS\s+)?(?!WHERE\b|GROUP\b|ORDER\b|LIMIT\b)(?P<alias>{IDENTIFIER}))?'
+    rf'\s+WHERE\s+(?P<rest>.+)$',
+    re.IGNORECASE | re.DOTALL
+)
+WHERE_END_KEYWORDS = {'GROUP', 'ORDER', 'LIMIT', 'HAVING', 'WINDOW'}
+NO_PUSHDOWN_KEYWORDS = {'OR', 'BETWEEN', 'JOIN', 'UNION', 'INTERSECT', 'EXCEPT'}
+
+
+def unquote_identifier(identifier: str) -> str:
+    """Strip SQL identifier quoting."""
+    identifier = identifier.strip()
+    if identifier[:1] == '"' and identifier[-1:] == '"':
+        return identifier[1:-1].replace('""', '"')
+    if identifier[:1] in ('[', '`'):
+        return identifier[1:-1]
+    return identifier
+
+
+def literal_to_text(literal: str) -> str:
+    """Convert a SQL literal to the text SQLite compares it as against a TEXT column."""
+    if literal.startswith("'"):
+        return literal[1:-1].replace("''", "'")
+    value = int(literal)
+    if abs(value) > 2 ** 63 - 1:
+        # SQLite reads this as a REAL; its text form is not worth guessing
+        return None
+    return str(value)
+
+
+def _top_level_words(sql: str):
+    """Yield (word, start, end) for words outside quotes and parentheses, with paren depth."""
+    depth = 0
+    i = 0
+    length = len(sql)
+    while i < length:
+        ch = sql[i]
+        if ch in ("'", '"', '`'):
+            end = sql.find(ch, i + 1)
+            while end != -1 and end + 1 < length and sql[end + 1] == ch:
+                end = sql.find(ch, end + 2)
+            i = length if end == -1 else end + 1
+            continue
+        if ch == '[':
+            end = sql.find(']', i + 1)
+            i = length if end == -1 else end + 1
+            continue
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch.isalpha() or ch == '_':
+            start = i
+            while i < length and (sql[i].isalnum() or sql[i] in '_$'):
+                i += 1
+            yield sql[start:i].upper(), start, i, depth
+            continue
+        i += 1
+
+
+def split_conjuncts(where_clause: str) -> Optional[List[str]]:
+    """Split a WHERE clause on top-level AND.
+
+    Returns None when the clause contains OR or BETWEEN anywhere, since
+    splitting on AND would then not give independent conditions.
+    """
+    parts = []
+    last = 0
+    for word, start, end, depth in _top_level_words(where_clause):
+        if word in ('OR', 'BETWEEN'):
+            return None
+        if word == 'AND' and depth == 0:
+            parts.append(where_clause[last:start].strip())
+            last = end
+    parts.append(where_clause[last:].strip())
+    return [part for part in parts if part]
+
+
+def extract_pushdown_predicates(query_text: str, table_name: str, columns: List[str]) -> List[Tuple[str, str, Any]]:
+    """Find simple column-vs-literal conditions that can be applied while reading a source.
+
+    Only single-table SELECTs on table_name are considered. The returned
+    predicates are (column, op, value) where op is one of =, !=, <, <=, >, >=,
+    in, not in, and values are compared as text. Conditions that cannot be
+    parsed are skipped, so the pushed filter always keeps a superset of the
+    rows the query needs; SQLite applies the full WHERE clause afterwards.
+    """
+    words = list(_top_level_words(query_text))
+    if any(word in NO_PUSHDOWN_KEYWORDS for word, _, _, _ in words):
+        return []
+
+    # Subqueries reading the same source need its unfiltered rows
+    references = [ref for ref in re.findall(IDENTIFIER, query_text) if unquote_identifier(ref).lower() == table_name.lower()]
+    if len(references) != 1:
+        return []
+
+    match = SINGLE_TABLE_RE.match(query_text.strip().rstrip(';'))
+    if not match or unquote_identifier(match.group('table')).lower() != table_name.lower():
+        return []
+
+    rest = match.group('rest')
+    where_end = len(rest)
+    for word, start, _, depth in _top_level_words(rest):
+        if depth == 0 and word in WHERE_END_KEYWORDS:
+            where_end = start
+            break
+    conjuncts = split_conjuncts(rest[:where_end])
+    if not conjuncts:
+        return []
+
+    qualifiers = {table_name.lower()}
+    if match.group('alias'):
+        qualifiers.add(unquote_identifier(match.group('alias')).lower())
+    column_lookup = {column.lower(): column for column in columns}
+
+    def resolve_column(text):
+        ref = COLUMN_REF_RE.match(text.strip())
+        if not ref:
+            return None
+        qualifier = ref.group('qualifier')
+        if qualifier and unquote_identifier(qualifier).lower() not in qualifiers:
+            return None
+        return column_lookup.get(unquote_identifier(ref.group('column')).lower())
+
+    predicates = []
+    for conjunct in conjuncts:
+        comparison = COMPARISON_RE.match(conjunct)
+        if comparison:
+            column = resolve_column(comparison.group('column'))
+            value = literal_to_text(comparison.group('value'))
+            if column is not None and value is not None:
+                op = {'==': '=', '<>': '!='}.get(comparison.group('op'), comparison.group('op'))
+                predicates.append((column, op, value))
+            continue
+        in_list = IN_LIST_RE.match(conjunct)
+        if in_list:
+            column = resolve_column(in_list.group('column'))
+            values = {literal_to_text(value) for value in re.findall(LITERAL, in_list.group('values'))}
+            if column is not None and None not in values:
+                predicates.append((column, 'not in' if in_list.group('negate') else 'in', tuple(sorted(values))))
+    return predicates
+
+
+def filter_chunk(chunk: pd.DataFrame, predicates: List[Tuple[str, str, Any]]) -> pd.DataFrame:
+    """Apply pushed-down predicates to a chunk of text values (NULL never matches)."""
+    if not predicates or chunk.empty:
+        return chunk
+    mask = pd.Series(True, index=chunk.index)
+    for column, op, value in predicates:
+        series = chunk[column]
+        present = series.notna()
+        text = series.where(present, '').astype(str)
+        if op == '=':
+            condition = text == value
+        elif op == '!=':
+            condition = text != value
+        elif op == '<':
+            condition = text < value
+        elif op == '<=':
+            condition = text <= value
+        elif op == '>':
+            condition = text > value
+        elif op == '>=':
+            condition = text >= value
+        elif op == 'in':
+            condition = text.isin(value)
+        else:
+            condition = ~text.isin(value)
+        mask &= present & condition
+    return chunk[mask]
+
+
+def unique_column_names(headers: List[str]) -> List[str]:
+    """Make column names non-empty and unique."""
+    result = []
+    seen = set()
+    for index, header in enumerate(headers):
+        name = str(header).strip() or f"col{index + 1}"
+        candidate = name
+        counter = 1
+        while candidate.lower() in seen:
+            candidate = f"{name}_{counter}"
+            counter += 1
+        seen.add(candidate.lower())
+        result.append(candidate)
+    return result
+
+
+class ExternalSourceManager:
+    """Registers CSV/Parquet files as lazily materialized tables and attaches SQLite files.
+
+    File sources are not imported when registered: only their header is read.
+    Before a query runs, prepare() materializes the sources it references into
+    an attached cache database, reading the file in chunks and keeping only
+    rows that pass simple WHERE conditions pushed down from the query. Since
+    the cache schema is searched after main, queries use the source name
+    unqualified, exactly like an imported table.
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE, cache_dir: Optional[str] = None):
+        self.chunk_size = chunk_size
+        self.cache_dir = cache_dir
+        self.sources = {}
+        self.attached = {}
+
+    @property
+    def cache_path(self) -> str:
+        """Path of the cache database, created on first use."""
+        if self.cache_dir is None:
+            self.cache_dir = tempfile.mkdtemp(prefix='csvquery_external_')
+        return os.path.join(self.cache_dir, 'external_cache.sqlite')
+
+    @staticmethod
+    def source_kind(path: str) -> Optional[str]:
+        """Return 'csv', 'parquet' or 'sqlite' based on the file extension."""
+        ext = os.path.splitext(path)[1].lower()
+        if ext in CSV_EXTENSIONS:
+            return 'csv'
+        if ext in PARQUET_EXTENSIONS:
+            return 'parquet'
+        if ext in SQLITE_EXTENSIONS:
+            return 'sqlite'
+        return None
+
+    def attached_schemas(self, conn: sqlite3.Connection) -> Dict[str, str]:
+        """Return {schema name: file} for databases attached to the connection."""
+        return {row[1]: row[2] for row in conn.execute("PRAGMA database_list")}
+
+    def ensure_cache_attached(self, conn: sqlite3.Connection):
+        """Attach the cache database if this connection does not have it yet."""
+        if CACHE_SCHEMA in self.attached_schemas(conn):
+            return
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute(f'ATTACH DATABASE ? AS "{CACHE_SCHEMA}"', (self.cache_path,))
+        # The cache is rebuilt from the source files, so it needs no durability
+        conn.execute(f'PRAGMA "{CACHE_SCHEMA}".journal_mode = OFF')
+        conn.execute(f'PRAGMA "{CACHE_SCHEMA}".synchronous = OFF')
+
+    def existing_names(self, conn: sqlite3.Connection) -> set:
+        """Lower-case names of main tables, views and registered sources."""
+        names = {row[0].lower() for row in conn.execute("SELECT name FROM main.sqlite_master WHERE type IN ('table', 'view')")}
+        return names | {name.lower() for name in self.sources}
+
+    def unique_name(self, base_name: str, taken: set) -> str:
+        """Generate a name not present in taken (compared case-insensitively)."""
+        base_name = re.sub(r'\W+', '_', base_name).strip('_') or 'external'
+        name = base_name
+        counter = 1
+        while name.lower() in taken:
+            name = f"{base_name}_{counter}"
+            counter += 1
+        return name
+
+    def register_file(self, conn: sqlite3.Connection, path: str, name: Optional[str] = None,
+                      encoding: str = 'utf-8', clean_headers: Optional[Callable] = None) -> str:
+        """Register a CSV or Parquet file as a lazy table and return its name."""
+        kind = self.source_kind(path)
+        if kind not in ('csv', 'parquet'):
+            raise ValueError(f"Unsupported external file type: {os.path.basename(path)}")
+
+        if kind == 'csv':
+            delimiter = CSV_EXTENSIONS[os.path.splitext(path)[1].lower()]
+            headers = list(pd.read_csv(path, sep=delimiter, nrows=0, encoding=encoding).columns)
+        else:
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("pyarrow is required for Parquet sources. Install it using: pip install pyarrow")
+            delimiter = None
+            headers = list(pq.ParquetFile(path).schema_arrow.names)
+
+        columns = unique_column_names(clean_headers(headers) if clean_headers else headers)
+        base_name = name or os.path.splitext(os.path.basename(path))[0]
+        name = self.unique_name(base_name, self.existing_names(conn))
+
+        self.sources[name] = {
+            'name': name,
+            'path': path,
+            'kind': kind,
+            'delimiter': delimiter,
+            'encoding': encoding,
+            'columns': columns,
+            'materialized': None,
+            'signature': None,
+            'rows': None
+        }
+        return name
+
+    def attach_database(self, conn: sqlite3.Connection, path: str, alias: Optional[str] = None) -> str:
+        """ATTACH another SQLite database and return its schema name."""
+        taken = {schema.lower() for schema in self.attached_schemas(conn)} | RESERVED_SCHEMAS
+        alias = self.unique_name(alias or os.path.splitext(os.path.basename(path))[0], taken)
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute(f'ATTACH DATABASE ? AS "{alias}"', (path,))
+        self.attached[alias] = path
+        return alias
+
+    def attached_tables(self, conn: sqlite3.Connection, alias: str) -> List[str]:
+        """List tables of an attached database."""
+        cursor = conn.execute(f'SELECT name FROM "{alias}".sqlite_master WHERE type IN (\'table\', \'view\') ORDER BY name')
+        return [row[0] for row in cursor.fetchall() if not row[0].startswith('sqlite_')]
+
+    def reattach(self, conn: sqlite3.Connection):
+        """Attach registered databases and the cache to a new connection (e.g. after opening a session)."""
+        schemas = self.attached_schemas(conn)
+        if CACHE_SCHEMA not in schemas and any(source['materialized'] is not None
+                                               for source in self.sources.values()):
+            self.ensure_cache_attached(conn)
+        for alias, path in list(self.attached.items()):
+            if alias not in schemas:
+                try:
+                    conn.execute(f'ATTACH DATABASE ? AS "{alias}"', (path,))
+                except sqlite3.Error:
+                    del self.attached[alias]
+
+    def remove(self, conn: sqlite3.Connection, name: str):
+        """Unregister a file source or detach a database."""
+        if name in self.attached:
+            if conn.in_transaction:
+                conn.commit()
+            conn.execute(f'DETACH DATABASE "{name}"')
+            del self.attached[name]
+        elif name in self.sources:
+            if self.sources[name]['materialized'] is not None:
+                self.ensure_cache_attached(conn)
+                conn.execute(f'DROP TABLE IF EXISTS "{CACHE_SCHEMA}"."{name}"')
+                conn.commit()
+            del self.sources[name]
+
+    def referenced_sources(self, query_text: str) -> List[str]:
+        """Names of registered file sources mentioned in the query."""
+        words = {unquote_identifier(match).lower() for match in re.findall(IDENTIFIER, query_text)}
+        return [name for name in self.sources if name.lower() in words]
+
+    def prepare(self, conn: sqlite3.Connection, query_text: str,
+                progress: Optional[Callable[[str, int], None]] = None) -> List[Dict[str, Any]]:
+        """Materialize the file sources a query references.
+
+        Returns one stats dict per source that had to be (re)loaded, with keys
+        name, rows_read, rows_kept, elapsed and predicates.
+        """
+        loaded = []
+        # Materialized tables are only reachable through a connection with the cache attached
+        cache_attached = CACHE_SCHEMA in self.attached_schemas(conn)
+        for name in self.referenced_sources(query_text):
+            source = self.sources[name]
+            predicates = extract_pushdown_predicates(query_text, name, source['columns'])
+            key = tuple(sorted(predicates, key=repr))
+            signature = self._file_signature(source['path'])
+
+            # A full materialization serves every query; a filtered one only the same filter
+            if cache_attached and source['signature'] == signature and source['materialized'] in ((), key):
+                continue
+            loaded.append(self.materialize(conn, name, predicates, progress))
+        return loaded
+
+    def materialize(self, conn: sqlite3.Connection, name: str, predicates: List[Tuple[str, str, Any]],
+                    progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, Any]:
+        """Read a file source in chunks into the cache database, keeping rows that pass predicates."""
+        source = self.sources[name]
+        self.ensure_cache_attached(conn)
+        start = time.perf_counter()
+
+        columns = source['columns']
+        column_defs = ', '.join(f'"{column}" TEXT' for column in columns)
+        placeholders = ', '.join(['?'] * len(columns))
+        table = f'"{CACHE_SCHEMA}"."{name}"'
+
+        rows_read = 0
+        rows_kept = 0
+        try:
+            conn.execute(f'DROP TABLE IF EXISTS {table}')
+            conn.execute(f'CREATE TABLE {table} ({column_defs})')
+            for chunk in self._iter_chunks(source):
+                chunk.columns = columns
+                rows_read += len(chunk)
+                chunk = filter_chunk(chunk, predicates)
+                if not chunk.empty:
+                    chunk = chunk.astype(object).where(chunk.notna(), None)
+                    conn.executemany(f'INSERT INTO {table} VALUES ({placeholders})',
+                                     chunk.itertuples(index=False, name=None))
+                    rows_kept += len(chunk)
+                if progress:
+                    progress(name, rows_read)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            source['materialized'] = None
+            raise
+
+        source['materialized'] = tuple(sorted(predicates, key=repr))
+        source['signature'] = self._file_signature(source['path'])
+        source['rows'] = rows_kept
+        return {
+            'name': name,
+            'rows_read': rows_read,
+            'rows_kept': rows_kept,
+            'elapsed': time.perf_counter() - start,
+            'predicates': predicates
+        }
+
+    def _iter_chunks(self, source: Dict[str, Any]):
+        """Yield DataFrame chunks of a file source."""
+        if source['kind'] == 'csv':
+            reader = pd.read_csv(source['path'], sep=source['delimiter'], encoding=source['encoding'],
+                                 dtype=str, keep_default_na=False, chunksize=self.chunk_size)
+            for chunk in reader:
+                yield chunk
+        else:
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(source['path']).iter_batches(batch_size=self.chunk_size):
+                chunk = batch.to_pandas()
+                yield chunk.astype(str).where(chunk.notna(), None)
+
+    @staticmethod
+    def _file_signature(path: str):
+        """Size and modification time, used to notice changed files."""
+        stat = os.stat(path)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def close(self, conn: Optional[sqlite3.Connection] = None):
+        """Detach the cache and delete its directory."""
+        if conn is not None:
+            try:
+                if CACHE_SCHEMA in self.attached_schemas(conn):
+                    conn.execute(f'DETACH DATABASE "{CACHE_SCHEMA}"')
+            except sqlite3.Error:
+                pass
+        if self.cache_dir:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self.cache_dir = None
+        for source in self.sources.values():
+            source['materialized'] = None
+            source['signature'] = None
@@ -0,0 +1,96 @@
+import json
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pandas import DataFrame
+
+from utils.merkle_tree import _mix, combine_row_hashes, file_signature, hash_digest, value_hashes
+
+FINGERPRINT_TABLE = 'csvq_fingerprints'
+FINGERPRINT_ALGORITHM = 'sha256'
+
+
+def dataframe_fingerprint(df: DataFrame) -> Dict[str, Any]:
+    """Summary of a DataFrame that decides equality and schema differences without its data.
+
+    Holds the row count, column names and types, null counts, index name
+    and type, a hash per column, the Merkle root of the rows (the sum of
+    mixed row hashes, the root of any tree of them) and a content hash
+    over the columns and their hashes in order.
+    """
+    row_hashes = [value_hashes(df.iloc[:, i]) for i in range(df.shape[1])]
+    columns = [[str(col), str(dtype)] for col, dtype in df.dtypes.items()]
+    column_hashes = [hash_digest(FINGERPRINT_ALGORITHM, hashes) for hashes in row_hashes]
+    merkle_root = np.sum(_mix(combine_row_hashes(row_hashes, len(df))), dtype=np.uint64)
+    return {
+        'row_count': len(df),
+        'columns': columns,
+        'null_counts': [int(count) for count in df.isna().sum()],
+        'index': [None if df.index.name is None else str(df.index.name), str(df.index.dtype)],
+        'column_hashes': column_hashes,
+        'merkle_root': f"{int(merkle_root):016x}",
+        'content_hash': hash_digest(FINGERPRINT_ALGORITHM, json.dumps(columns), *column_hashes)
+    }
+
+
+def file_source(path: str) -> Tuple[str, str]:
+    """Fingerprint source of a file: its absolute path and size/mtime signature."""
+    return os.path.abspath(path), file_signature(path)
+
+
+class FingerprintStore:
+    """Fingerprints of compared sources, kept in a table of the session database.
+
+    One fingerprint is kept per source, with the signature it was
+    computed for; a lookup with another signature misses.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {FINGERPRINT_TABLE} ("
+                     "source TEXT PRIMARY KEY, signature TEXT, fingerprint TEXT)")
+
+    def load(self, source: str, signature: str) -> Optional[Dict[str, Any]]:
+        """The stored fingerprint of a source, None if missing or out of date."""
+        row = self.conn.execute(f"SELECT fingerprint FROM {FINGERPRINT_TABLE} WHERE source = ? AND signature = ?",
+                                (source, signature)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, source: str, signature: str, fingerprint: Dict[str, Any]):
+        """Store the fingerprint of a source, replacing an earlier one."""
+        with self.conn:
+            self.conn.execute(f"INSERT OR REPLACE INTO {FINGERPRINT_TABLE} VALUES (?, ?, ?)",
+                              (source, signature, json.dumps(fingerprint)))
+
+
+def cached_fingerprints(store_path: Optional[str], sources: List[Optional[Tuple[str, str]]]
+                        ) -> List[Optional[Dict[str, Any]]]:
+    """Stored fingerprints of the given sources, None for missing ones or without a store."""
+    if not store_path:
+        return [None] * len(sources)
+    conn = sqlite3.connect(store_path, timeout=5)
+    try:
+        store = FingerprintStore(conn)
+        return [store.load(*source) if source else None for source in sources]
+    finally:
+        conn.close()
+
+
+def update_fingerprints(store_path: str, items: List[Tuple[Optional[Tuple[str, str]], DataFrame]]) -> int:
+    """Fingerprint and store the (source, DataFrame) items whose source has no current fingerprint.
+
+    Returns the number of fingerprints computed.
+    """
+    conn = sqlite3.connect(store_path, timeout=5)
+    try:
+        store = FingerprintStore(conn)
+        computed = 0
+        for source, df in items:
+            if source and df is not None and store.load(*source) is None:
+                store.save(*source, dataframe_fingerprint(df))
+                computed += 1
+        return computed
+    finally:
+        conn.close()
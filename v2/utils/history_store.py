@@ -0,0 +1,329 @@
+import os
+import json
+import sqlite3
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_groups (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS queries (
+    id INTEGER PRIMARY KEY,
+    group_id INTEGER NOT NULL REFERENCES query_groups(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    query TEXT NOT NULL,
+    query_hash INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    period TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS queries_hash ON queries(query_hash);
+CREATE INDEX IF NOT EXISTS queries_group ON queries(group_id, position);
+"""
+
+# Snippets have no table of their own; this gives them ids for the search index
+SNIPPET_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snippet_docs (
+    id INTEGER PRIMARY KEY,
+    group_name TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (group_name, name)
+);
+"""
+
+# One ranked search index over queries (rowid = query id) and snippets (rowid = -snippet_docs.id).
+# Query rows are maintained by triggers, so every history change updates the index. The insert
+# and update triggers are recreated on open: they use stored columns and built-in functions
+# only, so any connection can write the history (earlier ones called an application function).
+# The query-only queries_fts index of earlier versions is dropped.
+SEARCH_SCHEMA = """
+DROP TRIGGER IF EXISTS queries_fts_insert;
+DROP TRIGGER IF EXISTS queries_fts_delete;
+DROP TRIGGER IF EXISTS queries_fts_update;
+DROP TABLE IF EXISTS queries_fts;
+DROP TRIGGER IF EXISTS search_index_query_insert;
+DROP TRIGGER IF EXISTS search_index_query_update;
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    kind UNINDEXED, name, body, task_numbers, period,
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER search_index_query_insert AFTER INSERT ON queries BEGIN
+    INSERT INTO search_index(rowid, kind, name, body, task_numbers, period)
+    VALUES (new.id, 'query', new.name, new.query, json_extract(new.data, '$.task_numbers'), new.period);
+END;
+CREATE TRIGGER IF NOT EXISTS search_index_query_delete AFTER DELETE ON queries BEGIN
+    DELETE FROM search_index WHERE rowid = old.id;
+END;
+CREATE TRIGGER search_index_query_update AFTER UPDATE OF name, query, data, period ON queries BEGIN
+    DELETE FROM search_index WHERE rowid = old.id;
+    INSERT INTO search_index(rowid, kind, name, body, task_numbers, period)
+    VALUES (new.id, 'query', new.name, new.query, json_extract(new.data, '$.task_numbers'), new.period);
+END;
+"""
+
+# bm25 column weights: kind, name, body, task_numbers, period
+SEARCH_WEIGHTS = (0.0, 10.0, 1.0, 5.0, 2.0)
+HIGHLIGHT_START = '«'
+HIGHLIGHT_END = '»'
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December']
+
+
+def history_period(timestamp: Optional[str]) -> str:
+    """Searchable words for an ISO timestamp, e.g. '2024-03-14 March 2024'."""
+    if not timestamp or len(timestamp) < 7:
+        return ''
+    try:
+        year, month = int(timestamp[:4]), int(timestamp[5:7])
+        return f"{timestamp[:10]} {MONTH_NAMES[month - 1]} {year}"
+    except (ValueError, IndexError):
+        return ''
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    words = text.split()
+    return ' '.join('"' + word.replace('"', '""') + '"*' for word in words)
+
+
+def normalize_query(query_text: str) -> str:
+    """Normalize query text for duplicate detection (whitespace runs collapsed)."""
+    return ' '.join(query_text.split())
+
+
+def query_hash(query_text: str) -> int:
+    """Signed 64-bit hash of the normalized query text."""
+    digest = hashlib.blake2b(normalize_query(query_text).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+class QueryHistoryStore:
+    """Query history groups and queries persisted in SQLite.
+
+    Every change is a single-row statement, so saving one query does not
+    rewrite the history. Queries are looked up through an index on the hash
+    of their normalized text and are full-text indexed (FTS5) when the
+    SQLite build supports it.
+    """
+
+    def __init__(self, path: str, legacy_json_path: Optional[str] = None):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA + SNIPPET_SCHEMA)
+        self._add_period_column()
+        try:
+            self.conn.executescript(SEARCH_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+        self.conn.commit()
+        if self.has_fts:
+            self._index_existing_queries()
+
+        # One-time import of the JSON history used before
+        if legacy_json_path and os.path.exists(legacy_json_path) and self.is_empty():
+            try:
+                with open(legacy_json_path, 'r', encoding='utf-8') as f:
+                    self.replace_all(json.load(f))
+            except (OSError, ValueError):
+                pass
+
+    def is_empty(self) -> bool:
+        """True when no group is stored."""
+        return self.conn.execute("SELECT 1 FROM query_groups LIMIT 1").fetchone() is None
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Return groups in order: [{'id', 'name', 'queries': [(query_id, data), ...]}]."""
+        groups = []
+        by_id = {}
+        for group_id, name in self.conn.execute("SELECT id, name FROM query_groups ORDER BY position, id"):
+            group = {'id': group_id, 'name': name, 'queries': []}
+            groups.append(group)
+            by_id[group_id] = group
+        for query_id, group_id, data in self.conn.execute(
+                "SELECT id, group_id, data FROM queries ORDER BY group_id, position, id"):
+            by_id[group_id]['queries'].append((query_id, json.loads(data)))
+        return groups
+
+    def export(self) -> List[Dict[str, Any]]:
+        """Return history in the query_history.json layout."""
+        return [{'name': group['name'], 'queries': [data for _, data in group['queries']]}
+                for group in self.load()]
+
+    def replace_all(self, history_data: List[Dict[str, Any]]):
+        """Replace the stored history with groups in the query_history.json layout."""
+        with self.conn:
+            self.conn.execute("DELETE FROM queries")
+            self.conn.execute("DELETE FROM query_groups")
+            for position, group in enumerate(history_data):
+                group_id = self.conn.execute(
+                    "INSERT INTO query_groups (name, position) VALUES (?, ?)",
+                    (group.get('name', 'Unnamed Group'), position)).lastrowid
+                self.conn.executemany(
+                    "INSERT INTO queries (group_id, position, name, query, query_hash, data, period) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(group_id, query_position, *self._query_columns(data))
+                     for query_position, data in enumerate(group.get('queries', []))])
+
+    def add_group(self, name: str) -> int:
+        """Append a group; returns its id."""
+        with self.conn:
+            return self.conn.execute(
+                "INSERT INTO query_groups (name, position) "
+                "VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM query_groups))", (name,)).lastrowid
+
+    def rename_group(self, group_id: int, name: str):
+        """Rename a group."""
+        with self.conn:
+            self.conn.execute("UPDATE query_groups SET name = ? WHERE id = ?", (name, group_id))
+
+    def delete_group(self, group_id: int):
+        """Delete a group with its queries."""
+        with self.conn:
+            self.conn.execute("DELETE FROM query_groups WHERE id = ?", (group_id,))
+
+    def add_query(self, group_id: int, data: Dict[str, Any]) -> int:
+        """Append a query to a group; returns its id."""
+        with self.conn:
+            return self.conn.execute(
+                "INSERT INTO queries (group_id, position, name, query, query_hash, data, period) VALUES "
+                "(?, (SELECT COALESCE(MAX(position), -1) + 1 FROM queries WHERE group_id = ?), ?, ?, ?, ?, ?)",
+                (group_id, group_id, *self._query_columns(data))).lastrowid
+
+    def update_query(self, query_id: int, data: Dict[str, Any]):
+        """Replace the data of a query."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE queries SET name = ?, query = ?, query_hash = ?, data = ?, period = ? WHERE id = ?",
+                (*self._query_columns(data), query_id))
+
+    def delete_query(self, query_id: int):
+        """Delete a query."""
+        with self.conn:
+            self.conn.execute("DELETE FROM queries WHERE id = ?", (query_id,))
+
+    def find_query(self, query_text: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Find a query with the same normalized text; returns (id, data) or None."""
+        normalized = normalize_query(query_text)
+        for query_id, query, data in self.conn.execute(
+                "SELECT id, query, data FROM queries WHERE query_hash = ? ORDER BY id",
+                (query_hash(query_text),)):
+            if normalize_query(query) == normalized:
+                return query_id, json.loads(data)
+        return None
+
+    def save_order(self, layout: List[Tuple[int, List[int]]]):
+        """Store the order of groups and their queries: [(group_id, [query_id, ...]), ...]."""
+        with self.conn:
+            self.conn.executemany("UPDATE query_groups SET position = ? WHERE id = ?",
+                                  [(position, group_id) for position, (group_id, _) in enumerate(layout)])
+            self.conn.executemany("UPDATE queries SET group_id = ?, position = ? WHERE id = ?",
+                                  [(group_id, position, query_id)
+                                   for group_id, query_ids in layout
+                                   for position, query_id in enumerate(query_ids)])
+
+    def _add_period_column(self):
+        """Add the period column to a history stored before it existed, and fill it."""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(queries)")]
+        if 'period' in columns:
+            return
+        with self.conn:
+            self.conn.execute("ALTER TABLE queries ADD COLUMN period TEXT NOT NULL DEFAULT ''")
+            self.conn.executemany(
+                "UPDATE queries SET period = ? WHERE id = ?",
+                [(history_period(json.loads(data).get('timestamp')), query_id)
+                 for query_id, data in self.conn.execute("SELECT id, data FROM queries").fetchall()])
+
+    def _index_existing_queries(self):
+        """Fill a new search index with queries stored before it existed."""
+        if self.conn.execute("SELECT 1 FROM search_index WHERE kind = 'query' LIMIT 1").fetchone():
+            return
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO search_index(rowid, kind, name, body, task_numbers, period) "
+                "SELECT id, 'query', name, query, json_extract(data, '$.task_numbers'), period FROM queries")
+
+    def index_snippet(self, group_name: str, name: str, code: str):
+        """Add or update a snippet in the search index."""
+        if not self.has_fts:
+            return
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO snippet_docs (group_name, name) VALUES (?, ?)",
+                              (group_name, name))
+            snippet_id = self.conn.execute("SELECT id FROM snippet_docs WHERE group_name = ? AND name = ?",
+                                           (group_name, name)).fetchone()[0]
+            self.conn.execute("DELETE FROM search_index WHERE rowid = ?", (-snippet_id,))
+            self.conn.execute("INSERT INTO search_index(rowid, kind, name, body, task_numbers, period) "
+                              "VALUES (?, 'snippet', ?, ?, '', '')", (-snippet_id, name, code))
+
+    def remove_snippet(self, group_name: str, name: str):
+        """Remove a snippet from the search index."""
+        if not self.has_fts:
+            return
+        with self.conn:
+            row = self.conn.execute("SELECT id FROM snippet_docs WHERE group_name = ? AND name = ?",
+                                    (group_name, name)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM search_index WHERE rowid = ?", (-row[0],))
+                self.conn.execute("DELETE FROM snippet_docs WHERE id = ?", (row[0],))
+
+    def sync_snippets(self, snippet_groups: List[Dict[str, Any]]):
+        """Index the snippets of python_snippets.json, dropping ones that no longer exist."""
+        if not self.has_fts:
+            return
+        current = {(group['name'], snippet['name']): snippet.get('code', '')
+                   for group in snippet_groups for snippet in group.get('snippets', [])}
+        indexed = set(self.conn.execute("SELECT group_name, name FROM snippet_docs").fetchall())
+        for group_name, name in indexed - set(current):
+            self.remove_snippet(group_name, name)
+        for (group_name, name), code in current.items():
+            self.index_snippet(group_name, name, code)
+
+    def search(self, text: str, limit: int = 200) -> List[Dict[str, Any]]:
+        """Ranked full-text search over queries and snippets.
+
+        Every word of text must match as a prefix in the name, body, task
+        numbers or period (e.g. 'march 2024') of an entry. Returns dicts
+        with kind, id (query id) or group/name (snippet), the highlighted
+        name and a highlighted fragment of the query or code.
+        """
+        match = fts_query(text)
+        if not match or not self.has_fts:
+            return []
+        weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS)
+        rows = self.conn.execute(
+            f"SELECT rowid, kind, highlight(search_index, 1, ?, ?), "
+            f"snippet(search_index, 2, ?, ?, '…', 12) "
+            f"FROM search_index WHERE search_index MATCH ? "
+            f"ORDER BY bm25(search_index, {weights}) LIMIT ?",
+            (HIGHLIGHT_START, HIGHLIGHT_END, HIGHLIGHT_START, HIGHLIGHT_END, match, limit)).fetchall()
+
+        results = []
+        for rowid, kind, name, fragment in rows:
+            result = {'kind': kind, 'name': name, 'fragment': ' '.join(fragment.split())}
+            if kind == 'query':
+                result['id'] = rowid
+            else:
+                row = self.conn.execute("SELECT group_name, name FROM snippet_docs WHERE id = ?", (-rowid,)).fetchone()
+                if row is None:
+                    continue
+                result['group'], result['snippet'] = row
+            results.append(result)
+        return results
+
+    def close(self):
+        """Close the database."""
+        self.conn.close()
+
+    @staticmethod
+    def _query_columns(data: Dict[str, Any]) -> Tuple[str, str, int, str, str]:
+        """Column values (name, query, query_hash, data, period) of query data."""
+        query = data.get('query', '')
+        return (data.get('name', 'Unnamed Query'), query, query_hash(query),
+                json.dumps(data, ensure_ascii=False), history_period(data.get('timestamp')))
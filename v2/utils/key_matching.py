@@ -0,0 +1,154 @@
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, Series
+
+DEFAULT_WORKERS = 4
+FUZZY_BLOCK_CHARS = 1  # Leading/trailing characters that form a blocking key
+MAX_BLOCK_PAIRS = 200000  # Candidate pairs scored per block at most
+KEY_SEPARATOR = '\x1f'  # Joins the columns of a composite key for fuzzy matching
+FLOAT_DIGITS = 15  # Significant digits of a decimal that always survive a float64 round trip
+
+
+def normalize_key_series(series: Series, trim: bool = True, casefold: bool = True,
+                         numeric: bool = True, dates: bool = False) -> Series:
+    """Canonical text of key values, so that equal keys written differently match.
+
+    trim strips the ends and collapses inner runs of whitespace; numeric
+    writes numbers in one form ('1.50', ' 1.5' and 1.5 all become '1.5',
+    '7.0' and 7 become '7'); integers are rewritten as text, so long IDs
+    keep every digit, and other numbers only when float64 holds them
+    exactly. dates writes parseable dates as ISO dates (times only when
+    not midnight); casefold folds case. Missing values stay None. All
+    steps work on whole columns.
+    """
+    missing = series.isna().to_numpy()
+    text = series.astype(object).where(~missing, '').astype(str)
+    if trim:
+        text = text.str.strip().str.replace(r'\s+', ' ', regex=True)
+    result = text.copy()
+
+    parsed = np.zeros(len(text), dtype=bool)
+    if numeric:
+        # Sign, leading zeros and a zero fraction dropped from integers
+        parts = text.str.extract(r'^([+-]?)0*(\d+?)(?:\.0*)?$')
+        integers = parts[1].notna().to_numpy() & ~missing
+        if integers.any():
+            signs = parts[0][integers].where(parts[1][integers] != '0', '').str.replace('+', '', regex=False)
+            result[integers] = signs + parts[1][integers]
+        numbers = pd.to_numeric(text.where(~integers), errors='coerce')
+        digits = text.str.replace(r'[eE].*$', '', regex=True).str.replace(r'\D', '', regex=True).str.strip('0')
+        decimals = numbers.notna().to_numpy() & ~missing & ~integers & (digits.str.len() <= FLOAT_DIGITS).to_numpy()
+        if decimals.any():
+            values = numbers[decimals]
+            integral = (values % 1 == 0) & (values.abs() < 2 ** 53)
+            canonical = values.astype(str)
+            canonical[integral] = values[integral].astype('int64').astype(str)
+            result[decimals] = canonical
+        parsed = integers | decimals
+    if dates:
+        candidates = ~parsed & ~missing & (text != '').to_numpy()
+        if candidates.any():
+            stamps = pd.to_datetime(text[candidates], errors='coerce', format='mixed')
+            valid = stamps.notna().to_numpy()
+            if valid.any():
+                stamps = stamps[valid]
+                midnight = stamps == stamps.dt.normalize()
+                # By position: the index may hold duplicate labels
+                result.iloc[np.flatnonzero(candidates)[valid]] = np.where(
+                    midnight, stamps.dt.strftime('%Y-%m-%d'), stamps.dt.strftime('%Y-%m-%d %H:%M:%S'))
+    if casefold:
+        result = result.str.casefold()
+    return result.astype(object).where(~missing, None)
+
+
+def normalized_keys(df: DataFrame, key_columns: List[str], **options) -> DataFrame:
+    """Key columns of a frame normalized by normalize_key_series."""
+    return DataFrame({col: normalize_key_series(df[col], **options) for col in key_columns}, index=df.index)
+
+
+def key_text(keys: DataFrame) -> List[str]:
+    """One string per row of key columns, for fuzzy matching composite keys."""
+    parts = [keys[col].astype(object).where(keys[col].notna(), '').astype(str) for col in keys.columns]
+    joined = parts[0]
+    for part in parts[1:]:
+        joined = joined + KEY_SEPARATOR + part
+    return joined.tolist()
+
+
+def _block_candidates(keys1: List[str], keys2: List[str], block_chars: int, threshold: float
+                      ) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Candidate pairs of positions, per block of keys sharing their first or last characters.
+
+    Pairs whose lengths alone rule out the threshold are dropped: a
+    SequenceMatcher ratio is at most 2 * min(len) / (len1 + len2).
+    """
+    blocks: Dict[Tuple[str, str], Tuple[List[int], List[int]]] = {}
+    for side, keys in enumerate((keys1, keys2)):
+        for i, key in enumerate(keys):
+            for block in (('head', key[:block_chars]), ('tail', key[-block_chars:])):
+                blocks.setdefault(block, ([], []))[side].append(i)
+
+    candidates = []
+    lengths1 = np.array([len(key) for key in keys1])
+    lengths2 = np.array([len(key) for key in keys2])
+    for members1, members2 in blocks.values():
+        if not members1 or not members2:
+            continue
+        members1, members2 = np.array(members1), np.array(members2)
+        l1, l2 = lengths1[members1][:, None], lengths2[members2][None, :]
+        bound = 2 * np.minimum(l1, l2) / np.maximum(l1 + l2, 1)
+        rows, cols = np.nonzero(bound >= threshold)
+        if len(rows) > MAX_BLOCK_PAIRS:
+            best = np.argsort(-bound[rows, cols], kind='stable')[:MAX_BLOCK_PAIRS]
+            rows, cols = rows[best], cols[best]
+        candidates.append((members1[rows], members2[cols]))
+    return candidates
+
+
+def fuzzy_pairs(keys1: List[str], keys2: List[str], threshold: float = 0.9,
+                block_chars: int = FUZZY_BLOCK_CHARS, workers: int = DEFAULT_WORKERS
+                ) -> List[Tuple[int, int, float]]:
+    """Match keys of two lists one to one by string similarity.
+
+    Only keys sharing their first or last block_chars characters are
+    compared (blocking), and blocks are scored on a thread pool with
+    difflib ratios. Pairs scoring at least threshold are taken best first,
+    each key at most once. Returns (position in keys1, position in keys2,
+    score) tuples.
+    """
+    if not keys1 or not keys2:
+        return []
+    candidates = _block_candidates(keys1, keys2, block_chars, threshold)
+
+    def score_block(block):
+        positions1, positions2 = block
+        scored = []
+        matcher = SequenceMatcher(autojunk=False)
+        for j in np.unique(positions2):
+            matcher.set_seq2(keys2[j])
+            for i in positions1[positions2 == j]:
+                matcher.set_seq1(keys1[i])
+                if matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold:
+                    score = matcher.ratio()
+                    if score >= threshold:
+                        scored.append((score, int(i), int(j)))
+        return scored
+
+    if workers == 1 or len(candidates) <= 1:
+        scored = [pair for block in candidates for pair in score_block(block)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            scored = [pair for block in executor.map(score_block, candidates) for pair in block]
+
+    # A pair can come from both its head and tail block; best scores claim keys first
+    matches, used1, used2 = [], set(), set()
+    for score, i, j in sorted(set(scored), key=lambda pair: (-pair[0], pair[1], pair[2])):
+        if i not in used1 and j not in used2:
+            used1.add(i)
+            used2.add(j)
+            matches.append((i, j, score))
+    return matches
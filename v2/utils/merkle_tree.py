@@ -0,0 +1,216 @@
+import hashlib
+import os
+import sqlite3
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+FANOUT_BITS = 4  # Each node has 2 ** FANOUT_BITS children
+FANOUT = 1 << FANOUT_BITS
+LEAF_ROWS = 64  # Rows per leaf aimed for when choosing the depth
+MAX_DEPTH = 15  # Deepest level addressable by a 64-bit key hash prefix
+BLOCK_LEAVES = 256  # Leaves whose sorted rows are stored together
+TREE_TABLE = 'csvq_merkle_trees'
+TREE_ROWS_TABLE = 'csvq_merkle_rows'
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, so that sums of row hashes do not cancel out."""
+    z = values + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def value_hashes(series: pd.Series) -> np.ndarray:
+    """Vectorized 64-bit hash of every value of a column."""
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+
+def combine_row_hashes(row_hashes: List[np.ndarray], rows: int) -> np.ndarray:
+    """One 64-bit hash per row from the value hashes of all columns, in column order."""
+    combined = np.zeros(rows, dtype=np.uint64)
+    for hashes in row_hashes:
+        combined = (combined ^ hashes) * np.uint64(0x100000001B3)
+    return combined
+
+
+def hash_digest(algorithm: str, *parts) -> str:
+    """Hex digest of strings and arrays of value hashes, in order."""
+    hasher = hashlib.new(algorithm)
+    for part in parts:
+        hasher.update(part.encode('utf-8') if isinstance(part, str) else memoryview(np.ascontiguousarray(part)))
+    return hasher.hexdigest()
+
+
+def key_hashes(df: DataFrame, key_columns: List[str]) -> np.ndarray:
+    """64-bit hash of each row's key."""
+    return pd.util.hash_pandas_object(df[key_columns], index=False).to_numpy()
+
+
+def file_signature(path: str) -> str:
+    """Identity of a file's current content: size and modification time."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class MerkleTree:
+    """Hash tree over the rows of a table, partitioned by key hash prefix.
+
+    Rows are ordered by the hash of their key, and a node at depth d
+    covers the rows whose key hash starts with the node's d * FANOUT_BITS
+    bits. A node's hash is the wrapping sum of its rows' mixed row hashes,
+    so the nodes of a depth are comparable between trees of any size, and
+    a changed, added or removed row only changes the nodes on its path.
+    """
+
+    def __init__(self, levels: List[np.ndarray], offsets: np.ndarray,
+                 read_rows: Callable[[int, int], Tuple[np.ndarray, np.ndarray, np.ndarray]]):
+        self.levels = levels  # levels[d]: node hashes of depth d
+        self.offsets = offsets  # Sorted row range of every leaf
+        self.read_rows = read_rows  # (start, end) -> key hashes, row hashes and positions of sorted rows
+
+    @property
+    def depth(self) -> int:
+        return len(self.levels) - 1
+
+    @property
+    def row_count(self) -> int:
+        return int(self.offsets[-1])
+
+    @classmethod
+    def build(cls, keys: np.ndarray, rows: np.ndarray, leaf_rows: int = LEAF_ROWS) -> 'MerkleTree':
+        """Build a tree from the key hash and row hash of every row."""
+        depth = 1
+        while depth < MAX_DEPTH and FANOUT ** depth * leaf_rows < len(keys):
+            depth += 1
+        order = np.argsort(keys, kind='stable')
+        keys, rows = keys[order], rows[order]
+
+        # Leaf sums from a running sum of the sorted rows (uint64 arithmetic wraps)
+        leaves = keys >> np.uint64(64 - depth * FANOUT_BITS)
+        offsets = np.searchsorted(leaves, np.arange(FANOUT ** depth + 1, dtype=np.uint64))
+        running = np.concatenate([np.zeros(1, dtype=np.uint64), np.cumsum(_mix(rows), dtype=np.uint64)])
+        levels = [running[offsets[1:]] - running[offsets[:-1]]]
+        while len(levels[0]) > 1:
+            levels.insert(0, levels[0].reshape(-1, FANOUT).sum(axis=1, dtype=np.uint64))
+
+        positions = order.astype(np.int64)
+        return cls(levels, offsets.astype(np.int64), lambda start, end: (keys[start:end], rows[start:end],
+                                                                         positions[start:end]))
+
+    def node_rows(self, nodes: np.ndarray, depth: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Key hashes, row hashes and positions of the rows under the given nodes of a depth."""
+        span = FANOUT ** (self.depth - depth)
+        parts = [self.read_rows(int(self.offsets[node * span]), int(self.offsets[(node + 1) * span]))
+                 for node in nodes]
+        if not parts:
+            return np.zeros(0, np.uint64), np.zeros(0, np.uint64), np.zeros(0, np.int64)
+        return tuple(np.concatenate([part[i] for part in parts]) for i in range(3))
+
+
+def diff_trees(tree1: MerkleTree, tree2: MerkleTree) -> Dict[str, np.ndarray]:
+    """Locate the rows that differ between two trees.
+
+    Descends level by level into mismatching nodes only, down to the
+    deepest level both trees have, then compares the rows under the
+    mismatching nodes. Returns the positions of the rows only in the
+    first tree ('removed') or the second ('added'), of the differing rows
+    whose key is on both sides ('modified1', 'modified2'), and the number
+    of nodes compared.
+    """
+    depth = min(tree1.depth, tree2.depth)
+    nodes = np.zeros(1, dtype=np.int64)
+    visited = 0
+    for level in range(depth + 1):
+        visited += len(nodes)
+        nodes = nodes[tree1.levels[level][nodes] != tree2.levels[level][nodes]]
+        if not len(nodes):
+            break
+        if level < depth:
+            nodes = (nodes[:, None] * FANOUT + np.arange(FANOUT)).ravel()
+
+    keys1, rows1, positions1 = tree1.node_rows(nodes, depth)
+    keys2, rows2, positions2 = tree2.node_rows(nodes, depth)
+
+    # Rows without an identical (key, row) pair on the other side
+    pairs1 = rows1 ^ _mix(keys1)
+    pairs2 = rows2 ^ _mix(keys2)
+    only1 = ~np.isin(pairs1, pairs2)
+    only2 = ~np.isin(pairs2, pairs1)
+    common = np.intersect1d(keys1[only1], keys2[only2])
+    modified1 = only1 & np.isin(keys1, common)
+    modified2 = only2 & np.isin(keys2, common)
+    return {
+        'removed': np.sort(positions1[only1 & ~modified1]),
+        'added': np.sort(positions2[only2 & ~modified2]),
+        'modified1': np.sort(positions1[modified1]),
+        'modified2': np.sort(positions2[modified2]),
+        'nodes_compared': visited
+    }
+
+
+class MerkleTreeStore:
+    """Trees of compared sources, kept in tables of the session database.
+
+    One tree is kept per source (e.g. a file path), with the signature it
+    was built for. The sorted rows are stored in blocks of BLOCK_LEAVES
+    leaves, so locating differences only reads the blocks under
+    mismatching leaves.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {TREE_TABLE} ("
+                     "source TEXT PRIMARY KEY, signature TEXT, row_count INTEGER, depth INTEGER, "
+                     "levels BLOB, offsets BLOB)")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {TREE_ROWS_TABLE} ("
+                     "source TEXT, block INTEGER, key_hashes BLOB, row_hashes BLOB, positions BLOB, "
+                     "PRIMARY KEY (source, block))")
+
+    def load(self, source: str, signature: str) -> Optional[MerkleTree]:
+        """The stored tree of a source, None if missing or built for another signature."""
+        row = self.conn.execute(f"SELECT depth, levels, offsets FROM {TREE_TABLE} "
+                                "WHERE source = ? AND signature = ?", (source, signature)).fetchone()
+        if row is None:
+            return None
+        depth, levels_blob, offsets_blob = row
+        nodes = np.frombuffer(levels_blob, dtype=np.uint64)
+        levels, start = [], 0
+        for level in range(depth + 1):
+            levels.append(nodes[start:start + FANOUT ** level])
+            start += FANOUT ** level
+        offsets = np.frombuffer(offsets_blob, dtype=np.int64)
+        block_starts = offsets[::BLOCK_LEAVES]
+
+        def read_rows(start, end):
+            first = int(np.searchsorted(block_starts, start, side='right')) - 1
+            last = int(np.searchsorted(block_starts, end, side='left'))
+            blocks = self.conn.execute(
+                f"SELECT key_hashes, row_hashes, positions FROM {TREE_ROWS_TABLE} "
+                "WHERE source = ? AND block >= ? AND block < ? ORDER BY block", (source, first, last)).fetchall()
+            arrays = [np.frombuffer(b''.join(block[i] for block in blocks), dtype=dtype)
+                      for i, dtype in enumerate((np.uint64, np.uint64, np.int64))]
+            begin = start - int(block_starts[first])
+            return tuple(array[begin:begin + end - start] for array in arrays)
+
+        return MerkleTree(levels, offsets, read_rows)
+
+    def save(self, source: str, signature: str, tree: MerkleTree):
+        """Store a tree for a source, replacing the one built for an earlier signature."""
+        block_starts = tree.offsets[::BLOCK_LEAVES]
+        blocks = []
+        for block in range(len(block_starts)):
+            start = int(block_starts[block])
+            end = int(block_starts[block + 1]) if block + 1 < len(block_starts) else tree.row_count
+            if end > start:
+                keys, rows, positions = tree.read_rows(start, end)
+                blocks.append((source, block, keys.tobytes(), rows.tobytes(), positions.tobytes()))
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {TREE_ROWS_TABLE} WHERE source = ?", (source,))
+            self.conn.execute(f"INSERT OR REPLACE INTO {TREE_TABLE} VALUES (?, ?, ?, ?, ?, ?)", (
+                source, signature, tree.row_count, tree.depth,
+                np.concatenate(tree.levels).tobytes(), np.ascontiguousarray(tree.offsets).tobytes()))
+            self.conn.executemany(f"INSERT INTO {TREE_ROWS_TABLE} VALUES (?, ?, ?, ?, ?)", blocks)
@@ -0,0 +1,99 @@
+import sqlite3
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+# Number of VM instructions between progress handler calls
+PROGRESS_STEP = 1000
+# Profile runs kept per history entry
+MAX_PROFILE_RUNS = 20
+
+
+def classify_plan_detail(detail: str) -> Optional[str]:
+    """Classify a plan step that is worth highlighting.
+
+    Returns:
+        'auto_index', 'temp_btree', 'scan' or None
+    """
+    upper = detail.upper()
+    if 'AUTOMATIC' in upper:
+        return 'auto_index'
+    if 'TEMP B-TREE' in upper:
+        return 'temp_btree'
+    if upper.startswith('SCAN'):
+        return 'scan'
+    return None
+
+
+def explain_query_plan(conn: sqlite3.Connection, sql: str, bindings=None) -> List[Dict[str, Any]]:
+    """Return EXPLAIN QUERY PLAN rows as a tree of nodes with children."""
+    cursor = conn.execute(f"EXPLAIN QUERY PLAN {sql}", bindings or {})
+    nodes = {}
+    roots = []
+    for row in cursor.fetchall():
+        node_id, parent_id, detail = row[0], row[1], row[-1]
+        node = {
+            'id': node_id,
+            'detail': detail,
+            'kind': classify_plan_detail(detail),
+            'children': []
+        }
+        nodes[node_id] = node
+        if parent_id in nodes:
+            nodes[parent_id]['children'].append(node)
+        else:
+            roots.append(node)
+    return roots
+
+
+def iter_plan_nodes(nodes: List[Dict[str, Any]]):
+    """Iterate plan nodes depth-first."""
+    for node in nodes:
+        yield node
+        yield from iter_plan_nodes(node['children'])
+
+
+def profile_query(conn: sqlite3.Connection, sql: str, bindings=None,
+                  step_interval: int = PROGRESS_STEP) -> Dict[str, Any]:
+    """Run a statement under a VM step counter and measure elapsed time.
+
+    The statement runs inside a savepoint that is rolled back, so profiling
+    data-changing statements leaves the database untouched.
+    """
+    plan = explain_query_plan(conn, sql, bindings)
+
+    step_calls = [0]
+
+    def count_steps():
+        step_calls[0] += 1
+        return 0
+
+    conn.set_progress_handler(count_steps, step_interval)
+    conn.execute("SAVEPOINT query_profile")
+    try:
+        start = time.perf_counter()
+        cursor = conn.execute(sql, bindings or {})
+        rows = sum(1 for _ in cursor)
+        elapsed = time.perf_counter() - start
+    finally:
+        conn.set_progress_handler(None, step_interval)
+        conn.execute("ROLLBACK TO query_profile")
+        conn.execute("RELEASE query_profile")
+
+    kinds = [node['kind'] for node in iter_plan_nodes(plan)]
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'elapsed_ms': round(elapsed * 1000, 3),
+        'vm_steps': step_calls[0] * step_interval,
+        'rows': rows,
+        'scans': kinds.count('scan'),
+        'temp_btrees': kinds.count('temp_btree'),
+        'auto_indexes': kinds.count('auto_index'),
+        'plan': plan
+    }
+
+
+def format_profile_run(run: Dict[str, Any]) -> str:
+    """One-line summary of a profile run."""
+    return (f"{run['elapsed_ms']:.1f} ms, ~{run['vm_steps']:,} VM steps, {run['rows']} rows, "
+            f"{run['scans']} scans, {run['temp_btrees']} temp B-trees, {run['auto_indexes']} automatic indexes")
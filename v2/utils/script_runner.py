@@ -0,0 +1,159 @@
+import re
+import sqlite3
+import time
+from typing import List, Dict, Any, Optional
+
+from utils.sql_params import substitute_parameters, to_bind_parameters
+
+TEMP_TABLE_PREFIX = '_script_step_'
+COMMENT_RE = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+ROW_RETURNING_RE = re.compile(r'^\s*(SELECT|WITH|VALUES)\b', re.IGNORECASE)
+TRANSACTION_RE = re.compile(r'^\s*(BEGIN|COMMIT|END|ROLLBACK)\b(?!\s+(TRANSACTION\s+)?TO\b)', re.IGNORECASE)
+
+
+def strip_comments(sql: str) -> str:
+    """Remove SQL comments from statement text."""
+    return COMMENT_RE.sub('', sql)
+
+
+def split_statements(script: str) -> List[str]:
+    """Split a script into complete statements.
+
+    Semicolons are only treated as separators when sqlite3.complete_statement
+    agrees, so semicolons inside string literals, comments and trigger bodies
+    do not break statements apart.
+    """
+    statements = []
+    buffer = ''
+    for piece in re.split(r'(?<=;)', script):
+        buffer += piece
+        if buffer.rstrip().endswith(';') and sqlite3.complete_statement(buffer):
+            if strip_comments(buffer).strip().strip(';').strip():
+                statements.append(buffer.strip())
+            buffer = ''
+
+    # Last statement does not need a trailing semicolon
+    if strip_comments(buffer).strip():
+        statements.append(buffer.strip())
+    return statements
+
+
+class ScriptRunner:
+    """Runs multi-statement scripts in one transaction with per-statement timing.
+
+    A script with its own BEGIN/COMMIT/ROLLBACK statements controls its
+    transactions; it is not wrapped, only what it leaves open is committed
+    (or rolled back on error). Intermediate row-returning statements are materialized into TEMP tables
+    instead of Python lists; only the last statement's rows are fetched, up
+    to max_rows.
+    """
+
+    def __init__(self):
+        self.conn = None
+        self.temp_tables = []
+
+    def run(self, conn: sqlite3.Connection, script: str, params: Optional[Dict[str, Any]] = None,
+            bind: bool = False, max_rows: int = 5000) -> List[Dict[str, Any]]:
+        """Run script and return one result dict per statement.
+
+        Each result has keys: index, sql, elapsed, rows, changes, columns,
+        temp_table, data (last statement only) and truncated.
+        """
+        params = params or {}
+        self.drop_temp_tables()
+        self.conn = conn
+
+        if not bind:
+            script = substitute_parameters(script, params)
+        statements = split_statements(script)
+
+        results = []
+        started_transaction = not conn.in_transaction
+        own_transactions = any(TRANSACTION_RE.match(strip_comments(sql)) for sql in statements)
+        if started_transaction and not own_transactions:
+            conn.execute('BEGIN')
+        try:
+            for index, sql in enumerate(statements):
+                is_last = index == len(statements) - 1
+                try:
+                    results.append(self._run_statement(conn, index, sql, params, bind, is_last, max_rows))
+                except sqlite3.Error as e:
+                    raise sqlite3.Error(f"Statement {index + 1} failed: {e}\n{sql}") from e
+            if started_transaction and conn.in_transaction:
+                conn.commit()
+        except Exception:
+            if started_transaction and conn.in_transaction:
+                conn.rollback()
+            self.temp_tables = []
+            raise
+        return results
+
+    def _run_statement(self, conn, index, sql, params, bind, is_last, max_rows):
+        """Execute a single statement and collect its timing."""
+        bindings = {}
+        if bind:
+            sql, bindings = to_bind_parameters(sql, params)
+        body = sql.rstrip().rstrip(';')
+
+        result = {
+            'index': index,
+            'sql': sql,
+            'elapsed': 0.0,
+            'rows': None,
+            'changes': 0,
+            'columns': [],
+            'temp_table': None,
+            'data': None,
+            'truncated': False
+        }
+
+        changes_before = conn.total_changes
+        start = time.perf_counter()
+
+        if not is_last and ROW_RETURNING_RE.match(strip_comments(body)):
+            temp_table = f"{TEMP_TABLE_PREFIX}{index + 1}"
+            try:
+                conn.execute(f'DROP TABLE IF EXISTS temp."{temp_table}"')
+                conn.execute(f'CREATE TEMP TABLE "{temp_table}" AS {body}', bindings)
+            except sqlite3.OperationalError:
+                # Not a plain query (e.g. WITH ... INSERT), run it as is
+                temp_table = None
+            if temp_table:
+                result['elapsed'] = time.perf_counter() - start
+                self.temp_tables.append(temp_table)
+                result['temp_table'] = temp_table
+                result['rows'] = conn.execute(f'SELECT count(*) FROM temp."{temp_table}"').fetchone()[0]
+                result['columns'] = [row[1] for row in conn.execute(f'PRAGMA temp.table_info("{temp_table}")')]
+                return result
+
+        cursor = conn.execute(body, bindings)
+        if cursor.description is not None:
+            result['columns'] = [description[0] for description in cursor.description]
+            if is_last:
+                data = cursor.fetchmany(max_rows + 1)
+                result['truncated'] = len(data) > max_rows
+                result['data'] = data[:max_rows]
+                result['rows'] = len(result['data'])
+            else:
+                result['rows'] = sum(1 for _ in cursor)
+        result['elapsed'] = time.perf_counter() - start
+        result['changes'] = conn.total_changes - changes_before
+        return result
+
+    def fetch_temp_table(self, temp_table: str, max_rows: int = 5000):
+        """Read rows of an intermediate result."""
+        cursor = self.conn.execute(f'SELECT * FROM temp."{temp_table}" LIMIT ?', (max_rows,))
+        columns = [description[0] for description in cursor.description]
+        return cursor.fetchall(), columns
+
+    def drop_temp_tables(self):
+        """Drop intermediate results of the previous run."""
+        if self.conn is None:
+            return
+        for temp_table in self.temp_tables:
+            try:
+                self.conn.execute(f'DROP TABLE IF EXISTS temp."{temp_table}"')
+            except sqlite3.Error:
+                # Connection was closed or replaced
+                break
+        self.temp_tables = []
@@ -0,0 +1,267 @@
+import gc
+import io
+import os
+import json
+import itertools
+import shutil
+import sqlite3
+import zipfile
+import tempfile
+import contextlib
+from typing import List, Any, Dict, Tuple
+
+import numpy as np
+
+# 1: csv_data inline in session.json, 2: csv_data as a columnar npz member
+SESSION_FORMAT_VERSION = 2
+CSV_DATA_MEMBER = 'csv_data.npz'
+NPZ_COMPRESS_LEVEL = 1
+
+
+TEXT_SEPARATOR = '\x00'
+NONE_TYPE = type(None)
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    """Pause cyclic GC, which otherwise rescans millions of new row lists."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _column_kind(values) -> str:
+    """Pick the storage kind of a column: int, float, str or json."""
+    types = set(map(type, values))
+    types.discard(NONE_TYPE)
+    if not types or types == {str}:
+        return 'str'
+    if types == {int}:
+        return 'int'
+    if types == {float}:
+        return 'float'
+    # Mixed or other types (bool, int and float together) keep exact values as JSON
+    return 'json'
+
+
+def _encode_text(arrays, index, values):
+    """Store text values as one UTF-8 blob, separated by NUL when no value contains it."""
+    text = TEXT_SEPARATOR.join(values)
+    if text.count(TEXT_SEPARATOR) == max(len(values) - 1, 0):
+        arrays[f'c{index}_text'] = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+    else:
+        arrays[f'c{index}_text'] = np.frombuffer(''.join(values).encode('utf-8'), dtype=np.uint8)
+        arrays[f'c{index}_lengths'] = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+
+
+def _decode_text(arrays, index, count):
+    """Inverse of _encode_text."""
+    text = arrays[f'c{index}_text'].tobytes().decode('utf-8')
+    if f'c{index}_lengths' not in arrays:
+        return text.split(TEXT_SEPARATOR) if count else []
+    ends = np.cumsum(arrays[f'c{index}_lengths']).tolist()
+    starts = [0] + ends[:-1]
+    return [text[start:end] for start, end in zip(starts, ends)]
+
+
+def encode_table(data: List[List[Any]]) -> bytes:
+    """Encode rows as a compressed columnar npz blob.
+
+    Text columns are stored as one UTF-8 blob, numeric columns as
+    int64/float64 arrays, and None as a null mask. Columns with other or
+    mixed value types fall back to JSON text, so decode_table returns
+    exactly the values that were encoded.
+    """
+    with _gc_paused():
+        return _encode_table(data)
+
+
+def _encode_table(data):
+    """Build the npz blob (see encode_table)."""
+    row_lengths = [len(row) for row in data]
+    width = max(row_lengths) if row_lengths else 0
+    ragged = any(length != width for length in row_lengths)
+
+    arrays = {}
+    kinds = []
+    columns = itertools.zip_longest(*data, fillvalue=None) if data else []
+    for index, values in enumerate(columns):
+        kind = _column_kind(values)
+        nulls = None
+        if kind != 'json' and None in values:
+            nulls = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+            fill = '' if kind == 'str' else 0
+            values = [fill if value is None else value for value in values]
+
+        if kind in ('int', 'float'):
+            try:
+                arrays[f'c{index}_values'] = np.array(values, dtype=np.int64 if kind == 'int' else np.float64)
+            except OverflowError:
+                # Beyond int64, keep exact values as JSON
+                kind = 'json'
+                if nulls is not None:
+                    values = [None if null else value for value, null in zip(values, nulls.tolist())]
+                    nulls = None
+        if kind == 'json':
+            values = [json.dumps(value, ensure_ascii=False) for value in values]
+        if kind in ('str', 'json'):
+            _encode_text(arrays, index, values)
+        if nulls is not None:
+            arrays[f'c{index}_nulls'] = nulls
+        kinds.append(kind)
+
+    if ragged:
+        arrays['row_lengths'] = np.array(row_lengths, dtype=np.int64)
+    meta = {'format_version': SESSION_FORMAT_VERSION, 'rows': len(data), 'kinds': kinds}
+    arrays['meta'] = np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)
+
+    # Same layout as np.savez_compressed, with a faster compression level
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=NPZ_COMPRESS_LEVEL) as npz:
+        for name, array in arrays.items():
+            with npz.open(f'{name}.npy', 'w', force_zip64=True) as member:
+                np.lib.format.write_array(member, np.asanyarray(array), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def decode_table(blob: bytes) -> List[List[Any]]:
+    """Decode rows encoded with encode_table."""
+    with _gc_paused(), np.load(io.BytesIO(blob), allow_pickle=False) as arrays:
+        meta = json.loads(arrays['meta'].tobytes().decode('utf-8'))
+        row_count = meta['rows']
+        columns = []
+        for index, kind in enumerate(meta['kinds']):
+            if kind in ('str', 'json'):
+                values = _decode_text(arrays, index, row_count)
+                if kind == 'json':
+                    values = list(map(json.loads, values))
+            else:
+                values = arrays[f'c{index}_values'].tolist()
+            if f'c{index}_nulls' in arrays:
+                values = [None if null else value for value, null in zip(values, arrays[f'c{index}_nulls'].tolist())]
+            columns.append(values)
+
+        rows = list(map(list, zip(*columns))) if columns else [[] for _ in range(row_count)]
+        if 'row_lengths' in arrays:
+            rows = [row[:length] for row, length in zip(rows, arrays['row_lengths'].tolist())]
+    return rows
+
+
+def split_session_data(session_data: Dict[str, Any]) -> Tuple[Dict[str, Any], bytes]:
+    """Move csv_data out of session.json data into a columnar blob."""
+    session_data = dict(session_data)
+    csv_data = session_data.pop('csv_data', None) or []
+    session_data['format_version'] = SESSION_FORMAT_VERSION
+    session_data['csv_data_member'] = CSV_DATA_MEMBER
+    return session_data, encode_table(csv_data)
+
+
+def read_session_csv_data(session_data: Dict[str, Any], zip_file) -> List[List[Any]]:
+    """Return csv_data of a session, from the columnar member or legacy inline JSON."""
+    if session_data.get('format_version', 1) >= 2 and session_data.get('csv_data_member'):
+        return decode_table(zip_file.read(session_data['csv_data_member']))
+    return session_data.get('csv_data') or []
+
+
+# Default member names, used by sessions saved without a parts manifest
+SESSION_PARTS = {
+    'database': 'session_db.sqlite',
+    'history': 'history.json',
+    'csv_data': CSV_DATA_MEMBER
+}
+
+
+def session_manifest(session_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the parts manifest to session.json data."""
+    session_data = dict(session_data)
+    session_data['parts'] = dict(SESSION_PARTS)
+    return session_data
+
+
+class SessionArchive:
+    """Reads parts of a session zip on demand.
+
+    Only session.json is read up front; it acts as the manifest naming the
+    other members, which are opened when they are first needed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with zipfile.ZipFile(path, 'r') as zf:
+            self.members = set(zf.namelist())
+            if 'session.json' in self.members:
+                self.session_data = json.loads(zf.read('session.json').decode('utf-8'))
+            else:
+                self.session_data = {}
+        self.parts = dict(SESSION_PARTS)
+        self.parts.update(self.session_data.get('parts', {}))
+
+    def has_part(self, part: str) -> bool:
+        """Check whether the archive contains a part."""
+        if part == 'csv_data' and 'csv_data' in self.session_data:
+            return True
+        return self.parts.get(part) in self.members
+
+    def extract_part(self, part: str, target_path: str) -> str:
+        """Stream a part to a file without extracting the rest of the archive."""
+        with zipfile.ZipFile(self.path, 'r') as zf:
+            with zf.open(self.parts[part]) as source, open(target_path, 'wb') as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+        return target_path
+
+    def read_json_part(self, part: str):
+        """Load a JSON part."""
+        with zipfile.ZipFile(self.path, 'r') as zf:
+            return json.loads(zf.read(self.parts[part]).decode('utf-8'))
+
+    def read_csv_data(self) -> List[List[Any]]:
+        """Load csv_data from the columnar member or legacy inline JSON."""
+        if 'csv_data' in self.session_data:
+            return self.session_data['csv_data'] or []
+        with zipfile.ZipFile(self.path, 'r') as zf:
+            session_data = dict(self.session_data)
+            session_data.setdefault('csv_data_member', self.parts['csv_data'])
+            return read_session_csv_data(session_data, zf)
+
+
+@contextlib.contextmanager
+def database_snapshot(conn: sqlite3.Connection):
+    """Yield (binary file, size) with a consistent image of the connection's main database.
+
+    A file database is read in place: the WAL is checkpointed into the file
+    and a read transaction keeps other connections from changing it while
+    it is streamed. In-memory databases, open write transactions and busy
+    checkpoints fall back to a backup into a temporary file.
+    """
+    path = None
+    for _, name, file_path in conn.execute("PRAGMA database_list").fetchall():
+        if name == 'main':
+            path = file_path
+    if path and not conn.in_transaction:
+        busy = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+        if not busy:
+            conn.execute("BEGIN")
+            try:
+                conn.execute("SELECT count(*) FROM sqlite_master").fetchone()
+                with open(path, 'rb') as f:
+                    yield f, os.path.getsize(path)
+            finally:
+                conn.rollback()
+            return
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        backup_path = os.path.join(temp_dir, 'session_db.sqlite')
+        backup_conn = sqlite3.connect(backup_path)
+        try:
+            conn.backup(backup_conn)
+        finally:
+            backup_conn.close()
+        with open(backup_path, 'rb') as f:
+            yield f, os.path.getsize(backup_path)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
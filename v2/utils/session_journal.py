@@ -0,0 +1,235 @@
+import os
+import json
+import sqlite3
+import time
+from typing import List, Dict, Any, Optional
+
+from utils.session_format import encode_table, decode_table
+
+JOURNAL_FILE = 'journal.jsonl'
+
+# Authorizer actions that modify table contents or schema
+WRITE_ACTIONS = {
+    sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE,
+    sqlite3.SQLITE_CREATE_TABLE, sqlite3.SQLITE_DROP_TABLE, sqlite3.SQLITE_ALTER_TABLE
+}
+
+
+class SessionChangeTracker:
+    """Collects what changed in the session since the last autosave.
+
+    Lives on the GUI thread: editors mark dirty cells, structural CSV
+    changes and queries added to the history; a connection authorizer
+    marks tables that statements write to. take_entries() turns the
+    marks into journal entries and resets them. Per-table write versions
+    are kept across resets so that cached table statistics can tell when
+    data changed.
+    """
+
+    def __init__(self):
+        self.dirty_cells = {}
+        self.structure_dirty = False
+        self.history_queries = []
+        self.dirty_tables = set()
+        self.total_changes = None
+        self.table_versions = {}
+
+    def mark_cell(self, row: int, col: int, value):
+        """Record a single edited CSV cell."""
+        if not self.structure_dirty:
+            self.dirty_cells[(row, col)] = value
+
+    def mark_structure(self):
+        """Record that CSV rows/columns changed; the next entry is a full snapshot."""
+        self.structure_dirty = True
+        self.dirty_cells.clear()
+
+    def mark_history(self, query_entry: Dict[str, Any]):
+        """Record a query added to the history; only added queries are journaled."""
+        self.history_queries.append(dict(query_entry))
+
+    def authorizer(self, action, arg1, arg2, db_name, trigger_name):
+        """sqlite3 authorizer noting tables written by prepared statements."""
+        if action in WRITE_ACTIONS:
+            # ALTER TABLE passes (database, table); the others pass the table first
+            table, database = (arg2, arg1) if action == sqlite3.SQLITE_ALTER_TABLE else (arg1, db_name)
+            if table and database == 'main' and not table.startswith('sqlite_'):
+                self.dirty_tables.add(table)
+                self.table_versions[table] = self.table_versions.get(table, 0) + 1
+        return sqlite3.SQLITE_OK
+
+    def reset(self, total_changes: Optional[int] = None):
+        """Forget all marks, e.g. after a full save."""
+        self.dirty_cells = {}
+        self.structure_dirty = False
+        self.history_queries = []
+        self.dirty_tables = set()
+        self.total_changes = total_changes
+
+    def take_entries(self, csv_headers: List[str], csv_data: List[List[Any]],
+                     total_changes: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Build journal entries for the changes since the last call.
+
+        Data is copied, so the entries can be written from another thread
+        while the editors keep changing.
+        """
+        entries = []
+        if self.structure_dirty:
+            entries.append({
+                'type': 'csv_snapshot',
+                'headers': list(csv_headers),
+                'data': [list(row) for row in csv_data]
+            })
+        elif self.dirty_cells:
+            entries.append({
+                'type': 'cells',
+                'cells': [[row, col, value] for (row, col), value in self.dirty_cells.items()]
+            })
+        if self.history_queries:
+            entries.append({'type': 'history_queries', 'queries': self.history_queries})
+
+        changed = total_changes is not None and self.total_changes is not None and total_changes != self.total_changes
+        if self.dirty_tables or changed:
+            # Cached statements are not re-authorized, so a change count without names means unknown tables
+            entries.append({'type': 'tables', 'tables': sorted(self.dirty_tables) or None})
+
+        self.reset(total_changes)
+        return entries
+
+
+class SessionJournal:
+    """Append-only change journal of the current session, used for crash recovery.
+
+    The first entry ('base') names the session file and database the
+    changes apply to. Entries are JSON lines; CSV snapshots are stored next
+    to the journal as columnar npz files. A full session save starts a new
+    journal; a clean exit removes it.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, JOURNAL_FILE)
+        self.sequence = 0
+
+    def start(self, session_path: Optional[str], db_path: Optional[str]):
+        """Begin a new journal for a freshly opened or saved session."""
+        self.discard()
+        os.makedirs(self.directory, exist_ok=True)
+        self.sequence = 0
+        self.append([{'type': 'base', 'session_path': session_path, 'db_path': db_path}])
+
+    def append(self, entries: List[Dict[str, Any]]):
+        """Write entries durably; safe to call from a worker thread."""
+        if not entries:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        lines = []
+        for entry in entries:
+            self.sequence += 1
+            entry = dict(entry, seq=self.sequence, time=time.time())
+            if entry['type'] == 'csv_snapshot':
+                snapshot_file = f"csv_{self.sequence}.npz"
+                snapshot_path = os.path.join(self.directory, snapshot_file)
+                with open(snapshot_path, 'wb') as f:
+                    f.write(encode_table(entry.pop('data')))
+                    f.flush()
+                    os.fsync(f.fileno())
+                entry['file'] = snapshot_file
+            lines.append(json.dumps(entry, ensure_ascii=False))
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read_entries(self) -> List[Dict[str, Any]]:
+        """Read journal entries, ignoring a torn last line."""
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        return entries
+
+    def has_changes(self) -> bool:
+        """True when the journal holds changes beyond its base entry."""
+        return any(entry.get('type') != 'base' for entry in self.read_entries())
+
+    def replay(self) -> Dict[str, Any]:
+        """Fold journal entries into the state to recover.
+
+        Returns session_path and db_path of the base, csv_headers/csv_data
+        of the last snapshot (None without one), cells edited after it (to
+        apply on top of the snapshot, or of the base session's data),
+        history_queries (queries added to the history, in order) and tables
+        (names, or None when unknown tables changed).
+        """
+        state = {
+            'session_path': None,
+            'db_path': None,
+            'csv_headers': None,
+            'csv_data': None,
+            'cells': [],
+            'history_queries': [],
+            'tables': []
+        }
+        for entry in self.read_entries():
+            entry_type = entry.get('type')
+            if entry_type == 'base':
+                state['session_path'] = entry.get('session_path')
+                state['db_path'] = entry.get('db_path')
+            elif entry_type == 'csv_snapshot':
+                snapshot_path = os.path.join(self.directory, entry['file'])
+                if not os.path.exists(snapshot_path):
+                    continue
+                with open(snapshot_path, 'rb') as f:
+                    state['csv_data'] = decode_table(f.read())
+                state['csv_headers'] = entry['headers']
+                state['cells'] = []
+            elif entry_type == 'cells':
+                state['cells'].extend(entry['cells'])
+            elif entry_type == 'history_queries':
+                state['history_queries'].extend(entry['queries'])
+            elif entry_type == 'tables' and state['tables'] is not None:
+                if entry.get('tables') is None:
+                    state['tables'] = None
+                else:
+                    state['tables'] = sorted(set(state['tables']) | set(entry['tables']))
+
+        if state['csv_data'] is not None:
+            apply_cells(state['csv_data'], state['cells'])
+            state['cells'] = []
+        return state
+
+    def discard(self):
+        """Remove the journal and its snapshots."""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name == JOURNAL_FILE or (name.startswith('csv_') and name.endswith('.npz')):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+def apply_cells(data: List[List[Any]], cells: List[List[Any]]):
+    """Apply journaled cell edits to rows in place, skipping cells out of range."""
+    for row, col, value in cells:
+        if row < len(data) and col < len(data[row]):
+            data[row][col] = value
+
+
+def checkpoint_database(db_path: Optional[str]):
+    """Move WAL content into the database file using a separate connection."""
+    if not db_path or not os.path.exists(db_path):
+        return
+    conn = sqlite3.connect(db_path, timeout=1)
+    try:
+        if conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == 'wal':
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+    finally:
+        conn.close()
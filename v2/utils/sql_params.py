@@ -0,0 +1,122 @@
+import re
+import sqlite3
+from typing import Dict, Any, List, Tuple, Iterable
+
+# Default size of the per-connection prepared statement cache
+DEFAULT_CACHED_STATEMENTS = 256
+
+# Matches a {key} placeholder
+PLACEHOLDER_RE = re.compile(r"\{([^{}]+)\}")
+# Matches a string literal, a quoted identifier or a bare placeholder
+TOKEN_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\{([^{}]+)\}")
+BIND_NAME_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def substitute_parameters(query_text: str, params: Dict[str, Any]) -> str:
+    """Replace {key} placeholders with parameter values as plain text."""
+    final_query = query_text
+    for key, value in params.items():
+        placeholder = f"{{{key}}}"
+        final_query = final_query.replace(placeholder, str(value))
+    return final_query
+
+
+def to_bind_parameters(query_text: str, params: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Rewrite {key} placeholders to named :key bind parameters.
+
+    A string literal that is just a placeholder ('{key}') becomes the
+    parameter, so the bound value keeps its string meaning; placeholders
+    inside a longer literal split it into a concatenation ('%{key}%'
+    becomes '%' || :key || '%'). Placeholders in quoted identifiers and
+    keys that are not valid SQLite parameter names fall back to text
+    substitution.
+
+    Returns:
+        Tuple of (statement text, dict of values to bind)
+    """
+    bindings = {}
+
+    def substitute(text):
+        return PLACEHOLDER_RE.sub(
+            lambda match: str(params[match.group(1)]) if match.group(1) in params else match.group(0), text)
+
+    def replace_literal(literal):
+        pieces, text, pos = [], '', 0
+        for match in PLACEHOLDER_RE.finditer(literal):
+            key = match.group(1)
+            if key not in params:
+                continue
+            text += literal[pos:match.start()]
+            pos = match.end()
+            if BIND_NAME_RE.match(key):
+                if text:
+                    pieces.append(f"'{text}'")
+                pieces.append(f":{key}")
+                bindings[key] = params[key]
+                text = ''
+            else:
+                text += str(params[key])
+        text += literal[pos:]
+        if text or not pieces:
+            pieces.append(f"'{text}'")
+        return ' || '.join(pieces)
+
+    def replace(match):
+        token = match.group(0)
+        if token.startswith("'"):
+            return replace_literal(token[1:-1])
+        if token.startswith('"'):
+            return substitute(token)
+        key = match.group(1)
+        if key not in params:
+            return token
+        if not BIND_NAME_RE.match(key):
+            return str(params[key])
+        bindings[key] = params[key]
+        return f":{key}"
+
+    return TOKEN_RE.sub(replace, query_text), bindings
+
+
+def parse_parameter_sets(text: str) -> List[Dict[str, str]]:
+    """Parse tab-separated parameter sets with a header row of keys."""
+    rows = [row for row in text.split('\n') if row.strip()]
+    if len(rows) < 2:
+        return []
+    keys = [key.strip() for key in rows[0].rstrip('\r').split('\t')]
+    param_sets = []
+    for row in rows[1:]:
+        values = row.rstrip('\r').split('\t')
+        values += [''] * (len(keys) - len(values))
+        param_sets.append({key: values[idx] for idx, key in enumerate(keys) if key})
+    return param_sets
+
+
+def execute_bound(conn: sqlite3.Connection, query_text: str, params: Dict[str, Any]) -> sqlite3.Cursor:
+    """Execute a query with its parameters bound instead of spliced in."""
+    statement, bindings = to_bind_parameters(query_text, params)
+    return conn.execute(statement, bindings)
+
+
+def execute_batch(conn: sqlite3.Connection, query_text: str, base_params: Dict[str, Any],
+                  param_sets: Iterable[Dict[str, Any]]) -> int:
+    """Run one prepared statement over many parameter sets with executemany.
+
+    Every set is merged over base_params, so keys that do not vary between
+    runs only need to be defined once.
+
+    Returns:
+        Number of rows changed by the batch
+    """
+    merged_sets = [{**base_params, **param_set} for param_set in param_sets]
+    if not merged_sets:
+        return 0
+
+    # The statement text depends on the keys only, so one prepare serves every set.
+    # Keys that cannot be bound are substituted from the first set.
+    statement, bindings = to_bind_parameters(query_text, merged_sets[0])
+    rows = [{name: param_set.get(name) for name in bindings} for param_set in merged_sets]
+
+    before = conn.total_changes
+    conn.executemany(statement, rows)
+    return conn.total_changes - before
@@ -0,0 +1,69 @@
+import sqlite3
+from typing import List, Tuple, Optional
+
+# SQLite's own tables and tables the app keeps in the session database
+INTERNAL_TABLE_PREFIXES = ('sqlite_', 'csvq_')
+
+
+def group_table_names(table_names: List[str]) -> Tuple[List[Tuple[str, List[str]]], List[str]]:
+    """Group tables imported from Excel files by file prefix in one pass.
+
+    A table named file_sheet belongs to group "file" when at least one
+    other table has exactly the same prefix before its last underscore.
+    Returns (groups, standalone): groups as (file_name, sorted tables) in
+    order of first appearance, standalone tables sorted.
+    """
+    by_prefix = {}
+    for table_name in table_names:
+        if table_name.startswith(INTERNAL_TABLE_PREFIXES):
+            continue
+        prefix = table_name.rsplit('_', 1)[0] if '_' in table_name else None
+        by_prefix.setdefault(prefix, []).append(table_name)
+
+    groups = []
+    standalone = list(by_prefix.pop(None, []))
+    for prefix, members in by_prefix.items():
+        if len(members) > 1:
+            groups.append((prefix, sorted(members)))
+        else:
+            standalone.extend(members)
+    return groups, sorted(standalone)
+
+
+class TableCatalog:
+    """Table names of the session database, cached until the schema changes.
+
+    PRAGMA schema_version is bumped by SQLite on every CREATE, DROP or
+    ALTER, so checking it is enough to know whether sqlite_master has to
+    be read again.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.table_names = []
+
+    def refresh(self, conn: sqlite3.Connection) -> bool:
+        """Reload table names if the schema changed; returns True when it did."""
+        main_path = next((row[2] for row in conn.execute("PRAGMA database_list") if row[1] == 'main'), '')
+        key = (id(conn), main_path, conn.execute("PRAGMA schema_version").fetchone()[0])
+        if key == self.key:
+            return False
+        self.table_names = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")]
+        self.key = key
+        return True
+
+    def invalidate(self):
+        """Force the next refresh to reload the catalog."""
+        self.key = None
+
+
+def tree_spec(key: tuple, text: str, data: dict, tooltip: str = '', children: Optional[list] = None,
+              expanded: bool = False) -> dict:
+    """Description of a tree item, used to update a tree in place.
+
+    key identifies the item among its siblings; it is stored as a string
+    because Qt item data turns tuples into lists.
+    """
+    return {'key': '\x1f'.join(map(str, key)), 'text': text, 'data': data, 'tooltip': tooltip,
+            'children': children or [], 'expanded': expanded}
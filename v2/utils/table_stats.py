@@ -0,0 +1,147 @@
+import json
+import random
+import sqlite3
+from typing import Any, Dict, Hashable, List, Optional
+
+SAMPLE_ROWS = 100000  # Tables with more rows are profiled on a sample
+SAMPLE_BLOCKS = 20  # Sampled rowid ranges, spread over the table
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table or column name for use in SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def table_size(conn: sqlite3.Connection, table: str) -> Optional[Dict[str, int]]:
+    """On-disk size in bytes of a table and of its indexes, from dbstat.
+
+    Returns None when SQLite was built without the dbstat virtual table.
+    """
+    try:
+        rows = conn.execute(
+            "SELECT m.type, SUM(s.pgsize) FROM dbstat('main', 1) AS s "
+            "JOIN sqlite_master AS m ON m.name = s.name "
+            "WHERE m.tbl_name = ? GROUP BY m.type", (table,)).fetchall()
+    except sqlite3.Error:
+        return None
+    sizes = dict(rows)
+    return {'table': sizes.get('table', 0), 'indexes': sizes.get('index', 0)}
+
+
+def sample_rowids(conn: sqlite3.Connection, table: str, sample_rows: int,
+                  rng: Optional[random.Random] = None) -> Optional[List[int]]:
+    """Pick about sample_rows rowids from blocks at random places in the table.
+
+    Each block is a range scan on the rowid, so the cost depends on the
+    sample size rather than on the table size. Returns None for WITHOUT
+    ROWID tables.
+    """
+    rng = rng or random.Random()
+    quoted = quote_identifier(table)
+    try:
+        low, high = conn.execute(f"SELECT min(rowid), max(rowid) FROM {quoted}").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if low is None:
+        return []
+    block = max(1, sample_rows // SAMPLE_BLOCKS)
+    rowids = set()
+    for _ in range(SAMPLE_BLOCKS):
+        start = rng.randint(low, high)
+        rowids.update(row[0] for row in conn.execute(
+            f"SELECT rowid FROM {quoted} WHERE rowid >= ? ORDER BY rowid LIMIT ?", (start, block)))
+    return sorted(rowids)
+
+
+def compute_table_stats(conn: sqlite3.Connection, table: str, sample_rows: int = SAMPLE_ROWS,
+                        rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    """Row count, size and per-column null/distinct/min/max profile of a table.
+
+    Tables with more than sample_rows rows are profiled on a sample; the
+    column figures then describe the sample ('sampled' is True). Only reads
+    the database, so it can run on a separate read-only connection.
+    """
+    quoted = quote_identifier(table)
+    columns = [(row[1], row[2]) for row in conn.execute(f"PRAGMA table_info({quoted})")]
+    row_count = conn.execute(f"SELECT count(*) FROM {quoted}").fetchone()[0]
+
+    source, params = quoted, ()
+    sampled = row_count > sample_rows
+    if sampled:
+        rowids = sample_rowids(conn, table, sample_rows, rng)
+        if rowids is None:
+            source, params = f"(SELECT * FROM {quoted} LIMIT ?)", (sample_rows,)
+        else:
+            source = f"(SELECT * FROM {quoted} WHERE rowid IN (SELECT value FROM json_each(?)))"
+            params = (json.dumps(rowids),)
+
+    profiles = []
+    if columns:
+        # One pass over the rows computes every column's aggregates
+        parts = ['count(*)']
+        for name, _ in columns:
+            column = quote_identifier(name)
+            parts.append(f"count({column}), count(DISTINCT {column}), min({column}), max({column})")
+        values = conn.execute(f"SELECT {', '.join(parts)} FROM {source}", params).fetchone()
+        profiled_rows = values[0]
+        for i, (name, col_type) in enumerate(columns):
+            non_null, distinct, min_value, max_value = values[1 + 4 * i:5 + 4 * i]
+            profiles.append({
+                'name': name, 'type': col_type, 'nulls': profiled_rows - non_null,
+                'distinct': distinct, 'min': min_value, 'max': max_value
+            })
+    else:
+        profiled_rows = row_count
+
+    return {
+        'table': table,
+        'row_count': row_count,
+        'size': table_size(conn, table),
+        'sampled': sampled,
+        'profiled_rows': profiled_rows,
+        'columns': profiles
+    }
+
+
+class TableStatsCache:
+    """Computed table statistics, kept until the database's data changes.
+
+    Entries are stored with a signature of the state they were computed
+    for; a lookup with a different signature misses. Statements served
+    from sqlite3's statement cache are not re-authorized, so a write cannot
+    always be attributed to a table: the signature holds the connection's
+    change count and PRAGMA data_version (commits of other connections)
+    besides the table's schema and authorized write version.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, table: str, signature: Hashable) -> Optional[Dict[str, Any]]:
+        """Cached statistics of a table, None if missing or out of date."""
+        entry = self.entries.get(table)
+        if entry and entry[0] == signature:
+            return entry[1]
+        return None
+
+    def put(self, table: str, signature: Hashable, stats: Dict[str, Any]):
+        """Store statistics computed for the given table state."""
+        self.entries[table] = (signature, stats)
+
+    def invalidate(self, table: Optional[str] = None):
+        """Forget one table's statistics, or all of them."""
+        if table is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(table, None)
+
+
+def format_size(size: Optional[int]) -> str:
+    """Human readable byte size."""
+    if size is None:
+        return 'n/a'
+    value = float(size)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if value < 1024 or unit == 'GB':
+            return f"{value:.0f} {unit}" if unit == 'B' else f"{value:.1f} {unit}"
+        value /= 1024
@@ -0,0 +1,410 @@
+import re
+import sqlite3
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.table_stats import quote_identifier
+
+DEFAULT_PAGE_SIZE = 1000
+
+
+def _lower(value):
+    return None if value is None else str(value).lower()
+
+
+def _regexp(pattern, value):
+    if value is None:
+        return 0
+    try:
+        return 1 if re.search(pattern, str(value)) else 0
+    except re.error:
+        return 0
+
+
+def register_functions(conn: sqlite3.Connection):
+    """Register the SQL functions filters and searches are translated to.
+
+    SQLite's lower() only folds ASCII letters; csvq_lower() uses Python's
+    str.lower() so that pushed-down filters match what the editor matches.
+    """
+    conn.create_function('csvq_lower', 1, _lower, deterministic=True)
+    conn.create_function('csvq_regexp', 2, _regexp, deterministic=True)
+
+
+def _like_pattern(text: str, prefix: str = '%', suffix: str = '%') -> str:
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return prefix + escaped + suffix
+
+
+def filter_condition(column: str, filter_info: Dict[str, Any]) -> Tuple[str, list]:
+    """SQL condition for one CSV editor filter ({'value', 'type'}) on a column.
+
+    Cells are compared as the editor shows them: as text, NULL being empty.
+    """
+    text = f"coalesce(CAST({quote_identifier(column)} AS TEXT), '')"
+    value = str(filter_info['value'])
+    filter_type = filter_info['type']
+    if filter_type == 'equals':
+        return f"{text} = ?", [value]
+    if filter_type == 'not_equals':
+        return f"{text} <> ?", [value]
+    patterns = {'contains': ('%', '%'), 'starts_with': ('', '%'), 'ends_with': ('%', '')}
+    if filter_type in patterns:
+        prefix, suffix = patterns[filter_type]
+        return f"csvq_lower({text}) LIKE ? ESCAPE '\\'", [_like_pattern(value.lower(), prefix, suffix)]
+    return "0", []
+
+
+def search_condition(columns: List[str], search_text: str, mode: str = 'any',
+                     case_sensitive: bool = False) -> Tuple[str, list]:
+    """SQL condition for the CSV editor search box over the given columns.
+
+    Mirrors CSVEditor.perform_search: 'any'/'all' look for words, 'exact'
+    for a whole cell value and 'regex' for a pattern.
+    """
+    if not columns:
+        return "0", []
+    texts = [f"coalesce(CAST({quote_identifier(c)} AS TEXT), '')" for c in columns]
+    if not case_sensitive:
+        texts = [f"csvq_lower({t})" for t in texts]
+        search_text = search_text.lower() if mode != 'regex' else search_text
+    if mode == 'regex':
+        try:
+            re.compile(search_text)
+        except re.error:
+            return search_condition(columns, search_text, 'any', case_sensitive)
+        pattern = search_text if case_sensitive else '(?i)' + search_text
+        return '(' + ' OR '.join(f"csvq_regexp(?, {t})" for t in texts) + ')', [pattern] * len(texts)
+    if mode == 'exact':
+        return '(' + ' OR '.join(f"{t} = ?" for t in texts) + ')', [search_text] * len(texts)
+
+    words = search_text.split() or ['']
+    # instr() is case sensitive and, unlike LIKE, treats % and _ literally
+    word_conditions = ['(' + ' OR '.join(f"instr({t}, ?) > 0" for t in texts) + ')' for _ in words]
+    params = [word for word in words for _ in texts]
+    joiner = ' AND ' if mode == 'all' else ' OR '
+    return '(' + joiner.join(word_conditions) + ')', params
+
+
+class TableEditQueue:
+    """Edits of a SQLite table made in the editor, written back by rowid.
+
+    Cell edits of the same cell collapse to the last value, edits of rows
+    that are not in the table yet go into their INSERT, and edits of rows
+    or columns that are removed again are dropped, so a flush writes the
+    net result with one statement per column or kind of change.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Forget all queued edits."""
+        self.updates = {}  # (rowid, column) -> value
+        self.inserts = {}  # temporary id -> {column: value}
+        self.deletes = set()
+        self.added_columns = []
+        self.dropped_columns = []
+        self.next_id = -1
+
+    def __len__(self) -> int:
+        return (len(self.updates) + len(self.inserts) + len(self.deletes)
+                + len(self.added_columns) + len(self.dropped_columns))
+
+    def update(self, rowid: int, column: str, value: Any):
+        if rowid in self.inserts:
+            self.inserts[rowid][column] = value
+        elif rowid not in self.deletes:
+            self.updates[(rowid, column)] = value
+
+    def insert(self, values: Dict[str, Any]) -> int:
+        temp_id = self.next_id
+        self.next_id -= 1
+        self.inserts[temp_id] = dict(values)
+        return temp_id
+
+    def delete(self, rowid: int):
+        if rowid in self.inserts:
+            del self.inserts[rowid]
+            return
+        self.deletes.add(rowid)
+        self.updates = {key: value for key, value in self.updates.items() if key[0] != rowid}
+
+    def add_column(self, column: str):
+        self.added_columns.append(column)
+
+    def drop_column(self, column: str):
+        self.updates = {key: value for key, value in self.updates.items() if key[1] != column}
+        for values in self.inserts.values():
+            values.pop(column, None)
+        if column in self.added_columns:
+            self.added_columns.remove(column)
+        else:
+            self.dropped_columns.append(column)
+
+    def updated_columns(self) -> set:
+        return {column for _, column in self.updates}
+
+    def flush(self, conn: sqlite3.Connection, table: str) -> Dict[int, int]:
+        """Write the queued edits in one transaction and clear the queue.
+
+        Order: new columns, cell updates grouped by column, inserts,
+        deletes, dropped columns. Returns {temporary id: rowid} of the
+        inserted rows. On error the transaction is rolled back and the
+        queue is kept.
+        """
+        quoted = quote_identifier(table)
+        inserted = {}
+        started = not conn.in_transaction
+        if started:
+            conn.execute("BEGIN")  # ALTER TABLE would otherwise run outside the transaction
+        try:
+            for column in self.added_columns:
+                conn.execute(f"ALTER TABLE {quoted} ADD COLUMN {quote_identifier(column)}")
+            by_column = {}
+            for (rowid, column), value in self.updates.items():
+                by_column.setdefault(column, []).append((value, rowid))
+            for column, params in by_column.items():
+                conn.executemany(f"UPDATE {quoted} SET {quote_identifier(column)} = ? WHERE rowid = ?", params)
+            for temp_id, values in sorted(self.inserts.items(), reverse=True):
+                if values:
+                    columns = ', '.join(quote_identifier(c) for c in values)
+                    cursor = conn.execute(f"INSERT INTO {quoted} ({columns}) VALUES ({', '.join('?' * len(values))})",
+                                          list(values.values()))
+                else:
+                    cursor = conn.execute(f"INSERT INTO {quoted} DEFAULT VALUES")
+                inserted[temp_id] = cursor.lastrowid
+            conn.executemany(f"DELETE FROM {quoted} WHERE rowid = ?", [(rowid,) for rowid in sorted(self.deletes)])
+            for column in self.dropped_columns:
+                conn.execute(f"ALTER TABLE {quoted} DROP COLUMN {quote_identifier(column)}")
+            if started:
+                conn.commit()
+        except sqlite3.Error:
+            if started:
+                conn.rollback()
+            raise
+        self.clear()
+        return inserted
+
+
+class WindowPages:
+    """Pages of a table window shown in the editor, and the rows each still shows.
+
+    Rows added or deleted in the editor change the count of the page
+    they belong to, so the next page to fetch, the rows to drop when
+    sliding and the absolute row numbers do not assume full pages.
+    """
+
+    def __init__(self):
+        self.reset(0)
+
+    def reset(self, count: int):
+        """Show only the first page, with count rows."""
+        self.first_page = 0
+        self.first_row = 0  # Absolute position of the first shown row
+        self.counts = [count]
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def next_page(self) -> int:
+        return self.first_page + len(self.counts)
+
+    def append(self, count: int):
+        self.counts.append(count)
+
+    def prepend(self, count: int):
+        self.counts.insert(0, count)
+        self.first_page -= 1
+        self.first_row = 0 if self.first_page == 0 else max(0, self.first_row - count)
+
+    def drop_first(self) -> int:
+        """Forget the first page; returns how many rows it showed."""
+        count = self.counts.pop(0)
+        self.first_page += 1
+        self.first_row += count
+        return count
+
+    def drop_last(self) -> int:
+        """Forget the last page; returns how many rows it showed."""
+        return self.counts.pop()
+
+    def add_row(self):
+        """A row was added at the end of the shown rows."""
+        self.counts[-1] += 1
+
+    def remove_row(self, row: int):
+        """The shown row at this position was removed."""
+        for page, count in enumerate(self.counts):
+            if row < count:
+                self.counts[page] -= 1
+                return
+            row -= count
+
+
+class SQLiteTableWindow:
+    """Paged, editable view of a SQLite rowid table.
+
+    Rows are read a page at a time in the current sort order. Once a page
+    has been read, the key of its last row is kept so that the next page
+    starts with an indexed range condition on (sort column, rowid) instead
+    of an OFFSET that would scan every row before it. Filters and the
+    search box are applied as WHERE conditions. Edits are queued and
+    written back in one transaction by flush().
+    """
+
+    def __init__(self, conn: sqlite3.Connection, table: str, page_size: int = DEFAULT_PAGE_SIZE):
+        self.conn = conn
+        self.table = table
+        self.page_size = page_size
+        self.sort_column = None
+        self.descending = False
+        self.conditions = []  # (sql, params) joined with AND
+        self.page_keys = {}  # page -> (sort value, rowid) of its last row
+        self.edits = TableEditQueue()
+        self.inserted = {}  # Temporary id -> rowid of the rows inserted by the last flush
+        self.reload_columns()
+        register_functions(conn)
+
+    def reload_columns(self):
+        """Read the column names again, e.g. after a failed flush of column changes."""
+        self.columns = [row[1] for row in self.conn.execute(f"PRAGMA table_info({quote_identifier(self.table)})")]
+        if self.sort_column not in self.columns:
+            self.set_sort(None)
+
+    @staticmethod
+    def has_rowid(conn: sqlite3.Connection, table: str) -> bool:
+        """Whether a table can be paged by rowid (not a view or WITHOUT ROWID table)."""
+        try:
+            conn.execute(f"SELECT rowid FROM {quote_identifier(table)} LIMIT 0")
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def set_filters(self, active_filters: Dict[str, List[Dict[str, Any]]], search: Optional[Dict[str, Any]] = None):
+        """Apply the editor's column filters (OR within a column, AND across) and search."""
+        conditions = []
+        for column, filters in active_filters.items():
+            if column not in self.columns or not filters:
+                continue
+            parts = [filter_condition(column, f) for f in filters]
+            conditions.append(('(' + ' OR '.join(sql for sql, _ in parts) + ')',
+                               [p for _, params in parts for p in params]))
+        if search and search.get('text'):
+            columns = [c for c in search.get('columns') or self.columns if c in self.columns]
+            conditions.append(search_condition(columns, search['text'], search.get('mode', 'any'),
+                                               search.get('case', False)))
+        self.conditions = conditions
+        self.page_keys = {}
+
+    def set_sort(self, column: Optional[str], descending: bool = False):
+        """Order rows by a column (rowid breaks ties), or by rowid alone."""
+        self.sort_column = column if column in self.columns else None
+        self.descending = descending
+        self.page_keys = {}
+
+    def where_clause(self, extra: Optional[Tuple[str, list]] = None) -> Tuple[str, list]:
+        conditions = list(self.conditions) + ([extra] if extra else [])
+        if not conditions:
+            return '', []
+        return ' WHERE ' + ' AND '.join(sql for sql, _ in conditions), [p for _, params in conditions for p in params]
+
+    def order_clause(self) -> str:
+        direction = ' DESC' if self.descending else ''
+        if self.sort_column is None:
+            return f" ORDER BY rowid{direction}"
+        return f" ORDER BY {quote_identifier(self.sort_column)}{direction}, rowid{direction}"
+
+    def after_key(self, key: Tuple[Any, int]) -> Tuple[str, list]:
+        """Condition selecting the rows after a (sort value, rowid) key in sort order.
+
+        NULLs sort first ascending and last descending, as in SQLite.
+        """
+        value, rowid = key
+        op = '<' if self.descending else '>'
+        if self.sort_column is None:
+            return f"rowid {op} ?", [rowid]
+        column = quote_identifier(self.sort_column)
+        if value is None:
+            if self.descending:
+                return f"({column} IS NULL AND rowid < ?)", [rowid]
+            return f"(({column} IS NULL AND rowid > ?) OR {column} IS NOT NULL)", [rowid]
+        condition = f"({column} {op} ? OR ({column} = ? AND rowid {op} ?)"
+        condition += f" OR {column} IS NULL)" if self.descending else ")"
+        return condition, [value, value, rowid]
+
+    def count_query(self) -> Tuple[str, list]:
+        """SQL and parameters counting the rows that pass the filters."""
+        where, params = self.where_clause()
+        return f"SELECT count(*) FROM {quote_identifier(self.table)}{where}", params
+
+    def fetch_page(self, page: int) -> Tuple[List[int], List[List[Any]]]:
+        """Rowids and values of a page of rows; pending edits are written first."""
+        self.flush()
+        key = self.page_keys.get(page - 1) if page > 0 else None
+        where, params = self.where_clause(self.after_key(key) if key else None)
+        sort_expr = quote_identifier(self.sort_column) if self.sort_column else 'NULL'
+        columns = ', '.join(quote_identifier(c) for c in self.columns)
+        sql = (f"SELECT rowid, {sort_expr}, {columns} FROM {quote_identifier(self.table)}"
+               f"{where}{self.order_clause()} LIMIT ?")
+        params = params + [self.page_size]
+        if page > 0 and key is None:
+            sql += " OFFSET ?"
+            params.append(page * self.page_size)
+        rows = self.conn.execute(sql, params).fetchall()
+        if rows:
+            self.page_keys[page] = (rows[-1][1], rows[-1][0])
+        return [row[0] for row in rows], [list(row[2:]) for row in rows]
+
+    def iter_rows(self, batch_size: int = 10000) -> Iterator[List[tuple]]:
+        """All rows passing the filters in sort order, in batches."""
+        self.flush()
+        where, params = self.where_clause()
+        columns = ', '.join(quote_identifier(c) for c in self.columns)
+        cursor = self.conn.execute(
+            f"SELECT {columns} FROM {quote_identifier(self.table)}{where}{self.order_clause()}", params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+    def queue_update(self, rowid: int, column: str, value: Any):
+        """Queue a cell edit; later edits of the same cell replace earlier ones."""
+        self.edits.update(rowid, column, value)
+
+    def queue_insert(self, values: Dict[str, Any]) -> int:
+        """Queue a new row; returns the temporary (negative) id it is known by until flushed."""
+        return self.edits.insert(values)
+
+    def queue_delete(self, rowid: int):
+        """Queue a row deletion."""
+        self.edits.delete(rowid)
+
+    def queue_add_column(self, column: str):
+        """Queue a new column; it is shown (empty) right away."""
+        self.edits.add_column(column)
+        self.columns.append(column)
+
+    def queue_drop_column(self, column: str):
+        """Queue a column removal."""
+        self.edits.drop_column(column)
+        self.columns.remove(column)
+        if self.sort_column == column:
+            self.set_sort(None)
+
+    def flush(self) -> int:
+        """Write all queued edits in one transaction; returns how many were written.
+
+        Rows inserted by the flush are listed in self.inserted as
+        {temporary id: rowid}.
+        """
+        self.inserted = {}
+        if not self.edits:
+            return 0
+        count = len(self.edits)
+        moved = self.sort_column in self.edits.updated_columns() or self.conditions
+        self.inserted = self.edits.flush(self.conn, self.table)
+        if moved:
+            # Edited rows may have moved in the sort order or out of the filter
+            self.page_keys = {}
+        return count
@@ -0,0 +1,231 @@
+import io
+import os
+import time
+import zlib
+import struct
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+
+BLOCK_SIZE = 1024 * 1024
+DICT_SIZE = 32 * 1024
+DEFAULT_LEVEL = 6
+
+METHOD_STORED = 0
+METHOD_DEFLATED = 8
+UTF8_FLAG = 0x800
+UINT32_MAX = 0xFFFFFFFF
+# Members that may grow past this get a zip64 local header (same rule as zipfile)
+ZIP64_LIMIT = (1 << 31) - 1
+
+LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+END_RECORD = struct.Struct('<IHHHHIIH')
+ZIP64_END_RECORD = struct.Struct('<IQHHIIQQQQ')
+ZIP64_LOCATOR = struct.Struct('<IIQI')
+
+# Final empty deflate block closing a stream of sync-flushed blocks
+FINAL_DEFLATE_BLOCK = zlib.compressobj(DEFAULT_LEVEL, zlib.DEFLATED, -15).flush()
+
+
+class ZipWriteCancelled(Exception):
+    """Raised when the progress callback cancels writing."""
+
+
+def read_blocks(source: BinaryIO, block_size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """Read a stream in blocks."""
+    while True:
+        block = source.read(block_size)
+        if not block:
+            return
+        yield block
+
+
+def _compress_block(block: bytes, level: int, zdict: bytes) -> bytes:
+    """Raw deflate one block, primed with the end of the previous block, ending on a byte boundary."""
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(block) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def deflate_blocks(blocks: Iterable[bytes], level: int = DEFAULT_LEVEL, workers: int = 1) -> Iterator[bytes]:
+    """Raw deflate a sequence of blocks into one deflate stream.
+
+    With several workers blocks are compressed independently in a thread
+    pool (zlib releases the GIL), each primed with the last 32 KB of the
+    previous block and sync-flushed, so the concatenated output is a single
+    valid stream, as pigz does. At most 2 * workers blocks are in flight.
+    """
+    if workers <= 1:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        for block in blocks:
+            yield compressor.compress(block)
+        yield compressor.flush()
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        previous = b''
+        for block in blocks:
+            pending.append(executor.submit(_compress_block, block, level, previous[-DICT_SIZE:]))
+            previous = block
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    yield FINAL_DEFLATE_BLOCK
+
+
+def _dos_time(timestamp: float):
+    """Zip (DOS) date and time fields of a timestamp."""
+    t = time.localtime(timestamp)
+    date = (max(t.tm_year, 1980) - 1980) << 9 | t.tm_mon << 5 | t.tm_mday
+    clock = t.tm_hour << 11 | t.tm_min << 5 | t.tm_sec // 2
+    return date, clock
+
+
+class StreamingZipWriter:
+    """Writes a zip archive member by member, straight from streams.
+
+    Data is read once and written once: there are no temporary copies of
+    members, and the archive is written next to the target and renamed into
+    place when complete. Deflated members can be compressed by several
+    threads (see deflate_blocks); level 0 stores members as is. The archive
+    is readable by zipfile, including zip64 for large members.
+    """
+
+    def __init__(self, path: str, level: int = DEFAULT_LEVEL, workers: int = 1,
+                 progress: Optional[Callable[[int, int], bool]] = None, total_size: int = 0):
+        self.path = path
+        self.temp_path = path + '.part'
+        self.level = level
+        self.workers = max(1, workers)
+        self.progress = progress
+        self.total_size = total_size
+        self.bytes_done = 0
+        self.entries = []
+        self.file = open(self.temp_path, 'wb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def write_bytes(self, name: str, data: bytes, compress: bool = True, level: Optional[int] = None):
+        """Add a member from bytes."""
+        self.write_stream(name, io.BytesIO(data), len(data), compress, level)
+
+    def write_stream(self, name: str, source: BinaryIO, size: Optional[int] = None, compress: bool = True,
+                     level: Optional[int] = None):
+        """Add a member read from a binary stream.
+
+        size is a hint used to pick zip64 headers; level overrides the
+        writer's compression level for this member (0 stores it).
+        """
+        level = self.level if level is None else level
+        method = METHOD_DEFLATED if compress and level > 0 else METHOD_STORED
+        encoded_name = name.encode('utf-8')
+        zip64 = size is None or size * 1.05 > ZIP64_LIMIT
+        date, clock = _dos_time(time.time())
+        offset = self.file.tell()
+        self._write_local_header(encoded_name, method, date, clock, 0, 0, 0, zip64)
+
+        crc = 0
+        file_size = 0
+        compress_size = 0
+
+        def counted_blocks():
+            nonlocal crc, file_size
+            for block in read_blocks(source):
+                crc = zlib.crc32(block, crc)
+                file_size += len(block)
+                self._report(len(block))
+                yield block
+
+        chunks = counted_blocks()
+        if method == METHOD_DEFLATED:
+            chunks = deflate_blocks(chunks, level, self.workers)
+        for chunk in chunks:
+            self.file.write(chunk)
+            compress_size += len(chunk)
+
+        if not zip64 and max(file_size, compress_size) > ZIP64_LIMIT:
+            raise ValueError(f"Member {name} is larger than its size hint")
+        end = self.file.tell()
+        self.file.seek(offset)
+        self._write_local_header(encoded_name, method, date, clock, crc, compress_size, file_size, zip64)
+        self.file.seek(end)
+        self.entries.append((encoded_name, method, date, clock, crc, compress_size, file_size, offset))
+
+    def _report(self, count: int):
+        """Advance progress; a callback returning False cancels writing."""
+        self.bytes_done += count
+        if self.progress is not None and self.progress(self.bytes_done, self.total_size) is False:
+            raise ZipWriteCancelled("Writing was cancelled")
+
+    def _write_local_header(self, name, method, date, clock, crc, compress_size, file_size, zip64):
+        """Write (or rewrite) a local file header."""
+        extra = b''
+        if zip64:
+            extra = struct.pack('<HHQQ', 1, 16, file_size, compress_size)
+            compress_size = file_size = UINT32_MAX
+        self.file.write(LOCAL_HEADER.pack(
+            0x04034b50, 45 if zip64 else 20, UTF8_FLAG, method, clock, date,
+            crc, compress_size, file_size, len(name), len(extra)))
+        self.file.write(name)
+        self.file.write(extra)
+
+    def close(self):
+        """Write the central directory and move the archive into place."""
+        directory_offset = self.file.tell()
+        for name, method, date, clock, crc, compress_size, file_size, offset in self.entries:
+            zip64_fields = []
+            if file_size > UINT32_MAX - 1:
+                zip64_fields.append(file_size)
+                file_size = UINT32_MAX
+            if compress_size > UINT32_MAX - 1:
+                zip64_fields.append(compress_size)
+                compress_size = UINT32_MAX
+            if offset > UINT32_MAX - 1:
+                zip64_fields.append(offset)
+                offset = UINT32_MAX
+            extra = b''
+            if zip64_fields:
+                extra = struct.pack(f'<HH{len(zip64_fields)}Q', 1, 8 * len(zip64_fields), *zip64_fields)
+            version = 45 if zip64_fields else 20
+            self.file.write(CENTRAL_HEADER.pack(
+                0x02014b50, version, version, UTF8_FLAG, method, clock, date,
+                crc, compress_size, file_size, len(name), len(extra), 0, 0, 0, 0o600 << 16, offset))
+            self.file.write(name)
+            self.file.write(extra)
+
+        directory_end = self.file.tell()
+        directory_size = directory_end - directory_offset
+        count = len(self.entries)
+        if count >= 0xFFFF or directory_offset > UINT32_MAX - 1 or directory_size > UINT32_MAX - 1:
+            self.file.write(ZIP64_END_RECORD.pack(
+                0x06064b50, ZIP64_END_RECORD.size - 12, 45, 45, 0, 0,
+                count, count, directory_size, directory_offset))
+            self.file.write(ZIP64_LOCATOR.pack(0x07064b50, 0, directory_end, 1))
+            count = min(count, 0xFFFF)
+            directory_offset = min(directory_offset, UINT32_MAX)
+            directory_size = min(directory_size, UINT32_MAX)
+        self.file.write(END_RECORD.pack(0x06054b50, 0, 0, count, count, directory_size, directory_offset, 0))
+
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        """Discard a partially written archive; the target file is left untouched."""
+        self.file.close()
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
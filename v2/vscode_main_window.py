@@ -2,8 +2,8 @@ import sys
 import os
 import json
 import sqlite3
-import zipfile
 import tempfile
+import contextlib
 import csv
 import pandas as pd
 from PyQt5.QtWidgets import (
@@ -13,9 +13,9 @@ from PyQt5.QtWidgets import (
     QTableWidget, QTableWidgetItem, QFileDialog, QPushButton,
     QLineEdit, QCheckBox, QComboBox, QMenu, QAction, QMessageBox,
     QTreeWidget, QTreeWidgetItem, QInputDialog, QToolButton, QSizePolicy,
-    QDialog
+    QDialog, QProgressDialog
 )
-from PyQt5.QtCore import Qt, QDir, QSize, QSettings
+from PyQt5.QtCore import Qt, QDir, QSize, QSettings, QTimer, QThread, QEvent, pyqtSignal
 from PyQt5.QtGui import QIcon, QFont
 
 # Import custom components
@@ -25,9 +25,39 @@ from python_code_editor import PythonCodeEditor
 from ai_assistant import AIAssistant
 from table_manager import TableManager
 from utils.plugin_loader import PluginLoader
-from plugin_compare_dialog import PluginCompareDialog
+from plugin_compare_dialog import PluginCompareDialog, ChunkedCompareDialog, BatchCompareDialog
+from utils.sql_params import DEFAULT_CACHED_STATEMENTS
+from utils.db_profile import BulkLoadProfile, apply_connection_profile, profile_from_settings
+from utils.session_format import split_session_data, session_manifest, SessionArchive, database_snapshot
+from utils.zip_stream import StreamingZipWriter, ZipWriteCancelled
+from utils.history_store import QueryHistoryStore
+from utils.session_journal import SessionChangeTracker, SessionJournal, apply_cells, checkpoint_database
 
 SETTINGS_FILE = '../settings.json'
+QUERY_HISTORY_DB = 'query_history.sqlite'
+QUERY_HISTORY_JSON = 'query_history.json'  # Imported once into QUERY_HISTORY_DB
+AUTOSAVE_DIR = '../autosave'
+LARGE_COMPARE_BYTES = 1024 * 1024 * 1024  # Larger pairs of files are offered the out-of-core compare
+
+
+class AutosaveWorker(QThread):
+    """Writes autosave journal entries and checkpoints the session database off the GUI thread"""
+    failed = pyqtSignal(str)
+    
+    def __init__(self, journal, entries, db_path=None):
+        super().__init__()
+        self.journal = journal
+        self.entries = entries
+        self.db_path = db_path
+        
+    def run(self):
+        try:
+            self.journal.append(self.entries)
+            if self.db_path:
+                checkpoint_database(self.db_path)
+        except Exception as e:
+            self.failed.emit(str(e))
+
 
 class VSCodeMainWindow(QMainWindow):
     def __init__(self, file_to_open=None):
@@ -39,6 +69,11 @@ class VSCodeMainWindow(QMainWindow):
         self.sqlite_conn = None
         self.csv_data = []
         self.csv_headers = []
+        self.pending_session_parts = {}  # Parts of an opened session loaded on demand
+        self.session_changes = SessionChangeTracker()  # Changes since the last autosave
+        self.session_journal = SessionJournal(AUTOSAVE_DIR)
+        self.autosave_worker = None
+        self.query_items = {}  # Query history tree items by stored query id
         self.confirm_on_exit = True
         self.convert_first_row_to_headers = False
         self.last_selected_file = None
@@ -50,6 +85,8 @@ class VSCodeMainWindow(QMainWindow):
         # Initialize UI components
         self.init_central_widget()
         self.init_left_dock()
+        self.editor_tabs.currentChanged.connect(self.on_editor_tab_changed)
+        self.left_dock_tabs.currentChanged.connect(self.on_left_dock_tab_changed)
         self.init_right_dock()
         self.init_bottom_dock()
         self.init_toolbar()
@@ -66,8 +103,13 @@ class VSCodeMainWindow(QMainWindow):
         self.table_manager.refresh_tables()
         
         # Load query history
+        self.history_store = QueryHistoryStore(QUERY_HISTORY_DB, QUERY_HISTORY_JSON)
+        self.history_store.sync_snippets(self.python_editor.snippets)
         self.load_query_history_tree()
         
+        # Recover unsaved changes and start autosave
+        self.init_autosave()
+        
         # Open file from command line if provided
         if self.file_to_open:
             self.open_file_from_command_line(self.file_to_open)
@@ -228,6 +270,26 @@ class VSCodeMainWindow(QMainWindow):
         
         queries_layout.addLayout(queries_header)
         
+        # Full-text search over query history and snippets
+        self.history_search_edit = QLineEdit()
+        self.history_search_edit.setPlaceholderText("Search queries and snippets...")
+        self.history_search_edit.setClearButtonEnabled(True)
+        self.history_search_edit.setStyleSheet("padding: 4px; border: 1px solid #ccc; border-radius: 3px;")
+        self.history_search_timer = QTimer(self)
+        self.history_search_timer.setSingleShot(True)
+        self.history_search_timer.setInterval(150)
+        self.history_search_timer.timeout.connect(self.search_history)
+        self.history_search_edit.textChanged.connect(lambda: self.history_search_timer.start())
+        self.history_search_edit.returnPressed.connect(self.search_history)
+        queries_layout.addWidget(self.history_search_edit)
+        
+        self.history_search_results = QTreeWidget()
+        self.history_search_results.setHeaderLabels(["Result", "Match"])
+        self.history_search_results.setRootIsDecorated(False)
+        self.history_search_results.itemDoubleClicked.connect(self.on_search_result_double_clicked)
+        self.history_search_results.hide()
+        queries_layout.addWidget(self.history_search_results)
+        
         # Query history tree
         self.query_history_tree = QTreeWidget()
         self.query_history_tree.setHeaderLabels(["Query History"])
@@ -240,9 +302,11 @@ class VSCodeMainWindow(QMainWindow):
         self.query_history_tree.setDragEnabled(True)
         self.query_history_tree.setAcceptDrops(True)
         self.query_history_tree.setDropIndicatorShown(True)
+        self.query_history_tree.viewport().installEventFilter(self)
         
         queries_layout.addWidget(self.query_history_tree)
         self.left_dock_tabs.addTab(queries_widget, "📊 Queries")
+        self.queries_widget = queries_widget
         
         # Code Snippets with command panel
         snippets_widget = QWidget()
@@ -490,12 +554,45 @@ class VSCodeMainWindow(QMainWindow):
     def init_database(self):
         """Initialize SQLite database"""
         try:
-            self.sqlite_conn = sqlite3.connect('../session_db.sqlite')
+            self.sqlite_conn = self.connect_database('../session_db.sqlite')
             self.db_status_label.setText("Database Connected")
             self.log_message("Database initialized successfully")
         except Exception as e:
             self.log_message(f"Database initialization failed: {e}")
             
+    def connect_database(self, db_path):
+        """Open SQLite connection with the configured prepared statement cache"""
+        cached_statements = self.settings.get('sql_cached_statements', DEFAULT_CACHED_STATEMENTS)
+        conn = sqlite3.connect(db_path, cached_statements=int(cached_statements))
+        self.apply_connection_profile(conn)
+        conn.set_authorizer(self.session_changes.authorizer)
+        return conn
+        
+    def apply_connection_profile(self, conn=None):
+        """Apply the configured SQLite connection profile (PRAGMAs) to a connection"""
+        conn = conn or getattr(self, 'sqlite_conn', None)
+        if conn is None:
+            return
+        try:
+            effective = apply_connection_profile(conn, profile_from_settings(self.settings))
+            self.log_message(
+                f"SQLite profile '{self.settings.get('sqlite_profile', 'interactive')}': "
+                f"journal={effective['journal_mode']}, synchronous={effective['synchronous']}, "
+                f"cache={effective['cache_size_mb']} MB, mmap={effective['mmap_size_mb']} MB, "
+                f"page_size={effective['page_size']}")
+        except sqlite3.Error as e:
+            self.log_message(f"Failed to apply SQLite profile: {e}")
+            
+    def bulk_load_profile(self):
+        """Context manager switching the session database to the bulk load profile during imports"""
+        if not self.settings.get('sqlite_auto_bulk_load', True):
+            return contextlib.nullcontext()
+        if not hasattr(self, '_bulk_load_profile'):
+            self._bulk_load_profile = BulkLoadProfile(
+                lambda: getattr(self, 'sqlite_conn', None),
+                lambda: profile_from_settings(self.settings))
+        return self._bulk_load_profile
+            
     def load_settings(self):
         """Load application settings"""
         self.settings = {}
@@ -687,11 +784,15 @@ class VSCodeMainWindow(QMainWindow):
         
     def new_session(self):
         """Create new session"""
+        self.pending_session_parts = {}
+        self.sql_editor.history_loader = None
+        self.sql_editor.unloaded_history_queries = []
         self.csv_data = []
         self.csv_headers = []
         self.csv_editor.clear_table()
         self.sql_editor.clear_editor()
         self.python_editor.clear_editor()
+        self.start_session_journal(None)
         self.log_message("New session created")
         
     def open_session(self):
@@ -701,120 +802,307 @@ class VSCodeMainWindow(QMainWindow):
         )
         if file_path:
             try:
-                with zipfile.ZipFile(file_path, "r") as zf:
-                    # Extract to temporary directory
-                    temp_dir = tempfile.mkdtemp()
-                    zf.extractall(temp_dir)
-                    
-                    # Load database if exists
-                    db_path = os.path.join(temp_dir, "session_db.sqlite")
-                    if os.path.exists(db_path):
-                        if self.sqlite_conn:
-                            self.sqlite_conn.close()
-                        self.sqlite_conn = sqlite3.connect(db_path)
-                        self.db_status_label.setText("Database Connected")
-                        
-                        # Update table manager if exists
-                        if hasattr(self, 'table_manager'):
-                            self.table_manager.refresh_tables()
-                    
-                    # Load query history if exists
-                    history_path = os.path.join(temp_dir, "history.json")
-                    if os.path.exists(history_path):
-                        with open(history_path, "r", encoding="utf-8") as f:
-                            history_data = json.load(f)
-                            if hasattr(self, 'sql_editor') and self.sql_editor:
-                                self.sql_editor.history = history_data
-                                # Update query history tree if exists
-                                if hasattr(self, 'query_history_tree'):
-                                    self.load_query_history_tree()
-                    
-                    # Load session data if exists
-                    session_path = os.path.join(temp_dir, "session.json")
-                    if os.path.exists(session_path):
-                        with open(session_path, "r", encoding="utf-8") as f:
-                            session_data = json.load(f)
-                            
-                            # Load CSV data
-                            if 'csv_data' in session_data:
-                                self.csv_data = session_data['csv_data']
-                            if 'csv_headers' in session_data:
-                                self.csv_headers = session_data['csv_headers']
-                                
-                            # Load editor content
-                            if 'sql_query' in session_data and hasattr(self, 'sql_editor'):
-                                self.sql_editor.editor.setText(session_data['sql_query'])
-                            if 'python_code' in session_data and hasattr(self, 'python_editor'):
-                                self.python_editor.set_code_text(session_data['python_code'])
-                                
-                            # Update CSV editor
-                            if self.csv_data and self.csv_headers:
-                                self.csv_editor.load_data(self.csv_headers, self.csv_data)
-                    
-                    # Clean up temporary files (but keep database)
-                    import shutil
-                    for file in os.listdir(temp_dir):
-                        if file != "session_db.sqlite":
-                            file_path_temp = os.path.join(temp_dir, file)
-                            if os.path.isfile(file_path_temp):
-                                os.remove(file_path_temp)
-                    
-                self.log_message(f"Session loaded from {file_path}")
+                self.load_session_file(file_path)
+                self.start_session_journal(file_path)
                 QMessageBox.information(self, "Success", "Session loaded successfully!")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to load session: {e}")
                 
+    def load_session_file(self, file_path):
+        """Load a session zip; only the manifest (session.json) is read now, other parts load when needed"""
+        archive = SessionArchive(file_path)
+        session_data = archive.session_data
+        self.pending_session_parts = {}
+        
+        # Load database if exists (single member, streamed to a temporary file)
+        if archive.has_part('database'):
+            temp_dir = tempfile.mkdtemp()
+            db_path = archive.extract_part('database', os.path.join(temp_dir, "session_db.sqlite"))
+            self.csv_editor.close_table_window()
+            if self.sqlite_conn:
+                self.sqlite_conn.close()
+            self.sqlite_conn = self.connect_database(db_path)
+            self.db_status_label.setText("Database Connected")
+            
+            # Update table manager if exists
+            if hasattr(self, 'table_manager'):
+                self.table_manager.refresh_tables()
+                
+        # Query history loads when the Queries tab is shown or a query is saved
+        if archive.has_part('history') and hasattr(self, 'sql_editor') and self.sql_editor:
+            self.pending_session_parts['history'] = archive
+            self.sql_editor.history_loader = self.load_pending_history
+            self.sql_editor.unloaded_history_queries = []
+            
+        # CSV data loads when the CSV editor tab is shown
+        if 'csv_headers' in session_data:
+            self.csv_headers = session_data['csv_headers']
+        self.csv_data = []
+        if archive.has_part('csv_data'):
+            self.pending_session_parts['csv_data'] = archive
+            
+        # Load editor content
+        if 'sql_query' in session_data and hasattr(self, 'sql_editor'):
+            self.sql_editor.sql_edit.setText(session_data['sql_query'])
+        if 'python_code' in session_data and hasattr(self, 'python_editor'):
+            self.python_editor.set_code_text(session_data['python_code'])
+            
+        # Parts whose views are already visible load right after the window updates
+        QTimer.singleShot(0, self.load_visible_session_parts)
+        
+        self.log_message(f"Session loaded from {file_path}")
+                
+
+    def load_visible_session_parts(self):
+        """Load pending session parts whose views are currently shown"""
+        if self.editor_tabs.currentWidget() is self.csv_editor:
+            self.load_pending_csv_data()
+        if self.left_dock_tabs.currentWidget() is self.queries_widget:
+            self.load_pending_history()
+            
+    def load_pending_session_parts(self):
+        """Load every pending session part (before saving or replacing the session)"""
+        self.load_pending_csv_data()
+        self.load_pending_history()
+        
+    def load_pending_csv_data(self):
+        """Load CSV data of an opened session into the CSV editor"""
+        archive = self.pending_session_parts.pop('csv_data', None)
+        if archive is None:
+            return
+        try:
+            self.csv_data = archive.read_csv_data()
+            if self.csv_data and self.csv_headers:
+                # The data is the opened session's, not a change to autosave
+                structure_dirty = self.session_changes.structure_dirty
+                self.csv_editor.load_data(self.csv_headers, self.csv_data)
+                self.session_changes.structure_dirty = structure_dirty
+            self.log_message(f"Loaded {len(self.csv_data)} session CSV rows")
+        except Exception as e:
+            self.log_message(f"Failed to load session CSV data: {e}")
+            
+    def load_pending_history(self):
+        """Load query history of an opened session; returns the history list"""
+        archive = self.pending_session_parts.pop('history', None)
+        if archive is None:
+            return self.sql_editor.history
+        try:
+            self.sql_editor.history_loader = None
+            self.sql_editor.history = archive.read_json_part('history')
+            # Update query history tree if exists
+            if hasattr(self, 'query_history_tree'):
+                self.load_query_history_tree()
+        except Exception as e:
+            self.log_message(f"Failed to load session query history: {e}")
+        # Queries executed before the history was needed
+        self.sql_editor.add_history_queries(self.sql_editor.unloaded_history_queries)
+        self.sql_editor.unloaded_history_queries = []
+        return self.sql_editor.history
+        
+    def on_editor_tab_changed(self, index):
+        """Load deferred session data for the editor tab being shown"""
+        if self.editor_tabs.widget(index) is self.csv_editor:
+            self.load_pending_csv_data()
+            
+    def on_left_dock_tab_changed(self, index):
+        """Load deferred session data for the explorer tab being shown"""
+        if self.left_dock_tabs.widget(index) is self.queries_widget:
+            self.load_pending_history()
+            
+    def init_autosave(self):
+        """Offer recovery from the autosave journal and start the autosave timer"""
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.timeout.connect(self.autosave_session)
+        
+        recovered = False
+        try:
+            if self.session_journal.has_changes():
+                reply = QMessageBox.question(
+                    self, 'Recover Session',
+                    'The previous session was not closed properly.\n'
+                    'Recover unsaved changes from the autosave journal?',
+                    QMessageBox.Yes | QMessageBox.No,
+                    QMessageBox.Yes
+                )
+                if reply == QMessageBox.Yes:
+                    recovered = self.recover_session_from_journal()
+        except Exception as e:
+            self.log_message(f"Failed to read autosave journal: {e}")
+        if not recovered:
+            self.start_session_journal(None)
+        self.configure_autosave()
+        
+    def configure_autosave(self):
+        """Start or stop the autosave timer from the autosave_interval setting (minutes, 0 disables)"""
+        minutes = int(self.settings.get('autosave_interval', 5) or 0)
+        if minutes > 0:
+            self.autosave_timer.start(minutes * 60 * 1000)
+            self.log_message(f"Autosave every {minutes} min")
+        else:
+            self.autosave_timer.stop()
+            
+    def current_db_path(self):
+        """File path of the session database, None for in-memory databases"""
+        if not self.sqlite_conn:
+            return None
+        for _, name, path in self.sqlite_conn.execute("PRAGMA database_list").fetchall():
+            if name == 'main':
+                return path or None
+        return None
+        
+    def wait_for_autosave(self):
+        """Block until a running autosave write has finished"""
+        if self.autosave_worker is not None:
+            self.autosave_worker.wait()
+            
+    def start_session_journal(self, session_path):
+        """Start a new autosave journal for a session that was just opened, saved or reset"""
+        self.wait_for_autosave()
+        self.session_changes.reset(self.sqlite_conn.total_changes if self.sqlite_conn else None)
+        try:
+            self.session_journal.start(session_path, self.current_db_path())
+        except Exception as e:
+            self.log_message(f"Failed to start autosave journal: {e}")
+            
+    def take_session_changes(self):
+        """Journal entries for the changes since the last autosave"""
+        return self.session_changes.take_entries(
+            self.csv_editor.csv_headers, self.csv_editor.csv_data,
+            self.sqlite_conn.total_changes if self.sqlite_conn else None)
+        
+    def autosave_session(self):
+        """Journal changes since the last autosave; the file writes run in a background thread"""
+        if self.autosave_worker is not None and self.autosave_worker.isRunning():
+            return
+        entries = self.take_session_changes()
+        if not entries:
+            return
+        # Table changes are already in the database file; move them out of the WAL
+        db_path = self.current_db_path() if any(entry['type'] == 'tables' for entry in entries) else None
+        self.autosave_worker = AutosaveWorker(self.session_journal, entries, db_path)
+        self.autosave_worker.failed.connect(lambda error: self.log_message(f"Autosave failed: {error}"))
+        self.autosave_worker.start()
+        
+    def recover_session_from_journal(self):
+        """Restore the session described by the autosave journal; returns True on success"""
+        state = self.session_journal.replay()
+        try:
+            session_path = state['session_path']
+            if session_path and os.path.exists(session_path):
+                self.load_session_file(session_path)
+                self.load_pending_session_parts()
+                
+            # The journaled database holds the table changes made after the base session
+            db_path = state['db_path']
+            if db_path and os.path.exists(db_path) and db_path != self.current_db_path():
+                self.csv_editor.close_table_window()
+                if self.sqlite_conn:
+                    self.sqlite_conn.close()
+                self.sqlite_conn = self.connect_database(db_path)
+                self.table_manager.refresh_tables()
+                
+            if state['csv_data'] is not None:
+                self.csv_headers = state['csv_headers']
+                self.csv_data = state['csv_data']
+                self.csv_editor.load_data(self.csv_headers, self.csv_data)
+            elif state['cells']:
+                apply_cells(self.csv_editor.csv_data, state['cells'])
+                self.csv_editor.update_table_display()
+                
+            if state['history_queries']:
+                # Queries of the base history (e.g. the history file) are not added twice
+                known = {(query.get('timestamp'), query.get('query'))
+                         for group in self.sql_editor.history for query in group.get('queries', [])}
+                self.sql_editor.add_history_queries([
+                    query for query in state['history_queries']
+                    if (query.get('timestamp'), query.get('query')) not in known])
+                self.load_query_history_tree()
+                
+            tables = 'unknown' if state['tables'] is None else ', '.join(state['tables']) or 'none'
+            self.log_message(f"Recovered session from autosave journal (changed tables: {tables})")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to recover session: {e}")
+            return False
+            
+        # Journal the recovered state again so a second crash does not lose it
+        self.session_changes.mark_structure()
+        for query_entry in state['history_queries']:
+            self.session_changes.mark_history(query_entry)
+        entries = self.take_session_changes()
+        if state['tables'] != []:
+            entries.append({'type': 'tables', 'tables': state['tables']})
+        self.session_journal.start(session_path, self.current_db_path())
+        self.session_journal.append(entries)
+        return True
+        
+    def shutdown_autosave(self):
+        """Stop autosave on a clean exit; nothing is left to recover"""
+        self.autosave_timer.stop()
+        self.wait_for_autosave()
+        self.session_journal.discard()
+        
     def save_session(self):
         """Save current session to zip file"""
         file_path, _ = QFileDialog.getSaveFileName(
             self, "Save Session", "", "Session files (*.zip);;All files (*.*)"
         )
         if file_path:
-            try:
-                # Create temporary files
-                temp_dir = tempfile.mkdtemp()
+            progress = QProgressDialog("Saving session...", "Cancel", 0, 100, self)
+            progress.setWindowTitle("Save Session")
+            progress.setWindowModality(Qt.WindowModal)
+            progress.setMinimumDuration(500)
+            
+            def report_progress(done, total):
+                progress.setValue(int(done * 100 / total) if total else 100)
+                QApplication.processEvents()
+                return not progress.wasCanceled()
                 
-                # Save database if exists
-                db_temp_path = os.path.join(temp_dir, "session_db.sqlite")
-                if self.sqlite_conn:
-                    backup_conn = sqlite3.connect(db_temp_path)
-                    self.sqlite_conn.backup(backup_conn)
-                    backup_conn.close()
+            try:
+                # Parts of an opened session that were not needed yet
+                self.load_pending_session_parts()
+                self.wait_for_autosave()
                 
-                # Save query history
-                history_temp_path = os.path.join(temp_dir, "history.json")
+                # Query history
                 history_data = []
                 if hasattr(self, 'sql_editor') and self.sql_editor and hasattr(self.sql_editor, 'history'):
                     history_data = self.sql_editor.history
-                with open(history_temp_path, "w", encoding="utf-8") as f:
-                    json.dump(history_data, f, ensure_ascii=False, indent=2)
+                history_json = json.dumps(history_data, ensure_ascii=False, indent=2).encode('utf-8')
                 
-                # Save session data
-                session_temp_path = os.path.join(temp_dir, "session.json")
-                session_data = {
+                # Session data; csv_data goes into a compressed columnar member
+                session_data, csv_data_blob = split_session_data(session_manifest({
                     'csv_data': self.csv_data,
                     'csv_headers': self.csv_headers,
                     'sql_query': self.sql_editor.get_query_text() if hasattr(self, 'sql_editor') else '',
                     'python_code': self.python_editor.get_code_text() if hasattr(self, 'python_editor') else ''
-                }
-                with open(session_temp_path, 'w', encoding='utf-8') as f:
-                    json.dump(session_data, f, ensure_ascii=False, indent=2)
-                
-                # Create zip file
-                with zipfile.ZipFile(file_path, "w", zipfile.ZIP_DEFLATED) as zf:
-                    if os.path.exists(db_temp_path):
-                        zf.write(db_temp_path, "session_db.sqlite")
-                    zf.write(history_temp_path, "history.json")
-                    zf.write(session_temp_path, "session.json")
+                }))
+                session_json = json.dumps(session_data, ensure_ascii=False, indent=2).encode('utf-8')
                 
-                # Clean up temporary files
-                import shutil
-                shutil.rmtree(temp_dir)
+                # Parts are streamed into the zip; the database is read from its file, not copied first
+                db_level = int(self.settings.get('session_db_compression_level', 0))
+                workers = int(self.settings.get('worker_threads', 4))
+                db_snapshot = database_snapshot(self.sqlite_conn) if self.sqlite_conn else contextlib.nullcontext((None, 0))
+                with db_snapshot as (db_file, db_size):
+                    total_size = db_size + len(history_json) + len(session_json) + len(csv_data_blob)
+                    with StreamingZipWriter(file_path, workers=workers, progress=report_progress,
+                                            total_size=total_size) as zf:
+                        if db_file is not None:
+                            # Stored uncompressed by default so opening the session is a plain copy
+                            zf.write_stream("session_db.sqlite", db_file, db_size, level=db_level)
+                        zf.write_bytes("history.json", history_json)
+                        zf.write_bytes("session.json", session_json)
+                        # Already compressed by NumPy, store as is
+                        zf.write_bytes(session_data['csv_data_member'], csv_data_blob, compress=False)
                 
+                self.start_session_journal(file_path)
                 self.log_message(f"Session saved to {file_path}")
+                progress.close()
                 QMessageBox.information(self, "Success", "Session saved successfully!")
+            except ZipWriteCancelled:
+                self.log_message("Session save cancelled")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to save session: {e}")
+            finally:
+                progress.close()
                 
     def import_csv(self):
         """Import CSV file"""
@@ -878,6 +1166,10 @@ class VSCodeMainWindow(QMainWindow):
             self.confirm_on_exit = options['confirm_on_exit']
         if 'convert_first_row_to_headers' in options:
             self.convert_first_row_to_headers = options['convert_first_row_to_headers']
+        if any(key.startswith('sqlite_') for key in options):
+            self.apply_connection_profile()
+        if 'autosave_interval' in options:
+            self.configure_autosave()
         
         # Save settings
         self.save_settings()
@@ -969,10 +1261,7 @@ class VSCodeMainWindow(QMainWindow):
         """Add a new query group to the history tree"""
         text, ok = QInputDialog.getText(self, 'Add Query Group', 'Enter group name:')
         if ok and text:
-            group_item = QTreeWidgetItem([text])
-            group_item.setData(0, Qt.UserRole, {'type': 'group', 'name': text})
-            self.query_history_tree.addTopLevelItem(group_item)
-            group_item.setExpanded(True)
+            self.add_query_history_group(text)
     
     def edit_query_item(self):
          """Edit the selected query item"""
@@ -992,6 +1281,7 @@ class VSCodeMainWindow(QMainWindow):
                      current_item.setText(0, text)
                      data['name'] = text
                      current_item.setData(0, Qt.UserRole, data)
+                     self.history_store.rename_group(data['id'], text)
     
     def delete_query_item(self):
         """Delete the selected query item"""
@@ -1001,6 +1291,17 @@ class VSCodeMainWindow(QMainWindow):
                                        f'Are you sure you want to delete "{current_item.text(0)}"?',
                                        QMessageBox.Yes | QMessageBox.No)
             if reply == QMessageBox.Yes:
+                data = current_item.data(0, Qt.UserRole) or {}
+                if data.get('type') == 'query':
+                    self.history_store.delete_query(data['id'])
+                    self.query_items.pop(data['id'], None)
+                elif data.get('type') == 'group':
+                    self.history_store.delete_group(data['id'])
+                    for j in range(current_item.childCount()):
+                        child_data = current_item.child(j).data(0, Qt.UserRole) or {}
+                        self.query_items.pop(child_data.get('id'), None)
+                if self.sql_editor.loaded_query_item is current_item:
+                    self.sql_editor.clear_loaded_query_item()
                 parent = current_item.parent()
                 if parent:
                     parent.removeChild(current_item)
@@ -1084,66 +1385,149 @@ class VSCodeMainWindow(QMainWindow):
                 'timestamp': pd.Timestamp.now().isoformat()
             }
             
-            query_item = QTreeWidgetItem([name.strip()])
-            query_item.setData(0, Qt.UserRole, {'type': 'query', 'data': query_data})
-            group_item.addChild(query_item)
-            group_item.setExpanded(True)
-            
-            # Save to persistent storage
-            self.save_query_history_tree()
+            self.add_query_history_item(group_item, query_data)
     
     def save_query_history_tree(self):
-        """Save the query history tree to file"""
-        history_data = []
-        
+        """Save the order of groups and queries in the history tree (after drag and drop)"""
+        layout = []
         for i in range(self.query_history_tree.topLevelItemCount()):
             group_item = self.query_history_tree.topLevelItem(i)
             group_data = group_item.data(0, Qt.UserRole)
             
             if group_data and group_data.get('type') == 'group':
-                group_entry = {
-                    'name': group_data.get('name', group_item.text(0)),
-                    'queries': []
-                }
-                
+                query_ids = []
                 for j in range(group_item.childCount()):
-                    query_item = group_item.child(j)
-                    query_data = query_item.data(0, Qt.UserRole)
-                    
+                    query_data = group_item.child(j).data(0, Qt.UserRole)
                     if query_data and query_data.get('type') == 'query':
-                        group_entry['queries'].append(query_data.get('data', {}))
-                
-                history_data.append(group_entry)
+                        query_ids.append(query_data['id'])
+                layout.append((group_data['id'], query_ids))
         
         try:
-            with open('query_history.json', 'w', encoding='utf-8') as f:
-                json.dump(history_data, f, ensure_ascii=False, indent=2)
+            self.history_store.save_order(layout)
         except Exception as e:
             self.log_message(f"Failed to save query history: {e}")
     
     def load_query_history_tree(self):
-        """Load the query history tree from file"""
+        """Load the query history tree from the history store"""
         try:
-            if os.path.exists('query_history.json'):
-                with open('query_history.json', 'r', encoding='utf-8') as f:
-                    history_data = json.load(f)
+            groups = self.history_store.load()
+            
+            self.query_history_tree.clear()
+            self.query_items = {}
+            
+            for group_entry in groups:
+                group_item = QTreeWidgetItem([group_entry['name']])
+                group_item.setData(0, Qt.UserRole, {'type': 'group', 'name': group_entry['name'], 'id': group_entry['id']})
                 
-                self.query_history_tree.clear()
+                for query_id, query_entry in group_entry['queries']:
+                    query_item = QTreeWidgetItem([query_entry.get('name', 'Unnamed Query')])
+                    query_item.setData(0, Qt.UserRole, {'type': 'query', 'data': query_entry, 'id': query_id})
+                    group_item.addChild(query_item)
+                    self.query_items[query_id] = query_item
                 
-                for group_entry in history_data:
-                    group_item = QTreeWidgetItem([group_entry.get('name', 'Unnamed Group')])
-                    group_item.setData(0, Qt.UserRole, {'type': 'group', 'name': group_entry.get('name', 'Unnamed Group')})
-                    
-                    for query_entry in group_entry.get('queries', []):
-                        query_name = query_entry.get('name', 'Unnamed Query')
-                        query_item = QTreeWidgetItem([query_name])
-                        query_item.setData(0, Qt.UserRole, {'type': 'query', 'data': query_entry})
-                        group_item.addChild(query_item)
-                    
-                    self.query_history_tree.addTopLevelItem(group_item)
-                    group_item.setExpanded(True)
+                self.query_history_tree.addTopLevelItem(group_item)
+                group_item.setExpanded(True)
         except Exception as e:
             self.log_message(f"Failed to load query history: {e}")
+            
+    def add_query_history_group(self, name):
+        """Add a group to the history tree and store; returns the group item"""
+        group_id = self.history_store.add_group(name)
+        group_item = QTreeWidgetItem([name])
+        group_item.setData(0, Qt.UserRole, {'type': 'group', 'name': name, 'id': group_id})
+        self.query_history_tree.addTopLevelItem(group_item)
+        group_item.setExpanded(True)
+        return group_item
+        
+    def find_query_history_group(self, name):
+        """Return the history group item with the given name, creating it if needed"""
+        for i in range(self.query_history_tree.topLevelItemCount()):
+            group_item = self.query_history_tree.topLevelItem(i)
+            group_data = group_item.data(0, Qt.UserRole)
+            if group_data and group_data.get('type') == 'group' and group_data.get('name') == name:
+                return group_item
+        return self.add_query_history_group(name)
+        
+    def add_query_history_item(self, group_item, query_data):
+        """Add a query to a history group, storing only that query; returns the item"""
+        group_id = group_item.data(0, Qt.UserRole)['id']
+        query_id = self.history_store.add_query(group_id, query_data)
+        query_item = QTreeWidgetItem([query_data.get('name', 'Unnamed Query')])
+        query_item.setData(0, Qt.UserRole, {'type': 'query', 'data': query_data, 'id': query_id})
+        group_item.addChild(query_item)
+        group_item.setExpanded(True)
+        self.query_items[query_id] = query_item
+        return query_item
+        
+    def update_query_history_item(self, query_item, query_data):
+        """Replace the data of a history query item, storing only that query"""
+        item_data = query_item.data(0, Qt.UserRole)
+        item_data['data'] = query_data
+        query_item.setData(0, Qt.UserRole, item_data)
+        try:
+            self.history_store.update_query(item_data['id'], query_data)
+        except Exception as e:
+            self.log_message(f"Failed to save query history: {e}")
+            
+    def find_query_history_item(self, query_text):
+        """Find the history item holding the query (by normalized text) through the store index"""
+        found = self.history_store.find_query(query_text)
+        if found is None:
+            return None
+        return self.query_items.get(found[0])
+        
+    def search_history(self):
+        """Show ranked full-text matches for the search box; an empty box shows the history tree"""
+        text = self.history_search_edit.text().strip()
+        self.history_search_results.clear()
+        if not text:
+            self.history_search_results.hide()
+            self.query_history_tree.show()
+            return
+            
+        try:
+            results = self.history_store.search(text)
+        except Exception as e:
+            self.log_message(f"History search failed: {e}")
+            results = []
+            
+        for result in results:
+            icon = "📊" if result['kind'] == 'query' else "🐍"
+            item = QTreeWidgetItem([f"{icon} {result['name']}", result['fragment']])
+            item.setData(0, Qt.UserRole, result)
+            item.setToolTip(1, result['fragment'])
+            self.history_search_results.addTopLevelItem(item)
+        self.history_search_results.resizeColumnToContents(0)
+        self.query_history_tree.hide()
+        self.history_search_results.show()
+        self.status_bar.showMessage(f"{len(results)} matches for '{text}'", 3000)
+        
+    def on_search_result_double_clicked(self, item, column):
+        """Open a search result: queries load into the SQL editor, snippets into the Python editor"""
+        result = item.data(0, Qt.UserRole)
+        if result['kind'] == 'query':
+            query_item = self.query_items.get(result['id'])
+            if query_item is not None:
+                self.query_history_tree.setCurrentItem(query_item)
+                self.on_query_double_clicked(query_item, 0)
+            return
+            
+        for group in self.python_editor.snippets:
+            if group['name'] != result['group']:
+                continue
+            for snippet in group['snippets']:
+                if snippet['name'] == result['snippet']:
+                    self.python_editor.set_code_text(snippet['code'])
+                    self.editor_tabs.setCurrentWidget(self.python_editor)
+                    self.log_message(f"Loaded snippet: {snippet['name']}")
+                    return
+        
+    def eventFilter(self, source, event):
+        """Store the new query history order after drag and drop"""
+        if (hasattr(self, 'query_history_tree') and source is self.query_history_tree.viewport()
+                and event.type() == QEvent.Drop):
+            QTimer.singleShot(0, self.save_query_history_tree)
+        return super().eventFilter(source, event)
     
     def add_snippet(self):
         """Add a new code snippet"""
@@ -1360,19 +1744,20 @@ class VSCodeMainWindow(QMainWindow):
                 # Multiple sheets - create tables for each sheet
                 base_name = os.path.splitext(os.path.basename(file_path))[0]
                 
-                for sheet_name in sheet_names:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name)
-                    
-                    # Clean and prepare data
-                    headers = [str(col) for col in df.columns.tolist()]
-                    data = df.fillna('').values.tolist()
-                    
-                    # Create unique table name
-                    table_name = f"{base_name}_{sheet_name}"
-                    table_name = self.table_manager.generate_unique_table_name(table_name)
-                    
-                    # Create table in database
-                    self.table_manager.create_table_from_data(table_name, headers, data)
+                with self.bulk_load_profile():
+                    for sheet_name in sheet_names:
+                        df = pd.read_excel(file_path, sheet_name=sheet_name)
+                        
+                        # Clean and prepare data
+                        headers = [str(col) for col in df.columns.tolist()]
+                        data = df.fillna('').values.tolist()
+                        
+                        # Create unique table name
+                        table_name = f"{base_name}_{sheet_name}"
+                        table_name = self.table_manager.generate_unique_table_name(table_name)
+                        
+                        # Create table in database
+                        self.table_manager.create_table_from_data(table_name, headers, data)
                     
                 # Refresh table list
                 self.table_manager.refresh_tables()
@@ -1435,6 +1820,10 @@ class VSCodeMainWindow(QMainWindow):
             )
             if reply == QMessageBox.Yes:
                 self.save_settings()
+                self.shutdown_autosave()
+                self.table_manager.stop_table_stats()
+                self.csv_editor.close_table_window()
+                self.table_manager.external_sources.close(self.sqlite_conn)
                 if self.sqlite_conn:
                     self.sqlite_conn.close()
                 event.accept()
@@ -1442,6 +1831,10 @@ class VSCodeMainWindow(QMainWindow):
                 event.ignore()
         else:
             self.save_settings()
+            self.shutdown_autosave()
+            self.table_manager.stop_table_stats()
+            self.csv_editor.close_table_window()
+            self.table_manager.external_sources.close(self.sqlite_conn)
             if self.sqlite_conn:
                 self.sqlite_conn.close()
             event.accept()
@@ -1516,6 +1909,12 @@ class VSCodeMainWindow(QMainWindow):
             else:
                 no_plugins_action = menu.addAction("No plugins available")
                 no_plugins_action.setEnabled(False)
+            
+            chunked_action = menu.addAction("📦 Out-of-Core Compare by Key")
+            chunked_action.triggered.connect(lambda checked, f=file_path: self.start_chunked_comparison(f))
+            
+            batch_action = menu.addAction("🗂️ Batch Compare Selected Files")
+            batch_action.triggered.connect(lambda checked, f=file_path: self.start_batch_comparison(f))
         
         # Show selected files info
         if self.selected_files_for_comparison:
@@ -1559,23 +1958,37 @@ class VSCodeMainWindow(QMainWindow):
             QMessageBox.information(self, "Info", "Please select at least 2 files to compare.")
             return
         
+        # More than two files are compared as a batch with the chosen plugin
+        if len(self.selected_files_for_comparison) > 2:
+            self.start_batch_comparison(current_file, [plugin.get_name()])
+            return
+        
         try:
-            import pandas as pd
-            
-            # Load the first two files for comparison
+            # Compare the two selected files
             file1 = self.selected_files_for_comparison[0]
             file2 = self.selected_files_for_comparison[1]
             
-            # Load DataFrames
-            df1 = self.load_dataframe_from_file(file1)
-            df2 = self.load_dataframe_from_file(file2)
+            # Files too large to load are better compared out of core
+            size = os.path.getsize(file1) + os.path.getsize(file2)
+            if size > LARGE_COMPARE_BYTES:
+                reply = QMessageBox.question(
+                    self, "Large Files",
+                    f"The files take {size / (1024 * 1024):.0f} MB and will be loaded into memory.\n\n"
+                    "Compare them out of core by key columns instead?",
+                    QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+                )
+                if reply == QMessageBox.Yes:
+                    self.start_chunked_comparison(current_file)
+                    return
             
-            # Create comparison dialog
+            # The dialog loads the files only if cached fingerprints cannot decide the comparison
             dialog = PluginCompareDialog(
-                df1, df2, 
+                None, None, 
                 os.path.basename(file1), 
                 os.path.basename(file2), 
-                self
+                self,
+                df1_path=file1,
+                df2_path=file2
             )
             
             dialog.exec_()
@@ -1584,6 +1997,40 @@ class VSCodeMainWindow(QMainWindow):
             QMessageBox.critical(self, "Error", f"Failed to start comparison: {e}")
             self.log_message(f"Comparison failed: {e}")
     
+    def start_chunked_comparison(self, current_file):
+        """Compare the first two selected files by key without loading them into memory"""
+        if current_file not in self.selected_files_for_comparison:
+            self.selected_files_for_comparison.append(current_file)
+        
+        if len(self.selected_files_for_comparison) < 2:
+            QMessageBox.information(self, "Info", "Please select at least 2 files to compare.")
+            return
+        
+        try:
+            file1 = self.selected_files_for_comparison[0]
+            file2 = self.selected_files_for_comparison[1]
+            dialog = ChunkedCompareDialog(file1, file2, self)
+            dialog.exec_()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to start comparison: {e}")
+            self.log_message(f"Comparison failed: {e}")
+    
+    def start_batch_comparison(self, current_file, plugin_names=None):
+        """Compare all selected files pairwise or against a baseline with several plugins"""
+        if current_file not in self.selected_files_for_comparison:
+            self.selected_files_for_comparison.append(current_file)
+        
+        if len(self.selected_files_for_comparison) < 2:
+            QMessageBox.information(self, "Info", "Please select at least 2 files to compare.")
+            return
+        
+        try:
+            dialog = BatchCompareDialog(list(self.selected_files_for_comparison), self, plugin_names)
+            dialog.exec_()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to start comparison: {e}")
+            self.log_message(f"Comparison failed: {e}")
+    
     def load_dataframe_from_file(self, file_path):
         """Load a pandas DataFrame from a file"""
         import pandas as pd